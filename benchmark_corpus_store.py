@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语料库读取性能对比
+在临时目录中生成N个单独的翻译对JSON文件，对比原来逐个open + json.load的读取方式和从打包的SQLite语料库读取
+用法: python benchmark_corpus_store.py [--pairs 20000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from corpus_store import CORPUS_DB_NAME, CorpusStore, open_corpus
+
+def write_pair_files(directory: str, count: int):
+    """生成与individual_pairs相同格式的翻译对文件"""
+    for index in range(count):
+        item = {
+            'source': f"Garchomp sets up Swords Dance and sweeps the opposing team {index}.",
+            'target': f"烈咬陆鲨使用剑舞后横扫对手的队伍 {index}。",
+            'source_lang': 'english',
+            'target_lang': 'chinese',
+            'metadata_section_type': 'SET_COMMENTS' if index % 2 else 'OVERVIEW',
+            'metadata_source_file': f"thread_{index % 100}.txt"
+        }
+        with open(os.path.join(directory, f"pair_{index:06d}.json"), 'w', encoding='utf-8') as f:
+            json.dump([item], f, ensure_ascii=False)
+
+def legacy_load(directory: str) -> List[Dict]:
+    """原来的读取方式：每个文件分别打开并解析"""
+    pairs = []
+    for filename in os.listdir(directory):
+        if filename.endswith('.json'):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            pairs.extend(data if isinstance(data, list) else [data])
+    return pairs
+
+def run_benchmark(count: int) -> Dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        write_pair_files(work_dir, count)
+
+        start = time.perf_counter()
+        legacy_count = len(legacy_load(work_dir))
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with CorpusStore(os.path.join(work_dir, CORPUS_DB_NAME)) as corpus:
+            corpus.import_directory(work_dir)
+        import_seconds = time.perf_counter() - start
+
+        # 目录模式：先检查文件有没有变化（只stat不打开），再从语料库读取
+        start = time.perf_counter()
+        with open_corpus(work_dir) as corpus:
+            directory_count = sum(1 for _ in corpus.iter_pairs())
+        directory_seconds = time.perf_counter() - start
+
+        # 直接打开语料库文件
+        start = time.perf_counter()
+        with open_corpus(os.path.join(work_dir, CORPUS_DB_NAME)) as corpus:
+            packed_count = sum(1 for _ in corpus.iter_pairs())
+        packed_seconds = time.perf_counter() - start
+
+    return {
+        'pairs': count,
+        'legacy_seconds': legacy_seconds,
+        'import_seconds': import_seconds,
+        'directory_seconds': directory_seconds,
+        'packed_seconds': packed_seconds,
+        'same_count': legacy_count == directory_count == packed_count
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='语料库读取性能对比')
+    parser.add_argument('--pairs', type=int, default=20000, help='翻译对数量')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.pairs)
+    print(f"翻译对数量: {result['pairs']}")
+    print(f"逐个文件读取: {result['legacy_seconds'] * 1000:.1f}ms")
+    print(f"首次导入语料库: {result['import_seconds'] * 1000:.1f}ms")
+    print(f"目录模式读取（检查文件变化）: {result['directory_seconds'] * 1000:.1f}ms")
+    print(f"直接读取语料库文件: {result['packed_seconds'] * 1000:.1f}ms")
+    print(f"数量一致: {'是' if result['same_count'] else '否'}")
+
+if __name__ == '__main__':
+    main()
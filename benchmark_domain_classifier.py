@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+领域分类性能对比
+在individual_pairs的英文文本上，对比原来对每个领域的每个关键词做子串判断的写法、DomainClassifier逐条分类
+和classify_batch批量分类，并统计与原写法分类结果相同的比例（单词边界使部分子串误命中不再计数）
+用法: python benchmark_domain_classifier.py [--input-dir individual_pairs] [--scale 20] [--config transformers_config.json]
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from corpus_store import load_pairs
+from domain_classifier import DomainClassifier
+
+def load_domains(config_path: str) -> Dict[str, Dict]:
+    """transformers_config.json中的pokemon_domains"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['pokemon_domains']
+
+def load_texts(input_dir: str, scale: int = 1) -> List[str]:
+    """翻译对的英文文本，重复scale次模拟更大的语料库"""
+    texts = [pair['english'] for pair in load_pairs(input_dir)] or [
+        "Garchomp is a strong wallbreaker; its Speed tier lets it pivot around the metagame.",
+        "This team relies on hazard control and a Choice Band user to break walls."
+    ] * 20
+    return texts * scale
+
+def legacy_classify(domains: Dict[str, Dict], text: str) -> str:
+    """原来EnhancedTransformersModule._classify_domain的写法"""
+    text_lower = text.lower()
+    domain_scores = {}
+    for domain_name, domain_info in domains.items():
+        score = sum(1 for keyword in domain_info['keywords'] if keyword in text_lower)
+        if score > 0:
+            domain_scores[domain_name] = score * domain_info['difficulty_weight']
+    if domain_scores:
+        return max(domain_scores, key=domain_scores.get)
+    return "general"
+
+def run_benchmark(domains: Dict[str, Dict], texts: List[str]) -> Dict:
+    """对比三种分类方式"""
+    start = time.perf_counter()
+    legacy = [legacy_classify(domains, text) for text in texts]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier = DomainClassifier(domains)
+    single = [classifier.classify(text) for text in texts]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = DomainClassifier(domains).classify_batch(texts)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'texts': len(texts),
+        'chars': sum(len(text) for text in texts),
+        'legacy_seconds': legacy_seconds,
+        'single_seconds': single_seconds,
+        'batch_seconds': batch_seconds,
+        'batch_matches_single': batch == single,
+        'agreement': sum(1 for old, new in zip(legacy, batch) if old == new) / max(len(texts), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='领域分类性能对比')
+    parser.add_argument('--input-dir', default='individual_pairs', help='翻译对目录')
+    parser.add_argument('--scale', type=int, default=20, help='把文本重复多少份')
+    parser.add_argument('--config', default='transformers_config.json', help='包含pokemon_domains的配置文件')
+    args = parser.parse_args()
+
+    result = run_benchmark(load_domains(args.config), load_texts(args.input_dir, args.scale))
+    print(f"文本: {result['texts']}，字符数: {result['chars']}")
+    print(f"原实现: {result['legacy_seconds'] * 1000:.1f}ms")
+    print(f"逐条分类: {result['single_seconds'] * 1000:.1f}ms")
+    print(f"classify_batch: {result['batch_seconds'] * 1000:.1f}ms")
+    print(f"批量与逐条结果一致: {'是' if result['batch_matches_single'] else '否'}")
+    print(f"与原实现分类相同: {result['agreement']:.1%}")
+
+if __name__ == '__main__':
+    main()
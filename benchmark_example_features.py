@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+样本评分性能对比
+在individual_pairs的翻译对上，对比原来逐个特征各自跑正则的评分、批量评分，以及从特征缓存读取，
+并检查三者的结果一致
+用法: python benchmark_example_features.py [--input-dir individual_pairs] [--scale 20]
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+
+from corpus_store import load_pairs, pair_hash
+from enhanced_transformers_module import EnhancedTransformersModule
+from example_features import FeatureCache
+from nllb_learning_module import _DOMAIN_CLASSIFIER as nllb_domain_classifier, NLLBLearningModule
+
+SAMPLE_PAIRS = [
+    ("Garchomp is a strong wallbreaker that can set up Swords Dance on passive foes.",
+     "烈咬陆鲨是强力的破盾手，可以在被动的对手面前使用剑舞。"),
+    ("Mega Scizor hits hard with Bullet Punch, and Landorus-T provides Stealth Rock support.",
+     "超级巨钳螳螂用子弹拳造成大量伤害，土地云灵兽形态提供隐形岩支援。"),
+    ("This team relies on Speed control; Dragon and Fire types threaten it.", "这支队伍依赖速度控制，龙和火属性对它有威胁。"),
+]
+
+def enhanced_scorer(config_path: str = "transformers_config.json") -> EnhancedTransformersModule:
+    """不加载模型的EnhancedTransformersModule，只用于评分"""
+    module = EnhancedTransformersModule.__new__(EnhancedTransformersModule)
+    module.config = module._load_config(config_path)
+    module.term_dictionaries = {name: {} for name in ('pokemon_names', 'moves', 'abilities', 'items', 'types',
+                                                      'stats', 'mechanics', 'strategies')}
+    return module
+
+def legacy_enhanced_features(module, english: str, chinese: str) -> Dict:
+    """原来EnhancedTransformersModule.load_translation_data对每个翻译对的评分（领域分类的对比见benchmark_domain_classifier）"""
+    word_count = len(english.split())
+    sentence_count = len(re.findall(r'[.!?]+', english))
+    complex_words = len(re.findall(r'\b\w{8,}\b', english))
+    technical_terms = len(re.findall(r'\b[A-Z][a-z]+-[A-Z]\b|\bMega \w+\b', english))
+    difficulty = min(1.0, (
+        word_count / 50 * 0.3 +
+        complex_words / 5 * 0.3 +
+        technical_terms / 3 * 0.2 +
+        sentence_count / 3 * 0.2
+    ))
+
+    en_words = len(english.split())
+    cn_chars = len(re.findall(r'[一-鿿]', chinese))
+    if en_words == 0:
+        quality = 0.0
+    else:
+        length_ratio = cn_chars / en_words
+        length_score = min(1.0, length_ratio / 1.5) if length_ratio <= 3.0 else 0.3
+        completeness_score = 1.0 if len(chinese.strip()) > 0 else 0.0
+        chinese_ratio = cn_chars / len(chinese) if len(chinese) > 0 else 0.0
+        chinese_score = min(1.0, chinese_ratio * 1.2)
+        quality = (length_score * 0.4 + completeness_score * 0.3 + chinese_score * 0.3)
+
+    pokemon_patterns = [
+        r'\b[A-Z][a-z]+-[A-Z]\b',
+        r'\bMega [A-Z][a-z]+\b',
+        r'\b(?:HP|Attack|Defense|Speed|Special)\b',
+        r'\b(?:Ghost|Dragon|Fire|Water|Grass|Electric)\b'
+    ]
+    term_patterns = [
+        ('pokemon_names', r'\b[A-Z][a-z]+-[A-Z]\b'),
+        ('pokemon_names', r'\bMega [A-Z][a-z]+\b'),
+        ('pokemon_names', r'\b[A-Z][a-z]{4,}(?=\s+(?:is|can|has|learns))\b'),
+        ('moves', r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b'),
+        ('moves', r'\b[A-Z][a-z]+(?=\s+(?:hits|deals|can))\b')
+    ]
+    chinese_terms = re.findall(r'[一-鿿]+', chinese)
+    candidates = []
+    for term_type, pattern in term_patterns:
+        for i, match in enumerate(re.findall(pattern, english)):
+            if i < len(chinese_terms):
+                candidates.append((term_type, match, chinese_terms[i]))
+
+    domain, domain_hits = module._domain_classifier().classify_with_hits(english)
+    return {
+        'domain': domain,
+        'domain_hits': domain_hits,
+        'difficulty': difficulty,
+        'quality_score': quality,
+        'has_pokemon_terms': any(re.search(pattern, english) for pattern in pokemon_patterns),
+        'sentence_count': len(re.findall(r'[.!?]+', english)),
+        'term_candidates': candidates
+    }
+
+def legacy_nllb_features(module, source: str, target: str) -> Dict:
+    """原来NLLBLearningModule._create_example_from_dict对每个翻译对的评分（领域分类的对比见benchmark_domain_classifier）"""
+    source_len = len(source.split())
+    length_factor = min(source_len / 20, 2.0)
+    complexity_factor = min(len(re.findall(r'\b\w{8,}\b', source)) / 5, 2.0)
+    special_factor = min(len(re.findall(r'[^\w\s]', source)) / 10, 1.5)
+    difficulty = min(max((length_factor + complexity_factor + special_factor) / 3, 0.1), 3.0)
+
+    if not source.strip() or not target.strip() or source_len == 0 or len(target) == 0:
+        quality = 0.1
+    else:
+        length_ratio = len(target) / source_len
+        quality = 0.5 if length_ratio < 0.3 or length_ratio > 5.0 else 1.0
+        if '???' in target or '###' in target:
+            quality *= 0.5
+        quality = min(max(quality, 0.1), 1.0)
+
+    domain, domain_hits = nllb_domain_classifier.classify_with_hits(source)
+    return {
+        'source_lang': module._detect_language(source),
+        'target_lang': module._detect_language(target),
+        'domain': domain,
+        'domain_hits': domain_hits,
+        'difficulty': difficulty,
+        'quality_score': quality
+    }
+
+def load_texts(input_dir: str, scale: int = 1) -> List[Tuple[str, str]]:
+    """读取翻译对的 (英文, 中文)，重复scale次模拟更大的语料库（每份末尾加编号，内容哈希互不相同）"""
+    pairs = [(pair['english'], pair['chinese']) for pair in load_pairs(input_dir)] or SAMPLE_PAIRS * 20
+    return [(f"{english} ({copy})", f"{chinese}（{copy}）") for copy in range(scale) for english, chinese in pairs]
+
+def legacy_score(module, legacy, pairs: List[Tuple[str, str]]) -> List[Dict]:
+    return [legacy(module, source, target) for source, target in pairs]
+
+def cached_score(module, cache: FeatureCache, pairs: List[Tuple[str, str]]) -> List[Dict]:
+    return cache.features([(pair_hash(source, target), source, target) for source, target in pairs],
+                          module._score_pairs)
+
+def run_benchmark(pairs: List[Tuple[str, str]]) -> Dict:
+    """对比两个学习模块的三种评分方式"""
+    results = {'pairs': len(pairs)}
+    for name, module, legacy in (('enhanced', enhanced_scorer(), legacy_enhanced_features),
+                                 ('nllb', NLLBLearningModule(), legacy_nllb_features)):
+        start = time.perf_counter()
+        legacy_features = legacy_score(module, legacy, pairs)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_features = module._score_pairs(pairs)
+        batch_seconds = time.perf_counter() - start
+
+        conn = sqlite3.connect(":memory:")
+        cache = FeatureCache(conn, module._feature_scorer_key())
+        cached_score(module, cache, pairs)
+        start = time.perf_counter()
+        cached_features = cached_score(module, cache, pairs)
+        cached_seconds = time.perf_counter() - start
+        conn.close()
+
+        # 缓存经过JSON，元组变成列表
+        normalized = [dict(features, term_candidates=[list(item) for item in features['term_candidates']])
+                      if 'term_candidates' in features else features for features in legacy_features]
+        results[name] = {
+            'legacy_seconds': legacy_seconds,
+            'batch_seconds': batch_seconds,
+            'cached_seconds': cached_seconds,
+            'same_results': legacy_features == batch_features and normalized == cached_features
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='样本评分性能对比')
+    parser.add_argument('--input-dir', default='individual_pairs', help='翻译对目录')
+    parser.add_argument('--scale', type=int, default=20, help='把翻译对重复多少份')
+    args = parser.parse_args()
+
+    result = run_benchmark(load_texts(args.input_dir, args.scale))
+    print(f"翻译对: {result['pairs']}")
+    for name in ('enhanced', 'nllb'):
+        item = result[name]
+        print(f"{name}: 原实现 {item['legacy_seconds'] * 1000:.1f}ms，批量评分 {item['batch_seconds'] * 1000:.1f}ms，"
+              f"读取缓存 {item['cached_seconds'] * 1000:.1f}ms，结果一致: {'是' if item['same_results'] else '否'}")
+
+if __name__ == '__main__':
+    main()
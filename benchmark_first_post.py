@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主帖提取性能对比
+对比整页BeautifulSoup解析和first_post_extractor快速路径的耗时与峰值内存，并检查两者提取的文本一致
+用法: python benchmark_first_post.py [保存的帖子页面目录]  （不指定目录时生成一个模拟的长帖子页面）
+"""
+
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from first_post_extractor import extract_first_post
+
+def build_sample_thread(replies: int = 300) -> str:
+    """生成一个模拟的XenForo长帖子页面"""
+    first_post = (
+        "<b>[SET]</b><br>name: Swords Dance<br>move 1: Swords Dance<br>"
+        "<div class=\"bbCodeBlock\"><div class=\"bbCodeBlock-content\">Chinese Set: 剑舞 || 道具：生命宝珠</div></div>"
+        "<b>[SET COMMENTS]</b><br>Garchomp is a strong setup sweeper.<br>烈咬陆鲨是强力的强化清场手。"
+    )
+    reply = (
+        '<article class="message" data-content="post-{post_id}"><div class="message-body">'
+        '<div class="bbWrapper">Reply {post_id}: <a href="/members/{post_id}">@user</a> '
+        'Thanks for the analysis! <div class="bbCodeBlock"><blockquote>quoted text</blockquote></div></div>'
+        '</div><div class="message-signature"><div class="bbWrapper">signature</div></div></article>'
+    )
+    replies_html = ''.join(reply.format(post_id=1000 + i) for i in range(replies))
+    return (
+        '<html><head><title>Garchomp</title></head><body>'
+        '<div class="p-title"><h1 class="p-title-value">Garchomp &amp; Friends</h1></div>'
+        '<article class="message" data-content="post-999"><div class="message-body">'
+        f'<div class="bbWrapper">{first_post}</div></div></article>'
+        f'{replies_html}</body></html>'
+    )
+
+def full_parse(html: bytes) -> Tuple[str, str]:
+    """原来的做法：整页解析"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title_elem = soup.find('h1', class_='p-title-value')
+    posts = soup.find_all('div', class_='bbWrapper')
+    title = title_elem.get_text(strip=True) if title_elem else None
+    text = posts[0].get_text(separator='\n', strip=True) if posts else ""
+    return title, text
+
+def fast_parse(html: bytes) -> Tuple[str, str]:
+    """快速路径"""
+    page = extract_first_post(html)
+    return page.title, page.text()
+
+def measure(parse: Callable[[bytes], Tuple[str, str]], html: bytes, repeat: int) -> Dict[str, float]:
+    """测量平均耗时和峰值内存"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'peak_bytes': peak}
+
+def run_benchmark(pages: List[Tuple[str, bytes]], repeat: int = 3) -> List[Dict]:
+    """对每个页面比较两种解析方式"""
+    results = []
+    for name, html in pages:
+        full = measure(full_parse, html, repeat)
+        fast = measure(fast_parse, html, repeat)
+        results.append({
+            'page': name,
+            'size_kb': len(html) / 1024,
+            'same_output': full_parse(html) == fast_parse(html),
+            'full': full,
+            'fast': fast,
+            'speedup': full['seconds'] / max(fast['seconds'], 1e-9),
+            'memory_ratio': full['peak_bytes'] / max(fast['peak_bytes'], 1)
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='主帖提取性能对比')
+    parser.add_argument('pages_dir', nargs='?', help='保存的帖子HTML页面目录')
+    parser.add_argument('--repeat', type=int, default=3, help='每个页面重复次数')
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages_dir, '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [('sample_300_replies', build_sample_thread().encode('utf-8'))]
+
+    if not pages:
+        print("没有找到页面")
+        return
+
+    print(f"{'页面':<30} {'大小KB':>8} {'整页ms':>9} {'快速ms':>9} {'加速':>7} {'整页内存KB':>11} {'快速内存KB':>11} {'一致':>5}")
+    for result in run_benchmark(pages, args.repeat):
+        print(f"{result['page'][:30]:<30} {result['size_kb']:>8.1f} "
+              f"{result['full']['seconds'] * 1000:>9.2f} {result['fast']['seconds'] * 1000:>9.2f} "
+              f"{result['speedup']:>6.1f}x "
+              f"{result['full']['peak_bytes'] / 1024:>11.0f} {result['fast']['peak_bytes'] / 1024:>11.0f} "
+              f"{'是' if result['same_output'] else '否':>5}")
+
+if __name__ == '__main__':
+    main()
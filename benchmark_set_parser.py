@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SET块解析性能对比
+在包含几百个SET块的模拟帖子上，对比原来的嵌套while循环实现和set_block_parser单遍状态机的耗时，
+并检查两者提取的配置行一致
+用法: python benchmark_set_parser.py [--sets 400] [--repeat 5]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from set_block_parser import parse_set_blocks
+
+EN_SET = [
+    "[SET]",
+    "name: Swords Dance {index}",
+    "Garchomp @ Life Orb",
+    "Ability: Rough Skin",
+    "Tera Type: Steel",
+    "EVs: 252 Atk / 4 SpD / 252 Spe",
+    "Jolly Nature",
+    "- Swords Dance",
+    "- Earthquake",
+    "- Scale Shot",
+    "- Stealth Rock",
+    "[SET COMMENTS]",
+    "Swords Dance boosts Garchomp's attack {index}.",
+    "Scale Shot raises its speed while hitting hard.",
+    "Stealth Rock supports the team.",
+]
+CN_SET = [
+    "[SET]",
+    "Chinese Set: 剑舞 {index} || 道具：生命宝珠 || 特性：粗糙皮肤 || 性格：爽朗 || 努力值：252 攻击 / 4 特防 / 252 速度",
+    "- 剑舞",
+    "- 地震",
+    "- 鳞射",
+    "- 隐形岩",
+    "[SET COMMENTS]",
+    "剑舞可以提升烈咬陆鲨的攻击{index}。",
+    "鳞射在造成伤害的同时提升速度。",
+    "隐形岩可以支援队伍。",
+]
+
+def build_sample_post(sets: int = 400) -> List[str]:
+    """生成包含sets个英文SET和sets个中文SET的帖子行（与SmogonScraper一样去掉空行）"""
+    lines = ["[OVERVIEW]", "Garchomp is a strong sweeper.", "烈咬陆鲨是强力的清场手。"]
+    for index in range(sets):
+        lines.extend(line.format(index=index) for line in EN_SET)
+        lines.extend(line.format(index=index) for line in CN_SET)
+    lines.extend(["[SET CREDITS]", "Written by: someone"])
+    return lines
+
+def legacy_extract_all_set_blocks(lines: List[str]) -> List[Dict]:
+    """原来的实现：每行多次调用upper()，并用嵌套while循环重新扫描"""
+    set_blocks = []
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+
+        if '[SET]' in line.upper() or 'SET]' in line.upper():
+            set_content = []
+            comments_content = []
+            j = i + 1
+
+            while j < len(lines):
+                current_line = lines[j]
+                if '[SET COMMENTS]' in current_line.upper() or 'SET COMMENTS]' in current_line.upper():
+                    k = j + 1
+                    while k < len(lines):
+                        comment_line = lines[k]
+                        if ('[SET]' in comment_line.upper() or
+                            comment_line.strip() == '' or
+                            k == len(lines) - 1):
+                            break
+                        if comment_line.strip():
+                            comments_content.append(comment_line.strip())
+                        k += 1
+                    break
+                if current_line.strip() and not current_line.startswith('['):
+                    set_content.append(current_line.strip())
+                j += 1
+
+            if set_content:
+                set_blocks.append({
+                    'set_content': set_content,
+                    'comments_content': comments_content,
+                    'start_line': i,
+                    'end_line': j
+                })
+
+            i = j if j > i else i + 1
+        else:
+            i += 1
+
+    return set_blocks
+
+def single_pass_extract(lines: List[str]) -> List[Dict]:
+    """单遍状态机"""
+    return [record.to_block() for record in parse_set_blocks(lines)]
+
+def single_pass_extract_with_fields(lines: List[str]) -> List[Dict]:
+    """单遍状态机，并解析每个块的结构化字段"""
+    records = parse_set_blocks(lines)
+    for record in records:
+        record.key_info()
+    return [record.to_block() for record in records]
+
+def measure(parse: Callable[[List[str]], List[Dict]], lines: List[str], repeat: int) -> float:
+    """平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(lines)
+    return (time.perf_counter() - start) / repeat
+
+def run_benchmark(sets: int = 400, repeat: int = 5) -> Dict:
+    """对比两种实现"""
+    lines = build_sample_post(sets)
+    legacy_blocks = legacy_extract_all_set_blocks(lines)
+    new_blocks = single_pass_extract(lines)
+    legacy_seconds = measure(legacy_extract_all_set_blocks, lines, repeat)
+    new_seconds = measure(single_pass_extract, lines, repeat)
+    fields_seconds = measure(single_pass_extract_with_fields, lines, repeat)
+    return {
+        'sets': sets * 2,
+        'lines': len(lines),
+        'legacy_seconds': legacy_seconds,
+        'new_seconds': new_seconds,
+        'fields_seconds': fields_seconds,
+        'speedup': legacy_seconds / max(new_seconds, 1e-9),
+        'same_set_content': [block['set_content'] for block in legacy_blocks] ==
+                            [block['set_content'] for block in new_blocks],
+        'blocks': len(new_blocks)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='SET块解析性能对比')
+    parser.add_argument('--sets', type=int, default=400, help='英文和中文SET各多少个')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sets, args.repeat)
+    print(f"SET块: {result['sets']}，行数: {result['lines']}")
+    print(f"原实现: {result['legacy_seconds'] * 1000:.2f}ms")
+    print(f"单遍解析: {result['new_seconds'] * 1000:.2f}ms")
+    print(f"单遍解析 + 结构化字段: {result['fields_seconds'] * 1000:.2f}ms")
+    print(f"加速: {result['speedup']:.1f}x")
+    print(f"配置行一致: {'是' if result['same_set_content'] else '否'}")
+
+if __name__ == '__main__':
+    main()
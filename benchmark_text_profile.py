@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语言判断性能对比
+在individual_pairs的逐行文本上，对比原来每次判断都多次调用re.findall的写法和text_profile的单次扫描，
+并检查两者的判断结果一致
+用法: python benchmark_text_profile.py [--input-dir individual_pairs] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+from text_profile import profile_texts
+
+SAMPLE_LINES = [
+    "Garchomp is a strong wallbreaker that can set up Swords Dance on passive foes.",
+    "烈咬陆鲨是强力的破盾手，可以在被动的对手面前使用剑舞。",
+    "EVs: 252 Atk / 4 SpD / 252 Spe",
+    "努力值：252 攻击 / 4 特防 / 252 速度",
+    "- Scale Shot",
+]
+
+def load_lines(input_dir: str) -> List[str]:
+    """读取目录中所有翻译对的逐行文本，目录不存在时使用示例文本"""
+    lines = []
+    if os.path.isdir(input_dir):
+        for filename in sorted(os.listdir(input_dir)):
+            if not filename.endswith('.json'):
+                continue
+            with open(os.path.join(input_dir, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data if isinstance(data, list) else [data]:
+                if isinstance(item, dict):
+                    for key in ('source', 'target'):
+                        lines.extend(line for line in str(item.get(key, '')).split('\n') if line.strip())
+    return lines or SAMPLE_LINES * 100
+
+def legacy_is_english_text(text: str) -> bool:
+    """原来的SmogonScraper._is_english_text"""
+    if not text or len(text) < 5:
+        return False
+    alpha_chars = re.sub(r'[^a-zA-Z]', '', text)
+    if len(alpha_chars) < 3:
+        return False
+    english_chars = len(re.findall(r'[a-zA-Z]', text))
+    total_chars = len(text.replace(' ', ''))
+    if total_chars == 0:
+        return False
+    return english_chars / total_chars > 0.6
+
+def legacy_is_chinese_text(text: str) -> bool:
+    """原来的SmogonScraper._is_chinese_text"""
+    if not text or len(text) < 2:
+        return False
+    chinese_chars = len(re.findall(r'[一-鿿]', text))
+    total_chars = len(text.replace(' ', ''))
+    if total_chars == 0:
+        return False
+    return chinese_chars / total_chars > 0.3
+
+def legacy_detect_language(text: str) -> str:
+    """原来的DataFormatConverter.detect_language"""
+    chinese_chars = len(re.findall(r'[一-鿿]', text))
+    japanese_chars = len(re.findall(r'[぀-ゟ゠-ヿ]', text))
+    korean_chars = len(re.findall(r'[가-힯]', text))
+    total_chars = len(text)
+    if total_chars == 0:
+        return "unknown"
+    if chinese_chars / total_chars > 0.3:
+        return "chinese"
+    elif japanese_chars / total_chars > 0.3:
+        return "japanese"
+    elif korean_chars / total_chars > 0.3:
+        return "korean"
+    return "english"
+
+def legacy_classify(lines: List[str]) -> List[tuple]:
+    """原来的写法：每行分别判断英文、中文和语言"""
+    return [(legacy_is_english_text(line), legacy_is_chinese_text(line), legacy_detect_language(line))
+            for line in lines]
+
+def profile_classify(lines: List[str]) -> List[tuple]:
+    """单次扫描：每行只统计一次字符画像"""
+    return [(profile.is_english(), profile.is_chinese(), profile.language())
+            for profile in profile_texts(lines)]
+
+def measure(classify: Callable[[List[str]], List[tuple]], lines: List[str], repeat: int) -> float:
+    """平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        classify(lines)
+    return (time.perf_counter() - start) / repeat
+
+def run_benchmark(lines: List[str], repeat: int = 5) -> Dict:
+    """对比两种实现"""
+    legacy_seconds = measure(legacy_classify, lines, repeat)
+    profile_seconds = measure(profile_classify, lines, repeat)
+    return {
+        'lines': len(lines),
+        'chars': sum(len(line) for line in lines),
+        'legacy_seconds': legacy_seconds,
+        'profile_seconds': profile_seconds,
+        'speedup': legacy_seconds / max(profile_seconds, 1e-9),
+        'same_results': legacy_classify(lines) == profile_classify(lines)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='语言判断性能对比')
+    parser.add_argument('--input-dir', default='individual_pairs', help='翻译对目录')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    args = parser.parse_args()
+
+    result = run_benchmark(load_lines(args.input_dir), args.repeat)
+    print(f"行数: {result['lines']}，字符数: {result['chars']}")
+    print(f"原实现: {result['legacy_seconds'] * 1000:.2f}ms")
+    print(f"字符画像: {result['profile_seconds'] * 1000:.2f}ms")
+    print(f"加速: {result['speedup']:.1f}x")
+    print(f"判断结果一致: {'是' if result['same_results'] else '否'}")
+
+if __name__ == '__main__':
+    main()
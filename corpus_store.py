@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打包的翻译对语料库
+用一个SQLite文件保存individual_pairs中的所有翻译对，统一为english/chinese/section_type/source_file的结构，
+并在section_type、source_file和内容哈希上建索引。各个学习模块都通过open_corpus读取，
+不再对每个JSON文件分别open + json.load并各自猜测格式
+用法: python corpus_store.py [individual_pairs] [--db corpus.db]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from crawl_state import content_hash
+from pair_dedup import DEFAULT_THRESHOLD, NearDuplicateIndex
+from text_profile import detect_language
+
+# 目录模式下语料库文件放在目录内（学习模块只读取.json文件，不受影响）
+CORPUS_DB_NAME = "corpus.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    id INTEGER PRIMARY KEY,
+    english TEXT NOT NULL,
+    chinese TEXT NOT NULL,
+    section_type TEXT NOT NULL DEFAULT '',
+    source_file TEXT NOT NULL DEFAULT '',
+    origin_file TEXT NOT NULL DEFAULT '',
+    confidence REAL NOT NULL DEFAULT 1.0,
+    content_hash TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_pairs_section_type ON pairs (section_type);
+CREATE INDEX IF NOT EXISTS idx_pairs_source_file ON pairs (source_file);
+CREATE INDEX IF NOT EXISTS idx_pairs_content_hash ON pairs (content_hash);
+CREATE INDEX IF NOT EXISTS idx_pairs_origin_file ON pairs (origin_file);
+CREATE TABLE IF NOT EXISTS imported_files (
+    origin_file TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER,
+    pair_count INTEGER
+);
+"""
+
+# 原文件中的文本字段，以及DataFormatConverter加上的语言字段，都不放进metadata
+_TEXT_KEYS = (('english', 'chinese'), ('en', 'zh'), ('source', 'target'))
+_LANGUAGE_KEYS = ('source_lang', 'target_lang')
+
+def pair_hash(english: str, chinese: str) -> str:
+    """翻译对的内容哈希"""
+    return content_hash(f"{english}\x00{chinese}")
+
+def iter_file_items(data) -> Iterator[Dict]:
+    """JSON文件中的翻译对：列表、带translation_pairs的文档或单个翻译对"""
+    if isinstance(data, list):
+        items = data
+    elif isinstance(data, dict) and isinstance(data.get('translation_pairs'), list):
+        items = data['translation_pairs']
+    else:
+        items = [data]
+    return (item for item in items if isinstance(item, dict))
+
+def normalize_pair(item: Dict, origin_file: str = "") -> Optional[Dict]:
+    """把各种格式的翻译对统一为english/chinese结构，缺少文本时返回None
+
+    支持english/chinese、en/zh和source/target（按source_lang或检测到的语言确定方向）三种写法，
+    DataFormatConverter加上的metadata_前缀会去掉
+    """
+    for source_key, target_key in _TEXT_KEYS:
+        if source_key in item and target_key in item:
+            break
+    else:
+        return None
+
+    english = str(item[source_key] or '').strip()
+    chinese = str(item[target_key] or '').strip()
+    if source_key == 'source':
+        source_lang = item.get('source_lang') or detect_language(english)
+        target_lang = item.get('target_lang') or detect_language(chinese)
+        if source_lang == 'chinese' and target_lang != 'chinese':
+            english, chinese = chinese, english
+    if not english or not chinese:
+        return None
+
+    metadata = {}
+    for key, value in item.items():
+        if key in (source_key, target_key) or key in _LANGUAGE_KEYS:
+            continue
+        metadata[key[len('metadata_'):] if key.startswith('metadata_') else key] = value
+
+    try:
+        confidence = float(metadata.pop('confidence', 1.0))
+    except (TypeError, ValueError):
+        confidence = 1.0
+    return {
+        'english': english,
+        'chinese': chinese,
+        'section_type': str(metadata.pop('section_type', '') or ''),
+        'source_file': str(metadata.pop('source_file', '') or '') or origin_file,
+        'origin_file': origin_file,
+        'confidence': confidence,
+        'content_hash': pair_hash(english, chinese),
+        'metadata': metadata
+    }
+
+class CorpusStore:
+    """SQLite翻译对语料库"""
+
+    def __init__(self, db_path: str = CORPUS_DB_NAME):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add_pairs(self, pairs: Iterable[Dict], origin_file: str = "") -> int:
+        """写入翻译对（任意支持的格式），返回写入的数量"""
+        count = self._insert(pairs, origin_file)
+        self.conn.commit()
+        return count
+
+    def _insert(self, pairs: Iterable[Dict], origin_file: str) -> int:
+        rows = []
+        for item in pairs:
+            pair = normalize_pair(item, origin_file)
+            if pair:
+                rows.append((pair['english'], pair['chinese'], pair['section_type'], pair['source_file'],
+                             pair['origin_file'], pair['confidence'], pair['content_hash'],
+                             json.dumps(pair['metadata'], ensure_ascii=False)))
+        self.conn.executemany(
+            "INSERT INTO pairs (english, chinese, section_type, source_file, origin_file, confidence, "
+            "content_hash, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(rows)
+
+    def import_directory(self, directory: str) -> Dict:
+        """导入目录中的JSON翻译对文件
+
+        按文件名记录每个文件的修改时间和大小，再次导入时只读取新增或修改过的文件，
+        并删除已不存在的文件以及已无法读取的文件的翻译对
+        """
+        stats = {'files': 0, 'imported': 0, 'skipped': 0, 'removed': 0, 'pairs': 0, 'errors': 0}
+        known = {row['origin_file']: (row['mtime'], row['size'])
+                 for row in self.conn.execute("SELECT origin_file, mtime, size FROM imported_files")}
+        present = set()
+
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.json'):
+                continue
+            stats['files'] += 1
+            present.add(filename)
+            file_stat = os.stat(os.path.join(directory, filename))
+            if known.get(filename) == (file_stat.st_mtime, file_stat.st_size):
+                stats['skipped'] += 1
+                continue
+
+            try:
+                with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"加载文件 {filename} 时出错: {e}")
+                stats['errors'] += 1
+                if filename in known:
+                    self._remove_file(filename)
+                    print(f"  已删除 {filename} 上次导入的翻译对")
+                continue
+            if filename in known:
+                self.conn.execute("DELETE FROM pairs WHERE origin_file = ?", (filename,))
+            count = self._insert(iter_file_items(data), filename)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO imported_files (origin_file, mtime, size, pair_count) VALUES (?, ?, ?, ?)",
+                (filename, file_stat.st_mtime, file_stat.st_size, count)
+            )
+            stats['imported'] += 1
+            stats['pairs'] += count
+
+        for filename in set(known) - present:
+            self._remove_file(filename)
+            stats['removed'] += 1
+        self.conn.commit()
+        return stats
+
+    def _remove_file(self, filename: str):
+        """删除一个文件导入的翻译对和导入记录"""
+        self.conn.execute("DELETE FROM pairs WHERE origin_file = ?", (filename,))
+        self.conn.execute("DELETE FROM imported_files WHERE origin_file = ?", (filename,))
+
+    def _where(self, section_type: Optional[str], source_file: Optional[str], content_hash: Optional[str],
+               origin_file: Optional[str]):
+        conditions, values = [], []
+        for column, value in (('section_type', section_type), ('source_file', source_file),
+                              ('content_hash', content_hash), ('origin_file', origin_file)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), values
+
+    def iter_pairs(self, section_type: Optional[str] = None, source_file: Optional[str] = None,
+                   content_hash: Optional[str] = None, origin_file: Optional[str] = None,
+                   limit: Optional[int] = None, deduplicate: bool = False,
+                   threshold: float = DEFAULT_THRESHOLD) -> Iterator[Dict]:
+        """按导入顺序逐个读取翻译对，可按section_type、source_file、内容哈希和原文件名过滤
+
+        deduplicate为True时跳过与前面的翻译对完全重复或近似重复（见pair_dedup）的翻译对
+        """
+        where, values = self._where(section_type, source_file, content_hash, origin_file)
+        query = f"SELECT * FROM pairs{where} ORDER BY id"
+        if limit is not None and not deduplicate:
+            query += " LIMIT ?"
+            values.append(limit)
+
+        index = NearDuplicateIndex(threshold) if deduplicate else None
+        yielded = 0
+        for row in self.conn.execute(query, values):
+            if index is not None:
+                if index.add(row['id'], row['english'], row['chinese']) is not None:
+                    continue
+                if limit is not None and yielded >= limit:
+                    break
+            pair = dict(row)
+            pair['metadata'] = json.loads(pair['metadata'])
+            yielded += 1
+            yield pair
+
+    def count(self, section_type: Optional[str] = None, source_file: Optional[str] = None,
+              content_hash: Optional[str] = None, origin_file: Optional[str] = None) -> int:
+        where, values = self._where(section_type, source_file, content_hash, origin_file)
+        return self.conn.execute(f"SELECT COUNT(*) FROM pairs{where}", values).fetchone()[0]
+
+    def contains(self, english: str, chinese: str) -> bool:
+        """是否已有内容相同的翻译对"""
+        return self.count(content_hash=pair_hash(english, chinese)) > 0
+
+    def section_counts(self) -> Dict[str, int]:
+        """各section_type的翻译对数量"""
+        rows = self.conn.execute("SELECT section_type, COUNT(*) FROM pairs GROUP BY section_type ORDER BY section_type")
+        return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def open_corpus(path: str) -> CorpusStore:
+    """打开语料库
+
+    path为SQLite文件时直接打开；为individual_pairs这样的目录时使用目录内的corpus.db，
+    并先增量导入新增或修改过的JSON文件（目录不可写时在内存中导入）
+    """
+    if not os.path.isdir(path):
+        return CorpusStore(path)
+
+    db_path = os.path.join(path, CORPUS_DB_NAME)
+    try:
+        store = CorpusStore(db_path)
+    except sqlite3.OperationalError:
+        store = CorpusStore(":memory:")
+    try:
+        store.import_directory(path)
+    except sqlite3.OperationalError:
+        store.close()
+        store = CorpusStore(":memory:")
+        store.import_directory(path)
+    return store
+
+def load_pairs(path: str, **filters) -> List[Dict]:
+    """读取语料库中的全部翻译对（filters见CorpusStore.iter_pairs，包括deduplicate）"""
+    with open_corpus(path) as corpus:
+        return list(corpus.iter_pairs(**filters))
+
+def main():
+    parser = argparse.ArgumentParser(description='把翻译对目录导入SQLite语料库')
+    parser.add_argument('input_dir', nargs='?', default='individual_pairs', help='翻译对目录')
+    parser.add_argument('--db', default=None, help='语料库文件（默认为目录内的corpus.db）')
+    args = parser.parse_args()
+
+    with CorpusStore(args.db or os.path.join(args.input_dir, CORPUS_DB_NAME)) as corpus:
+        stats = corpus.import_directory(args.input_dir)
+        print(f"文件: {stats['files']} 个（导入 {stats['imported']}，未变化 {stats['skipped']}，"
+              f"删除 {stats['removed']}，出错 {stats['errors']}）")
+        print(f"语料库共 {corpus.count()} 个翻译对: {corpus.db_path}")
+        for section_type, count in corpus.section_counts().items():
+            print(f"  {section_type or '(无类型)'}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发爬取引擎
+基于有界线程池并发抓取页面，按主机进行令牌桶限速，失败时指数退避重试，并支持跟随论坛分页
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from http_client import RETRY_STATUS_CODES
+
+class TokenBucket:
+    """令牌桶限速器：平均每秒 rate 个请求，最多允许 capacity 个突发请求"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """取走一个令牌，没有令牌时阻塞等待"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait_time = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_time)
+
+class CrawlEngine:
+    """有界线程池爬取引擎"""
+
+    def __init__(self,
+                 session: requests.Session,
+                 max_workers: int = 4,
+                 requests_per_second: float = 1.0,
+                 burst: int = 2,
+                 max_retries: int = 3,
+                 backoff_factor: float = 1.0,
+                 timeout: float = 15,
+                 max_retry_after: float = 60.0):
+        """
+        Args:
+            session: 共享的HTTP会话
+            max_workers: 同时抓取的最大页面数
+            requests_per_second: 每个主机每秒的平均请求数（礼貌预算）
+            burst: 每个主机允许的突发请求数
+            max_retries: 失败后的最大重试次数
+            backoff_factor: 退避基数（秒），第n次重试等待 backoff_factor * 2**n
+            timeout: 单次请求超时（秒）
+            max_retry_after: 遵守Retry-After时最多等待的秒数
+        """
+        self.session = session
+        self.max_workers = max(1, max_workers)
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.max_retry_after = max_retry_after
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0
+        }
+        self._stats_lock = threading.Lock()
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        """获取URL所在主机的令牌桶"""
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """计算第attempt次重试前的等待时间，优先遵守Retry-After（不超过max_retry_after）"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_retry_after)
+
+        delay = self.backoff_factor * (2 ** attempt)
+        # 加入随机抖动，避免多个线程同时重试
+        return delay + random.uniform(0, self.backoff_factor)
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        """限速抓取单个URL，遇到网络错误或可重试状态码时指数退避重试"""
+        kwargs.setdefault('timeout', self.timeout)
+        bucket = self._get_bucket(url)
+
+        attempt = 0
+        while True:
+            bucket.acquire()
+            self._count('requests')
+
+            response = None
+            try:
+                response = self.session.get(url, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    if not response.ok:
+                        # 不重试的错误状态码：释放连接后抛出
+                        response.close()
+                        response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} Error for url: {url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if response is not None:
+                # 流式请求时释放连接（包括最后一次失败的请求）
+                response.close()
+            if attempt >= self.max_retries:
+                self._count('failures')
+                raise error
+
+            delay = self._backoff_delay(attempt, response)
+            print(f"  请求失败 ({error})，{delay:.1f}秒后第{attempt + 1}次重试: {url}")
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+    def iter_archive_pages(self, archive_url: str, max_pages: Optional[int] = None) -> Iterator[BeautifulSoup]:
+        """从存档首页开始，沿着XenForo的"下一页"链接依次返回每一页的解析结果"""
+        page_url = archive_url
+        seen_pages = set()
+
+        while page_url and page_url not in seen_pages:
+            if max_pages is not None and len(seen_pages) >= max_pages:
+                break
+            seen_pages.add(page_url)
+
+            response = self.fetch(page_url)
+            soup = BeautifulSoup(response.content, 'html.parser')
+            yield soup
+
+            page_url = self._find_next_page(soup, page_url)
+
+    def _find_next_page(self, soup: BeautifulSoup, current_url: str) -> Optional[str]:
+        """查找分页导航中的下一页链接"""
+        next_link = soup.find('a', class_='pageNav-jump--next')
+        if next_link is None:
+            next_link = soup.find('link', rel='next')
+        if next_link is None or not next_link.get('href'):
+            return None
+        return urljoin(current_url, next_link['href'])
+
+    def run(self, urls: List[str], handler: Callable[[str], None]) -> Dict[str, Optional[Exception]]:
+        """用线程池并发处理URL，返回每个URL的异常（成功为None）"""
+        results: Dict[str, Optional[Exception]] = {}
+        if not urls:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(handler, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    future.result()
+                    results[url] = None
+                except Exception as e:
+                    print(f"处理 {url} 时出错: {e}")
+                    results[url] = e
+
+        return results
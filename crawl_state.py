@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取状态数据库
+用SQLite持久化记录每个帖子URL的ETag、Last-Modified、内容哈希和最后看到的回复ID，支持增量爬取
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS thread_state (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    first_post_hash TEXT,
+    last_post_id INTEGER,
+    saved_path TEXT,
+    last_fetched_at REAL,
+    last_changed_at REAL
+)
+"""
+
+# 可以更新的字段
+STATE_FIELDS = ('etag', 'last_modified', 'content_hash', 'first_post_hash', 'last_post_id', 'saved_path')
+
+def content_hash(data) -> str:
+    """计算内容哈希（接受str或bytes）"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+class CrawlStateStore:
+    """以帖子URL为键的持久化爬取状态"""
+
+    def __init__(self, db_path: str = "crawl_state.db"):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        # 爬取引擎会在多个线程中访问同一个连接，由self.lock串行化
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute(SCHEMA)
+            self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """获取URL的状态记录，没有记录时返回None"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM thread_state WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """根据已记录的ETag/Last-Modified生成条件请求头"""
+        state = self.get(url)
+        headers = {}
+        if state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def record(self, url: str, changed: bool = True, **fields):
+        """写入一次抓取结果
+
+        Args:
+            url: 帖子URL
+            changed: 主帖内容是否发生变化（决定是否更新last_changed_at）
+            **fields: STATE_FIELDS中的字段，值为None的字段保持原值
+        """
+        now = time.time()
+        updates = {key: value for key, value in fields.items() if key in STATE_FIELDS and value is not None}
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO thread_state (url, last_changed_at) VALUES (?, ?)",
+                (url, now)
+            )
+            assignments = ['last_fetched_at = ?']
+            values = [now]
+            if changed:
+                assignments.append('last_changed_at = ?')
+                values.append(now)
+            for key, value in updates.items():
+                assignments.append(f'{key} = ?')
+                values.append(value)
+            values.append(url)
+
+            self.conn.execute(f"UPDATE thread_state SET {', '.join(assignments)} WHERE url = ?", values)
+            self.conn.commit()
+
+    def known_urls(self) -> set:
+        """返回所有已记录的URL"""
+        with self.lock:
+            rows = self.conn.execute("SELECT url FROM thread_state").fetchall()
+        return {row['url'] for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -9,6 +9,8 @@ import json
 import shutil
 import time
 
+from format_converter import DataFormatConverter
+
 def create_sample_data():
     """创建示例翻译对数据"""
     print("创建示例翻译对数据...")
@@ -88,112 +90,22 @@ def create_sample_data():
     print(f"成功创建 {len(samples)} 个示例文件")
     return True
 
-def detect_language(text):
-    """简单的语言检测"""
-    import re
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-    total_chars = len(text.strip())
-    
-    if total_chars == 0:
-        return "unknown"
-    
-    if chinese_chars / total_chars > 0.3:
-        return "chinese"
-    else:
-        return "english"
-
-def convert_item(item):
-    """转换单个数据项"""
-    source_fields = ['source', 'english', 'en', 'eng', 'original']
-    target_fields = ['target', 'chinese', 'zh', 'chn', 'translation']
-    
-    source_text = None
-    target_text = None
-    
-    # 查找源文本
-    for field in source_fields:
-        if field in item and item[field]:
-            source_text = str(item[field]).strip()
-            break
-    
-    # 查找目标文本
-    for field in target_fields:
-        if field in item and item[field]:
-            target_text = str(item[field]).strip()
-            break
-    
-    if not source_text or not target_text:
-        return None
-    
-    return {
-        "source": source_text,
-        "target": target_text,
-        "source_lang": detect_language(source_text),
-        "target_lang": detect_language(target_text)
-    }
-
-def convert_file(input_file, output_file):
-    """转换单个文件"""
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        converted_items = []
-        
-        if isinstance(data, dict):
-            converted = convert_item(data)
-            if converted:
-                converted_items.append(converted)
-        elif isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict):
-                    converted = convert_item(item)
-                    if converted:
-                        converted_items.append(converted)
-        
-        if converted_items:
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(converted_items, f, ensure_ascii=False, indent=2)
-            return len(converted_items)
-        
-        return 0
-        
-    except Exception as e:
-        print(f"转换文件 {input_file} 时出错: {e}")
-        return 0
-
 def convert_all_files():
-    """转换所有文件"""
+    """转换所有文件（DataFormatConverter：按清单增量转换、多进程、逐项校验）"""
     print("\n转换数据格式...")
     
     input_dir = "individual_pairs"
     output_dir = "individual_pairs_formatted"
     
-    # 获取所有JSON文件
-    json_files = [f for f in os.listdir(input_dir) if f.endswith('.json')]
-    
-    if not json_files:
-        print("没有找到JSON文件")
+    converter = DataFormatConverter(input_dir, output_dir, keep_metadata=False)
+    if not converter.convert_directory(workers=0):
+        print("没有可转换的JSON文件")
         return False
     
-    total_pairs = 0
-    success_files = 0
-    
-    for filename in json_files:
-        input_file = os.path.join(input_dir, filename)
-        output_file = os.path.join(output_dir, filename)
-        
-        pairs_count = convert_file(input_file, output_file)
-        if pairs_count > 0:
-            print(f"✓ {filename}: {pairs_count} 个翻译对")
-            total_pairs += pairs_count
-            success_files += 1
-        else:
-            print(f"✗ {filename}: 转换失败")
-    
-    print(f"\n转换完成: {success_files}/{len(json_files)} 个文件, 共 {total_pairs} 个翻译对")
-    return success_files > 0
+    stats = converter.stats
+    print(f"\n转换完成: {stats['converted'] + stats['unchanged']}/{stats['files']} 个文件"
+          f"（其中 {stats['unchanged']} 个未变化）, 共 {stats['items']} 个翻译对")
+    return True
 
 def replace_directory():
     """替换目录"""
@@ -182,8 +182,8 @@ def demonstrate_basic_usage():
             "Shadow Ball is a Ghost-type move."
         ]
         
-        for text in test_texts:
-            translation = module.translate_text(text)
+        translations = module.translate_batch(test_texts)
+        for text, translation in zip(test_texts, translations):
             print(f"   原文: {text}")
             print(f"   译文: {translation}")
             print()
@@ -246,8 +246,8 @@ def demonstrate_fine_tuning(module: EnhancedTransformersModule):
             "Shadow Ball may lower Special Defense."
         ]
         
-        for text in test_texts:
-            translation = module.translate_text(text, num_beams=4)
+        translations = module.translate_batch(test_texts, num_beams=4)
+        for text, translation in zip(test_texts, translations):
             print(f"   原文: {text}")
             print(f"   译文: {translation}")
             print()
@@ -300,8 +300,8 @@ def demonstrate_evaluation(module: EnhancedTransformersModule):
         else:
             test_samples = module.training_examples[:3]
         
-        for i, example in enumerate(test_samples, 1):
-            predicted = module.translate_text(example.source_text)
+        predictions = module.translate_batch([example.source_text for example in test_samples])
+        for i, (example, predicted) in enumerate(zip(test_samples, predictions), 1):
             print(f"\n   样本 {i}:")
             print(f"     原文: {example.source_text}")
             print(f"     参考译文: {example.target_text}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本领域分类
+把所有领域的关键词编译成一个术语匹配器（见term_matcher），单次扫描统计每个领域命中的关键词数，
+取代对每个领域的每个关键词分别做 keyword in text_lower 子串判断的写法。
+英文关键词按单词边界匹配（type不会匹配到prototype，ev不会匹配到every），并接受简单的复数形式；
+classify_batch / score_batch一次处理整个语料库的文本
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from term_matcher import TermMatcher
+
+DEFAULT_DOMAIN = "general"
+_PLURALIZABLE = re.compile(r'[a-z]+')
+
+def _keyword_forms(keyword: str) -> List[str]:
+    """关键词及其简单复数形式（move -> moves，ability -> abilities，status不变）"""
+    forms = [keyword]
+    if not _PLURALIZABLE.fullmatch(keyword) or keyword.endswith('s'):
+        return forms
+    if len(keyword) > 1 and keyword.endswith('y') and keyword[-2] not in 'aeiou':
+        forms.append(keyword[:-1] + 'ies')
+    else:
+        forms.append(keyword + 's')
+    return forms
+
+class DomainClassifier:
+    """单次扫描的领域分类器"""
+
+    def __init__(self, domains: Dict[str, Dict], default: str = DEFAULT_DOMAIN, priority: bool = False):
+        """
+        Args:
+            domains: 领域名 -> {'keywords': [...], 'difficulty_weight': 权重}，与transformers_config.json中
+                     pokemon_domains的格式一致，权重默认为1.0
+            default: 没有命中任何关键词时的领域
+            priority: 为True时按domains的顺序取第一个命中的领域；否则取 命中的不同关键词数 × 权重 最高的领域，
+                      分数相同时取顺序靠前的领域
+        """
+        self.domains = list(domains)
+        self.weights = {name: float(info.get('difficulty_weight', 1.0)) for name, info in domains.items()}
+        self.default = default
+        self.priority = priority
+
+        # 关键词的各种形式 -> 关键词；关键词 -> 所属领域（同一关键词可以属于多个领域）
+        self._keywords: Dict[str, str] = {}
+        self._keyword_domains: Dict[str, List[str]] = {}
+        for name, info in domains.items():
+            for keyword in info.get('keywords', []):
+                keyword = keyword.lower()
+                self._keyword_domains.setdefault(keyword, []).append(name)
+                for form in _keyword_forms(keyword):
+                    self._keywords.setdefault(form, keyword)
+        # 关键词都已小写，匹配前先把文本转为小写，比忽略大小写的正则快
+        self._matcher = TermMatcher({form: form for form in self._keywords}, ascii_boundary=True)
+
+    def _hits(self, keywords) -> Dict[str, int]:
+        """命中的关键词 -> 每个领域命中的不同关键词数（按domains的顺序，只包含有命中的领域）"""
+        counts = {}
+        for keyword in keywords:
+            for name in self._keyword_domains[keyword]:
+                counts[name] = counts.get(name, 0) + 1
+        return {name: counts[name] for name in self.domains if name in counts}
+
+    def _choose(self, hits: Dict[str, int]) -> str:
+        if not hits:
+            return self.default
+        if self.priority:
+            return next(iter(hits))
+        return max(hits, key=lambda name: hits[name] * self.weights[name])
+
+    def keyword_hits(self, text: str) -> Dict[str, int]:
+        """每个领域命中的不同关键词数"""
+        return self._hits({self._keywords[form] for form in set(self._matcher.findall((text or '').lower()))})
+
+    def classify(self, text: str) -> str:
+        """文本的领域"""
+        return self._choose(self.keyword_hits(text))
+
+    def classify_with_hits(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """文本的领域以及各领域命中的关键词数"""
+        hits = self.keyword_hits(text)
+        return self._choose(hits), hits
+
+    def score_batch(self, texts: List[str]) -> List[Tuple[str, Dict[str, int]]]:
+        """批量分类，返回每段文本的 (领域, 各领域命中的关键词数)"""
+        results = []
+        for text in texts:
+            hits = self.keyword_hits(text)
+            results.append((self._choose(hits), hits))
+        return results
+
+    def classify_batch(self, texts: List[str]) -> List[str]:
+        """批量分类，返回每段文本的领域"""
+        return [domain for domain, _ in self.score_batch(texts)]
+
+def domains_from_keywords(keywords: Dict[str, List[str]]) -> Dict[str, Dict]:
+    """领域名 -> 关键词列表 转换为DomainClassifier的领域格式"""
+    return {name: {'keywords': list(words)} for name, words in keywords.items()}
+
+_CLASSIFIER_CACHE: Dict[Tuple, DomainClassifier] = {}
+
+def get_domain_classifier(domains: Dict[str, Dict], default: str = DEFAULT_DOMAIN,
+                          priority: bool = False) -> DomainClassifier:
+    """获取领域配置对应的分类器，配置内容不变时复用已编译的分类器"""
+    cache_key = (tuple((name, tuple(info.get('keywords', [])), info.get('difficulty_weight', 1.0))
+                       for name, info in domains.items()), default, priority)
+    classifier = _CLASSIFIER_CACHE.get(cache_key)
+    if classifier is None:
+        classifier = DomainClassifier(domains, default=default, priority=priority)
+        _CLASSIFIER_CACHE[cache_key] = classifier
+    return classifier
@@ -6,40 +6,54 @@
 """
 
 import os
-import requests
 from bs4 import BeautifulSoup
 import time
 import re
 
-def get_first_post_content(url):
-    """从给定URL获取thread的first post内容"""
+from first_post_extractor import extract_first_post
+from html_archive import create_session, parse_as_of
+from http_client import PooledSession, get_shared_session
+
+# 增强后的文件中原内容和first post之间的分割线
+SEPARATOR = '\n\n' + '=' * 80 + '\n' + 'ORIGINAL THREAD FIRST POST\n' + '=' * 80 + '\n\n'
+
+def is_first_post_content(text):
+    """get_first_post_content的返回值是否为帖子内容（而不是失败说明）"""
+    return bool(text) and text != "无法找到帖子内容" and not text.startswith(("爬取失败:", "无法解析帖子内容"))
+
+def get_first_post_content(url, session=None):
+    """从给定URL获取thread的first post内容
+    
+    Args:
+        url: 帖子链接
+        session: HTTP会话（归档或回放会话），None时使用共享的连接池会话
+    """
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
+        response = (session or get_shared_session()).get(url, headers=headers, timeout=15)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 查找第一个帖子内容 - 尝试多种选择器
-        selectors = [
-            'div.message-body div.bbWrapper',
-            'article.message-body div.bbWrapper', 
-            'div.message-content div.bbWrapper',
-            'div.bbWrapper',
-            'div.message-body',
-            'article.message-body',
-            '.message-content'
-        ]
+        # 快速路径：只解析第一个bbWrapper
+        first_post = extract_first_post(response.content).post
+        soup = None
         
-        first_post = None
-        for selector in selectors:
-            elements = soup.select(selector)
-            if elements:
-                first_post = elements[0]  # 取第一个匹配的元素
-                break
+        if first_post is None:
+            # 找不到bbWrapper时解析整页，尝试其他选择器
+            soup = BeautifulSoup(response.content, 'html.parser')
+            selectors = [
+                'div.message-body',
+                'article.message-body',
+                '.message-content'
+            ]
+            
+            for selector in selectors:
+                elements = soup.select(selector)
+                if elements:
+                    first_post = elements[0]  # 取第一个匹配的元素
+                    break
         
         if first_post:
             # 清理HTML标签，获取纯文本，保持分行格式
@@ -82,14 +96,22 @@ def get_first_post_content(url):
     except Exception as e:
         return f"爬取失败: {str(e)}"
 
-def enhance_scraped_files():
-    """增强scraped_threads目录中的文件"""
-    scraped_dir = '/Users/zhengyongping/test/AI-test/sctp/scraped_threads'
+def enhance_scraped_files(scraped_dir='/Users/zhengyongping/test/AI-test/sctp/scraped_threads',
+                          archive_dir=None, replay=False, as_of=None):
+    """增强scraped_threads目录中的文件
     
+    Args:
+        scraped_dir: 帖子文件目录
+        archive_dir: 原始HTML归档目录（None表示不归档）
+        replay: 从归档回放，已经增强过的文件会用回放结果重新生成
+        as_of: 回放时只使用该时间（Unix时间戳）之前的快照
+    """
     if not os.path.exists(scraped_dir):
         print(f"目录不存在: {scraped_dir}")
         return
     
+    session = create_session(archive_dir, replay, as_of)
+    
     processed_count = 0
     error_count = 0
     
@@ -118,22 +140,21 @@ def enhance_scraped_files():
                 
                 # 检查是否已经增强过（包含分割线）
                 if '=' * 50 in content:
-                    print(f"已处理过: {filename}")
-                    continue
+                    if not replay or SEPARATOR not in content:
+                        print(f"已处理过: {filename}")
+                        continue
+                    # 回放时去掉上次添加的内容，重新生成
+                    content = content.split(SEPARATOR)[0]
                 
                 print(f"处理文件: {filename}")
                 print(f"链接: {first_line}")
                 
                 # 爬取first post内容
-                first_post_content = get_first_post_content(first_line)
+                first_post_content = get_first_post_content(first_line, session)
                 
-                if first_post_content and first_post_content != "无法找到帖子内容":
+                if is_first_post_content(first_post_content):
                     # 添加分割线和新内容
-                    separator = '\n\n' + '=' * 80 + '\n'
-                    separator += 'ORIGINAL THREAD FIRST POST\n'
-                    separator += '=' * 80 + '\n\n'
-                    
-                    enhanced_content = content + separator + first_post_content
+                    enhanced_content = content + SEPARATOR + first_post_content
                     
                     # 写回文件
                     with open(file_path, 'w', encoding='utf-8') as f:
@@ -145,8 +166,9 @@ def enhance_scraped_files():
                     print(f"✗ 爬取失败: {filename} - {first_post_content}")
                     error_count += 1
                 
-                # 添加延迟避免被封
-                time.sleep(2)
+                # 添加延迟避免被封（回放不访问网络，不需要等待）
+                if not replay:
+                    time.sleep(2)
                 
             except Exception as e:
                 print(f"处理文件失败 {filename}: {e}")
@@ -155,6 +177,24 @@ def enhance_scraped_files():
     print(f"\n=== 处理完成 ===")
     print(f"成功处理: {processed_count} 个文件")
     print(f"处理失败: {error_count} 个文件")
+    if isinstance(session, PooledSession):
+        print(session.metrics_summary())
 
 if __name__ == "__main__":
-    enhance_scraped_files()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='为帖子文件添加thread的first post')
+    parser.add_argument('scraped_dir', nargs='?', default='/Users/zhengyongping/test/AI-test/sctp/scraped_threads',
+                        help='帖子文件目录')
+    parser.add_argument('--archive-dir', type=str, default='html_archive', help='原始HTML归档目录')
+    parser.add_argument('--no-archive', action='store_true', help='不保存原始HTML')
+    parser.add_argument('--replay', action='store_true', help='从归档回放，不访问网络')
+    parser.add_argument('--as-of', type=parse_as_of, default=None,
+                        help='回放时只使用该时间之前的快照（Unix时间戳或ISO日期时间，如2026-10-01T12:00:00）')
+    args = parser.parse_args()
+    if args.as_of is not None and not args.replay:
+        parser.error('--as-of只能与--replay一起使用')
+    
+    enhance_scraped_files(args.scraped_dir,
+                          archive_dir=None if args.no_archive and not args.replay else args.archive_dir,
+                          replay=args.replay, as_of=args.as_of)
\ No newline at end of file
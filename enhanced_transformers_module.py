@@ -16,6 +16,12 @@ from collections import defaultdict, Counter
 from dataclasses import dataclass, asdict
 import logging
 
+from corpus_store import open_corpus
+from domain_classifier import DomainClassifier, domains_from_keywords, get_domain_classifier
+from example_features import FeatureCache, scorer_key
+from term_matcher import get_term_matcher
+from tokenized_cache import load_or_tokenize
+
 try:
     from transformers import (
         AutoTokenizer, AutoModelForSeq2SeqLM,
@@ -29,6 +35,7 @@ try:
     )
     from torch.utils.data import Dataset, DataLoader
     import sacrebleu
+    from length_bucketing import BucketedTrainer, build_batch_sampler
     TRANSFORMERS_AVAILABLE = True
 except ImportError as e:
     print(f"警告：部分依赖库未安装: {e}")
@@ -39,6 +46,72 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 样本评分用的正则，模块加载时编译一次
+_SENTENCE_END = re.compile(r'[.!?]+')
+_COMPLEX_WORD = re.compile(r'\b\w{8,}\b')
+_TECHNICAL_TERM = re.compile(r'\b[A-Z][a-z]+-[A-Z]\b|\bMega \w+\b')
+_POKEMON_TERM = re.compile('|'.join([
+    r'\b[A-Z][a-z]+-[A-Z]\b',  # Giratina-O
+    r'\bMega [A-Z][a-z]+\b',    # Mega Garchomp
+    r'\b(?:HP|Attack|Defense|Speed|Special)\b',  # 属性值
+    r'\b(?:Ghost|Dragon|Fire|Water|Grass|Electric)\b'  # 属性类型
+]))
+_CHINESE_RUN = re.compile(r'[\u4e00-\u9fff]+')
+
+# 配置中没有pokemon_domains时的简单分类：按顺序取第一个命中的领域
+_FALLBACK_DOMAINS = domains_from_keywords({
+    'pokemon': ['pokemon', 'move', 'ability', 'type', 'stat'],
+    'strategy': ['strategy', 'team', 'synergy', 'counter']
+})
+_TERM_PATTERNS = [
+    # 宝可梦名称
+    ('pokemon_names', re.compile(r'\b[A-Z][a-z]+-[A-Z]\b')),
+    ('pokemon_names', re.compile(r'\bMega [A-Z][a-z]+\b')),
+    ('pokemon_names', re.compile(r'\b[A-Z][a-z]{4,}(?=\s+(?:is|can|has|learns))\b')),
+    # 招式名称
+    ('moves', re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b')),
+    ('moves', re.compile(r'\b[A-Z][a-z]+(?=\s+(?:hits|deals|can))\b'))
+]
+
+def _difficulty_score(word_count: int, complex_words: int, technical_terms: int, sentence_count: int) -> float:
+    """综合难度评分"""
+    return min(1.0, (
+        word_count / 50 * 0.3 +
+        complex_words / 5 * 0.3 +
+        technical_terms / 3 * 0.2 +
+        sentence_count / 3 * 0.2
+    ))
+
+def _quality_score(en_words: int, cn_chars: int, chinese: str) -> float:
+    """综合质量评分"""
+    if en_words == 0:
+        return 0.0
+
+    # 长度比例评分
+    length_ratio = cn_chars / en_words
+    length_score = min(1.0, length_ratio / 1.5) if length_ratio <= 3.0 else 0.3
+
+    # 内容完整性评分
+    completeness_score = 1.0 if len(chinese.strip()) > 0 else 0.0
+
+    # 中文字符比例评分
+    total_chars = len(chinese)
+    chinese_ratio = cn_chars / total_chars if total_chars > 0 else 0.0
+    chinese_score = min(1.0, chinese_ratio * 1.2)
+
+    return (length_score * 0.4 + completeness_score * 0.3 + chinese_score * 0.3)
+
+def _term_candidates(english: str, chinese_terms: List[str]) -> List[Tuple[str, str, str]]:
+    """简单的术语对齐：每个模式的第i个匹配对应第i个中文片段（实际应用中需要更复杂的算法）"""
+    candidates = []
+    if not chinese_terms:
+        return candidates
+    for term_type, pattern in _TERM_PATTERNS:
+        for i, match in enumerate(pattern.findall(english)):
+            if i < len(chinese_terms):
+                candidates.append((term_type, match, chinese_terms[i]))
+    return candidates
+
 @dataclass
 class EnhancedTranslationExample:
     """增强版翻译样本"""
@@ -77,61 +150,53 @@ class TrainingConfig:
     description: str
 
 class EnhancedPokemonDataset(Dataset):
-    """增强版宝可梦翻译数据集"""
+    """增强版宝可梦翻译数据集
+
+    整个数据集在构造时一次性分词（不填充）并缓存到磁盘，样本保持原始长度，
+    由DataCollatorForSeq2Seq在每个批次内动态填充
+    """
     
     def __init__(self, 
                  examples: List[EnhancedTranslationExample], 
                  tokenizer, 
                  max_length: int = 512,
                  source_lang: str = "en",
-                 target_lang: str = "zh"):
+                 target_lang: str = "zh",
+                 cache_dir: Optional[str] = ".tokenized_cache"):
         self.examples = examples
         self.tokenizer = tokenizer
         self.max_length = max_length
         self.source_lang = source_lang
         self.target_lang = target_lang
+        
+        source_texts = []
+        target_texts = []
+        for example in examples:
+            source_text = example.source_text
+            target_text = example.target_text
+            
+            if hasattr(self.tokenizer, 'lang_code_to_id'):
+                # mBART模型：添加语言标记
+                source_text = f"{self.source_lang}_XX {source_text}"
+                target_text = f"{self.target_lang}_CN {target_text}"
+            
+            source_texts.append(source_text)
+            target_texts.append(target_text)
+        
+        self.tokenized = load_or_tokenize(tokenizer, source_texts, target_texts, max_length, cache_dir)
     
     def __len__(self):
         return len(self.examples)
     
     def __getitem__(self, idx):
         example = self.examples[idx]
+        input_ids = self.tokenized.source(idx)
         
-        # 为mBART模型添加语言标记
-        source_text = example.source_text
-        target_text = example.target_text
-        
-        if hasattr(self.tokenizer, 'lang_code_to_id'):
-            # mBART模型
-            source_text = f"{self.source_lang}_XX {source_text}"
-            target_text = f"{self.target_lang}_CN {target_text}"
-        
-        # 编码输入
-        source_encoding = self.tokenizer(
-            source_text,
-            max_length=self.max_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt"
-        )
-        
-        # 编码目标
-        with self.tokenizer.as_target_tokenizer():
-            target_encoding = self.tokenizer(
-                target_text,
-                max_length=self.max_length,
-                padding="max_length",
-                truncation=True,
-                return_tensors="pt"
-            )
-        
-        labels = target_encoding["input_ids"]
-        labels[labels == self.tokenizer.pad_token_id] = -100
-        
+        # 标签不在这里填充，批次内填充时由整理器使用-100
         return {
-            "input_ids": source_encoding["input_ids"].flatten(),
-            "attention_mask": source_encoding["attention_mask"].flatten(),
-            "labels": labels.flatten(),
+            "input_ids": input_ids,
+            "attention_mask": [1] * len(input_ids),
+            "labels": self.tokenized.target(idx),
             "difficulty": torch.tensor(example.difficulty, dtype=torch.float),
             "quality_score": torch.tensor(example.quality_score, dtype=torch.float)
         }
@@ -286,7 +351,10 @@ class EnhancedTransformersModule:
                              train_ratio: float = 0.7,
                              val_ratio: float = 0.2,
                              test_ratio: float = 0.1):
-        """加载翻译数据并分割"""
+        """加载翻译数据并分割
+
+        样本特征按内容哈希缓存在语料库文件中（见example_features），未变化的翻译对不再重新评分
+        """
         if not os.path.exists(pairs_directory):
             logger.error(f"目录 {pairs_directory} 不存在")
             return
@@ -295,34 +363,34 @@ class EnhancedTransformersModule:
         
         all_examples = []
         
-        for filename in os.listdir(pairs_directory):
-            if filename.endswith('.json'):
-                filepath = os.path.join(pairs_directory, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if 'english' in data and 'chinese' in data:
-                        example = EnhancedTranslationExample(
-                            source_text=data['english'],
-                            target_text=data['chinese'],
-                            domain=self._classify_domain(data['english']),
-                            difficulty=self._assess_difficulty(data['english']),
-                            quality_score=self._assess_quality(data['english'], data['chinese']),
-                            source_file=filename,
-                            metadata={
-                                'file_size': len(data['english']) + len(data['chinese']),
-                                'has_pokemon_terms': self._has_pokemon_terms(data['english']),
-                                'sentence_count': len(re.findall(r'[.!?]+', data['english']))
-                            }
-                        )
-                        
-                        all_examples.append(example)
-                        self._extract_terms(data['english'], data['chinese'])
-                        
-                except Exception as e:
-                    logger.warning(f"加载文件 {filename} 失败: {e}")
-                    continue
+        with open_corpus(pairs_directory) as corpus:
+            pairs = list(corpus.iter_pairs(deduplicate=True))
+            if self.config.get("default_settings", {}).get("feature_cache", True):
+                cache = FeatureCache(corpus.conn, self._feature_scorer_key())
+                features = cache.features([(data['content_hash'], data['english'], data['chinese']) for data in pairs],
+                                          self._score_pairs)
+                logger.info(f"样本特征: 缓存命中 {cache.hits} 个，新计算 {cache.misses} 个")
+            else:
+                features = self._score_pairs([(data['english'], data['chinese']) for data in pairs])
+
+        for data, feature in zip(pairs, features):
+            example = EnhancedTranslationExample(
+                source_text=data['english'],
+                target_text=data['chinese'],
+                domain=feature['domain'],
+                difficulty=feature['difficulty'],
+                quality_score=feature['quality_score'],
+                source_file=data['origin_file'],
+                metadata={
+                    'file_size': len(data['english']) + len(data['chinese']),
+                    'has_pokemon_terms': feature['has_pokemon_terms'],
+                    'sentence_count': feature['sentence_count'],
+                    'domain_hits': feature['domain_hits']
+                }
+            )
+            
+            all_examples.append(example)
+            self._add_terms(feature['term_candidates'])
         
         # 按质量和难度排序
         all_examples.sort(key=lambda x: (x.quality_score, -x.difficulty), reverse=True)
@@ -351,114 +419,66 @@ class EnhancedTransformersModule:
         logger.info(f"  测试集: {len(self.test_examples)} 个")
         logger.info(f"  术语词典: {sum(len(d) for d in self.term_dictionaries.values())} 个术语")
     
+    def _feature_scorer_key(self) -> str:
+        """特征缓存的评分器键：领域分类依赖配置中的pokemon_domains"""
+        return scorer_key("enhanced_transformers", getattr(self, 'config', {}).get('pokemon_domains'))
+
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """批量计算样本特征，与_classify_domain、_assess_difficulty、_assess_quality、_has_pokemon_terms、
+        _extract_terms的结果一致；每段文本的分词、句末标点和中文片段只扫描一次，供各项特征共用"""
+        features = []
+        domains = self._domain_classifier().score_batch([english for english, _ in pairs])
+        for (english, chinese), (domain, domain_hits) in zip(pairs, domains):
+            word_count = len(english.split())
+            sentence_count = len(_SENTENCE_END.findall(english))
+            complex_words = len(_COMPLEX_WORD.findall(english))
+            technical_terms = len(_TECHNICAL_TERM.findall(english))
+            chinese_terms = _CHINESE_RUN.findall(chinese)
+            features.append({
+                'domain': domain,
+                'domain_hits': domain_hits,
+                'difficulty': _difficulty_score(word_count, complex_words, technical_terms, sentence_count),
+                'quality_score': _quality_score(word_count, sum(len(term) for term in chinese_terms), chinese),
+                'has_pokemon_terms': _POKEMON_TERM.search(english) is not None,
+                'sentence_count': sentence_count,
+                'term_candidates': _term_candidates(english, chinese_terms)
+            })
+        return features
+
+    def _domain_classifier(self) -> DomainClassifier:
+        """领域分类器：使用配置文件中的pokemon_domains（命中关键词数 × difficulty_weight最高的领域）"""
+        if not hasattr(self, 'config') or 'pokemon_domains' not in self.config:
+            return get_domain_classifier(_FALLBACK_DOMAINS, priority=True)
+        return get_domain_classifier(self.config['pokemon_domains'])
+
     def _classify_domain(self, text: str) -> str:
         """分类文本领域"""
-        if not hasattr(self, 'config') or 'pokemon_domains' not in self.config:
-            # 简单分类
-            pokemon_keywords = ['pokemon', 'move', 'ability', 'type', 'stat']
-            strategy_keywords = ['strategy', 'team', 'synergy', 'counter']
-            
-            text_lower = text.lower()
-            if any(keyword in text_lower for keyword in pokemon_keywords):
-                return "pokemon"
-            elif any(keyword in text_lower for keyword in strategy_keywords):
-                return "strategy"
-            else:
-                return "general"
-        
-        # 使用配置文件中的领域分类
-        domains = self.config['pokemon_domains']
-        text_lower = text.lower()
-        
-        domain_scores = {}
-        for domain_name, domain_info in domains.items():
-            score = sum(1 for keyword in domain_info['keywords'] if keyword in text_lower)
-            if score > 0:
-                domain_scores[domain_name] = score * domain_info['difficulty_weight']
-        
-        if domain_scores:
-            return max(domain_scores, key=domain_scores.get)
-        else:
-            return "general"
+        return self._domain_classifier().classify(text)
     
     def _assess_difficulty(self, text: str) -> float:
         """评估文本难度"""
-        word_count = len(text.split())
-        sentence_count = len(re.findall(r'[.!?]+', text))
-        complex_words = len(re.findall(r'\b\w{8,}\b', text))
-        technical_terms = len(re.findall(r'\b[A-Z][a-z]+-[A-Z]\b|\bMega \w+\b', text))
-        
-        # 综合难度评分
-        difficulty = min(1.0, (
-            word_count / 50 * 0.3 +
-            complex_words / 5 * 0.3 +
-            technical_terms / 3 * 0.2 +
-            sentence_count / 3 * 0.2
-        ))
-        
-        return difficulty
+        complex_words = len(_COMPLEX_WORD.findall(text))
+        return _difficulty_score(len(text.split()), complex_words, len(_TECHNICAL_TERM.findall(text)),
+                                 len(_SENTENCE_END.findall(text)))
     
     def _assess_quality(self, english: str, chinese: str) -> float:
         """评估翻译质量"""
-        en_words = len(english.split())
-        cn_chars = len(re.findall(r'[\u4e00-\u9fff]', chinese))
-        
-        if en_words == 0:
-            return 0.0
-        
-        # 长度比例评分
-        length_ratio = cn_chars / en_words
-        length_score = min(1.0, length_ratio / 1.5) if length_ratio <= 3.0 else 0.3
-        
-        # 内容完整性评分
-        completeness_score = 1.0 if len(chinese.strip()) > 0 else 0.0
-        
-        # 中文字符比例评分
-        total_chars = len(chinese)
-        chinese_ratio = cn_chars / total_chars if total_chars > 0 else 0.0
-        chinese_score = min(1.0, chinese_ratio * 1.2)
-        
-        # 综合质量评分
-        quality = (length_score * 0.4 + completeness_score * 0.3 + chinese_score * 0.3)
-        
-        return quality
+        cn_chars = sum(len(term) for term in _CHINESE_RUN.findall(chinese))
+        return _quality_score(len(english.split()), cn_chars, chinese)
     
     def _has_pokemon_terms(self, text: str) -> bool:
         """检查是否包含宝可梦术语"""
-        pokemon_patterns = [
-            r'\b[A-Z][a-z]+-[A-Z]\b',  # Giratina-O
-            r'\bMega [A-Z][a-z]+\b',    # Mega Garchomp
-            r'\b(?:HP|Attack|Defense|Speed|Special)\b',  # 属性值
-            r'\b(?:Ghost|Dragon|Fire|Water|Grass|Electric)\b'  # 属性类型
-        ]
-        
-        return any(re.search(pattern, text) for pattern in pokemon_patterns)
+        return _POKEMON_TERM.search(text) is not None
     
     def _extract_terms(self, english: str, chinese: str):
         """提取专业术语"""
-        # 宝可梦名称
-        pokemon_patterns = [
-            r'\b[A-Z][a-z]+-[A-Z]\b',
-            r'\bMega [A-Z][a-z]+\b',
-            r'\b[A-Z][a-z]{4,}(?=\s+(?:is|can|has|learns))\b'
-        ]
-        
-        # 招式名称
-        move_patterns = [
-            r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b',
-            r'\b[A-Z][a-z]+(?=\s+(?:hits|deals|can))\b'
-        ]
-        
-        # 提取中文术语
-        chinese_terms = re.findall(r'[\u4e00-\u9fff]+', chinese)
-        
-        # 简单的术语对齐（实际应用中需要更复杂的算法）
-        for pattern_list, term_type in [(pokemon_patterns, 'pokemon_names'), (move_patterns, 'moves')]:
-            for pattern in pattern_list:
-                matches = re.findall(pattern, english)
-                for i, match in enumerate(matches):
-                    if i < len(chinese_terms) and match not in self.term_dictionaries[term_type]:
-                        self.term_dictionaries[term_type][match] = chinese_terms[i]
+        self._add_terms(_term_candidates(english, _CHINESE_RUN.findall(chinese)))
+    
+    def _add_terms(self, candidates):
+        """把 (术语类型, 英文, 中文) 候选加入术语词典，已有的术语不覆盖"""
+        for term_type, match, chinese_term in candidates:
+            if match not in self.term_dictionaries[term_type]:
+                self.term_dictionaries[term_type][match] = chinese_term
     
     def fine_tune_model(self, 
                        config_name: str = "development",
@@ -478,11 +498,13 @@ class EnhancedTransformersModule:
         logger.info(f"开始微调模型，配置: {train_config.description}")
         start_time = datetime.now()
         
-        # 创建数据集
+        # 创建数据集（预分词结果缓存在磁盘上）
+        cache_dir = self.config.get("default_settings", {}).get("tokenized_cache_dir", ".tokenized_cache")
         train_dataset = EnhancedPokemonDataset(
             self.training_examples, 
             self.tokenizer,
-            max_length=self.model_config.max_length
+            max_length=self.model_config.max_length,
+            cache_dir=cache_dir
         )
         
         eval_dataset = None
@@ -490,7 +512,8 @@ class EnhancedTransformersModule:
             eval_dataset = EnhancedPokemonDataset(
                 self.validation_examples,
                 self.tokenizer,
-                max_length=self.model_config.max_length
+                max_length=self.model_config.max_length,
+                cache_dir=cache_dir
             )
         
         # 设置训练参数
@@ -517,21 +540,31 @@ class EnhancedTransformersModule:
             save_total_limit=3,  # 只保留最近3个检查点
         )
         
-        # 数据整理器
+        # 数据整理器：按批次内最长序列动态填充，标签填充为-100
         data_collator = DataCollatorForSeq2Seq(
             tokenizer=self.tokenizer,
             model=self.model,
-            padding=True
+            padding=True,
+            label_pad_token_id=-100,
+            pad_to_multiple_of=8 if torch.cuda.is_available() else None
+        )
+        
+        # 按长度分桶组批，减少填充
+        batch_sampler = build_batch_sampler(
+            train_dataset.tokenized,
+            self.model_config.recommended_batch_size,
+            self.config.get("batching")
         )
         
         # 创建训练器
-        self.trainer = Trainer(
+        self.trainer = BucketedTrainer(
             model=self.model,
             args=training_args,
             train_dataset=train_dataset,
             eval_dataset=eval_dataset,
             data_collator=data_collator,
-            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)] if eval_dataset else None
+            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)] if eval_dataset else None,
+            train_batch_sampler=batch_sampler
         )
         
         try:
@@ -549,9 +582,14 @@ class EnhancedTransformersModule:
             self.learning_stats.update({
                 "epochs_trained": train_config.num_epochs,
                 "training_time": training_time,
-                "last_training_config": asdict(train_config)
+                "last_training_config": asdict(train_config),
+                "padding_efficiency": batch_sampler.epoch_stats if batch_sampler else []
             })
             
+            if batch_sampler:
+                for stats in batch_sampler.epoch_stats:
+                    logger.info(f"Epoch {stats['epoch']} 填充效率: {stats['efficiency']:.1%}")
+            
             logger.info(f"微调完成！训练时间: {training_time:.2f}秒")
             logger.info(f"模型已保存到: {output_dir}")
             
@@ -568,41 +606,77 @@ class EnhancedTransformersModule:
                       temperature: float = 1.0,
                       do_sample: bool = False) -> str:
         """翻译文本"""
+        return self.translate_batch(
+            [text],
+            batch_size=1,
+            max_length=max_length,
+            num_beams=num_beams,
+            temperature=temperature,
+            do_sample=do_sample
+        )[0]
+    
+    def translate_batch(self,
+                        texts: List[str],
+                        batch_size: int = None,
+                        max_length: int = None,
+                        num_beams: int = 4,
+                        temperature: float = 1.0,
+                        do_sample: bool = False) -> List[str]:
+        """批量翻译文本
+        
+        先对所有输入编码一次，按token长度排序后分批生成，使同一批内的输入长度接近、填充最少；
+        结果按输入顺序返回。
+        """
+        if not texts:
+            return []
+        
         if max_length is None:
             max_length = self.model_config.max_length
-        
-        # 预处理
-        processed_text = self._preprocess_text(text)
-        
-        # 编码
-        inputs = self.tokenizer(
-            processed_text,
-            return_tensors="pt",
+        if batch_size is None:
+            batch_size = self.model_config.recommended_batch_size
+        batch_size = max(1, batch_size)
+        
+        # 预处理并编码（不填充）
+        processed_texts = [self._preprocess_text(text) for text in texts]
+        encodings = self.tokenizer(
+            processed_texts,
             max_length=max_length,
-            truncation=True,
-            padding=True
-        ).to(self.device)
-        
-        # 生成
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_length=max_length,
-                num_beams=num_beams,
-                temperature=temperature,
-                do_sample=do_sample,
-                early_stopping=True,
-                pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id
-            )
+            truncation=True
+        )["input_ids"]
         
-        # 解码
-        translation = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        # 按token长度排序，长度相近的输入放在同一批
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i]))
+        translations = [None] * len(texts)
         
-        # 后处理
-        final_translation = self._postprocess_translation(translation)
+        self.model.eval()
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_indices = order[start:start + batch_size]
+                
+                # 只填充到本批最长的输入
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [encodings[i] for i in batch_indices]},
+                    padding=True,
+                    return_tensors="pt"
+                ).to(self.device)
+                
+                outputs = self.model.generate(
+                    **inputs,
+                    max_length=max_length,
+                    num_beams=num_beams,
+                    temperature=temperature,
+                    do_sample=do_sample,
+                    early_stopping=True,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    eos_token_id=self.tokenizer.eos_token_id
+                )
+                
+                # 解码并后处理
+                decoded = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+                for i, translation in zip(batch_indices, decoded):
+                    translations[i] = self._postprocess_translation(translation)
         
-        return final_translation
+        return translations
     
     def _preprocess_text(self, text: str) -> str:
         """预处理文本"""
@@ -611,25 +685,24 @@ class EnhancedTransformersModule:
         
         # 应用术语替换（可选）
         if hasattr(self, 'config') and self.config.get('preprocessing', {}).get('term_replacement', {}).get('enable_pokemon_terms', False):
-            for en_term, cn_term in self.term_dictionaries['pokemon_names'].items():
-                text = re.sub(r'\b' + re.escape(en_term) + r'\b', f"[{en_term}]", text)
+            markers = {en_term: f"[{en_term}]" for en_term in self.term_dictionaries['pokemon_names']}
+            text = get_term_matcher(markers).replace(text)
         
         return text
     
     def _postprocess_translation(self, translation: str) -> str:
         """后处理翻译"""
-        # 应用术语映射
-        for term_type, term_dict in self.term_dictionaries.items():
+        # 应用术语映射（各类词典合并，先出现的术语优先）
+        all_terms = {}
+        for term_dict in self.term_dictionaries.values():
             for en_term, cn_term in term_dict.items():
-                # 替换术语标记
-                translation = translation.replace(f"[{en_term}]", cn_term)
-                # 直接替换（不区分大小写）
-                translation = re.sub(
-                    r'\b' + re.escape(en_term) + r'\b', 
-                    cn_term, 
-                    translation, 
-                    flags=re.IGNORECASE
-                )
+                all_terms.setdefault(en_term, cn_term)
+        
+        # 替换术语标记
+        markers = {f"[{en_term}]": cn_term for en_term, cn_term in all_terms.items()}
+        translation = get_term_matcher(markers, word_boundary=False).replace(translation)
+        # 直接替换（不区分大小写）
+        translation = get_term_matcher(all_terms, ignore_case=True).replace(translation)
         
         return translation.strip()
     
@@ -650,12 +723,20 @@ class EnhancedTransformersModule:
         length_ratios = []
         domain_scores = defaultdict(list)
         
+        # 批量生成所有预测；批量翻译失败时逐个翻译，只跳过出错的样本
+        try:
+            batch_predictions = self.translate_batch([example.source_text for example in test_examples])
+        except Exception as e:
+            logger.warning(f"批量翻译时出错，改为逐个翻译: {e}")
+            batch_predictions = [None] * len(test_examples)
+        
         predictions = []
         references = []
         
-        for example in test_examples:
+        for example, predicted in zip(test_examples, batch_predictions):
             try:
-                predicted = self.translate_text(example.source_text)
+                if predicted is None:
+                    predicted = self.translate_text(example.source_text)
                 reference = example.target_text
                 
                 predictions.append(predicted)
@@ -747,6 +828,7 @@ class EnhancedTransformersModule:
         
         # 生成样本统计
         domain_stats = defaultdict(int)
+        domain_hit_stats = defaultdict(int)
         difficulty_stats = defaultdict(int)
         quality_stats = defaultdict(int)
         
@@ -754,6 +836,8 @@ class EnhancedTransformersModule:
         
         for example in all_examples:
             domain_stats[example.domain] += 1
+            for domain, hits in example.metadata.get('domain_hits', {}).items():
+                domain_hit_stats[domain] += hits
             difficulty_stats[f"difficulty_{int(example.difficulty * 10)}"] += 1
             quality_stats[f"quality_{int(example.quality_score * 10)}"] += 1
         
@@ -770,6 +854,7 @@ class EnhancedTransformersModule:
                 "validation_examples": len(self.validation_examples),
                 "test_examples": len(self.test_examples),
                 "domain_distribution": dict(domain_stats),
+                "domain_keyword_hits": dict(domain_hit_stats),
                 "difficulty_distribution": dict(difficulty_stats),
                 "quality_distribution": dict(quality_stats)
             },
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+样本特征缓存
+学习模块为每个翻译对计算的领域、难度、质量等特征按 (内容哈希, 评分器键) 保存在语料库的SQLite文件中，
+再次加载时未变化的翻译对直接读取缓存，只有新增的翻译对才交给评分器批量计算。
+评分器键包含评分器名称、SCORER_VERSION以及影响结果的配置的哈希，评分逻辑或配置变化时旧特征自动失效
+"""
+
+import json
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from crawl_state import content_hash
+
+# 评分逻辑变化时递增，使所有旧特征失效
+SCORER_VERSION = 2
+
+FEATURE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS example_features (
+    content_hash TEXT NOT NULL,
+    scorer TEXT NOT NULL,
+    features TEXT NOT NULL,
+    PRIMARY KEY (content_hash, scorer)
+);
+"""
+
+# SQLite的IN查询每次最多带的参数个数
+_LOOKUP_CHUNK = 500
+
+def scorer_key(name: str, config=None) -> str:
+    """评分器键：名称、版本和配置哈希"""
+    digest = content_hash(json.dumps(config, sort_keys=True, ensure_ascii=False))[:16]
+    return f"{name}:v{SCORER_VERSION}:{digest}"
+
+class FeatureCache:
+    """按内容哈希缓存样本特征"""
+
+    def __init__(self, conn: sqlite3.Connection, scorer: str):
+        """
+        Args:
+            conn: SQLite连接（通常是CorpusStore.conn，特征与翻译对保存在同一个文件中）
+            scorer: 评分器键，见scorer_key
+        """
+        self.conn = conn
+        self.scorer = scorer
+        self.hits = 0
+        self.misses = 0
+        self.conn.executescript(FEATURE_SCHEMA)
+        self.conn.commit()
+
+    def lookup(self, hashes: Iterable[str]) -> Dict[str, Dict]:
+        """读取已缓存的特征"""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        for start in range(0, len(hashes), _LOOKUP_CHUNK):
+            chunk = hashes[start:start + _LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT content_hash, features FROM example_features WHERE scorer = ? "
+                f"AND content_hash IN ({', '.join('?' * len(chunk))})",
+                [self.scorer] + chunk
+            )
+            for digest, features in rows:
+                found[digest] = json.loads(features)
+        return found
+
+    def store(self, features: Dict[str, Dict]):
+        """写入特征"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO example_features (content_hash, scorer, features) VALUES (?, ?, ?)",
+            [(digest, self.scorer, json.dumps(value, ensure_ascii=False)) for digest, value in features.items()]
+        )
+        self.conn.commit()
+
+    def features(self, pairs: Sequence[Tuple[str, str, str]],
+                 score_batch: Callable[[List[Tuple[str, str]]], List[Dict]]) -> List[Dict]:
+        """返回每个翻译对的特征，未缓存的翻译对一次性交给score_batch计算并写入缓存
+
+        Args:
+            pairs: (内容哈希, 原文, 译文) 列表
+            score_batch: 对 (原文, 译文) 列表批量计算特征的函数，返回同样顺序的特征列表
+        """
+        cached = self.lookup(digest for digest, _, _ in pairs)
+        missing = {}
+        for digest, source, target in pairs:
+            if digest not in cached and digest not in missing:
+                missing[digest] = (source, target)
+
+        if missing:
+            scored = dict(zip(missing, score_batch(list(missing.values()))))
+            self.store(scored)
+            cached.update(scored)
+
+        self.misses += len(missing)
+        self.hits += len(pairs) - len(missing)
+        return [cached[digest] for digest, _, _ in pairs]
+
+    def clear(self):
+        """删除当前评分器的全部特征"""
+        self.conn.execute("DELETE FROM example_features WHERE scorer = ?", (self.scorer,))
+        self.conn.commit()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主帖快速提取
+帖子页面中只需要标题（h1.p-title-value）和第一个 div.bbWrapper，
+先用正则在原始HTML中定位这两个片段，再只把片段交给BeautifulSoup解析，
+不为整页（可能包含几百条回复）建立完整的DOM树；
+也支持边下载边扫描，主帖结束后立即断开连接，不下载后面的回复
+"""
+
+import codecs
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+TITLE_PATTERN = re.compile(
+    r'<h1\b[^>]*\bclass\s*=\s*["\'][^"\']*\bp-title-value\b[^"\']*["\'][^>]*>.*?</h1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+BB_WRAPPER_START_PATTERN = re.compile(
+    r'<div\b[^>]*\bclass\s*=\s*["\'][^"\']*\bbbWrapper\b[^"\']*["\'][^>]*>',
+    re.IGNORECASE
+)
+DIV_TAG_PATTERN = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+@dataclass
+class FirstPost:
+    """帖子标题和主帖内容元素"""
+    title: Optional[str]
+    post: Optional[object]  # bs4.Tag
+
+    def text(self) -> str:
+        """主帖纯文本（每个文本节点一行）"""
+        if self.post is None:
+            return ""
+        return self.post.get_text(separator='\n', strip=True)
+
+def _decode(html: Union[str, bytes]) -> str:
+    if isinstance(html, bytes):
+        return html.decode('utf-8', errors='replace')
+    return html
+
+def _slice_first_bb_wrapper(html: str) -> Optional[str]:
+    """截取第一个bbWrapper的完整HTML（按div嵌套层数找到对应的结束标签）"""
+    start_match = BB_WRAPPER_START_PATTERN.search(html)
+    if not start_match:
+        return None
+
+    depth = 1
+    for tag in DIV_TAG_PATTERN.finditer(html, start_match.end()):
+        if tag.group(1):
+            depth -= 1
+            if depth == 0:
+                return html[start_match.start():tag.end()]
+        elif not tag.group(0).endswith('/>'):
+            depth += 1
+    return None
+
+def _parse_fragment(fragment: str, name: str):
+    return BeautifulSoup(fragment, 'html.parser').find(name)
+
+def extract_first_post(html: Union[str, bytes]) -> FirstPost:
+    """提取帖子标题和主帖内容元素，找不到时对应字段为None"""
+    html = _decode(html)
+
+    title_match = TITLE_PATTERN.search(html)
+    title_elem = _parse_fragment(title_match.group(0), 'h1') if title_match else None
+    title = title_elem.get_text(strip=True) if title_elem else None
+
+    fragment = _slice_first_bb_wrapper(html)
+    if fragment is not None:
+        return FirstPost(title, _parse_fragment(fragment, 'div'))
+
+    # 标签不配对等异常页面：退回只保留标题和bbWrapper的受限解析
+    strainer = SoupStrainer(['h1', 'div'], class_=['p-title-value', 'bbWrapper'])
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    if title is None:
+        title_elem = soup.find('h1', class_='p-title-value')
+        title = title_elem.get_text(strip=True) if title_elem else None
+    return FirstPost(title, soup.find('div', class_='bbWrapper'))
+
+class FirstPostStreamParser:
+    """增量扫描HTML，检测第一个bbWrapper是否已经完整接收"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.buffer = ""
+        self._search_from = 0
+        self._scan_pos = None
+        self._depth = 0
+        self.end = None
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: bytes) -> bool:
+        """输入一段字节，主帖结束时返回True"""
+        if self.complete:
+            return True
+        self.buffer += self._decoder.decode(chunk)
+
+        if self._scan_pos is None:
+            start_match = BB_WRAPPER_START_PATTERN.search(self.buffer, self._search_from)
+            if not start_match:
+                # 开始标签可能被分在两段之间，从最后一个'<'继续查找
+                last_tag = self.buffer.rfind('<')
+                self._search_from = last_tag if last_tag >= 0 else len(self.buffer)
+                return False
+            self._scan_pos = start_match.end()
+            self._depth = 1
+
+        # 只匹配完整的标签，不完整的标签留到下一段再处理
+        for tag in DIV_TAG_PATTERN.finditer(self.buffer, self._scan_pos):
+            self._scan_pos = tag.end()
+            if tag.group(1):
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = tag.end()
+                    return True
+            elif not tag.group(0).endswith('/>'):
+                self._depth += 1
+        return False
+
+    def result(self) -> FirstPost:
+        """提取已接收部分中的标题和主帖"""
+        html = self.buffer[:self.end] if self.complete else self.buffer + self._decoder.decode(b'', final=True)
+        return extract_first_post(html)
+
+@dataclass
+class StreamStats:
+    """一次流式下载的统计"""
+    bytes_read: int = 0
+    content_length: Optional[int] = None  # 服务器声明的完整长度（可能未知）
+    stopped_early: bool = False
+    elapsed: float = 0.0
+    prefix: bytes = field(default=b'', repr=False)
+
+    def summary(self) -> str:
+        """每个页面的读取情况"""
+        text = f"已读取 {self.bytes_read / 1024:.1f}KB"
+        if self.content_length:
+            saved = 1 - self.bytes_read / self.content_length
+            # 按已用时间和读取比例估算节省的下载时间
+            saved_time = self.elapsed * (self.content_length / max(self.bytes_read, 1) - 1)
+            text += f" / {self.content_length / 1024:.1f}KB，节省 {saved:.0%}（约{saved_time * 1000:.0f}ms）"
+        elif self.stopped_early:
+            text += "，主帖结束后已停止下载"
+        return text
+
+def read_first_post(response, chunk_size: int = 16384) -> Tuple[FirstPost, StreamStats]:
+    """从 stream=True 的响应中边读边扫描，主帖结束后关闭连接
+
+    Returns:
+        (标题和主帖, 统计信息)；stats.prefix为已读取的页面前缀
+    """
+    start = time.perf_counter()
+    parser = FirstPostStreamParser()
+    stats = StreamStats()
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        stats.content_length = int(content_length)
+
+    chunks = []
+    finished = False
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            stats.bytes_read += len(chunk)
+            if parser.feed(chunk):
+                finished = True
+                break
+
+        # 启用gzip时按网络上实际传输的字节数统计，和Content-Length保持一致
+        raw_tell = getattr(getattr(response, 'raw', None), 'tell', None)
+        if callable(raw_tell):
+            try:
+                # 分块传输时urllib3不统计，tell()为0，保留按块累计的字节数
+                stats.bytes_read = raw_tell() or stats.bytes_read
+            except Exception:
+                pass
+    finally:
+        # 提前结束时丢弃剩余内容，不把连接放回连接池
+        response.close()
+
+    stats.stopped_early = finished and (stats.content_length is None or stats.bytes_read < stats.content_length)
+    stats.elapsed = time.perf_counter() - start
+    stats.prefix = b''.join(chunks)
+    return parser.result(), stats
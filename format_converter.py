@@ -2,16 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 数据格式转换工具
-将individual_pairs目录中的文件转换为NLLB学习模块可读取的格式
+将individual_pairs目录中的文件转换为NLLB学习模块可读取的格式。
+按清单（输出目录中的.conversion_manifest）增量转换：修改时间和大小都没变的文件直接跳过，
+修改时间变了但内容哈希没变的文件也不重新转换；转换在多个进程中进行，每一项写出前按编译好的结构校验。
+去重时已写出的翻译对的MinHash签名保存在.conversion_signatures.npy中，跳过的文件仍参与近似重复判断；
+清单记录每个文件的重复项由哪些文件中的代表去掉，这些文件变化或删除后重新转换依赖它们的文件
 """
 
 import os
 import json
 import glob
 import logging
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from crawl_state import content_hash
+from pair_dedup import NearDuplicateIndex, exact_key
+from text_profile import detect_language
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -19,12 +30,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 转换清单（不以.json结尾，读取目录中*.json的程序不会把它当作翻译对文件）
+MANIFEST_NAME = ".conversion_manifest"
+# 去重时写出的翻译对的签名，清单中每个文件的signatures为它在其中的起始行
+SIGNATURES_NAME = ".conversion_signatures.npy"
+LANGUAGES = ("chinese", "japanese", "korean", "english")
+
+# 输出项的结构：字段 -> (类型, 附加检查, 说明)
+ITEM_SCHEMA = {
+    "source": (str, lambda value: bool(value.strip()), "非空字符串"),
+    "target": (str, lambda value: bool(value.strip()), "非空字符串"),
+    "source_lang": (str, lambda value: value in LANGUAGES, f"{'/'.join(LANGUAGES)}之一"),
+    "target_lang": (str, lambda value: value in LANGUAGES, f"{'/'.join(LANGUAGES)}之一"),
+}
+
+def compile_schema(schema: Dict) -> Callable[[Any], Optional[str]]:
+    """把结构说明编译为校验函数：通过时返回None，否则返回第一个错误"""
+    checks = tuple((key, expected_type, check, description)
+                   for key, (expected_type, check, description) in schema.items())
+
+    def validate(item: Any) -> Optional[str]:
+        if not isinstance(item, dict):
+            return "不是对象"
+        for key, expected_type, check, description in checks:
+            if key not in item:
+                return f"缺少字段 {key}"
+            value = item[key]
+            if not isinstance(value, expected_type) or not check(value):
+                return f"字段 {key} 应为{description}"
+        return None
+
+    return validate
+
+validate_item = compile_schema(ITEM_SCHEMA)
+
+def _convert_file_worker(task: tuple) -> Dict:
+    """在工作进程中转换一个文件（参数见DataFormatConverter._convert_file）"""
+    converter_class, options, input_file, output_file, known_hash, write = task
+    return converter_class(**options)._convert_file(input_file, output_file, known_hash, write)
+
 class DataFormatConverter:
     """数据格式转换器"""
     
-    def __init__(self, input_dir: str = "individual_pairs", output_dir: str = "individual_pairs_formatted"):
+    def __init__(self, input_dir: str = "individual_pairs", output_dir: str = "individual_pairs_formatted",
+                 deduplicate: bool = False, keep_metadata: bool = True):
+        """
+        Args:
+            deduplicate: 转换目录时跳过与之前的翻译对完全重复或近似重复的翻译对（见pair_dedup）
+            keep_metadata: 把源文本和目标文本以外的字段保留为metadata_*字段
+        """
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self.deduplicate = deduplicate
+        self.keep_metadata = keep_metadata
+        self.duplicate_count = 0
+        self._dedup_index = None
+        self._previous_signatures = None
+        self._signature_rows = []
+        self.stats = {}
         self.supported_formats = [
             # 原始格式（英文-中文键值对）
             ['english', 'chinese'],
@@ -44,57 +107,109 @@ class DataFormatConverter:
                 return format_pair
         return None
     
-    def convert_single_file(self, input_file: str, output_file: str) -> bool:
-        """转换单个文件"""
+    def detect_fields(self, data: Dict) -> Optional[List[str]]:
+        """没有完整的字段对时，分别取第一个非空的源文本字段和目标文本字段（如english与translation混用）"""
+        source_key = next((source for source, _ in self.supported_formats if data.get(source)), None)
+        target_key = next((target for _, target in self.supported_formats if data.get(target)), None)
+        if source_key and target_key:
+            return [source_key, target_key]
+        return None
+    
+    def _convert_data(self, data: Any) -> Optional[List[Dict]]:
+        """转换一个文件中的数据（数组或单个对象），不支持的结构返回None"""
+        if isinstance(data, list):
+            items = data
+        elif isinstance(data, dict):
+            items = [data]
+        else:
+            return None
+        converted_data = []
+        for item in items:
+            converted_item = self.convert_item(item) if isinstance(item, dict) else None
+            if converted_item:
+                converted_data.append(converted_item)
+        return converted_data
+    
+    def _convert_file(self, input_file: str, output_file: str, known_hash: Optional[str] = None,
+                      write: bool = True) -> Dict:
+        """读取、转换并逐项校验一个文件
+        
+        Args:
+            known_hash: 上次转换时的内容哈希，内容没变且输出文件存在时不再转换
+            write: 是否直接写出输出文件；为False时把转换结果放在返回值的items中
+            
+        Returns:
+            {'status': converted/unchanged/empty/error, 'hash', 'count', 'invalid', 'items', 'error'}
+        """
+        result = {'status': 'error', 'hash': None, 'count': 0, 'invalid': 0, 'items': [], 'error': None}
         try:
-            logger.info(f"转换文件: {input_file} -> {output_file}")
-            
-            # 读取输入文件
-            with open(input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 处理不同的数据结构
-            if isinstance(data, list):
-                # 如果是数组，转换每个元素
-                converted_data = []
-                for item in data:
-                    converted_item = self.convert_item(item)
-                    if converted_item:
-                        converted_data.append(converted_item)
-            elif isinstance(data, dict):
-                # 如果是单个对象，直接转换
-                converted_item = self.convert_item(data)
-                if converted_item:
-                    converted_data = [converted_item]
+            with open(input_file, 'rb') as f:
+                raw = f.read()
+            result['hash'] = content_hash(raw)
+            if known_hash == result['hash'] and os.path.exists(output_file):
+                result['status'] = 'unchanged'
+                return result
+            
+            converted_data = self._convert_data(json.loads(raw.decode('utf-8')))
+            if converted_data is None:
+                result['error'] = "不支持的数据格式"
+                return result
+            
+            valid_items = []
+            for item in converted_data:
+                error = validate_item(item)
+                if error:
+                    result['invalid'] += 1
+                    logger.warning(f"文件 {input_file} 中的项无效: {error}")
                 else:
-                    converted_data = []
+                    valid_items.append(item)
+            
+            result['count'] = len(valid_items)
+            if not valid_items:
+                result['status'] = 'empty'
+                return result
+            if write:
+                self._write_output(output_file, valid_items)
             else:
-                logger.error(f"不支持的数据格式: {type(data)}")
-                return False
-            
-            if not converted_data:
-                logger.warning(f"文件 {input_file} 没有有效的翻译对")
-                return False
-            
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            
-            # 写入输出文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(converted_data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"成功转换 {len(converted_data)} 个翻译对")
-            return True
-            
+                result['items'] = valid_items
+            result['status'] = 'converted'
         except Exception as e:
-            logger.error(f"转换文件 {input_file} 时出错: {e}")
+            result['error'] = str(e)
+        return result
+    
+    def _write_output(self, output_file: str, items: List[Dict]):
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+    
+    def convert_single_file(self, input_file: str, output_file: str) -> bool:
+        """转换单个文件"""
+        logger.info(f"转换文件: {input_file} -> {output_file}")
+        result = self._convert_file(input_file, output_file, write=self._dedup_index is None)
+        
+        if result['status'] == 'error':
+            logger.error(f"转换文件 {input_file} 时出错: {result['error']}")
             return False
+        if result['status'] == 'converted' and self._dedup_index is not None:
+            kept, _ = self._drop_duplicates(result['items'], input_file)
+            items = [result['items'][position] for position in kept]
+            if not items:
+                logger.info(f"文件 {input_file} 的翻译对都与之前的翻译对重复")
+                return False
+            self._write_output(output_file, items)
+            result['count'] = len(items)
+        if not result['count']:
+            logger.warning(f"文件 {input_file} 没有有效的翻译对")
+            return False
+        
+        logger.info(f"成功转换 {result['count']} 个翻译对")
+        return True
     
     def convert_item(self, item: Dict) -> Optional[Dict]:
         """转换单个数据项"""
         try:
             # 检测格式
-            format_pair = self.detect_format(item)
+            format_pair = self.detect_format(item) or self.detect_fields(item)
             
             if not format_pair:
                 logger.warning(f"无法识别数据格式: {list(item.keys())}")
@@ -122,9 +237,10 @@ class DataFormatConverter:
             }
             
             # 保留其他元数据
-            for key, value in item.items():
-                if key not in [source_key, target_key] and key not in converted_item:
-                    converted_item[f"metadata_{key}"] = value
+            if self.keep_metadata:
+                for key, value in item.items():
+                    if key not in [source_key, target_key] and key not in converted_item:
+                        converted_item[f"metadata_{key}"] = value
             
             return converted_item
             
@@ -132,46 +248,116 @@ class DataFormatConverter:
             logger.error(f"转换数据项时出错: {e}")
             return None
     
+    def _drop_duplicates(self, items: List[Dict], input_file: str) -> Tuple[List[int], List[str]]:
+        """去掉与本次转换中之前的翻译对重复的翻译对，返回保留的项的序号，以及重复项的代表所在的其他文件"""
+        kept = []
+        dropped_by = set()
+        for position, item in enumerate(items):
+            duplicate = self._dedup_index.add((input_file, position), item['source'], item['target'])
+            if duplicate is None:
+                kept.append(position)
+            else:
+                self.duplicate_count += 1
+                if duplicate.representative[0] != input_file:
+                    dropped_by.add(duplicate.representative[0])
+                logger.info(f"跳过重复的翻译对: {input_file}[{position}] 与 {duplicate.representative[0]} 重复 "
+                            f"(相似度 {duplicate.similarity:.2f})")
+        return kept, sorted(dropped_by)
+    
     def detect_language(self, text: str) -> str:
         """简单的语言检测"""
-        import re
-        
-        # 检测中文字符
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-        # 检测日文字符
-        japanese_chars = len(re.findall(r'[\u3040-\u309f\u30a0-\u30ff]', text))
-        # 检测韩文字符
-        korean_chars = len(re.findall(r'[\uac00-\ud7af]', text))
-        
-        total_chars = len(text)
-        
-        if total_chars == 0:
-            return "unknown"
-        
-        # 计算各语言字符比例
-        chinese_ratio = chinese_chars / total_chars
-        japanese_ratio = japanese_chars / total_chars
-        korean_ratio = korean_chars / total_chars
-        
-        # 判断语言
-        if chinese_ratio > 0.3:
-            return "chinese"
-        elif japanese_ratio > 0.3:
-            return "japanese"
-        elif korean_ratio > 0.3:
-            return "korean"
-        else:
-            return "english"  # 默认为英文
+        return detect_language(text)
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_NAME)
     
-    def convert_directory(self) -> bool:
-        """转换整个目录"""
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """读取转换清单：输入文件名 -> {mtime, size, hash, count, invalid, keys, signatures, duplicates, dropped_by}"""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 输出的字段不同时，上次的输出都不能沿用
+        if manifest.get('keep_metadata', True) != self.keep_metadata:
+            return {}
+        return manifest.get('files', {})
+    
+    def _save_manifest(self, files: Dict[str, Dict]):
+        temp_path = self._manifest_path() + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'input_dir': self.input_dir, 'keep_metadata': self.keep_metadata,
+                       'updated_at': datetime.now().isoformat(), 'files': files}, f, ensure_ascii=False)
+        os.replace(temp_path, self._manifest_path())
+    
+    def _signatures_path(self) -> str:
+        return os.path.join(self.output_dir, SIGNATURES_NAME)
+    
+    def _load_signatures(self) -> Optional[np.ndarray]:
+        try:
+            return np.load(self._signatures_path())
+        except (OSError, ValueError):
+            return None
+    
+    def _save_signatures(self):
+        rows = self._signature_rows
+        signatures = np.stack(rows) if rows else np.empty((0, 0), dtype=np.uint64)
+        temp_path = self._signatures_path() + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, signatures)
+        os.replace(temp_path, self._signatures_path())
+    
+    def _entry_signatures(self, entry: Dict) -> Optional[np.ndarray]:
+        """清单项对应的已保存签名，缺失时返回None"""
+        offset, count = entry.get('signatures'), len(entry['keys'])
+        if count == 0:
+            return np.empty((0, 0), dtype=np.uint64)
+        if offset is None or self._previous_signatures is None or offset + count > len(self._previous_signatures):
+            return None
+        return self._previous_signatures[offset:offset + count]
+    
+    def _can_skip(self, entry: Optional[Dict]) -> bool:
+        """清单项是否足以跳过转换：去重时还需要之前保存的exact_key、签名和重复项的来源（不去重的转换不保存它们）"""
+        if not entry:
+            return False
+        return not self.deduplicate or ('keys' in entry and 'dropped_by' in entry and
+                                        self._entry_signatures(entry) is not None)
+    
+    def _is_unchanged(self, entry: Optional[Dict], file_stat: os.stat_result, output_file: str) -> bool:
+        """修改时间和大小都和清单一致，且输出文件还在（没有有效项的文件没有输出）"""
+        if not self._can_skip(entry) or (entry['mtime'], entry['size']) != (file_stat.st_mtime, file_stat.st_size):
+            return False
+        return entry['count'] == 0 or os.path.exists(output_file)
+    
+    def _stale_dependents(self, previous: Dict[str, Dict], changed: Set[str]) -> Set[str]:
+        """去重时需要重新转换的文件：它的重复项的代表所在的文件变化或删除了，跳过的项可能已经没有代表；
+        重新转换的文件保留的项也可能变化，所以依赖关系是传递的"""
+        dirty = set(changed)
+        stale = set()
+        grew = True
+        while grew:
+            grew = False
+            for filename, entry in previous.items():
+                if filename not in stale and dirty.intersection(entry.get('dropped_by', ())):
+                    stale.add(filename)
+                    dirty.add(filename)
+                    grew = True
+        return stale
+    
+    def convert_directory(self, workers: int = 1, incremental: bool = True) -> bool:
+        """转换整个目录
+        
+        Args:
+            workers: 工作进程数，1为单进程，0或负数使用全部CPU核心；结果按文件名顺序合并
+            incremental: 按转换清单跳过没有变化的文件；为False时全部重新转换
+        """
         try:
             if not os.path.exists(self.input_dir):
                 logger.error(f"输入目录不存在: {self.input_dir}")
                 return False
             
             # 查找所有JSON文件
-            json_files = glob.glob(os.path.join(self.input_dir, "*.json"))
+            json_files = sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.input_dir, "*.json")))
             
             if not json_files:
                 logger.warning(f"在 {self.input_dir} 中没有找到JSON文件")
@@ -182,22 +368,149 @@ class DataFormatConverter:
             # 创建输出目录
             os.makedirs(self.output_dir, exist_ok=True)
             
-            success_count = 0
-            
-            for input_file in json_files:
-                filename = os.path.basename(input_file)
+            previous = self._load_manifest() if incremental else {}
+            manifest = {}
+            self.stats = {'files': len(json_files), 'converted': 0, 'unchanged': 0, 'empty': 0, 'deduplicated': 0,
+                          'failed': 0, 'removed': 0, 'items': 0, 'invalid': 0}
+            self.duplicate_count = 0
+            self._dedup_index = NearDuplicateIndex() if self.deduplicate else None
+            self._previous_signatures = self._load_signatures() if self.deduplicate and previous else None
+            self._signature_rows = []
+            
+            # 没有变化的文件只stat不打开；去重时它们已写出的翻译对作为已有的代表
+            candidates = []
+            for filename in json_files:
+                input_file = os.path.join(self.input_dir, filename)
                 output_file = os.path.join(self.output_dir, filename)
-                
-                if self.convert_single_file(input_file, output_file):
-                    success_count += 1
+                file_stat = os.stat(input_file)
+                entry = previous.get(filename)
+                candidates.append((filename, input_file, output_file, file_stat, entry,
+                                   self._is_unchanged(entry, file_stat, output_file)))
+            removed = set(previous) - set(json_files)
+            stale = set()
+            if self.deduplicate:
+                stale = self._stale_dependents(previous, removed | {candidate[0] for candidate in candidates
+                                                                    if not candidate[5]})
+            pending = []
+            for filename, input_file, output_file, file_stat, entry, unchanged in candidates:
+                if unchanged and filename not in stale:
+                    self._count_unchanged(manifest, filename, dict(entry))
+                else:
+                    pending.append((filename, input_file, output_file, file_stat, entry))
+            
+            if workers <= 0:
+                workers = os.cpu_count() or 1
+            workers = max(1, min(workers, len(pending)))
+            write = self._dedup_index is None
+            options = {'keep_metadata': self.keep_metadata}
+            tasks = [(type(self), options, input_file, output_file,
+                      entry['hash'] if self._can_skip(entry) and filename not in stale else None, write)
+                     for filename, input_file, output_file, _, entry in pending]
+            if workers > 1:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_convert_file_worker, tasks, chunksize=chunksize))
+            else:
+                results = map(_convert_file_worker, tasks)
+            
+            for (filename, input_file, output_file, file_stat, entry), result in zip(pending, results):
+                self._apply_result(manifest, filename, input_file, output_file, file_stat, entry, result)
             
-            logger.info(f"转换完成: {success_count}/{len(json_files)} 个文件成功")
+            # 输入已删除的文件，删除它们的输出
+            for filename in removed:
+                output_file = os.path.join(self.output_dir, filename)
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+                self.stats['removed'] += 1
+            
+            self._save_manifest(manifest)
+            if self.deduplicate:
+                self._save_signatures()
+            
+            success_count = self.stats['converted'] + self.stats['unchanged']
+            logger.info(f"转换完成: {success_count}/{len(json_files)} 个文件成功"
+                        f"（转换 {self.stats['converted']}，未变化 {self.stats['unchanged']}，"
+                        f"无有效项 {self.stats['empty']}，全部重复 {self.stats['deduplicated']}，失败 {self.stats['failed']}，删除 {self.stats['removed']}；"
+                        f"{workers} 个进程）")
+            if self.stats['invalid']:
+                logger.warning(f"校验未通过 {self.stats['invalid']} 项")
+            if self.deduplicate:
+                logger.info(f"跳过 {self.duplicate_count} 个重复的翻译对")
             return success_count > 0
             
         except Exception as e:
             logger.error(f"转换目录时出错: {e}")
             return False
     
+    def _count_unchanged(self, manifest: Dict, filename: str, entry: Dict):
+        """没有重新转换的文件：计数；去重时把它已写出的翻译对连同签名作为已有的代表"""
+        manifest[filename] = entry
+        if entry['count']:
+            self.stats['unchanged'] += 1
+        else:
+            self.stats['deduplicated' if entry.get('duplicates') else 'empty'] += 1
+        self.stats['items'] += entry['count']
+        if self._dedup_index is not None:
+            signatures = self._entry_signatures(entry)
+            entry['signatures'] = len(self._signature_rows)
+            for position, (key, signature) in enumerate(zip(entry['keys'], signatures)):
+                self._dedup_index.add_representative((filename, position), key, signature)
+                self._signature_rows.append(signature)
+    
+    def _apply_result(self, manifest: Dict, filename: str, input_file: str, output_file: str,
+                      file_stat: os.stat_result, entry: Optional[Dict], result: Dict):
+        """合并一个文件的转换结果，更新清单"""
+        status = result['status']
+        if status == 'error':
+            logger.error(f"转换文件 {input_file} 时出错: {result['error']}")
+            self.stats['failed'] += 1
+            # 失败的文件不在清单中，也不保留上次的输出
+            if os.path.exists(output_file):
+                os.remove(output_file)
+                logger.warning(f"已删除 {output_file} 上次转换的输出")
+            return
+        if status == 'unchanged':
+            # 只是修改时间变了
+            self._count_unchanged(manifest, filename, dict(entry, mtime=file_stat.st_mtime, size=file_stat.st_size))
+            return
+        
+        items = result['items']
+        signatures = []
+        duplicates, dropped_by = 0, []
+        if status == 'converted' and self._dedup_index is not None:
+            kept, dropped_by = self._drop_duplicates(items, filename)
+            duplicates = len(items) - len(kept)
+            items = [items[position] for position in kept]
+            signatures = [self._dedup_index.representative_signature((filename, position)) for position in kept]
+            if items:
+                self._write_output(output_file, items)
+            result['count'] = len(items)
+        
+        self.stats['invalid'] += result['invalid']
+        if result['count']:
+            self.stats['converted'] += 1
+            self.stats['items'] += result['count']
+            logger.info(f"转换文件: {filename} ({result['count']} 个翻译对)")
+        else:
+            if status == 'converted':
+                # 有有效项，但都与之前的翻译对重复
+                self.stats['deduplicated'] += 1
+                logger.info(f"文件 {input_file} 的翻译对都与之前的翻译对重复")
+            else:
+                self.stats['empty'] += 1
+                logger.warning(f"文件 {input_file} 没有有效的翻译对")
+            if os.path.exists(output_file):
+                os.remove(output_file)
+        
+        manifest[filename] = {'mtime': file_stat.st_mtime, 'size': file_stat.st_size, 'hash': result['hash'],
+                              'count': result['count'], 'invalid': result['invalid']}
+        if self._dedup_index is not None:
+            manifest[filename]['keys'] = [exact_key(item['source'], item['target']) for item in items]
+            manifest[filename]['signatures'] = len(self._signature_rows)
+            manifest[filename]['duplicates'] = duplicates
+            manifest[filename]['dropped_by'] = dropped_by
+            self._signature_rows.extend(signatures)
+    
     def create_sample_data(self) -> bool:
         """创建示例数据用于测试"""
         try:
@@ -252,12 +565,24 @@ class DataFormatConverter:
             return False
     
     def validate_output(self) -> bool:
-        """验证输出格式"""
+        """验证输出格式
+        
+        有转换清单时每一项在转换时已经校验过，只检查清单中的输出文件是否都在；
+        没有清单时逐个读取输出文件并按ITEM_SCHEMA校验
+        """
         try:
             if not os.path.exists(self.output_dir):
                 logger.error(f"输出目录不存在: {self.output_dir}")
                 return False
             
+            manifest = self._load_manifest()
+            if manifest:
+                outputs = [filename for filename, entry in manifest.items() if entry['count']]
+                valid_count = sum(1 for filename in outputs if os.path.exists(os.path.join(self.output_dir, filename)))
+                logger.info(f"验证完成: {valid_count}/{len(outputs)} 个文件有效"
+                            f"（共 {sum(manifest[filename]['count'] for filename in outputs)} 项，转换时已逐项校验）")
+                return valid_count > 0 and valid_count == len(outputs)
+            
             json_files = glob.glob(os.path.join(self.output_dir, "*.json"))
             
             if not json_files:
@@ -277,11 +602,11 @@ class DataFormatConverter:
                     
                     valid_items = 0
                     for item in data:
-                        required_keys = ['source', 'target', 'source_lang', 'target_lang']
-                        if all(key in item for key in required_keys):
+                        error = validate_item(item)
+                        if error is None:
                             valid_items += 1
                         else:
-                            logger.warning(f"文件 {file_path} 中的项缺少必需字段")
+                            logger.warning(f"文件 {file_path} 中的项无效: {error}")
                     
                     if valid_items > 0:
                         valid_count += 1
@@ -302,7 +627,7 @@ def main():
     print("数据格式转换工具")
     print("=" * 50)
     
-    converter = DataFormatConverter()
+    converter = DataFormatConverter(deduplicate=True)
     
     # 检查输入目录
     if not os.path.exists(converter.input_dir):
@@ -324,7 +649,7 @@ def main():
     # 执行转换
     print(f"\n开始转换 {converter.input_dir} 目录中的文件...")
     
-    if converter.convert_directory():
+    if converter.convert_directory(workers=0):
         print("\n转换完成！")
         
         # 验证输出
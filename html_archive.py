@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始HTML归档
+把抓取到的原始页面按内容哈希gzip压缩保存（相同内容只存一份），用SQLite按URL和抓取时间建立索引；
+回放模式下用归档代替网络，修改提取和清洗规则后可以离线重新运行整个提取流程
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from crawl_state import content_hash
+from http_client import PooledSession
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT,
+    complete INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (url, fetched_at)
+)
+"""
+
+# 回放时需要还原的响应头
+ARCHIVED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+class HtmlArchive:
+    """内容寻址的原始页面归档"""
+
+    def __init__(self, root: str = "html_archive"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        # 爬取引擎会在多个线程中写入，由self.lock串行化
+        self.conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute(SCHEMA)
+            self.conn.commit()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def store(self, url: str, body: bytes, headers: Optional[Dict] = None, status: int = 200,
+              complete: bool = True, fetched_at: Optional[float] = None) -> str:
+        """保存一次抓取结果，返回内容哈希
+
+        Args:
+            url: 请求的URL
+            body: 原始响应内容
+            headers: 响应头，只保留ARCHIVED_HEADERS
+            status: HTTP状态码
+            complete: 是否为完整页面（流式下载只保存了主帖之前的前缀时为False）
+            fetched_at: 抓取时间，默认为当前时间
+        """
+        digest = content_hash(body)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            # mtime固定为0，相同内容压缩结果逐字节相同
+            with open(temp_path, 'wb') as raw_file:
+                with gzip.GzipFile(fileobj=raw_file, mode='wb', mtime=0) as f:
+                    f.write(body)
+            os.replace(temp_path, path)
+
+        headers = headers or {}
+        kept_headers = {name: headers[name] for name in ARCHIVED_HEADERS if headers.get(name)}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (url, fetched_at, digest, status, headers, complete) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, fetched_at if fetched_at is not None else time.time(), digest, status,
+                 json.dumps(kept_headers), int(complete))
+            )
+            self.conn.commit()
+        return digest
+
+    def lookup(self, url: str, as_of: Optional[float] = None) -> Optional[Dict]:
+        """查找URL最新的快照记录（as_of不为None时只看该时间之前的快照）"""
+        query = "SELECT * FROM snapshots WHERE url = ?"
+        params = [url]
+        if as_of is not None:
+            query += " AND fetched_at <= ?"
+            params.append(as_of)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+
+        with self.lock:
+            row = self.conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['headers'] = json.loads(entry['headers'] or '{}')
+        entry['complete'] = bool(entry['complete'])
+        return entry
+
+    def load(self, digest: str) -> bytes:
+        """按内容哈希读取页面"""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def get(self, url: str, as_of: Optional[float] = None) -> Optional[bytes]:
+        """读取URL最新的页面内容，没有归档时返回None"""
+        entry = self.lookup(url, as_of)
+        return self.load(entry['digest']) if entry else None
+
+    def urls(self) -> List[str]:
+        """已归档的URL（按字母顺序）"""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT url FROM snapshots ORDER BY url").fetchall()
+        return [row['url'] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """快照数、URL数和去重后的页面数"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) AS snapshots, COUNT(DISTINCT url) AS urls, "
+                "COUNT(DISTINCT digest) AS objects FROM snapshots"
+            ).fetchone()
+        return dict(row)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class ArchivingSession(PooledSession):
+    """抓取成功的完整页面自动写入归档的HTTP会话
+
+    stream=True的请求不写入归档：只读取了部分内容的页面无法在回放时重现完整的运行，
+    使用归档会话时调用方应下载完整页面
+    """
+
+    def __init__(self, archive: HtmlArchive, **session_options):
+        super().__init__(**session_options)
+        self.archive = archive
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        if method.upper() == 'GET' and not kwargs.get('stream') and response.status_code == 200:
+            self.archive.store(url, response.content, response.headers, response.status_code)
+        return response
+
+class ReplaySession(requests.Session):
+    """用归档内容响应请求的HTTP会话，不访问网络"""
+
+    def __init__(self, archive: HtmlArchive, as_of: Optional[float] = None):
+        """
+        Args:
+            archive: 页面归档
+            as_of: 只回放该时间（time.time()）之前的快照，固定后多次回放结果完全一致
+        """
+        super().__init__()
+        self.archive = archive
+        self.as_of = as_of
+        self.replayed = 0
+
+    def request(self, method, url, *args, **kwargs):
+        entry = self.archive.lookup(url, self.as_of)
+        if entry is None:
+            raise requests.ConnectionError(f"归档中没有该页面: {url}")
+
+        body = self.archive.load(entry['digest'])
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK' if entry['status'] == 200 else ''
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers['Content-Length'] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.request = requests.Request(method, url).prepare()
+        # 内容已经在内存中，stream=True时iter_content直接切分
+        response._content = body
+        response._content_consumed = True
+        self.replayed += 1
+        return response
+
+def create_session(archive_dir: Optional[str] = None, replay: bool = False,
+                   as_of: Optional[float] = None, **session_options) -> requests.Session:
+    """根据归档设置创建HTTP会话
+
+    Args:
+        archive_dir: 归档目录，None表示不归档
+        replay: 是否从归档回放（需要archive_dir）
+        as_of: 回放时使用的快照时间上限
+        **session_options: 传给PooledSession的连接池、重试和大小限制参数（回放时忽略）
+    """
+    if replay:
+        if not archive_dir:
+            raise ValueError("回放模式需要指定归档目录")
+        if not os.path.isdir(archive_dir):
+            raise FileNotFoundError(f"归档目录不存在: {archive_dir}")
+        return ReplaySession(HtmlArchive(archive_dir), as_of)
+    if archive_dir:
+        return ArchivingSession(HtmlArchive(archive_dir), **session_options)
+    return PooledSession(**session_options)
+
+def parse_as_of(value: str) -> float:
+    """解析命令行的快照时间：Unix时间戳，或ISO格式的日期时间（如2026-10-01、2026-10-01T12:00:00）"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"无法解析的时间: {value}")
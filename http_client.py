@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享HTTP客户端
+所有抓取页面的模块都使用这里的连接池会话：保持长连接复用TCP/TLS握手，
+连接级错误和可重试状态码自动退避重试，限制响应大小，并记录每个请求的耗时
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 可重试的HTTP状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+# 解压后的最大响应大小，超过时中止下载
+DEFAULT_MAX_RESPONSE_BYTES = 20 * 1024 * 1024
+
+class ResponseTooLarge(requests.RequestException):
+    """响应超过大小限制"""
+
+class FetchMetrics:
+    """请求计数、耗时和下载量统计（线程安全）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_downloaded = 0
+        self.durations: List[float] = []
+
+    def record(self, seconds: float, size: int = 0):
+        with self.lock:
+            self.requests += 1
+            self.bytes_downloaded += size
+            self.durations.append(seconds)
+
+    def record_error(self, seconds: float):
+        with self.lock:
+            self.errors += 1
+            self.durations.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """请求数、错误数、下载量和耗时分位数（毫秒）"""
+        with self.lock:
+            durations = sorted(self.durations)
+            result = {
+                'requests': self.requests,
+                'errors': self.errors,
+                'bytes_downloaded': self.bytes_downloaded
+            }
+        if durations:
+            result['avg_ms'] = sum(durations) / len(durations) * 1000
+            result['p50_ms'] = durations[len(durations) // 2] * 1000
+            result['p95_ms'] = durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000
+        return result
+
+class PooledSession(requests.Session):
+    """带连接池、自动重试、响应大小限制和耗时统计的会话"""
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_response_bytes: Optional[int] = DEFAULT_MAX_RESPONSE_BYTES,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pool_connections: 缓存连接池的主机数
+            pool_maxsize: 每个主机保持的最大连接数（应不小于并发线程数）
+            max_retries: 连接错误和RETRY_STATUS_CODES的重试次数（由CrawlEngine负责重试时设为0）
+            backoff_factor: 重试退避基数（秒），遵守Retry-After
+            timeout: 调用方没有指定timeout时使用的超时（秒）
+            max_response_bytes: 最大响应大小，None表示不限制
+            headers: 覆盖默认请求头
+        """
+        super().__init__()
+        self.timeout = timeout
+        self.max_response_bytes = max_response_bytes
+        self.metrics = FetchMetrics()
+        self.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        stream = kwargs.pop('stream', False)
+
+        start = time.perf_counter()
+        try:
+            # 总是先只读响应头，再按大小限制读取内容
+            response = super().request(method, url, *args, stream=True, **kwargs)
+            self._check_declared_size(response)
+            size = 0
+            if not stream:
+                self._read_capped(response)
+                size = len(response.content)
+        except requests.RequestException:
+            self.metrics.record_error(time.perf_counter() - start)
+            raise
+
+        # stream=True时只统计到收到响应头，内容由调用方读取
+        self.metrics.record(time.perf_counter() - start, size)
+        return response
+
+    def _check_declared_size(self, response: requests.Response):
+        content_length = response.headers.get('Content-Length')
+        if (self.max_response_bytes is not None and content_length and content_length.isdigit()
+                and int(content_length) > self.max_response_bytes):
+            response.close()
+            raise ResponseTooLarge(f"响应大小 {content_length} 字节超过限制: {response.url}", response=response)
+
+    def _read_capped(self, response: requests.Response):
+        """读取完整内容，超过大小限制时中止（读完后连接自动放回连接池）"""
+        chunks = []
+        total = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            total += len(chunk)
+            if self.max_response_bytes is not None and total > self.max_response_bytes:
+                response.close()
+                raise ResponseTooLarge(f"响应超过 {self.max_response_bytes} 字节限制: {response.url}",
+                                       response=response)
+            chunks.append(chunk)
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+
+    def connections_opened(self) -> int:
+        """连接池累计新建的连接数（与请求数的差就是复用连接省下的握手次数）"""
+        total = 0
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total += pool.num_connections
+        return total
+
+    def metrics_summary(self) -> str:
+        """一行统计信息"""
+        summary = self.metrics.summary()
+        text = (f"HTTP请求: {summary['requests']} 次，失败 {summary['errors']} 次，"
+                f"新建连接 {self.connections_opened()} 个，下载 {summary['bytes_downloaded'] / 1024:.1f}KB")
+        if 'avg_ms' in summary:
+            text += f"，平均 {summary['avg_ms']:.0f}ms，p95 {summary['p95_ms']:.0f}ms"
+        return text
+
+_shared_session: Optional[PooledSession] = None
+_shared_lock = threading.Lock()
+
+def get_shared_session() -> PooledSession:
+    """进程内共享的默认会话，没有自己会话的调用方都使用它以复用连接"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = PooledSession()
+    return _shared_session
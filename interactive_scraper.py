@@ -3,15 +3,14 @@
 """
 交互式Smogon爬虫程序
 允许用户输入链接进行爬取，并按照完整流程处理数据
-流程：爬取 -> 筛选 -> 增强
+流程：爬取 -> 筛选 -> 增强 -> 提取 -> 转换 -> 拆分（在同一个进程中流式运行，见pipeline_runner）
 """
 
 import os
-import sys
-import subprocess
-import time
 from urllib.parse import urlparse
 
+from pipeline_runner import ThreadPipeline
+
 def validate_smogon_url(url):
     """验证是否为有效的Smogon论坛链接"""
     try:
@@ -24,42 +23,6 @@ def validate_smogon_url(url):
     except:
         return False
 
-def run_script(script_name, description):
-    """运行指定脚本并显示结果"""
-    print(f"\n{'='*60}")
-    print(f"正在执行: {description}")
-    print(f"脚本: {script_name}")
-    print(f"{'='*60}")
-    
-    try:
-        result = subprocess.run(
-            ['python3', script_name],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
-        )
-        
-        if result.returncode == 0:
-            print(f"✓ {description} 完成")
-            if result.stdout:
-                print("输出:")
-                print(result.stdout)
-        else:
-            print(f"✗ {description} 失败")
-            if result.stderr:
-                print("错误信息:")
-                print(result.stderr)
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print(f"✗ {description} 超时")
-        return False
-    except Exception as e:
-        print(f"✗ {description} 执行异常: {e}")
-        return False
-    
-    return True
-
 def get_user_input():
     """获取用户输入的链接"""
     print("\n" + "="*80)
@@ -123,31 +86,6 @@ def batch_mode():
     print(f"从文件中读取到 {len(urls)} 个有效链接")
     return urls
 
-def scrape_single_url(url):
-    """爬取单个URL"""
-    try:
-        # 导入SmogonScraper类
-        sys.path.append('.')
-        from smogon_scraper import SmogonScraper
-        
-        print(f"开始爬取链接: {url}")
-        
-        scraper = SmogonScraper()
-        save_dir = "scraped_threads"
-        
-        # 确保保存目录存在
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-        
-        # 使用现有的_scrape_thread_to_file方法
-        scraper._scrape_thread_to_file(url, save_dir)
-        print("✓ 爬取完成")
-        return True
-        
-    except Exception as e:
-        print(f"✗ 爬取失败: {e}")
-        return False
-
 def cleanup_temp_files():
     """清理临时文件"""
     # 目前不需要清理临时文件
@@ -174,37 +112,16 @@ def main():
             
             print(f"\n准备处理 {len(urls_to_process)} 个链接")
             
-            for i, url in enumerate(urls_to_process, 1):
-                print(f"\n{'='*80}")
-                print(f"处理链接 {i}/{len(urls_to_process)}: {url}")
-                print(f"{'='*80}")
-                
-                # 步骤1: 爬取数据
-                if not scrape_single_url(url):
-                    print(f"跳过链接 {i}: 爬取失败")
-                    continue
-                
-                time.sleep(1)  # 短暂延迟
-                
-                # 步骤2: 筛选文件
-                if not run_script('auto_filter_files.py', "文件筛选"):
-                    print("警告: 文件筛选失败，继续下一步")
-                
-                time.sleep(1)
-                
-                # 步骤3: 增强文件
-                if not run_script('enhance_scraped_files.py', "文件增强"):
-                    print("警告: 文件增强失败")
-                
-                print(f"\n✓ 链接 {i} 处理完成")
-                
-                if i < len(urls_to_process):
-                    time.sleep(2)  # 链接间延迟
+            # 所有链接作为一个流式任务处理，各阶段在同一进程中逐条传递数据
+            pipeline = ThreadPipeline()
+            results = pipeline.run(urls_to_process)
             
             print(f"\n{'='*80}")
             print(f"所有链接处理完成！")
             print(f"处理的链接数量: {len(urls_to_process)}")
-            print(f"结果保存在: scraped_threads/ 目录")
+            print(f"生成的翻译对文件: {len(results)} 个")
+            print(f"帖子文件保存在: {pipeline.save_dir}/ 目录")
+            print(f"翻译对保存在: {pipeline.output_dir}/ 目录")
             print(f"{'='*80}")
             
     except KeyboardInterrupt:
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按长度分桶的批次采样器
+把长度相近的样本放进同一个批次以减少动态填充的浪费，支持固定批大小和按token预算组批两种模式，
+并统计每个epoch的填充效率
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from torch.utils.data import DataLoader, Sampler
+    from transformers import Trainer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    Sampler = object
+    TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# transformers_config.json 中 "batching" 段的默认值
+DEFAULT_BATCHING_CONFIG = {
+    "strategy": "length_bucket",  # length_bucket 或 random
+    "max_tokens": None,  # 设置后按token预算组批，忽略固定批大小
+    "bucket_size_multiplier": 50,  # 每个桶包含的批次数，越大排序越彻底、随机性越小
+    "shuffle": True,
+    "seed": 42
+}
+
+def padding_efficiency(batches: Sequence[Sequence[int]],
+                       source_lengths: Sequence[int],
+                       target_lengths: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """计算一组批次动态填充后的有效token比例"""
+    real_tokens = 0
+    padded_tokens = 0
+    for batch in batches:
+        if not len(batch):
+            continue
+        batch_sources = [int(source_lengths[i]) for i in batch]
+        real_tokens += sum(batch_sources)
+        padded_tokens += max(batch_sources) * len(batch)
+        if target_lengths is not None:
+            batch_targets = [int(target_lengths[i]) for i in batch]
+            real_tokens += sum(batch_targets)
+            padded_tokens += max(batch_targets) * len(batch)
+
+    return {
+        "num_batches": len(batches),
+        "real_tokens": real_tokens,
+        "padded_tokens": padded_tokens,
+        "efficiency": real_tokens / padded_tokens if padded_tokens else 1.0
+    }
+
+class LengthBucketBatchSampler(Sampler):
+    """按长度分桶的批次采样器
+
+    每个epoch先打乱全部样本，再切分成若干个桶，桶内按长度排序后组批，最后打乱批次顺序。
+    指定max_tokens时按token预算组批：批次的填充后大小（样本数 × 最长长度）不超过max_tokens。
+    """
+
+    def __init__(self,
+                 source_lengths: Sequence[int],
+                 target_lengths: Optional[Sequence[int]] = None,
+                 batch_size: int = 8,
+                 max_tokens: Optional[int] = None,
+                 bucket_size_multiplier: int = 50,
+                 shuffle: bool = True,
+                 seed: int = 42):
+        self.source_lengths = np.asarray(source_lengths, dtype=np.int64)
+        self.target_lengths = None if target_lengths is None else np.asarray(target_lengths, dtype=np.int64)
+        # 排序与预算都以源和目标中较长的一边为准
+        if self.target_lengths is None:
+            self.lengths = self.source_lengths
+        else:
+            self.lengths = np.maximum(self.source_lengths, self.target_lengths)
+
+        self.batch_size = max(1, batch_size)
+        self.max_tokens = max_tokens
+        self.bucket_size_multiplier = max(1, bucket_size_multiplier)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+        self._planned_batches = None
+        self.epoch_stats: List[Dict[str, Any]] = []
+
+    def set_epoch(self, epoch: int):
+        """设置epoch（决定打乱的随机种子）"""
+        if epoch != self.epoch:
+            self.epoch = epoch
+            self._planned_batches = None
+
+    def _bucket_size(self) -> int:
+        if self.max_tokens:
+            # 按预算估算每批的平均样本数
+            average_length = max(1, int(self.lengths.mean())) if len(self.lengths) else 1
+            return max(1, self.max_tokens // average_length) * self.bucket_size_multiplier
+        return self.batch_size * self.bucket_size_multiplier
+
+    def _split_bucket(self, bucket: np.ndarray) -> List[List[int]]:
+        """把一个已按长度排序的桶切分成批次"""
+        if not self.max_tokens:
+            return [bucket[i:i + self.batch_size].tolist() for i in range(0, len(bucket), self.batch_size)]
+
+        batches = []
+        current = []
+        current_max = 0
+        for index in bucket:
+            length = int(self.lengths[index])
+            new_max = max(current_max, length)
+            # 超长样本单独成批
+            if current and new_max * (len(current) + 1) > self.max_tokens:
+                batches.append(current)
+                current = []
+                new_max = length
+            current.append(int(index))
+            current_max = new_max
+        if current:
+            batches.append(current)
+        return batches
+
+    def plan_epoch(self) -> List[List[int]]:
+        """生成当前epoch的批次划分"""
+        if self._planned_batches is not None:
+            return self._planned_batches
+
+        rng = np.random.default_rng(self.seed + self.epoch)
+        indices = np.arange(len(self.lengths))
+        if self.shuffle:
+            rng.shuffle(indices)
+
+        bucket_size = self._bucket_size()
+        batches = []
+        for start in range(0, len(indices), bucket_size):
+            bucket = indices[start:start + bucket_size]
+            # 稳定排序使相同长度的样本保持打乱后的顺序
+            bucket = bucket[np.argsort(self.lengths[bucket], kind='stable')]
+            batches.extend(self._split_bucket(bucket))
+
+        if self.shuffle:
+            order = rng.permutation(len(batches))
+            batches = [batches[i] for i in order]
+
+        self._planned_batches = batches
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        batches = self.plan_epoch()
+
+        stats = padding_efficiency(batches, self.source_lengths, self.target_lengths)
+        stats["epoch"] = self.epoch
+        self.epoch_stats.append(stats)
+        logger.info(f"Epoch {self.epoch}: {stats['num_batches']} 个批次，填充效率 {stats['efficiency']:.1%}")
+
+        for batch in batches:
+            yield batch
+
+        # 下一个epoch使用新的随机种子
+        self.epoch += 1
+        self._planned_batches = None
+
+    def __len__(self) -> int:
+        return len(self.plan_epoch())
+
+def random_batching_efficiency(source_lengths: Sequence[int],
+                               target_lengths: Optional[Sequence[int]] = None,
+                               batch_size: int = 8,
+                               seed: int = 42) -> Dict[str, Any]:
+    """随机组批时的填充效率，用于和分桶结果对比"""
+    indices = np.random.default_rng(seed).permutation(len(source_lengths))
+    batches = [indices[i:i + batch_size].tolist() for i in range(0, len(indices), batch_size)]
+    return padding_efficiency(batches, source_lengths, target_lengths)
+
+def build_batch_sampler(tokenized, batch_size: int,
+                        batching_config: Optional[Dict[str, Any]] = None) -> Optional[LengthBucketBatchSampler]:
+    """根据配置为预分词数据集创建批次采样器，strategy为random时返回None（使用Trainer默认的随机组批）"""
+    config = dict(DEFAULT_BATCHING_CONFIG)
+    config.update(batching_config or {})
+
+    if config["strategy"] == "random":
+        return None
+    if config["strategy"] != "length_bucket":
+        raise ValueError(f"未知的组批策略: {config['strategy']}")
+
+    return LengthBucketBatchSampler(
+        tokenized.source_lengths(),
+        tokenized.target_lengths(),
+        batch_size=batch_size,
+        max_tokens=config["max_tokens"],
+        bucket_size_multiplier=config["bucket_size_multiplier"],
+        shuffle=config["shuffle"],
+        seed=config["seed"]
+    )
+
+if TRANSFORMERS_AVAILABLE:
+    class BucketedTrainer(Trainer):
+        """使用自定义批次采样器加载训练数据的Trainer"""
+
+        def __init__(self, *args, train_batch_sampler: Optional[LengthBucketBatchSampler] = None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.train_batch_sampler = train_batch_sampler
+
+        def get_train_dataloader(self):
+            if self.train_batch_sampler is None:
+                return super().get_train_dataloader()
+
+            dataloader = DataLoader(
+                self.train_dataset,
+                batch_sampler=self.train_batch_sampler,
+                collate_fn=self.data_collator,
+                num_workers=self.args.dataloader_num_workers,
+                pin_memory=self.args.dataloader_pin_memory
+            )
+            return self.accelerator.prepare(dataloader)
@@ -11,7 +11,6 @@ import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.metrics import accuracy_score, classification_report
 import pickle
 import re
@@ -19,6 +18,16 @@ from typing import List, Dict, Tuple, Any
 from datetime import datetime
 import logging
 
+import model_artifacts
+from pair_dedup import deduplicate_pairs
+
+# 可选依赖：大规模语料使用近似最近邻检索
+try:
+    from pynndescent import NNDescent
+    ANN_AVAILABLE = True
+except ImportError:
+    ANN_AVAILABLE = False
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,8 +38,22 @@ class TranslationMLTrainer:
     使用TF-IDF向量化和余弦相似度进行翻译学习
     """
     
-    def __init__(self, data_file: str = "ml_translation_pairs.json"):
+    # 单次相似度矩阵块的最大元素数（查询数 × 训练样本数），控制内存占用
+    SIMILARITY_BLOCK_SIZE = 16_000_000
+    # retrieval_backend为auto时，训练样本数超过该值且安装了pynndescent则使用近似检索
+    ANN_MIN_CORPUS_SIZE = 50_000
+    
+    def __init__(self, data_file: str = "ml_translation_pairs.json", retrieval_backend: str = "auto",
+                 deduplicate: bool = False):
+        """
+        Args:
+            deduplicate: 加载后去掉完全重复和近似重复的翻译对（见pair_dedup），
+                避免同一内容同时出现在训练集和测试集中
+        """
         self.data_file = data_file
+        self.retrieval_backend = retrieval_backend
+        self.deduplicate = deduplicate
+        self._ann_index = None
         self.translation_pairs = []
         self.english_vectorizer = None
         self.chinese_vectorizer = None
@@ -58,6 +81,11 @@ class TranslationMLTrainer:
                 data = json.load(f)
                 
             self.translation_pairs = data.get('translation_pairs', [])
+            if self.deduplicate:
+                self.translation_pairs, report = deduplicate_pairs(self.translation_pairs)
+                self.stats['duplicate_pairs'] = report.removed
+                logger.info(f"去掉 {report.removed} 个重复的翻译对（完全重复 {report.exact_duplicates}，"
+                            f"近似重复 {report.near_duplicates}）")
             self.stats['total_pairs'] = len(self.translation_pairs)
             
             logger.info(f"成功加载 {self.stats['total_pairs']} 个翻译对")
@@ -169,6 +197,7 @@ class TranslationMLTrainer:
             # 训练向量化器
             self.english_vectors = self.english_vectorizer.fit_transform(self.train_english)
             self.chinese_vectors = self.chinese_vectorizer.fit_transform(self.train_chinese)
+            self._ann_index = None
             
             self.stats['vocabulary_size_en'] = len(self.english_vectorizer.vocabulary_)
             self.stats['vocabulary_size_zh'] = len(self.chinese_vectorizer.vocabulary_)
@@ -191,19 +220,16 @@ class TranslationMLTrainer:
         try:
             # 向量化测试数据
             test_en_vectors = self.english_vectorizer.transform(self.test_english)
-            test_zh_vectors = self.chinese_vectorizer.transform(self.test_chinese)
             
             # 评估翻译准确性 - 基于训练数据中的最佳匹配
             correct_predictions = 0
             top_3_correct = 0
             top_5_correct = 0
             
-            # 使用英文测试向量与训练英文向量的相似度来评估
-            for i, test_en_vector in enumerate(test_en_vectors):
-                # 找到最相似的训练英文向量
-                similarities = cosine_similarity(test_en_vector, self.english_vectors).flatten()
-                top_indices = similarities.argsort()[-5:][::-1]  # 前5个最相似的
-                
+            # 一次性检索所有测试向量在训练英文向量中前5个最相似的样本
+            all_top_indices, _ = self.retrieve_top_k(test_en_vectors, top_k=5)
+            
+            for top_indices in all_top_indices:
                 # 检查准确性（假设测试数据的索引对应关系）
                 if 0 in top_indices[:1]:  # 简化的准确性检查
                     correct_predictions += 1
@@ -250,24 +276,26 @@ class TranslationMLTrainer:
             logger.error(f"模型评估失败: {e}")
             return {}
     
-    def save_model(self, model_path: str = "translation_model.pkl") -> bool:
+    def save_model(self, model_path: str = "translation_model") -> bool:
         """
         保存训练好的模型
+        
+        模型保存为一个目录：稀疏向量按CSR数组、训练文本按字节块+偏移量保存为 .npy，
+        向量化器保存为JSON，加载时可以直接内存映射
         """
         try:
-            model_data = {
-                'english_vectorizer': self.english_vectorizer,
-                'chinese_vectorizer': self.chinese_vectorizer,
-                'english_vectors': self.english_vectors,
-                'chinese_vectors': self.chinese_vectors,
-                'train_english': self.train_english,
-                'train_chinese': self.train_chinese,
+            os.makedirs(model_path, exist_ok=True)
+            
+            model_artifacts.save_tfidf_vectorizer(model_path, 'english_vectorizer', self.english_vectorizer)
+            model_artifacts.save_tfidf_vectorizer(model_path, 'chinese_vectorizer', self.chinese_vectorizer)
+            model_artifacts.save_csr(model_path, 'english_vectors', self.english_vectors)
+            model_artifacts.save_csr(model_path, 'chinese_vectors', self.chinese_vectors)
+            model_artifacts.save_strings(model_path, 'train_english', self.train_english)
+            model_artifacts.save_strings(model_path, 'train_chinese', self.train_chinese)
+            model_artifacts.write_metadata(model_path, {
                 'stats': self.stats,
                 'training_date': datetime.now().isoformat()
-            }
-            
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
+            })
             
             logger.info(f"模型已保存到: {model_path}")
             return True
@@ -276,37 +304,130 @@ class TranslationMLTrainer:
             logger.error(f"保存模型失败: {e}")
             return False
     
-    def translate_text(self, english_text: str, top_k: int = 3) -> List[Tuple[str, float]]:
+    def load_model(self, model_path: str = "translation_model") -> bool:
         """
-        翻译英文文本
+        加载save_model保存的模型（向量和训练文本使用内存映射），也兼容旧版的 .pkl 文件
+        """
+        try:
+            if os.path.isdir(model_path):
+                self.english_vectorizer = model_artifacts.load_tfidf_vectorizer(model_path, 'english_vectorizer')
+                self.chinese_vectorizer = model_artifacts.load_tfidf_vectorizer(model_path, 'chinese_vectorizer')
+                self.english_vectors = model_artifacts.load_csr(model_path, 'english_vectors')
+                self.chinese_vectors = model_artifacts.load_csr(model_path, 'chinese_vectors')
+                self.train_english = model_artifacts.load_strings(model_path, 'train_english')
+                self.train_chinese = model_artifacts.load_strings(model_path, 'train_chinese')
+                metadata = model_artifacts.read_metadata(model_path)
+            else:
+                # 旧版pickle格式
+                with open(model_path, 'rb') as f:
+                    metadata = pickle.load(f)
+                self.english_vectorizer = metadata['english_vectorizer']
+                self.chinese_vectorizer = metadata['chinese_vectorizer']
+                self.english_vectors = metadata['english_vectors']
+                self.chinese_vectors = metadata['chinese_vectors']
+                self.train_english = metadata['train_english']
+                self.train_chinese = metadata['train_chinese']
+            
+            self.stats.update(metadata.get('stats', {}))
+            self._ann_index = None
+            
+            logger.info(f"已加载模型: {model_path} ({len(self.train_chinese)} 个训练样本)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"加载模型失败: {e}")
+            return False
+    
+    def _use_ann(self) -> bool:
+        """判断是否使用近似最近邻检索"""
+        if self.retrieval_backend == "exact":
+            return False
+        if self.retrieval_backend == "ann":
+            if not ANN_AVAILABLE:
+                logger.warning("未安装pynndescent，改用精确检索。安装: pip install pynndescent")
+            return ANN_AVAILABLE
+        return ANN_AVAILABLE and self.english_vectors.shape[0] >= self.ANN_MIN_CORPUS_SIZE
+    
+    def _exact_top_k(self, query_vectors, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """分块稀疏矩阵乘法 + argpartition 求精确的前k个最相似样本"""
+        corpus_size = self.english_vectors.shape[0]
+        block_rows = max(1, self.SIMILARITY_BLOCK_SIZE // max(1, corpus_size))
+        
+        all_indices = []
+        all_scores = []
+        for start in range(0, query_vectors.shape[0], block_rows):
+            # TF-IDF向量已做L2归一化，点积即余弦相似度；
+            # 以训练矩阵为左操作数，不复制（可能是内存映射的）训练矩阵
+            query_block = query_vectors[start:start + block_rows]
+            similarities = (self.english_vectors @ query_block.T).T.toarray()
+            
+            if top_k < corpus_size:
+                candidates = np.argpartition(-similarities, top_k - 1, axis=1)[:, :top_k]
+            else:
+                candidates = np.tile(np.arange(corpus_size), (similarities.shape[0], 1))
+            candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+            
+            # 候选内部按相似度降序排列
+            order = np.argsort(-candidate_scores, axis=1, kind='stable')
+            all_indices.append(np.take_along_axis(candidates, order, axis=1))
+            all_scores.append(np.take_along_axis(candidate_scores, order, axis=1))
+        
+        return np.vstack(all_indices), np.vstack(all_scores)
+    
+    def _ann_top_k(self, query_vectors, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """pynndescent近似最近邻检索"""
+        if self._ann_index is None:
+            logger.info(f"构建近似最近邻索引 ({self.english_vectors.shape[0]} 个训练样本)...")
+            self._ann_index = NNDescent(self.english_vectors, metric="cosine")
+            self._ann_index.prepare()
+        
+        indices, distances = self._ann_index.query(query_vectors, k=top_k)
+        return indices, 1.0 - distances
+    
+    def retrieve_top_k(self, query_vectors, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """检索每个查询向量在训练英文向量中前k个最相似的样本
+        
+        Returns:
+            (样本索引, 余弦相似度)，形状都是 (查询数, k)，每行按相似度降序
+        """
+        top_k = min(top_k, self.english_vectors.shape[0])
+        if query_vectors.shape[0] == 0 or top_k <= 0:
+            return np.zeros((query_vectors.shape[0], 0), dtype=np.int64), np.zeros((query_vectors.shape[0], 0))
+        
+        if self._use_ann():
+            return self._ann_top_k(query_vectors, top_k)
+        return self._exact_top_k(query_vectors, top_k)
+    
+    def translate_batch(self, english_texts: List[str], top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        批量翻译英文文本，每个输入返回前k个最相似训练样本的中文翻译
         """
         try:
             if not self.english_vectorizer or not self.chinese_vectorizer:
                 logger.error("模型未训练")
-                return []
-            
-            # 预处理输入文本
-            processed_text = self.preprocess_text(english_text, False)
-            
-            # 向量化
-            input_vector = self.english_vectorizer.transform([processed_text])
+                return [[] for _ in english_texts]
             
-            # 计算与训练英文向量的相似度
-            similarities = cosine_similarity(input_vector, self.english_vectors).flatten()
+            # 预处理并一次性向量化全部输入
+            processed_texts = [self.preprocess_text(text, False) for text in english_texts]
+            input_vectors = self.english_vectorizer.transform(processed_texts)
             
-            # 获取最相似的翻译
-            top_indices = similarities.argsort()[-top_k:][::-1]
+            top_indices, top_scores = self.retrieve_top_k(input_vectors, top_k)
             
-            results = []
-            for idx in top_indices:
-                if idx < len(self.train_chinese):
-                    results.append((self.train_chinese[idx], similarities[idx]))
-            
-            return results
+            return [
+                [(self.train_chinese[idx], float(score)) for idx, score in zip(indices, scores)
+                 if idx < len(self.train_chinese)]
+                for indices, scores in zip(top_indices, top_scores)
+            ]
             
         except Exception as e:
-            logger.error(f"翻译失败: {e}")
-            return []
+            logger.error(f"批量翻译失败: {e}")
+            return [[] for _ in english_texts]
+    
+    def translate_text(self, english_text: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """
+        翻译英文文本
+        """
+        return self.translate_batch([english_text], top_k)[0]
     
     def train(self) -> bool:
         """
@@ -360,7 +481,7 @@ def main():
     """
     主函数
     """
-    trainer = TranslationMLTrainer()
+    trainer = TranslationMLTrainer(deduplicate=True)
     
     # 训练模型
     if trainer.train():
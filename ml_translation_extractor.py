@@ -12,9 +12,13 @@ import os
 import re
 import json
 import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
+from set_block_parser import find_section
+
 @dataclass
 class TranslationPair:
     """翻译对数据结构"""
@@ -24,12 +28,36 @@ class TranslationPair:
     source_file: str
     confidence: float = 1.0
 
+# 每个文件单独统计、合并时累加的计数
+PAIR_COUNT_KEYS = ('set_comments_pairs', 'overview_pairs', 'strategy_comments_pairs')
+
+def _extract_file_worker(task: Tuple[type, str, str]) -> Tuple[str, List[TranslationPair], Dict[str, int], float, Optional[str]]:
+    """在工作进程中处理单个文件
+
+    Returns:
+        (文件名, 翻译对, 计数, 耗时秒数, 错误信息)
+    """
+    extractor_class, scraped_dir, filename = task
+    extractor = extractor_class(scraped_dir)
+    start = time.perf_counter()
+    error = None
+    try:
+        extractor._process_file(os.path.join(scraped_dir, filename), filename)
+    except Exception as e:
+        error = str(e)
+    elapsed = time.perf_counter() - start
+    counts = {key: extractor.stats[key] for key in PAIR_COUNT_KEYS}
+    return filename, extractor.translation_pairs, counts, elapsed, error
+
 class MLTranslationExtractor:
     """机器学习翻译对提取器"""
     
     def __init__(self, scraped_dir: str = "scraped_threads"):
         self.scraped_dir = scraped_dir
         self.translation_pairs: List[TranslationPair] = []
+        self.file_timings: Dict[str, float] = {}
+        self.workers = 1
+        self.elapsed_time = 0.0
         self.stats = {
             'total_files': 0,
             'processed_files': 0,
@@ -40,27 +68,51 @@ class MLTranslationExtractor:
             'strategy_comments_pairs': 0
         }
     
-    def extract_all_files(self) -> None:
-        """处理scraped_threads目录下的所有文件"""
+    def extract_all_files(self, workers: int = 1) -> None:
+        """处理scraped_threads目录下的所有文件
+        
+        Args:
+            workers: 工作进程数，1为单进程，0或负数使用全部CPU核心；
+                     结果按文件名顺序合并，与进程数无关
+        """
         if not os.path.exists(self.scraped_dir):
             print(f"错误：目录 {self.scraped_dir} 不存在")
             return
         
-        files = [f for f in os.listdir(self.scraped_dir) if f.endswith('.txt')]
+        files = sorted(f for f in os.listdir(self.scraped_dir) if f.endswith('.txt'))
         self.stats['total_files'] = len(files)
         
-        print(f"开始处理 {len(files)} 个文件...")
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(files)))
+        self.workers = workers
+        
+        print(f"开始处理 {len(files)} 个文件（{workers} 个进程）...")
+        start = time.perf_counter()
+        
+        tasks = [(type(self), self.scraped_dir, filename) for filename in files]
+        if workers > 1:
+            # 按块分发文件，减少进程间通信次数
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_extract_file_worker, tasks, chunksize=chunksize))
+        else:
+            results = map(_extract_file_worker, tasks)
         
-        for filename in files:
-            filepath = os.path.join(self.scraped_dir, filename)
-            try:
-                self._process_file(filepath, filename)
-                self.stats['processed_files'] += 1
-                print(f"✓ 处理完成: {filename}")
-            except Exception as e:
+        for filename, pairs, counts, elapsed, error in results:
+            self.file_timings[filename] = elapsed
+            if error is not None:
                 self.stats['failed_files'] += 1
-                print(f"✗ 处理失败: {filename} - {str(e)}")
+                print(f"✗ 处理失败: {filename} - {error}")
+                continue
+            
+            self.translation_pairs.extend(pairs)
+            for key in PAIR_COUNT_KEYS:
+                self.stats[key] += counts[key]
+            self.stats['processed_files'] += 1
+            print(f"✓ 处理完成: {filename} ({elapsed * 1000:.1f}ms)")
         
+        self.elapsed_time = time.perf_counter() - start
         self._update_stats()
         self._print_summary()
     
@@ -68,7 +120,17 @@ class MLTranslationExtractor:
         """处理单个文件"""
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
-        
+        self._process_content(content, filename)
+    
+    def extract_from_text(self, content: str, filename: str) -> List[TranslationPair]:
+        """从内存中的帖子文本提取翻译对（不读写文件），返回本次新增的翻译对"""
+        start = len(self.translation_pairs)
+        self._process_content(content, filename)
+        self._update_stats()
+        return self.translation_pairs[start:]
+    
+    def _process_content(self, content: str, filename: str) -> None:
+        """处理一个帖子文件的内容"""
         # 按分割线分割中文翻译和英文原文
         separator = "=" * 80 + "\nORIGINAL THREAD FIRST POST\n" + "=" * 80
         if separator in content:
@@ -108,12 +170,12 @@ class MLTranslationExtractor:
     def _extract_set_comments(self, chinese_part: str, english_part: str, filename: str) -> None:
         """提取SET COMMENTS部分的翻译对"""
         # 提取中文SET COMMENTS
-        chinese_set_comments = self._find_section(chinese_part, r'\[SET COMMENTS\]', r'\[SET CREDITS\]')
+        chinese_set_comments = find_section(chinese_part, 'SET COMMENTS', ('SET CREDITS',))
         if not chinese_set_comments:
             return
         
         # 提取英文SET COMMENTS
-        english_set_comments = self._find_section(english_part, r'\[SET COMMENTS\]', r'\[SET CREDITS\]')
+        english_set_comments = find_section(english_part, 'SET COMMENTS', ('SET CREDITS',))
         if not english_set_comments:
             return
         
@@ -312,6 +374,17 @@ class MLTranslationExtractor:
         
         if self.stats['total_pairs'] > 0:
             print(f"\n平均每文件翻译对数: {self.stats['total_pairs'] / max(1, self.stats['processed_files']):.1f}")
+        
+        if self.file_timings:
+            total_file_time = sum(self.file_timings.values())
+            print(f"\n耗时统计 ({self.workers} 个进程):")
+            print(f"  总耗时: {self.elapsed_time:.2f}秒")
+            print(f"  文件处理时间合计: {total_file_time:.2f}秒")
+            print(f"  平均每文件: {total_file_time / len(self.file_timings) * 1000:.1f}ms")
+            slowest = sorted(self.file_timings.items(), key=lambda item: item[1], reverse=True)[:5]
+            print("  最慢的文件:")
+            for filename, elapsed in slowest:
+                print(f"    {filename}: {elapsed * 1000:.1f}ms")
     
     def save_to_json(self, output_file: str = "ml_translation_pairs.json") -> None:
         """保存翻译对到JSON文件"""
@@ -379,6 +452,7 @@ def main():
     parser.add_argument('--output-csv', default='ml_translation_pairs.csv', help='CSV输出文件名')
     parser.add_argument('--samples', type=int, default=3, help='显示的样本数量')
     parser.add_argument('--no-csv', action='store_true', help='不生成CSV文件')
+    parser.add_argument('--workers', type=int, default=1, help='并行处理的进程数（0表示使用全部CPU核心）')
     
     args = parser.parse_args()
     
@@ -386,7 +460,7 @@ def main():
     extractor = MLTranslationExtractor(args.input_dir)
     
     # 提取翻译对
-    extractor.extract_all_files()
+    extractor.extract_all_files(workers=args.workers)
     
     # 显示样本
     extractor.print_sample_pairs(args.samples)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可内存映射的模型文件格式
+稀疏矩阵按CSR的三个数组分别保存为 .npy，文本表保存为UTF-8字节块加偏移量，
+TF-IDF向量化器保存为JSON参数 + 按列号排列的词表 + idf数组；加载时全部使用内存映射，
+不需要反序列化pickle，多个进程加载同一个模型时共享操作系统的页缓存
+"""
+
+import json
+import os
+from typing import Dict, Iterator, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 模型格式版本
+FORMAT_VERSION = 1
+
+def _load_array(path: str, mmap_mode: str = 'r') -> np.ndarray:
+    """内存映射加载 .npy 文件；空数组无法映射，直接读入"""
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except ValueError:
+        return np.load(path)
+
+def save_csr(directory: str, name: str, matrix):
+    """把稀疏矩阵保存为 name.data.npy / name.indices.npy / name.indptr.npy / name.shape.npy"""
+    matrix = sparse.csr_matrix(matrix)
+    matrix.sort_indices()
+    np.save(os.path.join(directory, f"{name}.data.npy"), matrix.data)
+    np.save(os.path.join(directory, f"{name}.indices.npy"), matrix.indices)
+    np.save(os.path.join(directory, f"{name}.indptr.npy"), matrix.indptr)
+    np.save(os.path.join(directory, f"{name}.shape.npy"), np.asarray(matrix.shape, dtype=np.int64))
+
+def load_csr(directory: str, name: str, mmap_mode: str = 'r') -> sparse.csr_matrix:
+    """内存映射加载save_csr保存的稀疏矩阵"""
+    data = _load_array(os.path.join(directory, f"{name}.data.npy"), mmap_mode)
+    indices = _load_array(os.path.join(directory, f"{name}.indices.npy"), mmap_mode)
+    indptr = _load_array(os.path.join(directory, f"{name}.indptr.npy"), mmap_mode)
+    shape = tuple(np.load(os.path.join(directory, f"{name}.shape.npy")).tolist())
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+    # 保存时已排序，避免scipy在运算时重新检查
+    matrix.has_sorted_indices = True
+    return matrix
+
+class StringTable:
+    """只读的字符串表：UTF-8字节块 + 偏移量，按下标访问时才解码"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StringTable index out of range")
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+def save_strings(directory: str, name: str, texts: Sequence[str]):
+    """保存字符串表为 name.blob.npy 和 name.offsets.npy"""
+    encoded = [text.encode('utf-8') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    np.save(os.path.join(directory, f"{name}.blob.npy"), blob)
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+
+def load_strings(directory: str, name: str, mmap_mode: str = 'r') -> StringTable:
+    """内存映射加载字符串表"""
+    blob = _load_array(os.path.join(directory, f"{name}.blob.npy"), mmap_mode)
+    offsets = _load_array(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode)
+    return StringTable(blob, offsets)
+
+def save_tfidf_vectorizer(directory: str, name: str, vectorizer: TfidfVectorizer):
+    """保存TF-IDF向量化器：参数和按列号排列的词表写入JSON，idf写入 .npy"""
+    params = vectorizer.get_params()
+    if params.get('tokenizer') is not None or params.get('preprocessor') is not None or callable(params.get('analyzer')):
+        raise ValueError("自定义tokenizer/preprocessor/analyzer的向量化器无法保存为JSON")
+    # dtype 是类型对象，按名称保存
+    params['dtype'] = np.dtype(params['dtype']).name
+    if isinstance(params.get('stop_words'), (set, frozenset)):
+        params['stop_words'] = sorted(params['stop_words'])
+
+    vocabulary = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        vocabulary[column] = term
+
+    with open(os.path.join(directory, f"{name}.json"), 'w', encoding='utf-8') as f:
+        json.dump({'params': params, 'vocabulary': vocabulary}, f, ensure_ascii=False)
+    np.save(os.path.join(directory, f"{name}.idf.npy"), vectorizer.idf_)
+
+def load_tfidf_vectorizer(directory: str, name: str) -> TfidfVectorizer:
+    """加载save_tfidf_vectorizer保存的向量化器"""
+    with open(os.path.join(directory, f"{name}.json"), 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+
+    params = saved['params']
+    params['dtype'] = np.dtype(params['dtype']).type
+    if isinstance(params.get('ngram_range'), list):
+        params['ngram_range'] = tuple(params['ngram_range'])
+
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {term: column for column, term in enumerate(saved['vocabulary'])}
+    vectorizer.idf_ = np.load(os.path.join(directory, f"{name}.idf.npy"))
+    return vectorizer
+
+def write_metadata(directory: str, metadata: Dict):
+    """写入模型元数据"""
+    metadata = dict(metadata)
+    metadata['format_version'] = FORMAT_VERSION
+    with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+def read_metadata(directory: str) -> Dict:
+    """读取模型元数据并检查格式版本"""
+    with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    if metadata.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"不支持的模型格式版本: {metadata.get('format_version')}")
+    return metadata
@@ -16,6 +16,12 @@ from collections import defaultdict, Counter
 from dataclasses import dataclass, asdict
 import logging
 
+from corpus_store import open_corpus
+from domain_classifier import DomainClassifier, domains_from_keywords
+from example_features import FeatureCache, scorer_key
+from text_profile import profile_text
+from tokenized_cache import load_or_tokenize
+
 try:
     from transformers import (
         AutoTokenizer, AutoModelForSeq2SeqLM,
@@ -26,6 +32,7 @@ try:
     )
     from torch.utils.data import Dataset, DataLoader
     import sacrebleu
+    from length_bucketing import BucketedTrainer, build_batch_sampler
     TRANSFORMERS_AVAILABLE = True
 except ImportError as e:
     print(f"警告：部分依赖库未安装: {e}")
@@ -36,6 +43,24 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 样本评分用的正则，模块加载时编译一次
+_COMPLEX_WORD = re.compile(r'\b\w{8,}\b')
+_SPECIAL_CHAR = re.compile(r'[^\w\s]')
+
+# 领域关键词：先看宝可梦相关关键词，再看游戏相关关键词
+_DOMAIN_CLASSIFIER = DomainClassifier(domains_from_keywords({
+    'pokemon': [
+        'pokemon', 'pokémon', 'pikachu', 'charizard', 'blastoise', 'venusaur',
+        'gym', 'trainer', 'battle', 'evolution', 'legendary', 'shiny',
+        'type', 'move', 'ability', 'stats', 'nature', 'iv', 'ev',
+        '宝可梦', '神奇宝贝', '精灵', '训练师', '道馆', '进化', '属性', '技能'
+    ],
+    'gaming': [
+        'game', 'play', 'level', 'score', 'player', 'strategy', 'competitive',
+        '游戏', '玩家', '等级', '分数', '策略', '竞技'
+    ]
+}), priority=True)
+
 # NLLB语言代码映射
 NLLB_LANGUAGE_CODES = {
     "chinese": "zho_Hans",  # 中文简体
@@ -91,15 +116,26 @@ class NLLBModelConfig:
     repetition_penalty: float = 1.0
     
 class NLLBDataset(Dataset):
-    """NLLB数据集类"""
+    """NLLB数据集类
+
+    构造时一次性分词（不填充）并缓存到磁盘，由DataCollatorForSeq2Seq在批次内动态填充
+    """
     
     def __init__(self, 
                  examples: List[NLLBTranslationExample], 
                  tokenizer, 
-                 max_length: int = 512):
+                 max_length: int = 512,
+                 cache_dir: Optional[str] = ".tokenized_cache"):
         self.examples = examples
         self.tokenizer = tokenizer
         self.max_length = max_length
+        self.tokenized = load_or_tokenize(
+            tokenizer,
+            [example.source_text for example in examples],
+            [example.target_text for example in examples],
+            max_length,
+            cache_dir
+        )
     
     def __len__(self):
         return len(self.examples)
@@ -111,29 +147,12 @@ class NLLBDataset(Dataset):
         src_lang_code = NLLB_LANGUAGE_CODES[example.source_lang]
         tgt_lang_code = NLLB_LANGUAGE_CODES[example.target_lang]
         
-        # 编码源文本
-        inputs = self.tokenizer(
-            example.source_text,
-            max_length=self.max_length,
-            padding="max_length",
-            truncation=True,
-            return_tensors="pt"
-        )
-        
-        # 编码目标文本
-        with self.tokenizer.as_target_tokenizer():
-            targets = self.tokenizer(
-                example.target_text,
-                max_length=self.max_length,
-                padding="max_length",
-                truncation=True,
-                return_tensors="pt"
-            )
+        input_ids = self.tokenized.source(idx)
         
         return {
-            "input_ids": inputs["input_ids"].flatten(),
-            "attention_mask": inputs["attention_mask"].flatten(),
-            "labels": targets["input_ids"].flatten(),
+            "input_ids": input_ids,
+            "attention_mask": [1] * len(input_ids),
+            "labels": self.tokenized.target(idx),
             "source_lang": src_lang_code,
             "target_lang": tgt_lang_code
         }
@@ -154,6 +173,7 @@ class NLLBLearningModule:
         self.learning_stats = {
             "total_examples": 0,
             "domains": defaultdict(int),
+            "domain_keyword_hits": defaultdict(int),
             "languages": defaultdict(int),
             "difficulty_distribution": defaultdict(int),
             "quality_distribution": defaultdict(int)
@@ -199,11 +219,20 @@ class NLLBLearningModule:
                 "val_split": 0.1,
                 "test_split": 0.1,
                 "min_length": 5,
-                "max_length": 512
+                "max_length": 512,
+                "tokenized_cache_dir": ".tokenized_cache",
+                "feature_cache": True
             },
             "languages": {
                 "source": "english",
                 "target": "chinese"
+            },
+            "batching": {
+                "strategy": "length_bucket",
+                "max_tokens": None,
+                "bucket_size_multiplier": 50,
+                "shuffle": True,
+                "seed": 42
             }
         }
     
@@ -258,33 +287,22 @@ class NLLBLearningModule:
             logger.error(f"数据目录不存在: {data_dir}")
             return examples
         
-        # 遍历所有JSON文件
-        for filename in os.listdir(data_dir):
-            if filename.endswith('.json'):
-                file_path = os.path.join(data_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # 处理不同的数据格式
-                    if isinstance(data, dict):
-                        if 'source' in data and 'target' in data:
-                            example = self._create_example_from_dict(data, filename)
-                            if example:
-                                examples.append(example)
-                        elif 'translation_pairs' in data:
-                            for pair in data['translation_pairs']:
-                                example = self._create_example_from_dict(pair, filename)
-                                if example:
-                                    examples.append(example)
-                    elif isinstance(data, list):
-                        for item in data:
-                            example = self._create_example_from_dict(item, filename)
-                            if example:
-                                examples.append(example)
-                                
-                except Exception as e:
-                    logger.error(f"读取文件 {filename} 时出错: {e}")
+        # 语料库中的翻译对已统一为english/chinese结构；去掉重复的翻译对，避免同一内容同时进入训练集和测试集
+        with open_corpus(data_dir) as corpus:
+            pairs = list(corpus.iter_pairs(deduplicate=True))
+            if self.config.get('data', {}).get('feature_cache', True):
+                # 样本特征按内容哈希缓存在语料库文件中，未变化的翻译对不再重新评分
+                cache = FeatureCache(corpus.conn, self._feature_scorer_key())
+                features = cache.features([(pair['content_hash'], pair['english'], pair['chinese']) for pair in pairs],
+                                          self._score_pairs)
+                logger.info(f"样本特征: 缓存命中 {cache.hits} 个，新计算 {cache.misses} 个")
+            else:
+                features = self._score_pairs([(pair['english'], pair['chinese']) for pair in pairs])
+
+        for pair, feature in zip(pairs, features):
+            example = self._create_example_from_dict(pair, pair['origin_file'], feature)
+            if example:
+                examples.append(example)
         
         # 数据质量评估和排序
         examples = self._assess_and_sort_data(examples)
@@ -299,8 +317,13 @@ class NLLBLearningModule:
         
         return examples
     
-    def _create_example_from_dict(self, data: Dict, filename: str) -> Optional[NLLBTranslationExample]:
-        """从字典创建翻译样本"""
+    def _create_example_from_dict(self, data: Dict, filename: str,
+                                  features: Optional[Dict] = None) -> Optional[NLLBTranslationExample]:
+        """从字典创建翻译样本
+
+        Args:
+            features: 已计算好的样本特征（_score_pairs的结果），为None时现场计算
+        """
         try:
             source_text = data.get('source', data.get('english', data.get('en', '')))
             target_text = data.get('target', data.get('chinese', data.get('zh', '')))
@@ -308,28 +331,22 @@ class NLLBLearningModule:
             if not source_text or not target_text:
                 return None
             
-            # 检测语言
-            source_lang = self._detect_language(source_text)
-            target_lang = self._detect_language(target_text)
-            
-            # 评估难度和质量
-            difficulty = self._assess_difficulty(source_text, target_text)
-            quality = self._assess_quality(source_text, target_text)
-            
-            # 分类领域
-            domain = self._classify_domain(source_text)
+            # 检测语言、评估难度和质量、分类领域
+            if features is None:
+                features = self._score_pairs([(source_text, target_text)])[0]
             
             example = NLLBTranslationExample(
                 source_text=source_text.strip(),
                 target_text=target_text.strip(),
-                source_lang=source_lang,
-                target_lang=target_lang,
-                domain=domain,
-                difficulty=difficulty,
-                quality_score=quality,
+                source_lang=features['source_lang'],
+                target_lang=features['target_lang'],
+                domain=features['domain'],
+                difficulty=features['difficulty'],
+                quality_score=features['quality_score'],
                 source_file=filename,
                 metadata={
                     'original_data': data,
+                    'domain_hits': features['domain_hits'],
                     'created_at': datetime.now().isoformat()
                 }
             )
@@ -343,68 +360,52 @@ class NLLBLearningModule:
             logger.error(f"创建样本时出错: {e}")
             return None
     
+    def _feature_scorer_key(self) -> str:
+        """特征缓存的评分器键"""
+        return scorer_key("nllb")
+    
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """批量计算样本特征，与_detect_language、_assess_difficulty、_assess_quality、_classify_domain的结果一致；
+        难度和质量共用同一次分词"""
+        features = []
+        domains = _DOMAIN_CLASSIFIER.score_batch([source for source, _ in pairs])
+        for (source, target), (domain, domain_hits) in zip(pairs, domains):
+            source_len = len(source.split())
+            complex_words = len(_COMPLEX_WORD.findall(source))
+            features.append({
+                'source_lang': self._detect_language(source),
+                'target_lang': self._detect_language(target),
+                'domain': domain,
+                'domain_hits': domain_hits,
+                'difficulty': self._difficulty_score(source_len, complex_words,
+                                                     len(_SPECIAL_CHAR.findall(source))),
+                'quality_score': self._quality_score(source, target, source_len)
+            })
+        return features
+    
     def _detect_language(self, text: str) -> str:
         """简单的语言检测"""
-        # 检测中文字符
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-        # 检测日文字符
-        japanese_chars = len(re.findall(r'[\u3040-\u309f\u30a0-\u30ff]', text))
-        # 检测韩文字符
-        korean_chars = len(re.findall(r'[\uac00-\ud7af]', text))
-        
-        total_chars = len(text)
-        if total_chars == 0:
-            return "english"
-        
-        if chinese_chars / total_chars > 0.3:
-            return "chinese"
-        elif japanese_chars / total_chars > 0.3:
-            return "japanese"
-        elif korean_chars / total_chars > 0.3:
-            return "korean"
-        else:
-            return "english"
+        return profile_text(text).language(empty="english")
     
     def _classify_domain(self, text: str) -> str:
         """分类文本领域"""
-        text_lower = text.lower()
-        
-        # 宝可梦相关关键词
-        pokemon_keywords = [
-            'pokemon', 'pokémon', 'pikachu', 'charizard', 'blastoise', 'venusaur',
-            'gym', 'trainer', 'battle', 'evolution', 'legendary', 'shiny',
-            'type', 'move', 'ability', 'stats', 'nature', 'iv', 'ev',
-            '宝可梦', '神奇宝贝', '精灵', '训练师', '道馆', '进化', '属性', '技能'
-        ]
-        
-        # 游戏相关关键词
-        game_keywords = [
-            'game', 'play', 'level', 'score', 'player', 'strategy', 'competitive',
-            '游戏', '玩家', '等级', '分数', '策略', '竞技'
-        ]
-        
-        if any(keyword in text_lower for keyword in pokemon_keywords):
-            return "pokemon"
-        elif any(keyword in text_lower for keyword in game_keywords):
-            return "gaming"
-        else:
-            return "general"
+        return _DOMAIN_CLASSIFIER.classify(text)
     
     def _assess_difficulty(self, source: str, target: str) -> float:
         """评估翻译难度"""
         # 基于文本长度、复杂度等因素
-        source_len = len(source.split())
-        target_len = len(target)
-        
+        complex_words = len(_COMPLEX_WORD.findall(source))
+        return self._difficulty_score(len(source.split()), complex_words, len(_SPECIAL_CHAR.findall(source)))
+    
+    def _difficulty_score(self, source_len: int, complex_words: int, special_chars: int) -> float:
+        """由源文本词数、复杂词汇数和特殊字符数计算难度"""
         # 长度因子
         length_factor = min(source_len / 20, 2.0)
         
         # 复杂词汇因子
-        complex_words = len(re.findall(r'\b\w{8,}\b', source))
         complexity_factor = min(complex_words / 5, 2.0)
         
         # 特殊字符因子
-        special_chars = len(re.findall(r'[^\w\s]', source))
         special_factor = min(special_chars / 10, 1.5)
         
         difficulty = (length_factor + complexity_factor + special_factor) / 3
@@ -412,12 +413,15 @@ class NLLBLearningModule:
     
     def _assess_quality(self, source: str, target: str) -> float:
         """评估翻译质量"""
+        return self._quality_score(source, target, len(source.split()))
+    
+    def _quality_score(self, source: str, target: str, source_len: int) -> float:
+        """计算翻译质量，source_len为源文本词数"""
         # 基本质量检查
         if not source.strip() or not target.strip():
             return 0.1
         
         # 长度比例检查
-        source_len = len(source.split())
         target_len = len(target)
         
         if source_len == 0 or target_len == 0:
@@ -456,6 +460,8 @@ class NLLBLearningModule:
         """更新学习统计信息"""
         self.learning_stats['total_examples'] += 1
         self.learning_stats['domains'][example.domain] += 1
+        for domain, hits in example.metadata.get('domain_hits', {}).items():
+            self.learning_stats['domain_keyword_hits'][domain] += hits
         self.learning_stats['languages'][f"{example.source_lang}->{example.target_lang}"] += 1
         
         # 难度分布
@@ -503,15 +509,18 @@ class NLLBLearningModule:
         
         logger.info("开始微调NLLB模型")
         
-        # 创建数据集
-        train_dataset = NLLBDataset(self.training_data, self.tokenizer, self.model_config.max_length)
-        val_dataset = NLLBDataset(self.validation_data, self.tokenizer, self.model_config.max_length)
+        # 创建数据集（预分词结果缓存在磁盘上）
+        cache_dir = self.config.get('data', {}).get('tokenized_cache_dir', '.tokenized_cache')
+        train_dataset = NLLBDataset(self.training_data, self.tokenizer, self.model_config.max_length, cache_dir)
+        val_dataset = NLLBDataset(self.validation_data, self.tokenizer, self.model_config.max_length, cache_dir)
         
-        # 数据整理器
+        # 数据整理器：按批次内最长序列动态填充，标签填充为-100
         data_collator = DataCollatorForSeq2Seq(
             tokenizer=self.tokenizer,
             model=self.model,
-            padding=True
+            padding=True,
+            label_pad_token_id=-100,
+            pad_to_multiple_of=8 if torch.cuda.is_available() else None
         )
         
         # 训练参数
@@ -535,19 +544,31 @@ class NLLBLearningModule:
             remove_unused_columns=False
         )
         
+        # 按长度分桶组批，减少填充
+        batch_sampler = build_batch_sampler(
+            train_dataset.tokenized,
+            self.config['training']['per_device_train_batch_size'],
+            self.config.get('batching')
+        )
+        
         # 创建训练器
-        trainer = Trainer(
+        trainer = BucketedTrainer(
             model=self.model,
             args=training_args,
             train_dataset=train_dataset,
             eval_dataset=val_dataset,
             data_collator=data_collator,
-            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)]
+            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)],
+            train_batch_sampler=batch_sampler
         )
         
         # 开始训练
         trainer.train()
         
+        if batch_sampler:
+            for stats in batch_sampler.epoch_stats:
+                logger.info(f"Epoch {stats['epoch']} 填充效率: {stats['efficiency']:.1%}")
+        
         # 保存模型
         trainer.save_model()
         self.tokenizer.save_pretrained(output_dir)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译对去重
+先按规范化后的内容哈希找完全重复的翻译对，再用MinHash签名 + LSH分桶找近似重复的翻译对
+（英文和中文两边各有一半签名，两边的相似度都达到阈值才算重复）。
+每个翻译对只与同一个桶中的代表比较，整体开销与翻译对数量近似线性，可以处理几十万个翻译对
+用法: python pair_dedup.py [individual_pairs] [--threshold 0.8] [--report dedup_report.json]
+"""
+
+import argparse
+import json
+import re
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from crawl_state import content_hash
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 120
+# 每边10个band × 每个band 6行：一边的Jaccard相似度为0.8时这一边成为候选的概率约为0.95，
+# 两边都是0.8时约为0.998；0.5时约为0.15，0.3时约为0.007
+DEFAULT_BANDS = 20
+ENGLISH_SHINGLE = 4
+CHINESE_SHINGLE = 2
+
+# 哈希函数 (a * x + b) mod p，x为32位的n-gram哈希；a、b < p < 2^31，乘积不会溢出uint64
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# n-gram的多项式滚动哈希
+_GRAM_BASE = np.uint64(1000003)
+
+# NearDuplicateIndex.add的结果：重复的代表、估计的相似度、是否完全重复
+Duplicate = namedtuple('Duplicate', ['representative', 'similarity', 'exact'])
+
+_SPACES = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+def normalize_text(text: str) -> str:
+    """小写、去掉标点、合并空白"""
+    return _SPACES.sub(' ', _PUNCTUATION.sub(' ', (text or '').lower())).strip()
+
+def exact_key(english: str, chinese: str) -> str:
+    """规范化后的内容哈希（只有空白、大小写、标点不同的翻译对视为完全重复）"""
+    return content_hash(f"{normalize_text(english)}\x00{_SPACES.sub('', normalize_text(chinese))}")
+
+def _gram_hashes(text: str, size: int) -> np.ndarray:
+    """文本所有字符n-gram的32位哈希（用numpy对码位做滚动哈希，不逐个生成子串）"""
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    size = min(size, len(codes))
+    count = len(codes) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = (hashes * _GRAM_BASE + codes[offset:offset + count]) & _MAX_HASH
+    return np.unique(hashes)
+
+def english_shingles(text: str) -> np.ndarray:
+    """英文的字符4-gram哈希集合"""
+    return _gram_hashes(normalize_text(text), ENGLISH_SHINGLE)
+
+def chinese_shingles(text: str) -> np.ndarray:
+    """中文去掉空白后的字符2-gram哈希集合"""
+    return _gram_hashes(_SPACES.sub('', normalize_text(text)), CHINESE_SHINGLE)
+
+class MinHasher:
+    """固定随机种子的MinHash，同一参数下签名可以跨进程比较"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """n-gram哈希集合的MinHash签名"""
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+def signature_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """两个签名相同位置相等的比例，即Jaccard相似度的估计"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+class NearDuplicateIndex:
+    """增量的去重索引：逐个加入翻译对，返回它重复的代表（没有重复时自己成为代表）"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 bands: int = DEFAULT_BANDS, near: bool = True):
+        """
+        Args:
+            threshold: 估计的Jaccard相似度达到该值视为近似重复
+            num_perm: MinHash签名总长度（英文、中文各一半），必须能被bands整除
+            bands: LSH的band总数（英文、中文各一半），必须为偶数
+            near: 为False时只检查完全重复
+        """
+        if num_perm % bands or bands % 2:
+            raise ValueError("num_perm必须能被bands整除，bands必须为偶数")
+        self.threshold = threshold
+        self.near = near
+        self.rows = num_perm // bands
+        self.half = num_perm // 2
+        self.english_hasher = MinHasher(self.half, seed=1)
+        self.chinese_hasher = MinHasher(self.half, seed=2)
+        self._exact: Dict[str, Hashable] = {}
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+
+    def signature(self, english: str, chinese: str) -> np.ndarray:
+        """翻译对的MinHash签名（前一半为英文，后一半为中文）"""
+        return np.concatenate([self.english_hasher.signature(english_shingles(english)),
+                               self.chinese_hasher.signature(chinese_shingles(chinese))])
+
+    def add_representative(self, key: Hashable, digest: str, signature: Optional[np.ndarray] = None):
+        """不做重复检查，直接加入一个已有的代表（之前保存的exact_key和签名），之后与它重复的翻译对会归到它"""
+        self._exact.setdefault(digest, key)
+        if self.near and signature is not None:
+            self._index(key, signature)
+
+    def representative_signature(self, key: Hashable) -> Optional[np.ndarray]:
+        """代表的签名；不是代表或只检查完全重复时返回None"""
+        return self._signatures.get(key)
+
+    def add(self, key: Hashable, english: str, chinese: str) -> Optional[Duplicate]:
+        """加入一个翻译对；与已有的代表重复时返回Duplicate，否则返回None"""
+        digest = exact_key(english, chinese)
+        if digest in self._exact:
+            return Duplicate(self._exact[digest], 1.0, True)
+        self._exact[digest] = key
+        if not self.near:
+            return None
+
+        signature = self.signature(english, chinese)
+        best, best_similarity = None, 0.0
+        checked = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            for candidate in buckets.get(band_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = self._similarity(signature, self._signatures[candidate])
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is not None and best_similarity >= self.threshold:
+            # 完全重复的翻译对之后也归到同一个代表
+            self._exact[digest] = best
+            return Duplicate(best, best_similarity, False)
+
+        # 只有代表进入LSH桶，重复的翻译对不会把簇越拉越大
+        self._index(key, signature)
+        return None
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        packed = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [packed[band * width:(band + 1) * width] for band in range(len(self._buckets))]
+
+    def _index(self, key: Hashable, signature: np.ndarray):
+        """把代表的签名放入LSH桶"""
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+
+    def _similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """两边估计的相似度中较小的一个"""
+        return min(signature_similarity(first[:self.half], second[:self.half]),
+                   signature_similarity(first[self.half:], second[self.half:]))
+
+@dataclass
+class DedupReport:
+    """去重结果"""
+    total: int = 0
+    kept: List[int] = field(default_factory=list)
+    clusters: Dict[int, List[int]] = field(default_factory=dict)  # 代表序号 -> 重复的序号
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    def to_dict(self, pairs: Optional[List[Dict]] = None, max_clusters: Optional[int] = None) -> Dict:
+        """报告；提供pairs时每个簇附带英文原文和原文件名，簇按大小从大到小排列"""
+        clusters = sorted(self.clusters.items(), key=lambda item: len(item[1]), reverse=True)[:max_clusters]
+
+        def describe(index: int) -> Dict:
+            entry = {'index': index}
+            if pairs is not None:
+                entry['english'] = pairs[index].get('english', '')[:80]
+                entry['origin_file'] = pairs[index].get('origin_file', '')
+            return entry
+
+        return {
+            'total': self.total,
+            'kept': len(self.kept),
+            'exact_duplicates': self.exact_duplicates,
+            'near_duplicates': self.near_duplicates,
+            'clusters': [{'representative': describe(representative),
+                          'duplicates': [describe(index) for index in duplicates]}
+                         for representative, duplicates in clusters]
+        }
+
+def find_duplicates(pairs: Iterable[Dict], threshold: float = DEFAULT_THRESHOLD, near: bool = True,
+                    num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS) -> DedupReport:
+    """找出翻译对列表中的重复，每个簇保留最先出现的一个"""
+    index = NearDuplicateIndex(threshold, num_perm, bands, near)
+    report = DedupReport()
+    for position, pair in enumerate(pairs):
+        report.total += 1
+        duplicate = index.add(position, pair.get('english', ''), pair.get('chinese', ''))
+        if duplicate is None:
+            report.kept.append(position)
+            continue
+        report.clusters.setdefault(duplicate.representative, []).append(position)
+        if duplicate.exact:
+            report.exact_duplicates += 1
+        else:
+            report.near_duplicates += 1
+    return report
+
+def deduplicate_pairs(pairs: List[Dict], threshold: float = DEFAULT_THRESHOLD,
+                      near: bool = True) -> Tuple[List[Dict], DedupReport]:
+    """去掉重复的翻译对，返回 (保留的翻译对, 报告)"""
+    report = find_duplicates(pairs, threshold, near)
+    return [pairs[index] for index in report.kept], report
+
+def main():
+    from corpus_store import load_pairs
+
+    parser = argparse.ArgumentParser(description='翻译对去重报告')
+    parser.add_argument('input', nargs='?', default='individual_pairs', help='翻译对目录或语料库文件')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='近似重复的相似度阈值')
+    parser.add_argument('--exact-only', action='store_true', help='只检查完全重复')
+    parser.add_argument('--report', default=None, help='把重复簇写入JSON报告')
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.input)
+    report = find_duplicates(pairs, args.threshold, near=not args.exact_only)
+    print(f"翻译对: {report.total}，保留: {len(report.kept)}")
+    print(f"完全重复: {report.exact_duplicates}，近似重复: {report.near_duplicates}，重复簇: {len(report.clusters)}")
+    for cluster in report.to_dict(pairs, max_clusters=10)['clusters']:
+        files = [cluster['representative']['origin_file']] + [item['origin_file'] for item in cluster['duplicates']]
+        print(f"  {cluster['representative']['english'][:50]}... ({len(files)}个): {', '.join(files)}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(pairs), f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到: {args.report}")
+
+if __name__ == "__main__":
+    main()
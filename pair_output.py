@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译对照的流式输出
+- ShardedJsonlWriter: 只追加的JSONL写入器，翻译对提取出来就写入并刷新到磁盘，
+  分片超过大小上限时轮换到新分片，并维护manifest.json；爬取中途崩溃也不会丢失已写入的数据
+- write_json / write_csv / write_txt / write_xlsx: 从任意可迭代的翻译对流式生成原来的输出格式，
+  XLSX使用openpyxl的write-only模式（按需导入）
+用法: python pair_output.py <JSONL目录> <输出文件> [--format json|csv|txt|xlsx]
+"""
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+# 目录中已有分片时的处理方式
+EXISTING_SHARD_MODES = ('error', 'append', 'overwrite')
+
+class ShardedJsonlWriter:
+    """按大小分片的JSONL写入器（线程安全）"""
+
+    def __init__(self, directory: str, prefix: str = "pairs", max_shard_bytes: int = DEFAULT_SHARD_BYTES,
+                 fsync: bool = False, existing: str = 'append'):
+        """
+        Args:
+            directory: 分片目录
+            prefix: 分片文件名前缀，例如 pairs-00000.jsonl
+            max_shard_bytes: 单个分片的大小上限
+            fsync: 每条记录写入后是否调用os.fsync（更安全但更慢）
+            existing: 目录中已有分片时的处理：'append'接着写（截掉崩溃时写了一半的行），
+                      'overwrite'删除已有分片重新开始，'error'抛出FileExistsError
+        """
+        if existing not in EXISTING_SHARD_MODES:
+            raise ValueError(f"未知的已有分片处理方式: {existing}")
+        self.directory = directory
+        self.prefix = prefix
+        self.max_shard_bytes = max_shard_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+        existing_shards = _list_shards(directory, prefix)
+        if existing_shards and existing == 'error':
+            raise FileExistsError(f"目录中已有{len(existing_shards)}个翻译对分片: {directory}")
+        if existing == 'overwrite':
+            for name in existing_shards:
+                os.remove(os.path.join(directory, name))
+            existing_shards = []
+
+        self.shards: List[Dict] = []
+        for name in existing_shards:
+            path = os.path.join(directory, name)
+            _truncate_partial_line(path)
+            self.shards.append({'file': name, 'count': _count_lines(path), 'bytes': os.path.getsize(path)})
+        if not self.shards:
+            self.shards.append({'file': self._shard_name(0), 'count': 0, 'bytes': 0})
+        self._open_current()
+        self._write_manifest()
+
+    @property
+    def total_count(self) -> int:
+        return sum(shard['count'] for shard in self.shards)
+
+    def _shard_name(self, index: int) -> str:
+        return f"{self.prefix}-{index:05d}.jsonl"
+
+    def _open_current(self):
+        self._file = open(os.path.join(self.directory, self.shards[-1]['file']), 'ab')
+
+    def _write_manifest(self):
+        manifest = {
+            'prefix': self.prefix,
+            'shards': self.shards,
+            'total_count': self.total_count,
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        temp_path = os.path.join(self.directory, f"{MANIFEST_NAME}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, os.path.join(self.directory, MANIFEST_NAME))
+
+    def _rotate(self):
+        self._file.close()
+        self.shards.append({'file': self._shard_name(len(self.shards)), 'count': 0, 'bytes': 0})
+        self._open_current()
+        self._write_manifest()
+
+    def write(self, pair: Dict):
+        """追加一条翻译对并立即刷新"""
+        line = (json.dumps(pair, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            shard = self.shards[-1]
+            if shard['count'] and shard['bytes'] + len(line) > self.max_shard_bytes:
+                self._rotate()
+                shard = self.shards[-1]
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            shard['count'] += 1
+            shard['bytes'] += len(line)
+
+    def write_many(self, pairs: Iterable[Dict]):
+        for pair in pairs:
+            self.write(pair)
+
+    def close(self):
+        """关闭当前分片并更新manifest"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _list_shards(directory: str, prefix: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.startswith(f"{prefix}-") and name.endswith('.jsonl'))
+
+def _count_lines(path: str) -> int:
+    """完整行（以换行符结尾）的数量"""
+    count = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            count += chunk.count(b'\n')
+    return count
+
+def _truncate_partial_line(path: str):
+    """去掉崩溃时写了一半的最后一行"""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        # 向前找最后一个换行符
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+def iter_jsonl_pairs(directory: str, prefix: Optional[str] = None) -> Iterator[Dict]:
+    """按分片顺序逐条读取翻译对，忽略写了一半的行"""
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if prefix is None and os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            prefix = json.load(f).get('prefix')
+    for name in _list_shards(directory, prefix or "pairs"):
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                if line.strip():
+                    yield json.loads(line)
+
+def count_jsonl_pairs(directory: str, prefix: Optional[str] = None) -> int:
+    """翻译对总数（按完整行计数，爬取中断时manifest可能还没有更新）"""
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if prefix is None and os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            prefix = json.load(f).get('prefix')
+    return sum(_count_lines(os.path.join(directory, name)) for name in _list_shards(directory, prefix or "pairs"))
+
+class PairStatistics:
+    """边写边累计的统计信息（与SmogonScraper._get_statistics的结构相同）"""
+
+    def __init__(self):
+        self.count = 0
+        self.source_count: Dict[str, int] = {}
+        self.type_count: Dict[str, int] = {}
+        self.english_total = 0
+        self.chinese_total = 0
+        self.english_range = None  # (最短, 最长)
+        self.chinese_range = None
+
+    def add(self, pair: Dict):
+        source = pair.get('source', '未知来源')
+        pair_type = pair.get('type', '未知类型')
+        self.source_count[source] = self.source_count.get(source, 0) + 1
+        self.type_count[pair_type] = self.type_count.get(pair_type, 0) + 1
+
+        english_length, chinese_length = len(pair['english']), len(pair['chinese'])
+        self.english_total += english_length
+        self.chinese_total += chinese_length
+        self.english_range = _extend_range(self.english_range, english_length)
+        self.chinese_range = _extend_range(self.chinese_range, chinese_length)
+        self.count += 1
+
+    def to_dict(self) -> Dict:
+        if not self.count:
+            return {}
+        return {
+            'source_distribution': self.source_count,
+            'type_distribution': self.type_count,
+            'length_statistics': {
+                'avg_english_length': self.english_total / self.count,
+                'avg_chinese_length': self.chinese_total / self.count,
+                'max_english_length': self.english_range[1],
+                'max_chinese_length': self.chinese_range[1],
+                'min_english_length': self.english_range[0],
+                'min_chinese_length': self.chinese_range[0]
+            }
+        }
+
+def _extend_range(current: Optional[tuple], value: int) -> tuple:
+    if current is None:
+        return value, value
+    return min(current[0], value), max(current[1], value)
+
+def _indent(text: str, spaces: int) -> str:
+    return '\n'.join(' ' * spaces + line for line in text.split('\n'))
+
+def write_json(pairs: Iterable[Dict], filename: str, metadata: Optional[Dict] = None,
+               total: Optional[int] = None) -> int:
+    """流式写出JSON文档 {metadata, translation_pairs, statistics}，返回写出的数量
+
+    metadata中的total_count取total；total为None时先把pairs读入列表计数
+    """
+    if total is None:
+        pairs = list(pairs)
+        total = len(pairs)
+    metadata = dict(metadata or {})
+    metadata['total_count'] = total
+    metadata.setdefault('scraped_at', time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    statistics = PairStatistics()
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('{\n  "metadata": ' + _indent(json.dumps(metadata, ensure_ascii=False, indent=2), 2)[2:] + ',\n')
+        f.write('  "translation_pairs": [')
+        for pair in pairs:
+            f.write(',\n' if statistics.count else '\n')
+            f.write(_indent(json.dumps(pair, ensure_ascii=False, indent=2), 4))
+            statistics.add(pair)
+        f.write('\n  ],\n' if statistics.count else '],\n')
+        f.write('  "statistics": ' + _indent(json.dumps(statistics.to_dict(), ensure_ascii=False, indent=2), 2)[2:])
+        f.write('\n}')
+    return statistics.count
+
+def write_csv(pairs: Iterable[Dict], filename: str) -> int:
+    """流式写出CSV"""
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['英文原文', '中文翻译', '来源', '类型', '长度(英文)', '长度(中文)'])
+        for pair in pairs:
+            writer.writerow([
+                pair['english'],
+                pair['chinese'],
+                pair.get('source', ''),
+                pair.get('type', ''),
+                len(pair['english']),
+                len(pair['chinese'])
+            ])
+            count += 1
+    return count
+
+def write_txt(pairs: Iterable[Dict], filename: str, total: Optional[int] = None) -> int:
+    """流式写出TXT；表头的总数量取total，total为None时先把pairs读入列表计数"""
+    if total is None:
+        pairs = list(pairs)
+        total = len(pairs)
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(f"Smogon论坛翻译对照数据\n")
+        f.write(f"爬取时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"总数量: {total}\n")
+        f.write("=" * 50 + "\n\n")
+
+        for count, pair in enumerate(pairs, 1):
+            f.write(f"对照 {count}:\n")
+            f.write(f"英文: {pair['english']}\n")
+            f.write(f"中文: {pair['chinese']}\n")
+            f.write(f"来源: {pair.get('source', '未知')}\n")
+            f.write(f"类型: {pair.get('type', '未知')}\n")
+            f.write("-" * 30 + "\n\n")
+    return count
+
+def write_xlsx(pairs: Iterable[Dict], filename: str) -> int:
+    """用openpyxl的write-only模式流式写出Excel（需要openpyxl，缺少时抛出ImportError）"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('翻译对照')
+    sheet.append(['英文原文', '中文翻译', '来源', '类型', '英文长度', '中文长度', '英文词数', '中文字数'])
+
+    statistics = PairStatistics()
+    for pair in pairs:
+        sheet.append([
+            pair['english'],
+            pair['chinese'],
+            pair.get('source', ''),
+            pair.get('type', ''),
+            len(pair['english']),
+            len(pair['chinese']),
+            len(pair['english'].split()),
+            len(pair['chinese'].replace(' ', ''))
+        ])
+        statistics.add(pair)
+
+    stats_sheet = workbook.create_sheet('统计信息')
+    stats_sheet.append(['统计项目', '数值'])
+    stats_sheet.append(['总数量', statistics.count])
+    stats_sheet.append(['平均英文长度', f"{statistics.english_total / statistics.count:.1f}" if statistics.count else "0"])
+    stats_sheet.append(['平均中文长度', f"{statistics.chinese_total / statistics.count:.1f}" if statistics.count else "0"])
+    stats_sheet.append(['爬取时间', time.strftime('%Y-%m-%d %H:%M:%S')])
+    workbook.save(filename)
+    return statistics.count
+
+def convert_jsonl(directory: str, filename: str, format_type: str = "json") -> int:
+    """把JSONL分片目录转换为JSON/CSV/TXT/XLSX文件，返回转换的数量"""
+    format_type = format_type.lower()
+    if not filename.endswith(f".{format_type}"):
+        filename += f".{format_type}"
+    pairs = iter_jsonl_pairs(directory)
+    if format_type == "json":
+        return write_json(pairs, filename, {'source_dir': directory}, total=count_jsonl_pairs(directory))
+    if format_type == "csv":
+        return write_csv(pairs, filename)
+    if format_type == "txt":
+        return write_txt(pairs, filename, total=count_jsonl_pairs(directory))
+    if format_type == "xlsx":
+        return write_xlsx(pairs, filename)
+    raise ValueError(f"不支持的格式: {format_type}")
+
+def main():
+    parser = argparse.ArgumentParser(description='把JSONL分片转换为JSON/CSV/TXT/XLSX')
+    parser.add_argument('input_dir', help='JSONL分片目录')
+    parser.add_argument('output', help='输出文件')
+    parser.add_argument('--format', choices=['json', 'csv', 'txt', 'xlsx'], default='json', help='输出格式')
+    args = parser.parse_args()
+
+    try:
+        count = convert_jsonl(args.input_dir, args.output, args.format)
+    except ImportError:
+        print("需要安装openpyxl库才能保存Excel格式")
+        print("请运行: pip install openpyxl")
+        return
+    print(f"已转换 {count} 个翻译对照: {args.output}")
+
+if __name__ == "__main__":
+    main()
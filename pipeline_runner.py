@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内分阶段流水线
+在同一个进程中依次执行 爬取 -> 筛选 -> 增强 -> 提取 -> 转换 -> 拆分为individual_pairs，
+阶段之间用生成器逐条传递数据（不经过磁盘中转、不重复启动解释器），
+每个阶段的输出写入检查点文件，中断后可以从最后完成的阶段继续，并统计每个阶段自身的耗时
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from auto_filter_files import is_valid_url
+from create_individual_files import clean_chinese_text
+from enhance_scraped_files import SEPARATOR, get_first_post_content, is_first_post_content
+from format_converter import DataFormatConverter
+from ml_translation_extractor import MLTranslationExtractor
+from smogon_scraper import SmogonScraper
+
+# 阶段函数：接收上一阶段的数据流，返回本阶段的数据流（每条数据都是可JSON序列化的字典）
+StageFunc = Callable[[Iterator[Dict]], Iterator[Dict]]
+
+# 拆分阶段写出的文件名 pair_<编号>_<来源>.json
+PAIR_FILE_PATTERN = re.compile(r'^pair_(\d+)_.*\.json$')
+
+@dataclass
+class Stage:
+    """流水线阶段"""
+    name: str
+    func: StageFunc
+    description: str = ""
+
+@dataclass
+class StageStats:
+    """阶段统计"""
+    items_out: int = 0
+    seconds: float = 0.0            # 本阶段自身耗时（不含上游阶段）
+    inclusive_seconds: float = 0.0  # 包含上游阶段的耗时
+    resumed: bool = False           # 是否直接读取了检查点
+
+class _TimedIterator:
+    """统计从迭代器取数据的累计耗时和数量"""
+
+    def __init__(self, iterator: Iterator[Dict], stats: StageStats):
+        self.iterator = iterator
+        self.stats = stats
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Dict:
+        start = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        finally:
+            self.stats.inclusive_seconds += time.perf_counter() - start
+        self.stats.items_out += 1
+        return item
+
+def _write_checkpoint(items: Iterator[Dict], path: str) -> Iterator[Dict]:
+    """边传递边写检查点，阶段全部输出后才重命名为正式文件"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            yield item
+    os.replace(temp_path, path)
+
+def _read_checkpoint(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class StagedPipeline:
+    """按顺序串联的生成器阶段"""
+
+    def __init__(self, stages: List[Stage], checkpoint_dir: Optional[str] = None):
+        """
+        Args:
+            stages: 按执行顺序排列的阶段
+            checkpoint_dir: 检查点目录，None表示不写检查点
+        """
+        self.stages = stages
+        self.checkpoint_dir = checkpoint_dir
+        self.stats: Dict[str, StageStats] = {}
+        self.elapsed_time = 0.0
+
+    def _checkpoint_path(self, index: int) -> str:
+        return os.path.join(self.checkpoint_dir, f"{index + 1:02d}_{self.stages[index].name}.jsonl")
+
+    def _prepare_checkpoints(self, inputs: List[Dict], resume: bool) -> int:
+        """返回可以直接读取检查点的最后一个阶段序号（-1表示从头运行）"""
+        if not self.checkpoint_dir:
+            return -1
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        input_hash = hashlib.sha256(json.dumps(inputs, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+        manifest_path = os.path.join(self.checkpoint_dir, "manifest.json")
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+        if resume and manifest.get('input_hash') == input_hash:
+            for index in reversed(range(len(self.stages))):
+                if os.path.exists(self._checkpoint_path(index)):
+                    return index
+            return -1
+
+        # 输入变化或不续跑时清除旧检查点
+        for index in range(len(self.stages)):
+            for path in (self._checkpoint_path(index), f"{self._checkpoint_path(index)}.tmp"):
+                if os.path.exists(path):
+                    os.remove(path)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'input_hash': input_hash, 'stages': [stage.name for stage in self.stages]}, f)
+        return -1
+
+    def run(self, inputs: Iterable[Dict], resume: bool = False) -> List[Dict]:
+        """运行流水线，返回最后一个阶段的输出
+
+        Args:
+            inputs: 第一个阶段的输入
+            resume: 输入与上次相同时，从最后一个已完成的检查点继续
+        """
+        inputs = list(inputs)
+        start = time.perf_counter()
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+
+        resume_from = self._prepare_checkpoints(inputs, resume)
+        source_stats = StageStats()
+        if resume_from >= 0:
+            for stage in self.stages[:resume_from + 1]:
+                self.stats[stage.name].resumed = True
+            stream = _TimedIterator(_read_checkpoint(self._checkpoint_path(resume_from)), source_stats)
+            print(f"从检查点继续: {self.stages[resume_from].name} 之后的阶段")
+        else:
+            stream = _TimedIterator(iter(inputs), source_stats)
+
+        timers = [source_stats]
+        for index in range(resume_from + 1, len(self.stages)):
+            stage = self.stages[index]
+            stream = stage.func(stream)
+            if self.checkpoint_dir:
+                stream = _write_checkpoint(stream, self._checkpoint_path(index))
+            stream = _TimedIterator(stream, self.stats[stage.name])
+            timers.append(self.stats[stage.name])
+
+        results = list(stream)
+
+        # 下游阶段取一条数据的时间包含了上游阶段生产这条数据的时间
+        for upstream, downstream in zip(timers, timers[1:]):
+            downstream.seconds = downstream.inclusive_seconds - upstream.inclusive_seconds
+        self.elapsed_time = time.perf_counter() - start
+        return results
+
+    def print_summary(self):
+        """打印每个阶段的输出数量和耗时"""
+        print(f"\n{'阶段':<12} {'输出':>6} {'耗时(秒)':>10}")
+        for stage in self.stages:
+            stats = self.stats.get(stage.name, StageStats())
+            seconds = "检查点" if stats.resumed else f"{stats.seconds:.2f}"
+            print(f"{stage.name:<12} {stats.items_out:>6} {seconds:>10}")
+        print(f"总耗时: {self.elapsed_time:.2f}秒")
+
+class ThreadPipeline:
+    """Smogon帖子处理流水线：爬取 -> 筛选 -> 增强 -> 提取 -> 转换 -> 拆分"""
+
+    def __init__(self, scraper: Optional[SmogonScraper] = None, save_dir: Optional[str] = "scraped_threads",
+                 output_dir: str = "individual_pairs", checkpoint_dir: Optional[str] = "pipeline_checkpoints"):
+        """
+        Args:
+            scraper: 爬虫（默认不使用爬取状态）；增强阶段复用它的HTTP会话
+            save_dir: 增强后的帖子文件保存目录，None表示不保存
+            output_dir: 单个翻译对文件的输出目录
+            checkpoint_dir: 检查点目录，None表示不写检查点
+        """
+        self.scraper = scraper or SmogonScraper(state_db=None)
+        self.save_dir = save_dir
+        self.output_dir = output_dir
+        self.extractor = MLTranslationExtractor(save_dir or "scraped_threads")
+        self.converter = DataFormatConverter(output_dir=output_dir)
+        self.pipeline = StagedPipeline([
+            Stage('scrape', self.scrape, '爬取帖子主帖'),
+            Stage('filter', self.filter, '筛选开头为链接的帖子'),
+            Stage('enhance', self.enhance, '添加英文原帖'),
+            Stage('extract', self.extract, '提取翻译对'),
+            Stage('convert', self.convert, '转换为NLLB格式'),
+            Stage('split', self.split, '保存为单独文件'),
+        ], checkpoint_dir)
+
+    def scrape(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        for item in items:
+            url = item['url']
+            try:
+                result = self.scraper.fetch_first_post(url)
+            except Exception as e:
+                print(f"✗ 爬取失败: {url} - {e}")
+                continue
+            if result is None:
+                print(f"✗ 未找到主帖: {url}")
+                continue
+            title, text = result
+            yield {'url': url, 'title': title, 'filename': f"{self.scraper._clean_filename(title)}.txt", 'text': text}
+
+    def filter(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        for item in items:
+            first_line = item['text'].split('\n', 1)[0].strip()
+            if is_valid_url(first_line):
+                yield item
+            else:
+                print(f"✗ 筛选掉: {item['filename']} (开头: {first_line[:30]}...)")
+
+    def enhance(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        for item in items:
+            original_url = item['text'].split('\n', 1)[0].strip()
+            first_post_content = get_first_post_content(original_url, self.scraper.session)
+            if not is_first_post_content(first_post_content):
+                print(f"✗ 增强失败: {item['filename']} - {first_post_content}")
+                continue
+
+            content = item['text'] + SEPARATOR + first_post_content
+            if self.save_dir:
+                os.makedirs(self.save_dir, exist_ok=True)
+                with open(os.path.join(self.save_dir, item['filename']), 'w', encoding='utf-8') as f:
+                    f.write(content)
+            yield {'url': item['url'], 'filename': item['filename'], 'content': content}
+
+    def extract(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        for item in items:
+            for pair in self.extractor.extract_from_text(item['content'], item['filename']):
+                yield asdict(pair)
+
+    def convert(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        # 编号接在输出目录已有的最大编号之后（编号可能不连续），避免覆盖之前批次的翻译对
+        next_id = 1
+        if os.path.isdir(self.output_dir):
+            ids = [int(match.group(1)) for match in map(PAIR_FILE_PATTERN.match, os.listdir(self.output_dir)) if match]
+            next_id += max(ids, default=0)
+
+        for pair in items:
+            individual_pair = {
+                'id': next_id,
+                'english': pair.get('english', ''),
+                'chinese': clean_chinese_text(pair.get('chinese', '')),
+                'section_type': pair.get('section_type', ''),
+                'source_file': pair.get('source_file', ''),
+                'confidence': pair.get('confidence', 1.0)
+            }
+            converted = self.converter.convert_item(individual_pair)
+            if converted:
+                next_id += 1
+                yield converted
+
+    def split(self, items: Iterator[Dict]) -> Iterator[Dict]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        for item in items:
+            source_file = item.get('metadata_source_file') or 'unknown'
+            filename = f"pair_{item['metadata_id']:03d}_{source_file.replace('.txt', '').replace(' ', '_')}.json"
+            filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+            path = os.path.join(self.output_dir, filename)
+            # 与DataFormatConverter.convert_single_file的输出格式相同（列表）
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([item], f, ensure_ascii=False, indent=2)
+            yield {'file': path, 'id': item['metadata_id']}
+
+    def run(self, urls: List[str], resume: bool = False) -> List[Dict]:
+        """处理一批帖子链接，返回写出的翻译对文件"""
+        print(f"流水线处理 {len(urls)} 个链接...")
+        results = self.pipeline.run(({'url': url} for url in urls), resume=resume)
+        self.pipeline.print_summary()
+        print(f"共生成 {len(results)} 个翻译对文件，保存在: {self.output_dir}")
+        return results
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+宝可梦名称词典
+规则翻译器和SET配对共用的宝可梦英文名 -> 中文名，包含基础形态以及常见的地区形态、超级进化和其他形态；
+base_species把形态名归到基础形态（Landorus-T -> Landorus，Mega Scizor -> Scizor）
+"""
+
+from typing import Dict
+
+POKEMON_NAMES: Dict[str, str] = {
+    # 基础形态
+    'Garchomp': '烈咬陆鲨', 'Dragapult': '多龙巴鲁托', 'Landorus': '土地云', 'Rotom': '洛托姆',
+    'Tyranitar': '班基拉斯', 'Giratina': '骑拉帝纳', 'Clefable': '皮可西', 'Heatran': '席多蓝恩',
+    'Scizor': '巨钳螳螂', 'Kartana': '纸御剑', 'Zapdos': '闪电鸟', 'Ho-Oh': '凤王', 'Arceus': '阿尔宙斯',
+    'Kyogre': '盖欧卡', 'Koraidon': '故勒顿', 'Miraidon': '密勒顿', 'Necrozma': '奈克洛兹玛',
+    'Ting-Lu': '古鼎鹿', 'Gliscor': '天蝎王', 'Chien-Pao': '古剑豹', 'Clodsire': '土王',
+    'Dondozo': '吃吼霸', 'Samurott': '大剑鬼', 'Skarmory': '盔甲鸟', 'Weavile': '玛狃拉',
+    'Charizard': '喷火龙', 'Tornadus': '龙卷云', 'Ogerpon': '厄诡椪', 'Gholdengo': '赛富豪',
+    'Lopunny': '长耳兔', 'Crobat': '叉字蝠', 'Manaphy': '玛纳霏', 'Urshifu': '武道熊师',
+    'Tapu Koko': '卡璞·鸣鸣', 'Tapu Lele': '卡璞·蝶蝶', 'Melmetal': '美录梅塔', 'Corviknight': '钢铠鸦',
+    'Latias': '拉帝亚斯', 'Latios': '拉帝欧斯', 'Dragonite': '快龙', 'Toxapex': '超坏星',
+    'Ferrothorn': '坚果哑铃', 'Iron Valiant': '铁武者', 'Iron Hands': '铁臂膀', 'Great Tusk': '雄伟牙',
+    'Kingambit': '仆刀将军', 'Volcarona': '火神蛾', 'Raging Bolt': '猛雷鼓', 'Zamazenta': '藏玛然特',
+    'Serperior': '君主蛇', 'Diancie': '蒂安希', 'Slowking': '呆呆王', 'Moltres': '火焰鸟',
+    'Rillaboom': '轰擂金刚猩', 'Swampert': '巨沼怪', 'Basculegion': '戽斗尖梭', 'Mimikyu': '谜拟Q',
+    'Alomomola': '保姆曼波',
+    # 形态
+    'Giratina-O': '骑拉帝纳-起源', 'Landorus-T': '土地云-灵兽', 'Necrozma-DM': '奈克洛兹玛-黄昏之鬃',
+    'Urshifu-R': '武道熊师-连击流', 'Rotom-W': '清洗洛托姆', 'Ogerpon-W': '厄诡椪-水井面具',
+    'Arceus-Fairy': '阿尔宙斯-妖精', 'Arceus-Water': '阿尔宙斯-水', 'Galarian Slowking': '伽勒尔呆呆王',
+    'Mega Latias': '超级拉帝亚斯', 'Mega Scizor': '超级巨钳螳螂', 'Mega Tyranitar': '超级班基拉斯',
+}
+
+# 形态名的前缀（地区形态、超级进化）
+FORM_PREFIXES = ('Mega ', 'Galarian ', 'Alolan ', 'Hisuian ', 'Paldean ')
+
+def base_species(name: str) -> str:
+    """形态名对应的基础形态：去掉形态前缀，或去掉连字符后的形态后缀（去掉后仍须是词典中的名称，Ho-Oh不变）"""
+    for prefix in FORM_PREFIXES:
+        if name.startswith(prefix) and name[len(prefix):] in POKEMON_NAMES:
+            return base_species(name[len(prefix):])
+    head = name
+    while '-' in head:
+        head = head.rsplit('-', 1)[0]
+        if head in POKEMON_NAMES:
+            return head
+    return name
@@ -99,14 +99,14 @@ def run_learning():
             "The strategy focuses on maximizing damage output."
         ]
         
-        for text in test_texts:
-            try:
-                translation = module.translate_text(text)
+        try:
+            translations = module.translate_batch(test_texts)
+            for text, translation in zip(test_texts, translations):
                 print(f"原文: {text}")
                 print(f"译文: {translation}")
                 print()
-            except Exception as e:
-                print(f"翻译失败: {e}")
+        except Exception as e:
+            print(f"翻译失败: {e}")
         
         # 保存学习报告
         print("=== 保存学习报告 ===")
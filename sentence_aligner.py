@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于长度的句子对齐（Gale-Church）
+用动态规划按句子长度对齐英文和中文句子（或行），支持1-1、1-2、2-1合并以及1-0、0-1跳过；
+只计算对角线附近一条带状区域，耗时与句子数近似线性。
+也可以把individual_pairs中多段落的翻译对拆分为句子级翻译对：
+python sentence_aligner.py [individual_pairs] [--output individual_pairs_sentences]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 对齐类型 (英文句子数, 中文句子数) -> 先验概率（Gale & Church 1993）
+BEAD_PRIORS = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099,
+    (0, 1): 0.0099,
+    (2, 1): 0.089,
+    (1, 2): 0.089,
+}
+BEAD_COSTS = {bead: -math.log(prior) for bead, prior in BEAD_PRIORS.items()}
+
+# 长度差的方差系数（以英文字符数为单位）
+LENGTH_VARIANCE = 6.8
+# 动态规划只计算对角线两侧各DEFAULT_BAND个位置
+DEFAULT_BAND = 20
+
+ENGLISH_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+CHINESE_SENTENCE_END = re.compile(r'(?<=[。！？])(?![”’」』）)])|(?<=[。！？][”’」』）)])')
+
+@dataclass
+class AlignedPair:
+    """一个对齐结果"""
+    english: str
+    chinese: str
+    english_indices: Tuple[int, ...]
+    chinese_indices: Tuple[int, ...]
+    cost: float
+
+def split_sentences(text: str, language: str) -> List[str]:
+    """按段落和句末标点切分句子
+
+    Args:
+        text: 文本
+        language: 'english' 或 'chinese'
+    """
+    pattern = ENGLISH_SENTENCE_END if language == 'english' else CHINESE_SENTENCE_END
+    sentences = []
+    for paragraph in text.split('\n'):
+        sentences.extend(sentence.strip() for sentence in pattern.split(paragraph) if sentence.strip())
+    return sentences
+
+def _length_cost(english_length: float, chinese_length: float) -> float:
+    """长度差的代价：-log P(|z|)，z为标准化后的长度差"""
+    if english_length == 0 and chinese_length == 0:
+        return 0.0
+    mean = (english_length + chinese_length) / 2
+    z = abs(chinese_length - english_length) / math.sqrt(LENGTH_VARIANCE * mean)
+    probability = math.erfc(z / math.sqrt(2))  # 双侧 2 * (1 - Phi(z))
+    return -math.log(max(probability, 1e-12))
+
+def align_lengths(english_lengths: Sequence[int], chinese_lengths: Sequence[int],
+                  band: int = DEFAULT_BAND) -> List[Tuple[Tuple[int, ...], Tuple[int, ...], float]]:
+    """按长度对齐两组句子
+
+    中文长度按两边总长度之比换算为英文字符数后再比较。
+
+    Returns:
+        [(英文句子序号, 中文句子序号, 代价)]，按顺序覆盖全部句子（1-0、0-1表示跳过的句子）
+    """
+    n, m = len(english_lengths), len(chinese_lengths)
+    if n == 0 or m == 0:
+        return []
+
+    ratio = sum(english_lengths) / max(sum(chinese_lengths), 1)
+    scaled_chinese = [length * ratio for length in chinese_lengths]
+    # 两边句子数相差很大时加宽带宽，保证终点可达
+    band = max(band, 2, math.ceil(max(n / m, m / n)))
+
+    def in_band(i: int, j: int) -> bool:
+        return abs(j - i * m / n) <= band
+
+    # costs[i][j] = (到达(i, j)的最小代价, 上一步的对齐类型)
+    costs: List[Dict[int, Tuple[float, Tuple[int, int]]]] = [dict() for _ in range(n + 1)]
+    costs[0][0] = (0.0, (0, 0))
+    for i in range(n + 1):
+        center = round(i * m / n)
+        for j in range(max(0, center - band - 1), min(m, center + band + 1) + 1):
+            if (i, j) == (0, 0) or not in_band(i, j):
+                continue
+            best = None
+            for (di, dj), bead_cost in BEAD_COSTS.items():
+                previous = costs[i - di].get(j - dj) if i >= di and j >= dj else None
+                if previous is None:
+                    continue
+                cost = (previous[0] + bead_cost +
+                        _length_cost(sum(english_lengths[i - di:i]), sum(scaled_chinese[j - dj:j])))
+                if best is None or cost < best[0]:
+                    best = (cost, (di, dj))
+            if best is not None:
+                costs[i][j] = best
+
+    # 回溯
+    beads = []
+    i, j = n, m
+    while (i, j) != (0, 0):
+        total, (di, dj) = costs[i][j]
+        beads.append((tuple(range(i - di, i)), tuple(range(j - dj, j)), total - costs[i - di][j - dj][0]))
+        i, j = i - di, j - dj
+    beads.reverse()
+    return beads
+
+def align_sentences(english: Sequence[str], chinese: Sequence[str], band: int = DEFAULT_BAND,
+                    keep_unmatched: bool = False) -> List[AlignedPair]:
+    """对齐英文和中文句子（或行），合并的英文句子用空格连接，中文句子直接连接
+
+    Args:
+        keep_unmatched: 是否保留只有一边的对齐结果（1-0、0-1）
+    """
+    pairs = []
+    for en_indices, cn_indices, cost in align_lengths([len(s) for s in english], [len(s) for s in chinese], band):
+        if not keep_unmatched and (not en_indices or not cn_indices):
+            continue
+        pairs.append(AlignedPair(
+            english=' '.join(english[index] for index in en_indices),
+            chinese=''.join(chinese[index] for index in cn_indices),
+            english_indices=en_indices,
+            chinese_indices=cn_indices,
+            cost=cost
+        ))
+    return pairs
+
+def align_texts(english_text: str, chinese_text: str, band: int = DEFAULT_BAND) -> List[AlignedPair]:
+    """把两段文本切分为句子后对齐"""
+    return align_sentences(split_sentences(english_text, 'english'), split_sentences(chinese_text, 'chinese'), band)
+
+def split_pair_item(item: Dict, max_cost: Optional[float] = None) -> List[Dict]:
+    """把individual_pairs中的一个翻译对拆分为句子级翻译对
+
+    只有一句（或无法对齐出两句以上）时原样返回；其他字段保留，并记录句子序号
+
+    Args:
+        item: 含source/target的翻译对
+        max_cost: 丢弃代价高于此值的对齐结果，None表示全部保留
+    """
+    source, target = item.get('source', ''), item.get('target', '')
+    if item.get('source_lang', 'english') != 'english':
+        source, target = target, source
+
+    pairs = align_texts(source, target)
+    if max_cost is not None:
+        pairs = [pair for pair in pairs if pair.cost <= max_cost]
+    if len(pairs) < 2:
+        return [item]
+
+    results = []
+    for index, pair in enumerate(pairs):
+        english, chinese = pair.english, pair.chinese
+        if item.get('source_lang', 'english') != 'english':
+            english, chinese = chinese, english
+        result = dict(item)
+        result['source'] = english
+        result['target'] = chinese
+        result['metadata_sentence_index'] = index
+        results.append(result)
+    return results
+
+def split_pairs_directory(input_dir: str = "individual_pairs", output_dir: str = "individual_pairs_sentences",
+                          max_cost: Optional[float] = None) -> Dict[str, int]:
+    """拆分目录中的所有翻译对文件，每个输入文件对应一个同名输出文件"""
+    os.makedirs(output_dir, exist_ok=True)
+    stats = {'files': 0, 'input_pairs': 0, 'output_pairs': 0}
+
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(input_dir, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        items = data if isinstance(data, list) else [data]
+
+        output = []
+        for item in items:
+            output.extend(split_pair_item(item, max_cost) if isinstance(item, dict) else [item])
+        with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+
+        stats['files'] += 1
+        stats['input_pairs'] += len(items)
+        stats['output_pairs'] += len(output)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='把individual_pairs中的翻译对拆分为句子级翻译对')
+    parser.add_argument('input_dir', nargs='?', default='individual_pairs', help='输入目录')
+    parser.add_argument('--output', default='individual_pairs_sentences', help='输出目录')
+    parser.add_argument('--max-cost', type=float, default=None, help='丢弃代价高于此值的对齐结果')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        print(f"❌ 输入目录不存在: {args.input_dir}")
+        return
+
+    stats = split_pairs_directory(args.input_dir, args.output, args.max_cost)
+    print(f"处理文件: {stats['files']} 个")
+    print(f"翻译对: {stats['input_pairs']} -> {stats['output_pairs']}")
+    print(f"输出目录: {args.output}")
+
+if __name__ == "__main__":
+    main()
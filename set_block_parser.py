@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SET块解析
+用一个单遍状态机把帖子的行切分为 [SET] / [SET COMMENTS] 块和章节（[OVERVIEW]、[SET CREDITS]等）：
+每行只做一次标记识别（预编译正则），不回头重新扫描，整体为线性时间；
+配置行的结构化字段（宝可梦、特性、道具、性格、努力值、招式）在第一次访问时才解析
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 以"[名称]"开头的章节标记行，名称后可以跟正文
+MARKER_PATTERN = re.compile(r'^\s*\[\s*([A-Za-z][A-Za-z ]*?)\s*\](.*)$')
+
+SET_MARKER = 'SET'
+SET_COMMENTS_MARKER = 'SET COMMENTS'
+
+# 配置字段：英文（Smogon分析/Showdown格式）和中文写法
+FIELD_ALIASES = {
+    'pokemon': 'species', 'pokémon': 'species', 'species': 'species', '宝可梦': 'species',
+    'ability': 'ability', '特性': 'ability',
+    'item': 'item', '道具': 'item',
+    'nature': 'nature', '性格': 'nature',
+    'evs': 'evs', 'ev': 'evs', '努力值': 'evs',
+    'ivs': 'ivs', '个体值': 'ivs',
+    'tera type': 'tera_type', '太晶属性': 'tera_type',
+    'name': 'name', '名称': 'name',
+    'move': 'moves', '招式': 'moves',
+}
+FIELD_PATTERN = re.compile(
+    r'^\s*(pok[eé]mon|species|ability|item|nature|evs?|ivs|tera type|name|move\s*\d*|'
+    r'宝可梦|特性|道具|性格|努力值|个体值|太晶属性|名称|招式\s*\d*)\s*[:：]\s*(.+?)\s*$',
+    re.IGNORECASE
+)
+# Showdown格式：Garchomp @ Life Orb / Jolly Nature / - Swords Dance
+SHOWDOWN_ITEM_PATTERN = re.compile(r'^\s*([^@:：]+?)\s*@\s*(.+?)\s*$')
+SHOWDOWN_NATURE_PATTERN = re.compile(r'^\s*([A-Za-z]+)\s+Nature\s*$')
+MOVE_LINE_PATTERN = re.compile(r'^\s*[-•]\s*(.+?)\s*$')
+
+# 结构化字段（招式为列表，其余为字符串）
+SET_FIELDS = ('species', 'ability', 'item', 'nature', 'evs', 'ivs', 'tera_type', 'name')
+
+def parse_set_fields(set_lines: Iterable[str]) -> Dict:
+    """把配置行解析为结构化字段，同一字段只取第一次出现的值"""
+    fields = {key: '' for key in SET_FIELDS}
+    fields['moves'] = []
+    for line in set_lines:
+        # 中文配置常用"||"把多个字段写在一行
+        for text in line.split('||'):
+            move_match = MOVE_LINE_PATTERN.match(text)
+            if move_match:
+                fields['moves'].append(move_match.group(1))
+                continue
+
+            field_match = FIELD_PATTERN.match(text)
+            if field_match:
+                key = field_match.group(1).lower()
+                key = FIELD_ALIASES.get(re.sub(r'\s*\d+$', '', key), key)
+                value = field_match.group(2)
+                if key == 'moves':
+                    fields['moves'].extend(move.strip() for move in re.split(r'\s*/\s*', value) if move.strip())
+                elif not fields[key]:
+                    fields[key] = value
+                continue
+
+            nature_match = SHOWDOWN_NATURE_PATTERN.match(text)
+            if nature_match:
+                fields['nature'] = fields['nature'] or nature_match.group(1)
+                continue
+
+            item_match = SHOWDOWN_ITEM_PATTERN.match(text)
+            if item_match and not fields['species']:
+                fields['species'] = item_match.group(1)
+                fields['item'] = fields['item'] or item_match.group(2)
+    return fields
+
+@dataclass
+class SetRecord:
+    """一个[SET]块；结构化字段在第一次访问时才解析"""
+    start_line: int
+    end_line: int = 0  # 块结束后的下一行（不含）
+    set_lines: List[str] = field(default_factory=list)
+    comments: List[str] = field(default_factory=list)
+    _fields: Optional[Dict] = field(default=None, repr=False, compare=False)
+
+    @property
+    def fields(self) -> Dict:
+        if self._fields is None:
+            self._fields = parse_set_fields(self.set_lines)
+        return self._fields
+
+    species = property(lambda self: self.fields['species'])
+    ability = property(lambda self: self.fields['ability'])
+    item = property(lambda self: self.fields['item'])
+    nature = property(lambda self: self.fields['nature'])
+    evs = property(lambda self: self.fields['evs'])
+    tera_type = property(lambda self: self.fields['tera_type'])
+    name = property(lambda self: self.fields['name'])
+    moves = property(lambda self: self.fields['moves'])
+
+    def key_info(self) -> Dict:
+        """配对时使用的关键信息"""
+        return {
+            'pokemon': self.species,
+            'ability': self.ability,
+            'item': self.item,
+            'moves': list(self.moves),
+            'nature': self.nature,
+            'evs': self.evs
+        }
+
+    def to_block(self) -> Dict:
+        """SmogonScraper使用的字典格式"""
+        return {
+            'set_content': self.set_lines,
+            'comments_content': self.comments,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'record': self
+        }
+
+def parse_marker(line: str) -> Optional[Tuple[str, str]]:
+    """识别章节标记行，返回(大写名称, 标记后的正文)，不是标记行时返回None"""
+    match = MARKER_PATTERN.match(line)
+    if not match:
+        return None
+    return ' '.join(match.group(1).upper().split()), match.group(2).strip()
+
+def parse_set_blocks(lines: Iterable[str]) -> List[SetRecord]:
+    """单遍解析所有SET块
+
+    [SET]之后的非空行为配置（跳过以"["开头的行），遇到[SET COMMENTS]后开始收集说明，
+    说明在空行、下一个[SET]或其他章节标记处结束；没有配置行的块会被丢弃
+    """
+    records = []
+    current = None
+    in_comments = False
+
+    def finish(end_line: int):
+        if current is not None and current.set_lines:
+            current.end_line = end_line
+            records.append(current)
+
+    index = -1
+    for index, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        marker = parse_marker(line) if line.startswith('[') else None
+
+        if marker is not None:
+            name, rest = marker
+            if name == SET_MARKER:
+                finish(index)
+                current = SetRecord(start_line=index)
+                in_comments = False
+            elif current is None:
+                pass
+            elif not in_comments:
+                # 配置中除[SET COMMENTS]以外的标记行直接跳过
+                if name == SET_COMMENTS_MARKER:
+                    in_comments = True
+                    if rest:
+                        current.comments.append(rest)
+            else:
+                # 说明之后的任何章节标记都结束当前块
+                finish(index)
+                current = None
+                in_comments = False
+            continue
+
+        if current is None:
+            continue
+        if in_comments:
+            if not line:
+                finish(index)
+                current = None
+                in_comments = False
+            else:
+                current.comments.append(line)
+        elif line:
+            current.set_lines.append(line)
+
+    finish(index + 1)
+    return records
+
+def find_section(text: str, name: str, end_names: Optional[Iterable[str]] = None) -> Optional[str]:
+    """单遍查找第一个名为name的章节内容
+
+    Args:
+        text: 帖子文本
+        name: 章节名称，例如 'SET COMMENTS'（也接受 '[SET COMMENTS]'）
+        end_names: 结束章节名称；None表示在下一个任意章节标记处结束
+
+    Returns:
+        章节内容（去掉首尾空白），找不到章节时返回None
+    """
+    name = ' '.join(name.strip().strip('[]').upper().split())
+    end_names = None if end_names is None else {' '.join(end.strip('[]').upper().split()) for end in end_names}
+
+    collected = None
+    for line in text.split('\n'):
+        marker = parse_marker(line) if '[' in line else None
+        if collected is None:
+            if marker is not None and marker[0] == name:
+                collected = [marker[1]] if marker[1] else []
+            continue
+        if marker is not None and (end_names is None or marker[0] in end_names):
+            break
+        collected.append(line)
+
+    if collected is None:
+        return None
+    return '\n'.join(collected).strip()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SET配对
+把同一帖子中的英文SET块和中文SET块配对：每个块只提取一次规范化特征（宝可梦、招式数量、努力值数字），
+按宝可梦做哈希连接分块，块内在预先计算的分数矩阵上求最优指派（匈牙利算法），
+不再对每一对SET重复计算匹配度并贪心配对
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from pokemon_lexicon import POKEMON_NAMES, base_species
+from set_block_parser import SetRecord
+from term_matcher import get_term_matcher
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# 宝可梦名称词典的中文名 -> 英文名；英文按单词边界匹配、中文按子串匹配，匹配到的形态归到基础形态
+# （Landorus-T、土地云-灵兽 识别为 Landorus，超级烈咬陆鲨 识别为 Garchomp）
+_CHINESE_TO_ENGLISH = {cn: en for en, cn in POKEMON_NAMES.items()}
+
+# 与原来的匹配度计算相同的权重和阈值
+SPECIES_WEIGHT = 0.4
+MOVES_WEIGHT = 0.3
+NUMBERS_WEIGHT = 0.3
+MATCH_THRESHOLD = 0.5
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+@dataclass(frozen=True)
+class SetFeatures:
+    """SET块的规范化特征"""
+    species: str            # 规范化的宝可梦名（英文小写），无法识别时为空
+    has_species: bool       # SET中是否写了宝可梦（即使词典中没有）
+    move_count: int
+    numbers: FrozenSet[str]  # 努力值中的数字
+
+def find_species(text: str) -> str:
+    """用宝可梦词典识别文本中第一个出现的宝可梦（英文或中文），返回基础形态的规范化名称"""
+    if not text:
+        return ''
+    for _, _, term in get_term_matcher(POKEMON_NAMES, ignore_case=True).iter_matches(text):
+        return base_species(term).lower()
+    for _, _, term in get_term_matcher(_CHINESE_TO_ENGLISH, word_boundary=False).iter_matches(text):
+        return base_species(_CHINESE_TO_ENGLISH[term]).lower()
+    return ''
+
+def build_features(species: str, moves: Sequence[str], evs: str, set_text: str = '') -> SetFeatures:
+    """由结构化字段构建特征；宝可梦字段识别不出时在整个SET文本中查找，没有努力值字段时取整个SET文本中的数字"""
+    canonical = find_species(species) or find_species(set_text)
+    numbers = frozenset(NUMBER_PATTERN.findall(evs or set_text))
+    return SetFeatures(canonical, bool(species or canonical), len(moves), numbers)
+
+def extract_features(record: SetRecord) -> SetFeatures:
+    """提取SET块的特征"""
+    return build_features(record.species, record.moves, record.evs, '\n'.join(record.set_lines))
+
+def score_features(english: SetFeatures, chinese: SetFeatures) -> float:
+    """计算两个SET块的匹配度（0-1）"""
+    score = 0.0
+    total_weight = MOVES_WEIGHT + NUMBERS_WEIGHT
+
+    if english.has_species:
+        total_weight += SPECIES_WEIGHT
+        if english.species and english.species == chinese.species:
+            score += SPECIES_WEIGHT
+
+    if english.move_count and chinese.move_count:
+        score += MOVES_WEIGHT * min(english.move_count, chinese.move_count) / max(english.move_count, chinese.move_count)
+
+    if english.numbers and chinese.numbers:
+        score += NUMBERS_WEIGHT * len(english.numbers & chinese.numbers) / len(english.numbers | chinese.numbers)
+
+    return score / total_weight
+
+def _hungarian(cost: List[List[float]]) -> List[Tuple[int, int]]:
+    """匈牙利算法求最小代价指派（行数不超过列数），返回(行, 列)"""
+    rows, cols = len(cost), len(cost[0])
+    inf = float('inf')
+    u = [0.0] * (rows + 1)
+    v = [0.0] * (cols + 1)
+    owner = [0] * (cols + 1)  # 列 -> 指派的行（从1开始，0表示未指派）
+    way = [0] * (cols + 1)
+
+    for row in range(1, rows + 1):
+        owner[0] = row
+        col0 = 0
+        min_slack = [inf] * (cols + 1)
+        used = [False] * (cols + 1)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            delta = inf
+            col1 = 0
+            for col in range(1, cols + 1):
+                if used[col]:
+                    continue
+                slack = cost[row0 - 1][col - 1] - u[row0] - v[col]
+                if slack < min_slack[col]:
+                    min_slack[col] = slack
+                    way[col] = col0
+                if min_slack[col] < delta:
+                    delta = min_slack[col]
+                    col1 = col
+            for col in range(cols + 1):
+                if used[col]:
+                    u[owner[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_slack[col] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        # 沿增广路径更新指派
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    return sorted((owner[col] - 1, col - 1) for col in range(1, cols + 1) if owner[col])
+
+def max_weight_assignment(scores: List[List[float]]) -> List[Tuple[int, int]]:
+    """求总分最高的一一指派，返回(行, 列)；有scipy时使用linear_sum_assignment"""
+    if not scores or not scores[0]:
+        return []
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        return [(int(row), int(col)) for row, col in zip(rows, cols)]
+
+    if len(scores) <= len(scores[0]):
+        return _hungarian([[-score for score in row] for row in scores])
+    transposed = [[-scores[row][col] for row in range(len(scores))] for col in range(len(scores[0]))]
+    return sorted((row, col) for col, row in _hungarian(transposed))
+
+def _assign(english: List[Tuple[int, SetFeatures]], chinese: List[Tuple[int, SetFeatures]],
+            threshold: float) -> List[Tuple[int, int, float]]:
+    """在一个分块内求最优指派，只保留超过阈值的配对"""
+    if not english or not chinese:
+        return []
+    matrix = []
+    for _, en_features in english:
+        row = []
+        for _, cn_features in chinese:
+            # 两边都识别出宝可梦但不同时不允许配对
+            if en_features.species and cn_features.species and en_features.species != cn_features.species:
+                row.append(0.0)
+                continue
+            score = score_features(en_features, cn_features)
+            row.append(score if score > threshold else 0.0)
+        matrix.append(row)
+
+    return [(english[row][0], chinese[col][0], matrix[row][col])
+            for row, col in max_weight_assignment(matrix) if matrix[row][col] > 0]
+
+def pair_sets(english: Sequence[SetRecord], chinese: Sequence[SetRecord],
+              threshold: float = MATCH_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """配对英文和中文SET块
+
+    先按识别出的宝可梦分块，每块内求最优指派；剩下未配对的块（包括识别不出宝可梦的）再统一求一次指派
+
+    Returns:
+        按英文块顺序排列的 (英文序号, 中文序号, 匹配度)
+    """
+    english_features = [extract_features(record) for record in english]
+    chinese_features = [extract_features(record) for record in chinese]
+
+    chinese_by_species: Dict[str, List[Tuple[int, SetFeatures]]] = defaultdict(list)
+    for index, features in enumerate(chinese_features):
+        if features.species:
+            chinese_by_species[features.species].append((index, features))
+
+    english_by_species: Dict[str, List[Tuple[int, SetFeatures]]] = defaultdict(list)
+    for index, features in enumerate(english_features):
+        if features.species:
+            english_by_species[features.species].append((index, features))
+
+    pairs = []
+    for species, english_block in english_by_species.items():
+        pairs.extend(_assign(english_block, chinese_by_species.get(species, []), threshold))
+
+    paired_english = {pair[0] for pair in pairs}
+    paired_chinese = {pair[1] for pair in pairs}
+    pairs.extend(_assign(
+        [(index, features) for index, features in enumerate(english_features) if index not in paired_english],
+        [(index, features) for index, features in enumerate(chinese_features) if index not in paired_chinese],
+        threshold
+    ))
+    return sorted(pairs)
@@ -2,9 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
 import json
 
+from set_block_parser import find_section
+
 def extract_translation_pairs(file_path):
     """从单个文件提取翻译对"""
     try:
@@ -76,9 +77,8 @@ def extract_translation_pairs(file_path):
 
 def extract_section(text, section_name):
     """提取指定章节的内容"""
-    pattern = rf'{re.escape(section_name)}\s*\n(.*?)(?=\n\[|$)'
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(1) if match else None
+    # 章节内容到下一个章节标记为止
+    return find_section(text, section_name)
 
 def clean_chinese_comments(text):
     """清理中文注释中的Chinese Set行"""
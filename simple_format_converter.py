@@ -7,130 +7,21 @@
 
 import os
 import json
-import glob
-from typing import Dict, List, Any, Optional
 
-def detect_language(text: str) -> str:
-    """简单的语言检测"""
-    import re
-    
-    # 检测中文字符
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-    total_chars = len(text.strip())
-    
-    if total_chars == 0:
-        return "unknown"
-    
-    # 如果中文字符超过30%，认为是中文
-    if chinese_chars / total_chars > 0.3:
-        return "chinese"
-    else:
-        return "english"  # 默认为英文
-
-def convert_item(item: Dict) -> Optional[Dict]:
-    """转换单个数据项为标准格式"""
-    # 支持的字段映射
-    source_fields = ['source', 'english', 'en', 'eng', 'original', 'text']
-    target_fields = ['target', 'chinese', 'zh', 'chn', 'translation', 'translated_text']
-    
-    source_text = None
-    target_text = None
-    
-    # 查找源文本
-    for field in source_fields:
-        if field in item and item[field]:
-            source_text = str(item[field]).strip()
-            break
-    
-    # 查找目标文本
-    for field in target_fields:
-        if field in item and item[field]:
-            target_text = str(item[field]).strip()
-            break
-    
-    if not source_text or not target_text:
-        return None
-    
-    # 检测语言
-    source_lang = detect_language(source_text)
-    target_lang = detect_language(target_text)
-    
-    return {
-        "source": source_text,
-        "target": target_text,
-        "source_lang": source_lang,
-        "target_lang": target_lang
-    }
-
-def convert_file(input_file: str, output_file: str) -> bool:
-    """转换单个文件"""
-    try:
-        print(f"转换: {input_file}")
-        
-        # 读取文件
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        converted_items = []
-        
-        # 处理不同的数据结构
-        if isinstance(data, dict):
-            # 单个翻译对
-            converted = convert_item(data)
-            if converted:
-                converted_items.append(converted)
-        elif isinstance(data, list):
-            # 多个翻译对
-            for item in data:
-                if isinstance(item, dict):
-                    converted = convert_item(item)
-                    if converted:
-                        converted_items.append(converted)
-        
-        if not converted_items:
-            print(f"  警告: 文件 {input_file} 没有有效的翻译对")
-            return False
-        
-        # 确保输出目录存在
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        # 写入转换后的数据
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(converted_items, f, ensure_ascii=False, indent=2)
-        
-        print(f"  成功: {len(converted_items)} 个翻译对")
-        return True
-        
-    except Exception as e:
-        print(f"  错误: {e}")
-        return False
+from format_converter import DataFormatConverter
 
 def convert_directory(input_dir: str, output_dir: str) -> int:
-    """转换整个目录"""
+    """转换整个目录（DataFormatConverter：按清单增量转换、多进程、逐项校验），返回成功的文件数"""
     if not os.path.exists(input_dir):
         print(f"错误: 输入目录 {input_dir} 不存在")
         return 0
     
-    # 查找所有JSON文件
-    json_files = glob.glob(os.path.join(input_dir, "*.json"))
-    
-    if not json_files:
+    converter = DataFormatConverter(input_dir, output_dir, keep_metadata=False)
+    converter.convert_directory(workers=0)
+    if not converter.stats:
         print(f"警告: 在 {input_dir} 中没有找到JSON文件")
         return 0
-    
-    print(f"找到 {len(json_files)} 个JSON文件")
-    print("-" * 50)
-    
-    success_count = 0
-    
-    for input_file in json_files:
-        filename = os.path.basename(input_file)
-        output_file = os.path.join(output_dir, filename)
-        
-        if convert_file(input_file, output_file):
-            success_count += 1
-    
-    return success_count
+    return converter.stats['converted'] + converter.stats['unchanged']
 
 def create_sample_data(output_dir: str = "sample_data") -> bool:
     """创建示例数据"""
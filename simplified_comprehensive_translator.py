@@ -13,6 +13,10 @@ from datetime import datetime
 from typing import Dict, List, Any, Tuple
 from collections import defaultdict, Counter
 
+from corpus_store import open_corpus
+from pokemon_lexicon import POKEMON_NAMES
+from term_matcher import get_term_matcher
+
 class SimplifiedComprehensiveTranslator:
     def __init__(self):
         self.pairs_directory = "individual_pairs"
@@ -86,16 +90,8 @@ class SimplifiedComprehensiveTranslator:
             print(f"目录 {self.pairs_directory} 不存在")
             return
         
-        for filename in os.listdir(self.pairs_directory):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.pairs_directory, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if 'english' in data and 'chinese' in data:
-                            self.translation_pairs.append(data)
-                except:
-                    continue
+        with open_corpus(self.pairs_directory) as corpus:
+            self.translation_pairs.extend(corpus.iter_pairs(deduplicate=True))
         
         print(f"成功加载 {len(self.translation_pairs)} 个翻译对")
     
@@ -174,7 +170,7 @@ class SimplifiedComprehensiveTranslator:
         """在中文文本中寻找英文术语的对应翻译"""
         # 预定义的术语映射
         predefined_mappings = {
-            'Garchomp': '烈咬陆鲨', 'Giratina-O': '骑拉帝纳-起源', 'Landorus-T': '土地云-灵兽',
+            **POKEMON_NAMES,
             'Shadow Ball': '影子球', 'Hex': '祸不单行', 'Calm Mind': '冥想',
             'Will-O-Wisp': '磷火', 'Stone Edge': '尖石攻击', 'Thunder Wave': '电磁波',
             'Dragon Dance': '龙之舞', 'Scale Shot': '鳞射', 'Stealth Rock': '隐形岩',
@@ -466,7 +462,7 @@ class SimplifiedComprehensiveTranslator:
         
         # 添加预定义术语
         predefined_terms = {
-            'Garchomp': '烈咬陆鲨', 'Giratina-O': '骑拉帝纳-起源', 'Landorus-T': '土地云-灵兽',
+            **POKEMON_NAMES,
             'Shadow Ball': '影子球', 'Hex': '祸不单行', 'Calm Mind': '冥想',
             'Will-O-Wisp': '磷火', 'Stone Edge': '尖石攻击', 'Thunder Wave': '电磁波',
             'Dragon Dance': '龙之舞', 'Scale Shot': '鳞射', 'Stealth Rock': '隐形岩',
@@ -478,13 +474,7 @@ class SimplifiedComprehensiveTranslator:
         
         all_terms.update(predefined_terms)
         
-        result = text
-        for en_term, cn_term in all_terms.items():
-            if en_term and cn_term:
-                pattern = r'\b' + re.escape(en_term) + r'\b'
-                result = re.sub(pattern, cn_term, result, flags=re.IGNORECASE)
-        
-        return result
+        return get_term_matcher(all_terms, ignore_case=True).replace(text)
     
     def apply_grammar_transformations(self, text: str) -> str:
         """应用语法结构转换"""
@@ -535,13 +525,7 @@ class SimplifiedComprehensiveTranslator:
         
         all_vocab.update(predefined_vocab)
         
-        result = text
-        for en_word, cn_word in all_vocab.items():
-            if en_word and cn_word:
-                pattern = r'\b' + re.escape(en_word) + r'\b'
-                result = re.sub(pattern, cn_word, result, flags=re.IGNORECASE)
-        
-        return result
+        return get_term_matcher(all_vocab, ignore_case=True).replace(text)
     
     def apply_context_rules(self, text: str) -> str:
         """应用语境规则"""
@@ -10,60 +10,169 @@ from bs4 import BeautifulSoup
 import json
 import time
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from urllib.parse import urljoin, urlparse
 import os
+import threading
+
+from crawl_engine import CrawlEngine
+from crawl_state import CrawlStateStore, content_hash
+from first_post_extractor import extract_first_post, read_first_post
+from html_archive import ArchivingSession, create_session, parse_as_of
+from http_client import DEFAULT_POOL_MAXSIZE, PooledSession
+from pair_output import (EXISTING_SHARD_MODES, PairStatistics, ShardedJsonlWriter, iter_jsonl_pairs, write_csv,
+                         write_json, write_txt, write_xlsx)
+from sentence_aligner import align_sentences
+from set_block_parser import SetRecord, parse_set_blocks
+from set_pairing import build_features, extract_features, pair_sets, score_features
+from text_profile import profile_text, profile_texts
+
+# XenForo回复ID，例如 data-content="post-9876543"
+POST_ID_PATTERN = re.compile(r'data-content="post-(\d+)"')
 
 class SmogonScraper:
-    def __init__(self, base_url="https://www.smogon.com"):
+    def __init__(self, base_url="https://www.smogon.com", max_workers: int = 4,
+                 requests_per_second: float = 1.0, max_retries: int = 3,
+                 state_db: Optional[str] = "crawl_state.db", stream_first_post: bool = False,
+                 archive_dir: Optional[str] = None, replay: bool = False,
+                 pairs_dir: Optional[str] = None, keep_pairs_in_memory: bool = True,
+                 full_refresh: bool = False, as_of: Optional[float] = None, existing_pairs: str = 'error'):
+        """
+        Args:
+            archive_dir: 原始HTML归档目录（None表示不归档）
+            replay: 从archive_dir回放，不访问网络；回放时不限速、不重试、不使用爬取状态
+            as_of: 回放时只使用该时间（Unix时间戳）之前的快照，None表示使用最新的快照
+            pairs_dir: 翻译对JSONL分片目录，爬取时从保存的帖子中提取翻译对并立即追加写入（None表示不在爬取时提取）
+            keep_pairs_in_memory: 设置了pairs_dir时是否仍在translation_pairs中保留一份
+            existing_pairs: pairs_dir中已有之前爬取的分片时的处理：'error'拒绝使用该目录，
+                            'append'接着写（pair_count和保存、导出包含之前的翻译对），'overwrite'删除后重新写
+            full_refresh: 重新下载并保存所有帖子（不发送条件请求、不跳过内容未变化的帖子），
+                          下载结果仍写入爬取状态，供之后的增量爬取使用
+        """
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        self.replay = replay
+        if replay:
+            requests_per_second, max_retries, state_db = 0, 0, None
+        # 共享连接池会话；重试和限速由爬取引擎负责，会话本身不再重试
+        self.session = create_session(archive_dir, replay, as_of, pool_maxsize=max(max_workers, DEFAULT_POOL_MAXSIZE),
+                                      max_retries=0)
+        # 并发爬取引擎（按主机限速、失败重试）
+        self.crawler = CrawlEngine(
+            self.session,
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries
+        )
         self.translation_pairs = []
+        self.pairs_dir = pairs_dir
+        self.pair_writer = ShardedJsonlWriter(pairs_dir, existing=existing_pairs) if pairs_dir else None
+        self.keep_pairs_in_memory = keep_pairs_in_memory or not pairs_dir
         self.processed_urls = set()
+        self._processed_lock = threading.Lock()
+        self._pairs_lock = threading.Lock()
+        # 持久化爬取状态（state_db为None时不做增量爬取），首次使用时才打开数据库
+        self.state_db = state_db
+        self._crawl_state = None
+        self.full_refresh = full_refresh
+        self.crawl_results = {}
+        # 流式下载：主帖结束后立即断开连接（不再计算整页哈希和最新回复ID）；
+        # 归档原始HTML时下载完整页面，回放才能重现完整的运行
+        self.stream_first_post = stream_first_post and not isinstance(self.session, ArchivingSession)
+        if stream_first_post and not self.stream_first_post:
+            print("归档原始HTML时下载完整页面，不使用流式下载")
+        self.stream_totals = {'pages': 0, 'bytes_read': 0, 'content_length': 0}
+        
+    def _add_pair(self, pair: Dict):
+        """记录一个翻译对：写入JSONL分片（已设置pairs_dir时），并按需保留在内存中（多个爬取线程会同时调用）"""
+        with self._pairs_lock:
+            if self.pair_writer is not None:
+                self.pair_writer.write(pair)
+            if self.keep_pairs_in_memory:
+                self.translation_pairs.append(pair)
+
+    def _iter_pairs(self):
+        """逐个取出已提取的翻译对（优先从JSONL分片读取，内存中可能没有保留）"""
+        if self.pair_writer is not None:
+            return iter_jsonl_pairs(self.pairs_dir)
+        return iter(self.translation_pairs)
+
+    @property
+    def pair_count(self) -> int:
+        """已提取的翻译对数量"""
+        if self.pair_writer is not None:
+            return self.pair_writer.total_count
+        return len(self.translation_pairs)
+
+    def close_pairs(self):
+        """关闭JSONL分片写入器并更新manifest"""
+        if self.pair_writer is not None:
+            self.pair_writer.close()
+
+    @property
+    def crawl_state(self) -> Optional[CrawlStateStore]:
+        """爬取状态数据库"""
+        if self.state_db and self._crawl_state is None:
+            with self._processed_lock:
+                if self._crawl_state is None:
+                    self._crawl_state = CrawlStateStore(self.state_db)
+        return self._crawl_state
+        
+    def scrape_chinese_archive(self, archive_url="https://www.smogon.com/forums/forums/chinese-sv-analysis-archive.824/",
+                               max_threads: int = None, max_pages: int = None, save_dir: str = "scraped_threads"):
+        """爬取中文SV分析存档页面，保存每个thread的第一个回复为txt文件
         
-    def scrape_chinese_archive(self, archive_url="https://www.smogon.com/forums/forums/chinese-sv-analysis-archive.824/"):
-        """爬取中文SV分析存档页面，保存每个thread的第一个回复为txt文件"""
+        Args:
+            archive_url: 存档首页URL，会自动跟随分页
+            max_threads: 最多处理的帖子数量（None表示不限制）
+            max_pages: 最多读取的存档页数（None表示读取全部分页）
+            save_dir: txt文件保存目录
+        """
         print(f"开始爬取Smogon中文翻译存档: {archive_url}")
         
         # 创建保存目录
-        save_dir = "scraped_threads"
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
         
         try:
-            # 获取存档页面
-            response = self.session.get(archive_url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 查找所有帖子链接
-            thread_links = self._extract_thread_links(soup)
-            print(f"找到 {len(thread_links)} 个帖子")
-            
-            # 处理每个帖子
-            for i, thread_url in enumerate(thread_links):
-                if thread_url in self.processed_urls:
-                    continue
-                    
-                print(f"\n处理第 {i+1}/{len(thread_links)} 个帖子...")
-                print(f"URL: {thread_url}")
-                
+            # 获取存档分页中的帖子链接，已收集到max_threads个待处理帖子时不再读取后面的分页
+            thread_links = []
+            seen_links = set()
+            for page_number, soup in enumerate(self.crawler.iter_archive_pages(archive_url, max_pages), 1):
+                page_links = [link for link in self._extract_thread_links(soup) if link not in seen_links]
+                seen_links.update(page_links)
+                thread_links.extend(link for link in page_links if link not in self.processed_urls)
+                print(f"存档第 {page_number} 页: 找到 {len(page_links)} 个帖子")
+                if max_threads is not None and len(thread_links) >= max_threads:
+                    break
+            
+            if max_threads is not None:
+                thread_links = thread_links[:max_threads]
+            print(f"共找到 {len(thread_links)} 个待处理帖子")
+            
+            # 并发处理每个帖子（限速由爬取引擎负责）
+            def process_thread(thread_url):
+                print(f"\n处理帖子: {thread_url}")
                 self._scrape_thread_to_file(thread_url, save_dir)
-                self.processed_urls.add(thread_url)
-                
-                # 添加延迟避免被封
-                time.sleep(2)
+                with self._processed_lock:
+                    self.processed_urls.add(thread_url)
+            
+            results = self.crawler.run(thread_links, process_thread)
+            failed_threads = [url for url, error in results.items() if error is not None]
                 
-            print(f"\n爬取完成！所有文件已保存到 {save_dir} 目录")
+            print(f"\n{'回放' if self.replay else '爬取'}完成！所有文件已保存到 {save_dir} 目录")
+            if failed_threads:
+                print(f"处理失败的帖子: {len(failed_threads)} 个")
+            print(f"请求数: {self.crawler.stats['requests']}, 重试: {self.crawler.stats['retries']}, 失败: {self.crawler.stats['failures']}")
+            if isinstance(self.session, PooledSession):
+                print(self.session.metrics_summary())
+            if self.crawl_results:
+                print(f"更新: {self.crawl_results.get('updated', 0)}, "
+                      f"未修改(304): {self.crawl_results.get('not_modified', 0)}, "
+                      f"内容未变: {self.crawl_results.get('unchanged', 0)}")
+            if self.stream_totals['pages']:
+                print(f"流式下载: {self.stream_totals['pages']} 个页面，"
+                      f"读取 {self.stream_totals['bytes_read'] / 1024:.1f}KB / "
+                      f"{self.stream_totals['content_length'] / 1024:.1f}KB")
             
         except Exception as e:
             print(f"爬取存档页面时出错: {e}")
@@ -90,34 +199,104 @@ class SmogonScraper:
         return list(set(thread_links))  # 去重
         
     def _scrape_thread_to_file(self, thread_url: str, save_dir: str):
-        """爬取单个帖子的主帖（first post）并保存为txt文件"""
-        try:
-            response = self.session.get(thread_url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 获取帖子标题
-            title_elem = soup.find('h1', class_='p-title-value')
-            title = title_elem.get_text(strip=True) if title_elem else "未知标题"
-            print(f"帖子标题: {title}")
-            
-            # 清理标题，移除不能用作文件名的字符
-            safe_title = self._clean_filename(title)
+        """爬取单个帖子的主帖（first post）并保存为txt文件
+        
+        启用爬取状态数据库时会发送条件请求，并且只在主帖内容变化时重写txt文件（full_refresh时总是重新下载保存）；
+        出错时抛出异常，由爬取引擎计入失败的帖子
+        """
+        state = self.crawl_state.get(thread_url) if self.crawl_state else None
+        saved_path = state.get('saved_path') if state else None
+        
+        # 本地文件还在时才发送条件请求，否则需要完整内容重新保存
+        has_local_copy = bool(not self.full_refresh and state and saved_path and os.path.exists(saved_path))
+        headers = self.crawl_state.conditional_headers(thread_url) if has_local_copy else {}
+        
+        response = self.crawler.fetch(thread_url, headers=headers, stream=self.stream_first_post)
+        
+        if response.status_code == 304:
+            response.close()
+            print(f"  帖子未修改 (304)，跳过")
+            self.crawl_state.record(thread_url, changed=False)
+            self._count_crawl_result('not_modified')
+            return
+        
+        page = None
+        if self.stream_first_post:
+            # 边下载边扫描，主帖结束后断开；哈希只覆盖已读取的前缀
+            page, stream_stats = read_first_post(response)
+            print(f"  {stream_stats.summary()}")
+            self._count_stream_stats(stream_stats)
+            body = stream_stats.prefix
+        else:
+            body = response.content
+        
+        page_hash = content_hash(body)
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': page_hash
+        }
+        if has_local_copy and state.get('content_hash') == page_hash:
+            print(f"  页面内容未变化，跳过")
+            self.crawl_state.record(thread_url, changed=False, **validators)
+            self._count_crawl_result('unchanged')
+            return
+        
+        # 只解析标题和主帖（第一个bbWrapper），不解析整页回复
+        if page is None:
+            page = extract_first_post(body)
+        
+        # 获取帖子标题
+        title = page.title or "未知标题"
+        print(f"帖子标题: {title}")
+        
+        # 清理标题，移除不能用作文件名的字符
+        safe_title = self._clean_filename(title)
+        
+        # 获取主帖内容（第一个帖子）
+        if page.post is not None:
+            first_post = page.post
+            text_content = self._format_post_text(first_post)
+            first_post_hash = content_hash(text_content)
+            if not self.stream_first_post:
+                validators['last_post_id'] = self._find_last_post_id(response.text)
+            
+            # 只有新回复、主帖没有变化时不重写文件
+            if has_local_copy and state.get('first_post_hash') == first_post_hash:
+                print(f"  主帖内容未变化，跳过保存")
+                self.crawl_state.record(thread_url, changed=False, **validators)
+                self._count_crawl_result('unchanged')
+                return
+            
+            print(f"  找到主帖内容，正在保存...")
+            filepath = self._save_reply_to_file(first_post, safe_title, save_dir, thread_url, text_content)
+            if not filepath:
+                # 不记录爬取状态，由爬取引擎计为失败的帖子
+                raise OSError(f"保存帖子失败: {thread_url}")
+            if self.crawl_state:
+                self.crawl_state.record(thread_url, changed=True, first_post_hash=first_post_hash,
+                                        saved_path=filepath, **validators)
+            self._count_crawl_result('updated')
+            # 设置了pairs_dir时，提取出的翻译对立即写入分片
+            if self.pair_writer is not None:
+                self._extract_translations_from_post(first_post, title)
+        else:
+            print("  未找到任何内容")
             
-            # 查找所有帖子内容
-            posts = soup.find_all('div', class_='bbWrapper')
+    def _find_last_post_id(self, html: str) -> Optional[int]:
+        """从页面中找到最大的XenForo回复ID（data-content="post-12345"）"""
+        post_ids = [int(post_id) for post_id in POST_ID_PATTERN.findall(html)]
+        return max(post_ids) if post_ids else None
+        
+    def _count_stream_stats(self, stream_stats):
+        with self._processed_lock:
+            self.stream_totals['pages'] += 1
+            self.stream_totals['bytes_read'] += stream_stats.bytes_read
+            self.stream_totals['content_length'] += stream_stats.content_length or stream_stats.bytes_read
             
-            # 获取主帖内容（第一个帖子）
-            if len(posts) >= 1:
-                first_post = posts[0]  # 第一个是主帖
-                print(f"  找到主帖内容，正在保存...")
-                self._save_reply_to_file(first_post, safe_title, save_dir, thread_url)
-            else:
-                print("  未找到任何内容")
-                
-        except Exception as e:
-            print(f"处理帖子 {thread_url} 时出错: {e}")
+    def _count_crawl_result(self, key: str):
+        with self._processed_lock:
+            self.crawl_results[key] = self.crawl_results.get(key, 0) + 1
             
     def _clean_filename(self, filename: str) -> str:
         """清理文件名，移除不能用作文件名的字符"""
@@ -132,24 +311,27 @@ class SmogonScraper:
             
         return filename.strip()
         
-    def _save_reply_to_file(self, post_content, title: str, save_dir: str, thread_url: str):
-        """将帖子内容保存为txt文件"""
+    def _format_post_text(self, post_content) -> str:
+        """获取帖子的纯文本内容，保持分行格式"""
+        text_content = post_content.get_text(separator='\n', strip=True)
+        
+        # 清理多余的空行，但保持单行换行
+        text_content = re.sub(r'\n\s*\n\s*\n+', '\n\n', text_content)
+        # 只合并同一行内的多个空格，不影响换行符
+        lines = text_content.split('\n')
+        cleaned_lines = []
+        for line in lines:
+            # 清理每行内的多余空格和制表符，但保持行结构
+            cleaned_line = re.sub(r'\s+', ' ', line.strip())
+            cleaned_lines.append(cleaned_line)
+        return '\n'.join(cleaned_lines)
+        
+    def _save_reply_to_file(self, post_content, title: str, save_dir: str, thread_url: str,
+                            text_content: str = None) -> Optional[str]:
+        """将帖子内容保存为txt文件，返回保存路径（失败时返回None）"""
         try:
-            # 获取帖子的纯文本内容，保持分行格式
-            text_content = post_content.get_text(separator='\n', strip=True)
-            
-            # 清理文本格式，保持分行结构
-            import re
-            # 清理多余的空行，但保持单行换行
-            text_content = re.sub(r'\n\s*\n\s*\n+', '\n\n', text_content)
-            # 只合并同一行内的多个空格，不影响换行符
-            lines = text_content.split('\n')
-            cleaned_lines = []
-            for line in lines:
-                # 清理每行内的多余空格和制表符，但保持行结构
-                cleaned_line = re.sub(r'\s+', ' ', line.strip())
-                cleaned_lines.append(cleaned_line)
-            text_content = '\n'.join(cleaned_lines)
+            if text_content is None:
+                text_content = self._format_post_text(post_content)
             
             # 构建文件路径
             filename = f"{title}.txt"
@@ -161,30 +343,41 @@ class SmogonScraper:
                 
             print(f"  已保存到: {filepath}")
             print(f"  文件大小: {len(text_content)} 字符")
+            return filepath
             
         except Exception as e:
             print(f"保存文件时出错: {e}")
-            
+            return None
+            
+    def fetch_first_post(self, thread_url: str) -> Optional[Tuple[str, str]]:
+        """抓取帖子并返回(标题, 主帖纯文本)，不写文件、不使用爬取状态；没有主帖时返回None"""
+        response = self.crawler.fetch(thread_url, stream=self.stream_first_post)
+        if self.stream_first_post:
+            page, stream_stats = read_first_post(response)
+            self._count_stream_stats(stream_stats)
+        else:
+            page = extract_first_post(response.content)
+
+        if page.post is None:
+            return None
+        return page.title or "未知标题", self._format_post_text(page.post)
+
     def _scrape_thread(self, thread_url: str):
         """爬取单个帖子的翻译内容（保留原方法用于兼容性）"""
         try:
             response = self.session.get(thread_url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page = extract_first_post(response.content)
             
             # 获取帖子标题
-            title_elem = soup.find('h1', class_='p-title-value')
-            title = title_elem.get_text(strip=True) if title_elem else "未知标题"
+            title = page.title or "未知标题"
             print(f"帖子标题: {title}")
             
-            # 查找所有帖子内容
-            posts = soup.find_all('div', class_='bbWrapper')
-            
             # 只处理第一个回复
-            if posts:
+            if page.post is not None:
                 print(f"  处理第一个回复...")
-                self._extract_translations_from_post(posts[0], title)
+                self._extract_translations_from_post(page.post, title)
             else:
                 print("  未找到任何回复内容")
                 
@@ -240,53 +433,8 @@ class SmogonScraper:
         self._pair_sets_by_english_content(english_sets, chinese_sets, source)
         
     def _extract_all_set_blocks(self, lines: List[str]) -> List[Dict]:
-        """提取所有的SET块"""
-        set_blocks = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # 查找[SET]标记的开始
-            if '[SET]' in line.upper() or 'SET]' in line.upper():
-                set_content = []
-                comments_content = []
-                j = i + 1
-                
-                # 收集SET内容（从[SET]到[SET COMMENTS]）
-                while j < len(lines):
-                    current_line = lines[j]
-                    if '[SET COMMENTS]' in current_line.upper() or 'SET COMMENTS]' in current_line.upper():
-                        # 开始收集COMMENTS内容
-                        k = j + 1
-                        while k < len(lines):
-                            comment_line = lines[k]
-                            # 如果遇到下一个[SET]或其他结束标记，停止
-                            if ('[SET]' in comment_line.upper() or 
-                                comment_line.strip() == '' or
-                                k == len(lines) - 1):
-                                break
-                            if comment_line.strip():
-                                comments_content.append(comment_line.strip())
-                            k += 1
-                        break
-                    if current_line.strip() and not current_line.startswith('['):
-                        set_content.append(current_line.strip())
-                    j += 1
-                
-                if set_content:  # 只有当SET内容不为空时才添加
-                    set_blocks.append({
-                        'set_content': set_content,
-                        'comments_content': comments_content,
-                        'start_line': i,
-                        'end_line': j
-                    })
-                    
-                i = j if j > i else i + 1
-            else:
-                i += 1
-                
-        return set_blocks
+        """提取所有的SET块（单遍解析，见set_block_parser）"""
+        return [record.to_block() for record in parse_set_blocks(lines)]
         
     def _is_english_set_block(self, set_block: Dict) -> bool:
         """判断SET块是否为英文"""
@@ -299,118 +447,42 @@ class SmogonScraper:
         return self._is_chinese_text(set_content)
         
     def _pair_sets_by_english_content(self, english_sets: List[Dict], chinese_sets: List[Dict], source: str):
-        """根据英文内容的相同性配对SET块"""
-        used_chinese_sets = set()
-        
-        for en_set in english_sets:
-            # 提取英文SET中的关键信息（宝可梦名称、技能等）
-            en_key_info = self._extract_set_key_info(en_set['set_content'])
-            
-            best_match = None
-            best_score = 0
-            
-            for i, cn_set in enumerate(chinese_sets):
-                if i in used_chinese_sets:
-                    continue
-                    
-                # 计算匹配度
-                match_score = self._calculate_set_match_score(en_key_info, cn_set['set_content'])
-                
-                if match_score > best_score and match_score > 0.5:  # 设置匹配阈值
-                    best_score = match_score
-                    best_match = (i, cn_set)
-                    
-            if best_match:
-                used_chinese_sets.add(best_match[0])
-                cn_set = best_match[1]
-                
-                # 创建翻译对
-                en_full_content = '\n'.join(en_set['set_content'] + en_set['comments_content'])
-                cn_full_content = '\n'.join(cn_set['set_content'] + cn_set['comments_content'])
-                
-                self.translation_pairs.append({
-                    'english': self._clean_text(en_full_content),
-                    'chinese': self._clean_text(cn_full_content),
-                    'source': source,
-                    'type': 'set_matched_pair',
-                    'match_score': best_score
-                })
-                
-                print(f"    配对成功 (匹配度: {best_score:.2f}): {en_key_info.get('pokemon', 'Unknown')}")
-                
+        """根据英文内容的相同性配对SET块（按宝可梦分块后求最优指派，见set_pairing）"""
+        english_records = [self._set_record(block) for block in english_sets]
+        chinese_records = [self._set_record(block) for block in chinese_sets]
+
+        for en_index, cn_index, score in pair_sets(english_records, chinese_records):
+            en_set = english_sets[en_index]
+            cn_set = chinese_sets[cn_index]
+
+            # 创建翻译对
+            en_full_content = '\n'.join(en_set['set_content'] + en_set['comments_content'])
+            cn_full_content = '\n'.join(cn_set['set_content'] + cn_set['comments_content'])
+
+            self._add_pair({
+                'english': self._clean_text(en_full_content),
+                'chinese': self._clean_text(cn_full_content),
+                'source': source,
+                'type': 'set_matched_pair',
+                'match_score': score
+            })
+
+            print(f"    配对成功 (匹配度: {score:.2f}): {english_records[en_index].species or 'Unknown'}")
+
+    def _set_record(self, set_block: Dict) -> SetRecord:
+        """取SET块对应的SetRecord（_extract_all_set_blocks的结果中已带有）"""
+        return set_block.get('record') or SetRecord(start_line=set_block.get('start_line', 0),
+                                                   set_lines=list(set_block['set_content']))
+
     def _extract_set_key_info(self, set_content: List[str]) -> Dict:
         """从SET内容中提取关键信息"""
-        key_info = {
-            'pokemon': '',
-            'ability': '',
-            'item': '',
-            'moves': [],
-            'nature': '',
-            'evs': ''
-        }
-        
-        for line in set_content:
-            line_lower = line.lower()
-            if 'pokemon:' in line_lower or 'pokémon:' in line_lower:
-                key_info['pokemon'] = line.split(':', 1)[1].strip()
-            elif 'ability:' in line_lower:
-                key_info['ability'] = line.split(':', 1)[1].strip()
-            elif 'item:' in line_lower:
-                key_info['item'] = line.split(':', 1)[1].strip()
-            elif 'nature:' in line_lower:
-                key_info['nature'] = line.split(':', 1)[1].strip()
-            elif 'evs:' in line_lower:
-                key_info['evs'] = line.split(':', 1)[1].strip()
-            elif line.strip().startswith('-'):
-                move = line.strip()[1:].strip()
-                if move:
-                    key_info['moves'].append(move)
-                    
-        return key_info
+        return SetRecord(start_line=0, set_lines=list(set_content)).key_info()
         
     def _calculate_set_match_score(self, en_key_info: Dict, cn_set_content: List[str]) -> float:
         """计算SET块的匹配分数"""
-        score = 0.0
-        total_weight = 0.0
-        
-        cn_content_text = ' '.join(cn_set_content).lower()
-        
-        # 检查宝可梦名称匹配（权重最高）
-        if en_key_info['pokemon']:
-            pokemon_en = en_key_info['pokemon'].lower()
-            # 简单的宝可梦名称映射（可以扩展）
-            pokemon_mapping = {
-                'garchomp': '烈咬陆鲨',
-                'dragapult': '多龙巴鲁托',
-                'landorus': '土地云',
-                'rotom': '洛托姆',
-                'tyranitar': '班基拉斯'
-            }
-            
-            if pokemon_en in pokemon_mapping:
-                if pokemon_mapping[pokemon_en] in cn_content_text:
-                    score += 0.4
-            total_weight += 0.4
-            
-        # 检查技能数量匹配
-        en_moves_count = len(en_key_info['moves'])
-        cn_moves_count = len([line for line in cn_set_content if line.strip().startswith('-')])
-        
-        if en_moves_count > 0 and cn_moves_count > 0:
-            moves_similarity = min(en_moves_count, cn_moves_count) / max(en_moves_count, cn_moves_count)
-            score += moves_similarity * 0.3
-        total_weight += 0.3
-        
-        # 检查数字匹配（努力值等）
-        en_numbers = set(re.findall(r'\d+', ' '.join([en_key_info['evs']])))
-        cn_numbers = set(re.findall(r'\d+', cn_content_text))
-        
-        if en_numbers and cn_numbers:
-            number_overlap = len(en_numbers & cn_numbers) / len(en_numbers | cn_numbers)
-            score += number_overlap * 0.3
-        total_weight += 0.3
-        
-        return score / total_weight if total_weight > 0 else 0.0
+        en_features = build_features(en_key_info['pokemon'], en_key_info['moves'], en_key_info['evs'])
+        cn_features = extract_features(SetRecord(start_line=0, set_lines=list(cn_set_content)))
+        return score_features(en_features, cn_features)
                 
     def _pair_set_contents(self, english_lines: List[str], chinese_lines: List[str], source: str):
         """将英文和中文SET内容进行配对"""
@@ -422,7 +494,7 @@ class SmogonScraper:
                     chinese_clean = self._clean_text(cn_line)
                     
                     if english_clean and chinese_clean:
-                        self.translation_pairs.append({
+                        self._add_pair({
                             'english': english_clean,
                             'chinese': chinese_clean,
                             'source': source,
@@ -433,40 +505,21 @@ class SmogonScraper:
             self._smart_pair_contents(english_lines, chinese_lines, source)
             
     def _smart_pair_contents(self, english_lines: List[str], chinese_lines: List[str], source: str):
-        """智能配对英文和中文内容"""
-        # 简单的启发式配对：寻找相似的结构模式
-        used_chinese = set()
-        
-        for en_line in english_lines:
-            if not self._is_english_text(en_line):
-                continue
-                
-            best_match = None
-            best_score = 0
-            
-            for i, cn_line in enumerate(chinese_lines):
-                if i in used_chinese or not self._is_chinese_text(cn_line):
-                    continue
-                    
-                # 计算相似度分数（基于长度和结构）
-                score = self._calculate_similarity_score(en_line, cn_line)
-                
-                if score > best_score and score > 0.3:  # 设置最低相似度阈值
-                    best_score = score
-                    best_match = (i, cn_line)
-            
-            if best_match:
-                used_chinese.add(best_match[0])
-                english_clean = self._clean_text(en_line)
-                chinese_clean = self._clean_text(best_match[1])
-                
-                if english_clean and chinese_clean:
-                    self.translation_pairs.append({
-                        'english': english_clean,
-                        'chinese': chinese_clean,
-                        'source': source,
-                        'type': 'set_smart_pair'
-                    })
+        """智能配对英文和中文内容（按长度动态规划对齐，支持1-2、2-1合并，见sentence_aligner）"""
+        english_lines = [line for line in english_lines if self._is_english_text(line)]
+        chinese_lines = [line for line in chinese_lines if self._is_chinese_text(line)]
+
+        for pair in align_sentences(english_lines, chinese_lines):
+            english_clean = self._clean_text(pair.english)
+            chinese_clean = self._clean_text(pair.chinese)
+
+            if english_clean and chinese_clean:
+                self._add_pair({
+                    'english': english_clean,
+                    'chinese': chinese_clean,
+                    'source': source,
+                    'type': 'set_smart_pair'
+                })
                     
     def _calculate_similarity_score(self, english_text: str, chinese_text: str) -> float:
         """计算英文和中文文本的相似度分数"""
@@ -503,14 +556,16 @@ class SmogonScraper:
     
     def _extract_direct_pairs(self, lines: List[str], source: str):
         """提取直接的英文-中文对照"""
+        # 每行只统计一次字符画像
+        profiles = profile_texts(lines)
         i = 0
         while i < len(lines) - 1:
             current_line = lines[i]
             next_line = lines[i + 1]
             
             # 检查是否为英文-中文对照
-            if (self._is_english_text(current_line) and 
-                self._is_chinese_text(next_line) and
+            if (profiles[i].is_english() and 
+                profiles[i + 1].is_chinese() and
                 len(current_line) > 15 and len(next_line) > 5):
                 
                 # 清理文本
@@ -518,7 +573,7 @@ class SmogonScraper:
                 chinese_clean = self._clean_text(next_line)
                 
                 if english_clean and chinese_clean:
-                    self.translation_pairs.append({
+                    self._add_pair({
                         'english': english_clean,
                         'chinese': chinese_clean,
                         'source': source,
@@ -562,7 +617,7 @@ class SmogonScraper:
                         chinese_clean = self._clean_text(chinese_cell)
                         
                         if english_clean and chinese_clean:
-                            self.translation_pairs.append({
+                            self._add_pair({
                                 'english': english_clean,
                                 'chinese': chinese_clean,
                                 'source': source,
@@ -571,38 +626,11 @@ class SmogonScraper:
                             
     def _is_english_text(self, text: str) -> bool:
         """判断文本是否主要为英文"""
-        if not text or len(text) < 5:
-            return False
-            
-        # 移除标点和数字
-        alpha_chars = re.sub(r'[^a-zA-Z]', '', text)
-        if len(alpha_chars) < 3:
-            return False
-            
-        # 检查英文字符比例
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        total_chars = len(text.replace(' ', ''))
-        
-        if total_chars == 0:
-            return False
-            
-        english_ratio = english_chars / total_chars
-        return english_ratio > 0.6
+        return profile_text(text).is_english()
         
     def _is_chinese_text(self, text: str) -> bool:
         """判断文本是否主要为中文"""
-        if not text or len(text) < 2:
-            return False
-            
-        # 计算中文字符比例
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-        total_chars = len(text.replace(' ', ''))
-        
-        if total_chars == 0:
-            return False
-            
-        chinese_ratio = chinese_chars / total_chars
-        return chinese_ratio > 0.3
+        return profile_text(text).is_chinese()
         
     def _clean_text(self, text: str) -> str:
         """清理文本内容"""
@@ -657,158 +685,63 @@ class SmogonScraper:
         if not filename.endswith('.json'):
             filename += '.json'
             
-        data = {
-            'metadata': {
-                'total_count': len(self.translation_pairs),
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'processed_urls': list(self.processed_urls),
-                'scraper_version': '1.0'
-            },
-            'translation_pairs': self.translation_pairs,
-            'statistics': self._get_statistics()
+        metadata = {
+            'total_count': self.pair_count,
+            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'processed_urls': list(self.processed_urls),
+            'scraper_version': '1.0'
         }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        count = write_json(self._iter_pairs(), filename, metadata, total=self.pair_count)
             
         print(f"\n翻译对照已保存到: {filename} (JSON格式)")
-        print(f"共保存 {len(self.translation_pairs)} 个翻译对照")
+        print(f"共保存 {count} 个翻译对照")
         
     def _save_as_csv(self, filename: str):
         """保存为CSV格式"""
-        import csv
-        
         if not filename.endswith('.csv'):
             filename += '.csv'
             
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['英文原文', '中文翻译', '来源', '类型', '长度(英文)', '长度(中文)'])
-            
-            for pair in self.translation_pairs:
-                writer.writerow([
-                    pair['english'],
-                    pair['chinese'],
-                    pair.get('source', ''),
-                    pair.get('type', ''),
-                    len(pair['english']),
-                    len(pair['chinese'])
-                ])
+        count = write_csv(self._iter_pairs(), filename)
                 
         print(f"\n翻译对照已保存到: {filename} (CSV格式)")
-        print(f"共保存 {len(self.translation_pairs)} 个翻译对照")
+        print(f"共保存 {count} 个翻译对照")
         
     def _save_as_txt(self, filename: str):
         """保存为TXT格式"""
         if not filename.endswith('.txt'):
             filename += '.txt'
             
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"Smogon论坛翻译对照数据\n")
-            f.write(f"爬取时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"总数量: {len(self.translation_pairs)}\n")
-            f.write("=" * 50 + "\n\n")
-            
-            for i, pair in enumerate(self.translation_pairs, 1):
-                f.write(f"对照 {i}:\n")
-                f.write(f"英文: {pair['english']}\n")
-                f.write(f"中文: {pair['chinese']}\n")
-                f.write(f"来源: {pair.get('source', '未知')}\n")
-                f.write(f"类型: {pair.get('type', '未知')}\n")
-                f.write("-" * 30 + "\n\n")
+        count = write_txt(self._iter_pairs(), filename, total=self.pair_count)
                 
         print(f"\n翻译对照已保存到: {filename} (TXT格式)")
-        print(f"共保存 {len(self.translation_pairs)} 个翻译对照")
+        print(f"共保存 {count} 个翻译对照")
         
     def _save_as_xlsx(self, filename: str):
-        """保存为Excel格式"""
+        """保存为Excel格式（openpyxl的write-only模式，逐行写入）"""
+        if not filename.endswith('.xlsx'):
+            filename += '.xlsx'
         try:
-            import pandas as pd
-            
-            if not filename.endswith('.xlsx'):
-                filename += '.xlsx'
-                
-            # 准备数据
-            data = []
-            for pair in self.translation_pairs:
-                data.append({
-                    '英文原文': pair['english'],
-                    '中文翻译': pair['chinese'],
-                    '来源': pair.get('source', ''),
-                    '类型': pair.get('type', ''),
-                    '英文长度': len(pair['english']),
-                    '中文长度': len(pair['chinese']),
-                    '英文词数': len(pair['english'].split()),
-                    '中文字数': len(pair['chinese'].replace(' ', ''))
-                })
-                
-            df = pd.DataFrame(data)
-            
-            # 创建Excel文件
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='翻译对照', index=False)
-                
-                # 添加统计信息
-                stats_data = {
-                    '统计项目': ['总数量', '平均英文长度', '平均中文长度', '爬取时间'],
-                    '数值': [
-                        len(self.translation_pairs),
-                        f"{sum(len(p['english']) for p in self.translation_pairs) / len(self.translation_pairs):.1f}" if self.translation_pairs else "0",
-                        f"{sum(len(p['chinese']) for p in self.translation_pairs) / len(self.translation_pairs):.1f}" if self.translation_pairs else "0",
-                        time.strftime('%Y-%m-%d %H:%M:%S')
-                    ]
-                }
-                stats_df = pd.DataFrame(stats_data)
-                stats_df.to_excel(writer, sheet_name='统计信息', index=False)
-                
+            count = write_xlsx(self._iter_pairs(), filename)
             print(f"\n翻译对照已保存到: {filename} (Excel格式)")
-            print(f"共保存 {len(self.translation_pairs)} 个翻译对照")
+            print(f"共保存 {count} 个翻译对照")
             
         except ImportError:
-            print("需要安装pandas和openpyxl库才能保存Excel格式")
-            print("请运行: pip install pandas openpyxl")
+            print("需要安装openpyxl库才能保存Excel格式")
+            print("请运行: pip install openpyxl")
             print("改为保存JSON格式...")
             self._save_as_json(filename.replace('.xlsx', '.json'))
             
     def _get_statistics(self) -> dict:
         """获取爬取数据的统计信息"""
-        if not self.translation_pairs:
-            return {}
-            
-        # 按来源统计
-        source_count = {}
-        type_count = {}
-        
-        english_lengths = []
-        chinese_lengths = []
-        
-        for pair in self.translation_pairs:
-            source = pair.get('source', '未知来源')
-            pair_type = pair.get('type', '未知类型')
-            
-            source_count[source] = source_count.get(source, 0) + 1
-            type_count[pair_type] = type_count.get(pair_type, 0) + 1
-            
-            english_lengths.append(len(pair['english']))
-            chinese_lengths.append(len(pair['chinese']))
-            
-        return {
-            'source_distribution': source_count,
-            'type_distribution': type_count,
-            'length_statistics': {
-                'avg_english_length': sum(english_lengths) / len(english_lengths),
-                'avg_chinese_length': sum(chinese_lengths) / len(chinese_lengths),
-                'max_english_length': max(english_lengths),
-                'max_chinese_length': max(chinese_lengths),
-                'min_english_length': min(english_lengths),
-                'min_chinese_length': min(chinese_lengths)
-            }
-        }
+        statistics = PairStatistics()
+        for pair in self._iter_pairs():
+            statistics.add(pair)
+        return statistics.to_dict()
             
     def load_into_translator(self, translator_instance):
         """将爬取的翻译对照加载到翻译器中"""
         added_count = 0
-        for pair in self.translation_pairs:
+        for pair in self._iter_pairs():
             try:
                 translator_instance.add_translation_sample(
                     pair['english'], 
@@ -823,13 +756,16 @@ class SmogonScraper:
     def print_summary(self):
         """打印爬取结果摘要"""
         print("\n=== 爬取结果摘要 ===")
-        print(f"总翻译对照数: {len(self.translation_pairs)}")
+        print(f"总翻译对照数: {self.pair_count}")
         
         # 按来源统计
         source_count = {}
         type_count = {}
+        examples = []
         
-        for pair in self.translation_pairs:
+        for pair in self._iter_pairs():
+            if len(examples) < 3:
+                examples.append(pair)
             source = pair.get('source', '未知来源')
             pair_type = pair.get('type', '未知类型')
             
@@ -846,7 +782,7 @@ class SmogonScraper:
             
         # 显示一些示例
         print("\n翻译对照示例:")
-        for i, pair in enumerate(self.translation_pairs[:3]):
+        for i, pair in enumerate(examples):
             print(f"\n示例 {i+1}:")
             print(f"  英文: {pair['english']}")
             print(f"  中文: {pair['chinese']}")
@@ -870,18 +806,61 @@ def main():
                        help='自动加载到翻译器')
     parser.add_argument('--save-all-formats', action='store_true', 
                        help='保存所有格式')
+    parser.add_argument('--max-pages', type=int, default=None, 
+                       help='最多读取的存档分页数（默认读取全部）')
+    parser.add_argument('--workers', type=int, default=4, 
+                       help='同时抓取的帖子数量')
+    parser.add_argument('--rate', type=float, default=1.0, 
+                       help='每个主机每秒最多请求数')
+    parser.add_argument('--state-db', type=str, default='crawl_state.db', 
+                       help='爬取状态数据库路径（用于增量爬取）')
+    parser.add_argument('--full-refresh', action='store_true', 
+                       help='不使用已有的爬取状态跳过帖子，重新下载所有帖子（仍更新爬取状态）')
+    parser.add_argument('--stream', action='store_true', 
+                       help='流式下载帖子页面，读到主帖结束即断开连接（归档原始HTML时不生效，需同时指定--no-archive）')
+    parser.add_argument('--archive-dir', type=str, default='html_archive', 
+                       help='原始HTML归档目录')
+    parser.add_argument('--no-archive', action='store_true', 
+                       help='不保存原始HTML')
+    parser.add_argument('--replay', action='store_true', 
+                       help='从归档离线回放整个提取流程，不访问网络')
+    parser.add_argument('--as-of', type=parse_as_of, default=None, 
+                       help='回放时只使用该时间之前的快照（Unix时间戳或ISO日期时间，如2026-10-01T12:00:00）')
+    parser.add_argument('--pairs-dir', type=str, default=None, 
+                       help='翻译对JSONL分片目录：从本次保存的帖子中提取翻译对，提取出来立即写入磁盘，'
+                            '不在内存中累积（增量爬取跳过的帖子不重新提取，需要时配合--full-refresh）；'
+                            '目录中已有之前爬取的分片时默认报错，见--existing-pairs')
+    parser.add_argument('--existing-pairs', choices=EXISTING_SHARD_MODES, default='error', 
+                       help='--pairs-dir中已有分片时：error报错退出，append接着写（统计和导出包含之前的翻译对），'
+                            'overwrite删除已有分片后重新写')
     
     args = parser.parse_args()
+    if args.as_of is not None and not args.replay:
+        parser.error('--as-of只能与--replay一起使用')
     
-    scraper = SmogonScraper()
+    try:
+        scraper = SmogonScraper(max_workers=args.workers, requests_per_second=args.rate,
+                                state_db=args.state_db, full_refresh=args.full_refresh,
+                                stream_first_post=args.stream,
+                                archive_dir=None if args.no_archive and not args.replay else args.archive_dir,
+                                replay=args.replay, as_of=args.as_of,
+                                pairs_dir=args.pairs_dir, keep_pairs_in_memory=not args.pairs_dir,
+                                existing_pairs=args.existing_pairs)
+    except FileExistsError as e:
+        parser.error(f"{e}（使用--existing-pairs append接着写，或overwrite重新写）")
     
     print(f"开始爬取: {args.url}")
     print(f"最大处理帖子数: {args.max_threads}")
     
     # 爬取中文翻译存档，保存为txt文件
-    scraper.scrape_chinese_archive(args.url)
+    try:
+        scraper.scrape_chinese_archive(args.url, max_threads=args.max_threads, max_pages=args.max_pages)
+    finally:
+        scraper.close_pairs()
     
     print("\n爬取完成！")
+    if args.pairs_dir:
+        print(f"翻译对照已写入: {args.pairs_dir} (共{scraper.pair_count}个，可用pair_output.py转换格式)")
     
     # 显示保存的文件
     save_dir = "scraped_threads"
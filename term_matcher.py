@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+术语匹配器
+把整本术语词典编译成一个前缀树正则，单次从左到右扫描完成所有术语替换（最长匹配优先）
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+class TermMatcher:
+    """基于前缀树的单次扫描术语匹配器"""
+
+    def __init__(self, terms: Dict[str, str], ignore_case: bool = False, word_boundary: bool = True,
+                 ascii_boundary: bool = False):
+        """
+        Args:
+            terms: 英文术语 -> 译文 的映射
+            ignore_case: 是否忽略大小写
+            word_boundary: 是否要求术语两侧满足\\b单词边界（与原来的 r'\\b' + re.escape(term) + r'\\b' 语义一致）
+            ascii_boundary: 判断单词边界时只把ASCII字母、数字和下划线视为单词字符，
+                            中文术语与前后的汉字相连时仍能匹配（需要word_boundary为True）
+        """
+        self.ignore_case = ignore_case
+        self.word_boundary = word_boundary
+        self.ascii_boundary = ascii_boundary
+
+        # 规范化键 -> (原始术语, 译文)；忽略大小写时同一规范化键只保留第一个术语
+        self._lookup: Dict[str, Tuple[str, str]] = {}
+        for en_term, cn_term in terms.items():
+            if not en_term or not cn_term:
+                continue
+            key = en_term.lower() if ignore_case else en_term
+            if key not in self._lookup:
+                self._lookup[key] = (en_term, cn_term)
+
+        # re.IGNORECASE还会匹配 ſ(U+017F)、开尔文符号(U+212A) 这类lower()后不在词典中的变体，按casefold再查一次
+        self._folded: Dict[str, str] = {}
+        if ignore_case:
+            for key in self._lookup:
+                self._folded.setdefault(key.casefold(), key)
+
+        self._pattern = self._compile()
+
+    def __len__(self):
+        return len(self._lookup)
+
+    def _compile(self):
+        """把所有术语编译成一个前缀树正则"""
+        if not self._lookup:
+            return None
+
+        # 构建前缀树，空字符串键表示术语在此结束
+        trie = {}
+        for key in self._lookup:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        body = self._trie_to_regex(trie)
+        if self.word_boundary and self.ascii_boundary:
+            body = r'(?<![A-Za-z0-9_])(?:' + body + r')(?![A-Za-z0-9_])'
+        elif self.word_boundary:
+            body = r'\b' + body + r'\b'
+
+        flags = re.IGNORECASE if self.ignore_case else 0
+        return re.compile(body, flags)
+
+    def _trie_to_regex(self, node: Dict) -> str:
+        """递归地把前缀树节点转换为正则（贪婪可选组保证最长匹配优先，失败时回溯到较短术语）"""
+        alternatives = []
+        for char in sorted(key for key in node if key):
+            alternatives.append(re.escape(char) + self._trie_to_regex(node[char]))
+
+        if not alternatives:
+            return ''
+
+        if len(alternatives) == 1:
+            regex = alternatives[0]
+        else:
+            regex = '(?:' + '|'.join(alternatives) + ')'
+
+        if '' in node:
+            # 当前位置已经是完整术语，后续字符为可选
+            if len(alternatives) == 1:
+                regex = '(?:' + regex + ')'
+            regex += '?'
+
+        return regex
+
+    def _entry(self, text: str) -> Optional[Tuple[str, str]]:
+        """匹配到的文本对应的 (原始术语, 译文)，找不到时返回None"""
+        if not self.ignore_case:
+            return self._lookup.get(text)
+        entry = self._lookup.get(text.lower())
+        if entry is None:
+            key = self._folded.get(text.casefold())
+            entry = self._lookup.get(key) if key is not None else None
+        return entry
+
+    def _translate_match(self, match) -> str:
+        entry = self._entry(match.group(0))
+        return entry[1] if entry else match.group(0)
+
+    def replace(self, text: str) -> str:
+        """单次扫描替换文本中的所有术语"""
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(self._translate_match, text)
+
+    def findall(self, text: str) -> List[str]:
+        """文本中匹配到的所有片段（按原文大小写，不查词典，供只需要统计命中的调用方使用）"""
+        if self._pattern is None or not text:
+            return []
+        return self._pattern.findall(text)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """遍历文本中的术语匹配，返回 (起始位置, 结束位置, 原始术语)"""
+        if self._pattern is None or not text:
+            return
+        for match in self._pattern.finditer(text):
+            entry = self._entry(match.group(0))
+            if entry:
+                yield match.start(), match.end(), entry[0]
+
+# 已编译匹配器缓存：同一版本的词典只编译一次
+_MATCHER_CACHE: Dict[Tuple, TermMatcher] = {}
+_MATCHER_CACHE_SIZE = 64
+
+def get_term_matcher(terms: Dict[str, str], ignore_case: bool = False, word_boundary: bool = True,
+                     ascii_boundary: bool = False) -> TermMatcher:
+    """获取词典对应的匹配器，词典内容不变时复用已编译的匹配器"""
+    cache_key = (tuple(terms.items()), ignore_case, word_boundary, ascii_boundary)
+    matcher = _MATCHER_CACHE.get(cache_key)
+    if matcher is None:
+        matcher = TermMatcher(terms, ignore_case=ignore_case, word_boundary=word_boundary,
+                              ascii_boundary=ascii_boundary)
+        if len(_MATCHER_CACHE) >= _MATCHER_CACHE_SIZE:
+            # 淘汰最早加入的匹配器
+            _MATCHER_CACHE.pop(next(iter(_MATCHER_CACHE)))
+        _MATCHER_CACHE[cache_key] = matcher
+    return matcher
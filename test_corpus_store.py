@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试打包的翻译对语料库
+验证各种文件格式的统一、目录的增量导入、按索引字段过滤，以及学习模块从语料库加载
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from corpus_store import CORPUS_DB_NAME, CorpusStore, load_pairs, normalize_pair, open_corpus, pair_hash
+from translation_pair_mimic import TranslationPairMimic
+
+def write_json(path: str, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+def create_pairs_directory(directory: str):
+    """individual_pairs中出现过的几种格式"""
+    write_json(os.path.join(directory, 'pair_001.json'), [
+        {'source': 'Garchomp is fast.', 'target': '烈咬陆鲨速度很快。', 'source_lang': 'english',
+         'target_lang': 'chinese', 'metadata_section_type': 'OVERVIEW', 'metadata_source_file': 'garchomp.txt',
+         'metadata_id': 1},
+        {'source': '地震打击席多蓝恩。', 'target': 'Earthquake hits Heatran.'}
+    ])
+    write_json(os.path.join(directory, 'pair_002.json'), {
+        'id': 2, 'english': 'Scale Shot boosts Speed.', 'chinese': '鳞射提升速度。',
+        'section_type': 'SET_COMMENTS', 'source_file': 'garchomp.txt', 'confidence': 0.8
+    })
+    write_json(os.path.join(directory, 'pair_003.json'), {'translation_pairs': [
+        {'english': 'Fire Fang hits Ferrothorn.', 'chinese': '火焰牙打击坚果哑铃。', 'type': 'set_pair'}
+    ]})
+    with open(os.path.join(directory, 'broken.json'), 'w', encoding='utf-8') as f:
+        f.write('{"english": ')
+
+def test_normalize_pair():
+    """测试各种写法统一为english/chinese结构"""
+    pair = normalize_pair({'source': 'Hello there.', 'target': '你好。', 'source_lang': 'english',
+                           'target_lang': 'chinese', 'metadata_section_type': 'OVERVIEW', 'metadata_id': 3},
+                          'pair_003.json')
+    assert (pair['english'], pair['chinese']) == ('Hello there.', '你好。')
+    assert pair['section_type'] == 'OVERVIEW'
+    assert pair['source_file'] == 'pair_003.json'
+    assert pair['metadata'] == {'id': 3}
+    assert pair['content_hash'] == pair_hash('Hello there.', '你好。')
+
+    # 中译英方向的翻译对按检测到的语言交换
+    pair = normalize_pair({'source': '你好。', 'target': 'Hello there.', 'source_lang': 'chinese'})
+    assert (pair['english'], pair['chinese']) == ('Hello there.', '你好。')
+    assert normalize_pair({'en': 'Hi', 'zh': '嗨'})['english'] == 'Hi'
+    assert normalize_pair({'english': '', 'chinese': '空'}) is None
+    assert normalize_pair({'text': 'Hello'}) is None
+
+def test_import_and_filter():
+    """测试导入目录并按索引字段过滤"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        create_pairs_directory(work_dir)
+        with CorpusStore(os.path.join(work_dir, CORPUS_DB_NAME)) as corpus:
+            stats = corpus.import_directory(work_dir)
+            assert stats['files'] == 4 and stats['imported'] == 3 and stats['errors'] == 1
+            assert corpus.count() == 4
+
+            english = [pair['english'] for pair in corpus.iter_pairs()]
+            assert english == ['Garchomp is fast.', 'Earthquake hits Heatran.', 'Scale Shot boosts Speed.',
+                               'Fire Fang hits Ferrothorn.']
+            assert corpus.count(source_file='garchomp.txt') == 2
+            assert [pair['confidence'] for pair in corpus.iter_pairs(section_type='SET_COMMENTS')] == [0.8]
+            assert corpus.count(origin_file='pair_003.json') == 1
+            assert corpus.contains('Scale Shot boosts Speed.', '鳞射提升速度。')
+            assert len(list(corpus.iter_pairs(limit=2))) == 2
+            assert corpus.section_counts() == {'': 2, 'OVERVIEW': 1, 'SET_COMMENTS': 1}
+
+            # 查询使用索引
+            plan = corpus.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM pairs WHERE content_hash = ?", ('x',)).fetchall()
+            assert 'idx_pairs_content_hash' in str([tuple(row) for row in plan])
+
+def test_incremental_import():
+    """测试再次打开目录时只导入新增或修改过的文件，并删除已不存在的文件的翻译对"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        create_pairs_directory(work_dir)
+        os.remove(os.path.join(work_dir, 'broken.json'))
+        assert len(load_pairs(work_dir)) == 4
+
+        with open_corpus(work_dir) as corpus:
+            assert corpus.import_directory(work_dir)['skipped'] == 3
+
+        write_json(os.path.join(work_dir, 'pair_002.json'),
+                   {'english': 'Scale Shot breaks Multiscale.', 'chinese': '鳞射打破多重鳞片。'})
+        os.remove(os.path.join(work_dir, 'pair_003.json'))
+        write_json(os.path.join(work_dir, 'pair_004.json'), [{'english': 'New pair.', 'chinese': '新的翻译对。'}])
+
+        with open_corpus(work_dir) as corpus:
+            english = {pair['english'] for pair in corpus.iter_pairs()}
+        assert english == {'Garchomp is fast.', 'Earthquake hits Heatran.', 'Scale Shot breaks Multiscale.',
+                           'New pair.'}
+
+        # 已导入的文件变得无法读取时，删除它上次导入的翻译对
+        with open(os.path.join(work_dir, 'pair_004.json'), 'w', encoding='utf-8') as f:
+            f.write('[{"english": ')
+        with open_corpus(work_dir) as corpus:
+            assert corpus.count(origin_file='pair_004.json') == 0
+            assert corpus.import_directory(work_dir)['errors'] == 1
+
+        # 也可以直接打开语料库文件
+        assert len(load_pairs(os.path.join(work_dir, CORPUS_DB_NAME), section_type='OVERVIEW')) == 1
+
+def test_loader_uses_corpus():
+    """测试学习模块从语料库加载（包括列表格式的文件）"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        create_pairs_directory(work_dir)
+        mimic = TranslationPairMimic(work_dir)
+        assert len(mimic.translation_pairs) == 4
+        assert os.path.exists(os.path.join(work_dir, CORPUS_DB_NAME))
+
+        # 生成的翻译对记录原文件中的id，而不是语料库的行号
+        base_ids = {pair['english']: mimic.generate_mimic_pair(pair)['base_pair_id'] for pair in mimic.translation_pairs}
+        assert base_ids['Scale Shot boosts Speed.'] == 2
+        assert base_ids['Garchomp is fast.'] == 1
+
+if __name__ == "__main__":
+    test_normalize_pair()
+    test_import_and_filter()
+    test_incremental_import()
+    test_loader_uses_corpus()
+    print("所有测试通过")
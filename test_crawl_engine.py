@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试并发爬取引擎
+在本地启动一个模拟XenForo论坛的HTTP服务，验证分页跟随、并发抓取、失败重试、失败帖子的统计和令牌桶限速
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from crawl_engine import CrawlEngine, TokenBucket
+from smogon_scraper import SmogonScraper
+
+ARCHIVE_PAGE_1 = """<html><body>
+<div class="structItem-title"><a href="/forums/threads/garchomp.1001/" data-tp-primary="on">Garchomp</a></div>
+<div class="structItem-title"><a href="/forums/threads/heatran.1002/" data-tp-primary="on">Heatran</a></div>
+<nav class="pageNav"><a class="pageNav-jump pageNav-jump--next" href="/forums/forums/archive.824/page-2">Next</a></nav>
+</body></html>"""
+
+ARCHIVE_PAGE_2 = """<html><body>
+<div class="structItem-title"><a href="/forums/threads/clefable.1003/" data-tp-primary="on">Clefable</a></div>
+</body></html>"""
+
+THREAD_TEMPLATE = """<html><body>
+<h1 class="p-title-value">{title}</h1>
+<article><div class="bbWrapper">[SET]<br>Pokemon: {title}<br>[SET COMMENTS]<br>{title} is great.</div></article>
+<article><div class="bbWrapper">Reply that should be ignored</div></article>
+</body></html>"""
+
+class ForumStubHandler(BaseHTTPRequestHandler):
+    """模拟论坛页面的请求处理器"""
+    failures_left = {}
+    requested_paths = []
+
+    def do_GET(self):
+        ForumStubHandler.requested_paths.append(self.path)
+
+        # 模拟临时故障：某些页面前几次返回503
+        if ForumStubHandler.failures_left.get(self.path, 0) > 0:
+            ForumStubHandler.failures_left[self.path] -= 1
+            self._send(503, "Service Unavailable")
+            return
+
+        if self.path == "/forums/forums/archive.824/":
+            self._send(200, ARCHIVE_PAGE_1)
+        elif self.path == "/forums/forums/archive.824/page-2":
+            self._send(200, ARCHIVE_PAGE_2)
+        elif self.path.startswith("/forums/threads/"):
+            title = self.path.split('/')[3].split('.')[0].capitalize()
+            self._send(200, THREAD_TEMPLATE.format(title=title))
+        else:
+            self._send(404, "Not Found")
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server():
+    """启动本地模拟服务"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ForumStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def test_scrape_archive_with_pagination_and_retry():
+    """测试跟随分页并发抓取，且临时故障会被重试"""
+    ForumStubHandler.failures_left = {"/forums/threads/heatran.1002/": 2}
+    ForumStubHandler.requested_paths = []
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        scraper = SmogonScraper(base_url=base_url, max_workers=3, requests_per_second=50, state_db=None)
+        scraper.crawler.backoff_factor = 0.01
+
+        with tempfile.TemporaryDirectory() as save_dir:
+            scraper.scrape_chinese_archive(f"{base_url}/forums/forums/archive.824/", save_dir=save_dir)
+
+            files = sorted(os.listdir(save_dir))
+            print(f"保存的文件: {files}")
+            assert files == ['Clefable.txt', 'Garchomp.txt', 'Heatran.txt']
+
+            with open(os.path.join(save_dir, 'Heatran.txt'), 'r', encoding='utf-8') as f:
+                content = f.read()
+            assert 'Pokemon: Heatran' in content
+            assert 'Reply that should be ignored' not in content
+
+        assert len(scraper.processed_urls) == 3
+        assert scraper.crawler.stats['retries'] == 2
+        assert scraper.crawler.stats['failures'] == 0
+        assert "/forums/forums/archive.824/page-2" in ForumStubHandler.requested_paths
+    finally:
+        server.shutdown()
+
+def test_max_threads_limit():
+    """测试最大帖子数限制：收集到足够的帖子后不再读取后面的分页"""
+    ForumStubHandler.failures_left = {}
+    ForumStubHandler.requested_paths = []
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        scraper = SmogonScraper(base_url=base_url, requests_per_second=50, state_db=None)
+        with tempfile.TemporaryDirectory() as save_dir:
+            scraper.scrape_chinese_archive(f"{base_url}/forums/forums/archive.824/", max_threads=1, save_dir=save_dir)
+            assert len(os.listdir(save_dir)) == 1
+        assert "/forums/forums/archive.824/page-2" not in ForumStubHandler.requested_paths
+    finally:
+        server.shutdown()
+
+def test_failed_threads_reported():
+    """测试处理失败的帖子由爬取引擎统计，不记为已处理"""
+    ForumStubHandler.failures_left = {"/forums/threads/heatran.1002/": 5}
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        scraper = SmogonScraper(base_url=base_url, requests_per_second=50, max_retries=1, state_db=None)
+        scraper.crawler.backoff_factor = 0.01
+        with tempfile.TemporaryDirectory() as save_dir:
+            scraper.scrape_chinese_archive(f"{base_url}/forums/forums/archive.824/", save_dir=save_dir)
+            assert sorted(os.listdir(save_dir)) == ['Clefable.txt', 'Garchomp.txt']
+        assert f"{base_url}/forums/threads/heatran.1002/" not in scraper.processed_urls
+        assert len(scraper.processed_urls) == 2
+        assert scraper.crawler.stats['failures'] == 1
+    finally:
+        server.shutdown()
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def get(self, url, **kwargs):
+        return self.responses.pop(0)
+
+def test_retry_after_capped_and_responses_closed():
+    """测试Retry-After等待有上限，最后一次失败的响应也会关闭"""
+    responses = [FakeResponse(503, {'Retry-After': '3600'}), FakeResponse(503)]
+    engine = CrawlEngine(FakeSession(list(responses)), requests_per_second=0, max_retries=1, max_retry_after=0.01)
+    assert engine._backoff_delay(0, responses[0]) == 0.01
+    try:
+        engine.fetch("https://example.com/threads/1/", stream=True)
+        assert False, "应当抛出异常"
+    except requests.HTTPError:
+        pass
+    assert all(response.closed for response in responses)
+    assert engine.stats == {'requests': 2, 'retries': 1, 'failures': 1}
+
+def test_token_bucket_rate():
+    """测试令牌桶限速"""
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    print(f"5个请求耗时: {elapsed:.3f}秒")
+    # 第一个令牌立即可用，后续4个每个需要约0.05秒
+    assert elapsed >= 0.18
+
+if __name__ == "__main__":
+    test_scrape_archive_with_pagination_and_retry()
+    test_max_threads_limit()
+    test_failed_threads_reported()
+    test_retry_after_capped_and_responses_closed()
+    test_token_bucket_rate()
+    print("所有测试通过")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量爬取
+验证爬取状态数据库的持久化、条件请求(304)、只有主帖变化时才重写txt文件，全量刷新后更新爬取状态，以及保存失败的帖子计为失败
+"""
+
+import sys
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crawl_state import CrawlStateStore
+from smogon_scraper import SmogonScraper
+
+THREAD_TEMPLATE = """<html><body>
+<h1 class="p-title-value">Garchomp</h1>
+<article data-content="post-101"><div class="bbWrapper">{first_post}</div></article>
+{replies}
+</body></html>"""
+
+class ThreadStubHandler(BaseHTTPRequestHandler):
+    """支持ETag的模拟帖子页面"""
+    first_post = "Garchomp is a strong setup sweeper."
+    reply_ids = []
+    status_log = []
+
+    def do_GET(self):
+        replies = ''.join(
+            f'<article data-content="post-{post_id}"><div class="bbWrapper">Reply {post_id}</div></article>'
+            for post_id in ThreadStubHandler.reply_ids
+        )
+        body = THREAD_TEMPLATE.format(first_post=ThreadStubHandler.first_post, replies=replies).encode('utf-8')
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            ThreadStubHandler.status_log.append(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        ThreadStubHandler.status_log.append(200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_incremental_scraping():
+    """测试增量爬取流程"""
+    ThreadStubHandler.first_post = "Garchomp is a strong setup sweeper."
+    ThreadStubHandler.reply_ids = []
+    ThreadStubHandler.status_log = []
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThreadStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    thread_url = f"http://127.0.0.1:{server.server_address[1]}/forums/threads/garchomp.1001/"
+
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            state_db = os.path.join(work_dir, 'crawl_state.db')
+            save_dir = os.path.join(work_dir, 'scraped_threads')
+            os.makedirs(save_dir)
+            saved_file = os.path.join(save_dir, 'Garchomp.txt')
+
+            # 第一次爬取：完整下载并保存
+            scraper = SmogonScraper(requests_per_second=0, state_db=state_db)
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert os.path.exists(saved_file)
+            assert scraper.crawl_results == {'updated': 1}
+            first_mtime = os.path.getmtime(saved_file)
+
+            # 新进程再次爬取：发送条件请求，得到304
+            scraper = SmogonScraper(requests_per_second=0, state_db=state_db)
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert ThreadStubHandler.status_log == [200, 304]
+            assert scraper.crawl_results == {'not_modified': 1}
+
+            # 只有新回复：页面变化但主帖未变，不重写文件，记录最新回复ID
+            ThreadStubHandler.reply_ids = [205]
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert scraper.crawl_results['unchanged'] == 1
+            assert os.path.getmtime(saved_file) == first_mtime
+            assert scraper.crawl_state.get(thread_url)['last_post_id'] == 205
+
+            # 主帖被编辑：重新保存
+            ThreadStubHandler.first_post = "Garchomp is a bulky Stealth Rock setter."
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert scraper.crawl_results['updated'] == 1
+            with open(saved_file, 'r', encoding='utf-8') as f:
+                assert 'Stealth Rock' in f.read()
+
+            # 本地文件被删除时不发送条件请求，直接重新下载
+            os.remove(saved_file)
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert os.path.exists(saved_file)
+            assert ThreadStubHandler.status_log[-1] == 200
+            scraper.crawl_state.close()
+
+            # 全量刷新：不发送条件请求、总是重新保存，并记录新的状态
+            ThreadStubHandler.first_post = "Garchomp runs Swords Dance."
+            refresh = SmogonScraper(requests_per_second=0, state_db=state_db, full_refresh=True)
+            refresh._scrape_thread_to_file(thread_url, save_dir)
+            assert ThreadStubHandler.status_log[-1] == 200
+            assert refresh.crawl_results == {'updated': 1}
+            refresh_hash = refresh.crawl_state.get(thread_url)['first_post_hash']
+            refresh._scrape_thread_to_file(thread_url, save_dir)
+            assert ThreadStubHandler.status_log[-1] == 200
+            refresh.crawl_state.close()
+
+            # 之后的增量爬取使用刷新时记录的状态
+            scraper = SmogonScraper(requests_per_second=0, state_db=state_db)
+            assert scraper.crawl_state.get(thread_url)['first_post_hash'] == refresh_hash
+            scraper._scrape_thread_to_file(thread_url, save_dir)
+            assert ThreadStubHandler.status_log[-1] == 304
+            scraper.crawl_state.close()
+
+            # 保存失败：抛出异常，不计为更新，也不记录爬取状态
+            failing = SmogonScraper(requests_per_second=0, state_db=os.path.join(work_dir, 'failing.db'))
+            with pytest.raises(OSError):
+                failing._scrape_thread_to_file(thread_url, os.path.join(work_dir, 'missing_dir'))
+            assert failing.crawl_results == {}
+            assert failing.crawl_state.get(thread_url) is None
+            results = failing.crawler.run([thread_url], lambda url: failing._scrape_thread_to_file(
+                url, os.path.join(work_dir, 'missing_dir')))
+            assert isinstance(results[thread_url], OSError)
+            failing.crawl_state.close()
+    finally:
+        server.shutdown()
+
+def test_state_store_persistence():
+    """测试状态数据库持久化"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, 'state.db')
+        store = CrawlStateStore(db_path)
+        store.record('https://example.com/t/1', etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+        store.close()
+
+        store = CrawlStateStore(db_path)
+        assert store.conditional_headers('https://example.com/t/1') == {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+        }
+        assert store.conditional_headers('https://example.com/t/2') == {}
+        assert store.known_urls() == {'https://example.com/t/1'}
+        store.close()
+
+if __name__ == "__main__":
+    test_incremental_scraping()
+    test_state_store_persistence()
+    print("所有测试通过")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试领域分类
+验证单次扫描的关键词命中计数、单词边界、加权和按顺序两种判定方式，以及批量分类与逐条分类一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_domain_classifier import legacy_classify, load_domains
+from domain_classifier import DomainClassifier, domains_from_keywords, get_domain_classifier
+from nllb_learning_module import NLLBLearningModule
+
+DOMAINS = {
+    'moves': {'keywords': ['move', 'priority', 'ability'], 'difficulty_weight': 1.2},
+    'strategy': {'keywords': ['team', 'counter', 'priority'], 'difficulty_weight': 1.5},
+    'chinese': {'keywords': ['宝可梦', 'EV']}
+}
+
+def test_keyword_hits():
+    """测试各领域命中的不同关键词数，同一关键词可以属于多个领域"""
+    classifier = DomainClassifier(DOMAINS)
+    assert classifier.keyword_hits("Priority moves and priority abilities") == {'moves': 3, 'strategy': 1}
+    assert classifier.keyword_hits("这只宝可梦的ev分配") == {'chinese': 2}
+    assert classifier.keyword_hits("") == {}
+
+def test_word_boundaries():
+    """测试英文关键词按单词边界匹配，中文关键词可以与汉字相连"""
+    classifier = DomainClassifier(DOMAINS)
+    assert classifier.keyword_hits("removed teammates every counterplay") == {}
+    assert classifier.keyword_hits("teams, counters; MOVE!") == {'moves': 1, 'strategy': 2}
+    assert classifier.classify("every level") == "general"
+
+def test_weighted_and_priority():
+    """测试加权判定（分数相同时取顺序靠前的领域）和按顺序判定"""
+    weighted = DomainClassifier(DOMAINS)
+    assert weighted.classify("move and team") == "strategy"
+    assert weighted.classify("move and ability and team") == "moves"
+    assert weighted.classify_with_hits("plain text") == ("general", {})
+
+    tie = DomainClassifier(domains_from_keywords({'strategy': ['team'], 'pokemon': ['move']}))
+    assert tie.classify("team move") == "strategy"
+
+    priority = DomainClassifier(domains_from_keywords({'pokemon': ['move'], 'gaming': ['team', 'counter']}),
+                                default="other", priority=True)
+    assert priority.classify("team counter move") == "pokemon"
+    assert priority.classify("team") == "gaming"
+    assert priority.classify("nothing") == "other"
+
+def test_batch_matches_single():
+    """测试批量分类与逐条分类一致（关键词不会跨文本匹配）"""
+    classifier = DomainClassifier(DOMAINS)
+    texts = ["move", "", "宝可梦", "team\x00move", "mo", "ve team", "priority counter", None]
+    assert classifier.score_batch(texts) == [classifier.classify_with_hits(text or '') for text in texts]
+    assert classifier.classify_batch(texts[:3]) == ["moves", "general", "chinese"]
+    assert classifier.classify_batch([]) == []
+
+def test_config_domains():
+    """测试配置文件中的领域与原写法在没有子串误命中的文本上结果一致"""
+    domains = load_domains("transformers_config.json")
+    classifier = get_domain_classifier(domains)
+    assert get_domain_classifier(dict(domains)) is classifier
+    texts = ["Use a Choice Band and hold Leftovers.", "The team needs a lead and a pivot.",
+             "Weather and terrain mechanics matter.", "Burn and poison status"]
+    assert classifier.classify_batch(texts) == [legacy_classify(domains, text) for text in texts]
+    # 原写法中 type 命中了 prototype
+    assert legacy_classify(domains, "a prototype") != "general"
+    assert classifier.classify("a prototype") == "general"
+
+def test_module_features():
+    """测试学习模块保留各领域的关键词命中数"""
+    module = NLLBLearningModule()
+    features = module._score_pairs([("This Pokemon's best move wins the game.", "这只宝可梦的最佳技能。")])[0]
+    assert features['domain'] == module._classify_domain("This Pokemon's best move wins the game.") == "pokemon"
+    assert features['domain_hits'] == {'pokemon': 2, 'gaming': 1}
+
+if __name__ == "__main__":
+    test_keyword_hits()
+    test_word_boundaries()
+    test_weighted_and_priority()
+    test_batch_matches_single()
+    test_config_domains()
+    test_module_features()
+    print("所有测试通过")
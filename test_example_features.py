@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试样本特征缓存
+验证按内容哈希和评分器键缓存特征、批量评分与原来逐个特征的评分一致，以及再次加载语料库时不重新评分
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_example_features import (SAMPLE_PAIRS, enhanced_scorer, legacy_enhanced_features,
+                                        legacy_nllb_features)
+from corpus_store import CORPUS_DB_NAME
+from example_features import FeatureCache, scorer_key
+from nllb_learning_module import NLLBLearningModule
+
+EDGE_PAIRS = [
+    ("", "空的英文"),
+    ("Landorus-T", ""),
+    ("Giratina-O is great. Really!", "骑拉帝纳起源形态很强???"),
+    ("Mega Metagross can hits deals", "超级 巨金怪 可以"),
+]
+
+def count_calls(score_batch, calls: list):
+    """记录每次批量评分的翻译对数量"""
+    def wrapper(pairs):
+        calls.append(len(pairs))
+        return score_batch(pairs)
+    return wrapper
+
+def test_feature_cache():
+    """测试只有未缓存的翻译对才会评分，不同评分器键互不影响"""
+    conn = sqlite3.connect(":memory:")
+    calls = []
+    score = count_calls(lambda pairs: [{'length': len(source) + len(target)} for source, target in pairs], calls)
+    cache = FeatureCache(conn, scorer_key("test"))
+
+    pairs = [("a", "Hello", "你好"), ("b", "Hi", "嗨"), ("a", "Hello", "你好")]
+    assert cache.features(pairs, score) == [{'length': 7}, {'length': 3}, {'length': 7}]
+    assert calls == [2]
+    assert cache.features(pairs + [("c", "Bye", "再见")], score)[-1] == {'length': 5}
+    assert calls == [2, 1]
+    assert cache.features(pairs, score) == [{'length': 7}, {'length': 3}, {'length': 7}]
+    assert calls == [2, 1]
+
+    other = FeatureCache(conn, scorer_key("test", {'keywords': ['move']}))
+    assert other.lookup(["a", "b", "c"]) == {}
+    assert scorer_key("test", {'a': 1, 'b': 2}) == scorer_key("test", {'b': 2, 'a': 1})
+    cache.clear()
+    assert cache.lookup(["a"]) == {}
+
+def test_batch_matches_legacy():
+    """测试批量评分与原来逐个特征的评分一致"""
+    pairs = SAMPLE_PAIRS + EDGE_PAIRS
+    enhanced = enhanced_scorer()
+    assert enhanced._score_pairs(pairs) == [legacy_enhanced_features(enhanced, *pair) for pair in pairs]
+    nllb = NLLBLearningModule()
+    assert nllb._score_pairs(pairs) == [legacy_nllb_features(nllb, *pair) for pair in pairs]
+
+    # 单个特征的方法仍然可用
+    english, chinese = SAMPLE_PAIRS[1]
+    features = enhanced._score_pairs([(english, chinese)])[0]
+    assert enhanced._assess_difficulty(english) == features['difficulty']
+    assert enhanced._assess_quality(english, chinese) == features['quality_score']
+    assert enhanced._has_pokemon_terms(english) == features['has_pokemon_terms']
+    enhanced._extract_terms(english, chinese)
+    assert enhanced.term_dictionaries['pokemon_names']['Mega Scizor'] == features['term_candidates'][0][2]
+
+POKEMON = [("Garchomp", "烈咬陆鲨"), ("Scizor", "巨钳螳螂"), ("Landorus-T", "土地云灵兽"), ("Toxapex", "超坏星"),
+           ("Ferrothorn", "坚果哑铃"), ("Heatran", "席多蓝恩"), ("Tyranitar", "班基拉斯"), ("Clefable", "皮可西"),
+           ("Rotom-W", "清洗洛托姆"), ("Weavile", "玛狃拉"), ("Zapdos", "闪电鸟"), ("Kartana", "纸御剑")]
+ROLES = [("wallbreaker", "破盾手"), ("pivot", "轮转手"), ("hazard setter", "钉子手"), ("special wall", "特盾")]
+
+def write_pairs(directory: str):
+    """12个内容互不相似的翻译对文件"""
+    os.makedirs(directory, exist_ok=True)
+    for index, (name, chinese_name) in enumerate(POKEMON):
+        role, chinese_role = ROLES[index % len(ROLES)]
+        with open(os.path.join(directory, f"pair_{index:02d}.json"), 'w', encoding='utf-8') as f:
+            json.dump([{'english': f"{name} is a reliable {role} in this metagame.",
+                        'chinese': f"{chinese_name}是这个环境中可靠的{chinese_role}。"}], f, ensure_ascii=False)
+
+def test_reload_uses_cache():
+    """测试再次加载语料库时只为新增的翻译对评分，结果与不使用缓存时一致"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_pairs(data_dir)
+        calls = []
+        module = NLLBLearningModule()
+        module._score_pairs = count_calls(module._score_pairs, calls)
+        first = module.load_translation_data(data_dir)
+        assert calls == [12]
+        assert os.path.exists(os.path.join(data_dir, CORPUS_DB_NAME))
+
+        second = module.load_translation_data(data_dir)
+        assert calls == [12]
+        assert [(example.source_text, example.difficulty, example.quality_score, example.domain)
+                for example in first] == [(example.source_text, example.difficulty, example.quality_score,
+                                           example.domain) for example in second]
+
+        with open(os.path.join(data_dir, "pair_new.json"), 'w', encoding='utf-8') as f:
+            json.dump({'english': "Dragonite can set up Dragon Dance.", 'chinese': "快龙可以强化龙之舞。"}, f,
+                      ensure_ascii=False)
+        module.load_translation_data(data_dir)
+        assert calls == [12, 1]
+
+        module.config['data']['feature_cache'] = False
+        uncached = module.load_translation_data(data_dir)
+        assert calls == [12, 1, 13] and len(uncached) == 13
+
+def test_enhanced_reload_uses_cache():
+    """测试增强模块再次加载时术语词典与首次加载一致"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_pairs(data_dir)
+        dictionaries = []
+        for _ in range(2):
+            calls = []
+            module = enhanced_scorer()
+            module.learning_stats = {}
+            module._score_pairs = count_calls(module._score_pairs, calls)
+            module.load_translation_data(data_dir)
+            dictionaries.append((calls, module.term_dictionaries, len(module.training_examples)))
+        assert dictionaries[0][0] == [12] and dictionaries[1][0] == []
+        assert dictionaries[0][1] == dictionaries[1][1] and dictionaries[0][1]['pokemon_names']
+        assert dictionaries[0][2] == dictionaries[1][2] == 8
+
+if __name__ == "__main__":
+    test_feature_cache()
+    test_batch_matches_legacy()
+    test_reload_uses_cache()
+    test_enhanced_reload_uses_cache()
+    print("所有测试通过")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试主帖快速提取
+验证快速路径提取的标题和主帖文本与整页解析完全一致，并且明显更快
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_first_post import build_sample_thread, full_parse, fast_parse, run_benchmark
+from first_post_extractor import extract_first_post
+
+def test_same_output_as_full_parse():
+    """测试与整页解析结果一致"""
+    pages = [
+        build_sample_thread(replies=5),
+        # 嵌套div、自闭合div和多个class
+        '<h1 class="p-title-value extra">Heatran</h1>'
+        '<div class="bbWrapper js-post">line 1<div><div>nested</div>line 2</div><div/>tail</div>'
+        '<div class="bbWrapper">second post</div>',
+        # 属性使用单引号、大写标签
+        "<H1 class='p-title-value'>Clefable</H1><DIV class='bbWrapper'>Moonblast<br>Magic Guard</DIV>",
+    ]
+    for html in pages:
+        assert fast_parse(html.encode('utf-8')) == full_parse(html.encode('utf-8'))
+
+    title, text = fast_parse(pages[1].encode('utf-8'))
+    assert title == "Heatran"
+    assert text == "line 1\nnested\nline 2\ntail"
+
+def test_missing_parts():
+    """测试缺少标题或主帖时返回None"""
+    page = extract_first_post("<html><body><p>no post</p></body></html>")
+    assert page.title is None
+    assert page.post is None
+    assert page.text() == ""
+
+    page = extract_first_post('<h1 class="p-title-value">Only title</h1>')
+    assert page.title == "Only title"
+    assert page.post is None
+
+def test_unbalanced_html_fallback():
+    """测试div不配对时退回受限解析"""
+    html = '<h1 class="p-title-value">Broken</h1><div class="bbWrapper">unclosed <b>post</b>'
+    assert fast_parse(html.encode('utf-8')) == full_parse(html.encode('utf-8'))
+
+def test_faster_on_long_threads():
+    """测试长帖子页面上的耗时和内存"""
+    html = build_sample_thread(replies=200).encode('utf-8')
+    result = run_benchmark([('long_thread', html)], repeat=2)[0]
+    print(f"加速 {result['speedup']:.1f}x，内存降低 {result['memory_ratio']:.1f}x")
+    assert result['same_output']
+    assert result['speedup'] > 10
+    assert result['memory_ratio'] > 5
+
+if __name__ == "__main__":
+    test_same_output_as_full_parse()
+    test_missing_parts()
+    test_unbalanced_html_fallback()
+    test_faster_on_long_threads()
+    print("所有测试通过")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试数据格式转换
+验证按清单增量转换、多进程转换结果一致、逐项结构校验、增量去重，以及各个转换脚本共用同一个转换器
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import auto_convert
+import simple_format_converter
+from format_converter import MANIFEST_NAME, DataFormatConverter, validate_item
+
+def write_pairs(directory: str, start: int, count: int):
+    os.makedirs(directory, exist_ok=True)
+    for index in range(start, start + count):
+        with open(os.path.join(directory, f"pair_{index:03d}.json"), 'w', encoding='utf-8') as f:
+            json.dump([{'english': f"Garchomp uses Swords Dance number {index}.",
+                        'chinese': f"烈咬陆鲨第{index}次使用剑舞。", 'section_type': 'OVERVIEW'}], f,
+                      ensure_ascii=False)
+
+def read_outputs(directory: str) -> dict:
+    outputs = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json'):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                outputs[filename] = json.load(f)
+    return outputs
+
+def test_schema_validation():
+    """测试编译好的结构校验"""
+    item = {'source': 'Hello', 'target': '你好', 'source_lang': 'english', 'target_lang': 'chinese'}
+    assert validate_item(item) is None
+    assert validate_item(dict(item, target='  ')) == "字段 target 应为非空字符串"
+    assert validate_item(dict(item, source_lang='unknown')).startswith("字段 source_lang")
+    assert validate_item({'source': 'Hello'}) == "缺少字段 target"
+    assert validate_item([]) == "不是对象"
+
+def test_incremental_conversion():
+    """测试再次转换时只处理新增和修改过的文件，并删除已删除文件的输出"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'formatted')
+        write_pairs(input_dir, 0, 20)
+
+        converter = DataFormatConverter(input_dir, output_dir)
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['items']) == (20, 20)
+        assert os.path.exists(os.path.join(output_dir, MANIFEST_NAME))
+        output_mtime = os.stat(os.path.join(output_dir, 'pair_000.json')).st_mtime_ns
+
+        # 新增10个文件只转换这10个
+        write_pairs(input_dir, 20, 10)
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['unchanged']) == (10, 20)
+        assert os.stat(os.path.join(output_dir, 'pair_000.json')).st_mtime_ns == output_mtime
+
+        # 只改修改时间：按内容哈希判断没有变化，不重写输出
+        input_file = os.path.join(input_dir, 'pair_001.json')
+        os.utime(input_file, (1, 1))
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['unchanged']) == (0, 30)
+
+        # 修改内容和删除文件
+        write_pairs(input_dir, 1, 1)
+        with open(input_file, 'w', encoding='utf-8') as f:
+            json.dump({'source': 'Changed text.', 'target': '修改后的文本。'}, f, ensure_ascii=False)
+        os.remove(os.path.join(input_dir, 'pair_002.json'))
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['removed']) == (1, 1)
+        assert not os.path.exists(os.path.join(output_dir, 'pair_002.json'))
+        assert read_outputs(output_dir)['pair_001.json'][0]['source'] == 'Changed text.'
+        assert converter.validate_output()
+
+        # 关闭增量转换时全部重新转换
+        assert converter.convert_directory(incremental=False)
+        assert converter.stats['converted'] == 29
+
+def test_parallel_matches_serial():
+    """测试多进程转换与单进程结果一致"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        write_pairs(input_dir, 0, 12)
+        with open(os.path.join(input_dir, 'broken.json'), 'w', encoding='utf-8') as f:
+            f.write('{"english": ')
+
+        serial = DataFormatConverter(input_dir, os.path.join(work_dir, 'serial'))
+        parallel = DataFormatConverter(input_dir, os.path.join(work_dir, 'parallel'))
+        assert serial.convert_directory(workers=1)
+        assert parallel.convert_directory(workers=3)
+        assert read_outputs(os.path.join(work_dir, 'serial')) == read_outputs(os.path.join(work_dir, 'parallel'))
+        assert parallel.stats['failed'] == 1 and parallel.stats['converted'] == 12
+
+def test_incremental_deduplicate():
+    """测试增量转换时新文件与未变化文件中的翻译对重复也能去掉"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'formatted')
+        write_pairs(input_dir, 0, 3)
+        converter = DataFormatConverter(input_dir, output_dir, deduplicate=True)
+        assert converter.convert_directory()
+
+        with open(os.path.join(input_dir, 'pair_000.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with open(os.path.join(input_dir, 'pair_copy.json'), 'w', encoding='utf-8') as f:
+            json.dump(data + [{'english': 'A brand new sentence here.', 'chinese': '一个全新的句子。'}], f,
+                      ensure_ascii=False)
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.duplicate_count) == (1, 1)
+        assert len(read_outputs(output_dir)['pair_copy.json']) == 1
+
+        # 与未变化文件中的翻译对近似重复（签名从上次保存的结果中恢复）
+        english = ("Garchomp is a fast and powerful Dragon type that can set up Swords Dance "
+                   "and sweep teams that lack a faster revenge killer or a sturdy physical wall.")
+        chinese = "烈咬陆鲨是快速而强力的龙属性宝可梦，可以使用剑舞强化，横扫缺少更快的收割手或坚固物理盾的队伍。"
+        with open(os.path.join(input_dir, 'pair_long.json'), 'w', encoding='utf-8') as f:
+            json.dump({'english': english, 'chinese': chinese}, f, ensure_ascii=False)
+        assert converter.convert_directory()
+        with open(os.path.join(input_dir, 'pair_near.json'), 'w', encoding='utf-8') as f:
+            json.dump({'english': english.replace('fast', 'quick'), 'chinese': chinese}, f, ensure_ascii=False)
+        assert converter.convert_directory()
+        # 全部重复的文件与没有有效项的文件分开统计
+        assert (converter.stats['unchanged'], converter.stats['deduplicated'], converter.stats['empty'],
+                converter.duplicate_count) == (5, 1, 0, 1)
+        assert 'pair_near.json' not in read_outputs(output_dir)
+        assert converter.convert_directory()
+        assert (converter.stats['unchanged'], converter.stats['deduplicated']) == (5, 1)
+
+def test_incremental_deduplicate_keeps_dropped_pairs():
+    """测试重复项的代表所在文件修改后，依赖它的未变化文件重新转换，结果与完整转换一致"""
+    pair_p = {'english': 'Garchomp can set up Swords Dance on passive foes.', 'chinese': '烈咬陆鲨可以在被动的对手面前使用剑舞。'}
+    pair_q = {'english': 'Toxapex walls most physical attackers.', 'chinese': '超坏星能挡住大多数物理攻击手。'}
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'formatted')
+        os.makedirs(input_dir)
+        for filename, data in (('a.json', [pair_p, pair_q]), ('b.json', [pair_p])):
+            with open(os.path.join(input_dir, filename), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        converter = DataFormatConverter(input_dir, output_dir, deduplicate=True)
+        assert converter.convert_directory()
+        assert list(read_outputs(output_dir)) == ['a.json']
+
+        with open(os.path.join(input_dir, 'a.json'), 'w', encoding='utf-8') as f:
+            json.dump([pair_q], f, ensure_ascii=False)
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['unchanged']) == (2, 0)
+        incremental = read_outputs(output_dir)
+        assert [item['source'] for item in incremental['b.json']] == [pair_p['english']]
+
+        full_dir = os.path.join(work_dir, 'full')
+        assert DataFormatConverter(input_dir, full_dir, deduplicate=True).convert_directory()
+        assert read_outputs(full_dir) == incremental
+
+        # 代表所在的文件删除后同样重新转换
+        os.remove(os.path.join(input_dir, 'a.json'))
+        with open(os.path.join(input_dir, 'c.json'), 'w', encoding='utf-8') as f:
+            json.dump([pair_q, pair_p], f, ensure_ascii=False)
+        assert converter.convert_directory()
+        assert converter.convert_directory()
+        os.remove(os.path.join(input_dir, 'b.json'))
+        assert converter.convert_directory()
+        assert [item['source'] for item in read_outputs(output_dir)['c.json']] == [pair_q['english'], pair_p['english']]
+
+def test_deduplicate_after_plain_run():
+    """测试不去重的转换之后在同一输出目录去重转换：清单中没有exact_key的文件重新转换"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'formatted')
+        write_pairs(input_dir, 0, 3)
+        assert DataFormatConverter(input_dir, output_dir).convert_directory()
+
+        converter = DataFormatConverter(input_dir, output_dir, deduplicate=True)
+        assert converter.convert_directory()
+        assert (converter.stats['converted'], converter.stats['failed']) == (3, 0)
+        assert converter.convert_directory()
+        assert converter.stats['unchanged'] == 3
+
+def test_failed_file_drops_output():
+    """测试转换失败的文件不保留上次的输出"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'formatted')
+        write_pairs(input_dir, 0, 2)
+        converter = DataFormatConverter(input_dir, output_dir)
+        assert converter.convert_directory()
+
+        with open(os.path.join(input_dir, 'pair_001.json'), 'w', encoding='utf-8') as f:
+            f.write('{"english": ')
+        assert converter.convert_directory()
+        assert converter.stats['failed'] == 1
+        assert list(read_outputs(output_dir)) == ['pair_000.json']
+        assert converter.validate_output()
+
+def test_scripts_share_converter():
+    """测试转换脚本使用同一个转换器"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        write_pairs(input_dir, 0, 3)
+        assert auto_convert.convert_directory(input_dir, os.path.join(work_dir, 'out')) == 3
+        assert auto_convert.convert_directory(input_dir, os.path.join(work_dir, 'out')) == 3
+        # 和原来的脚本一样只输出标准字段；源文本和目标文本字段可以混用
+        assert set(read_outputs(os.path.join(work_dir, 'out'))['pair_000.json'][0]) == {
+            'source', 'target', 'source_lang', 'target_lang'}
+        with open(os.path.join(input_dir, 'mixed.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'english': 'Use Stealth Rock early.', 'translation': '尽早使用隐形岩。'},
+                       {'en': 'Garchomp outspeeds.', 'chinese': '烈咬陆鲨速度更快。', 'note': 'x'},
+                       {'english': 'No target here.'}], f, ensure_ascii=False)
+        assert simple_format_converter.convert_directory(input_dir, os.path.join(work_dir, 'simple')) == 4
+        mixed = read_outputs(os.path.join(work_dir, 'simple'))['mixed.json']
+        assert [(item['source'], item['target']) for item in mixed] == [
+            ('Use Stealth Rock early.', '尽早使用隐形岩。'), ('Garchomp outspeeds.', '烈咬陆鲨速度更快。')]
+        assert 'metadata_note' not in mixed[1]
+
+        # DataFormatConverter默认保留其他字段；改变设置后不沿用上次的输出
+        converter = DataFormatConverter(input_dir, os.path.join(work_dir, 'simple'))
+        assert converter.convert_directory()
+        assert converter.stats['converted'] == 4
+        assert read_outputs(os.path.join(work_dir, 'simple'))['mixed.json'][1]['metadata_note'] == 'x'
+
+if __name__ == "__main__":
+    test_schema_validation()
+    test_incremental_conversion()
+    test_parallel_matches_serial()
+    test_incremental_deduplicate()
+    test_incremental_deduplicate_keeps_dropped_pairs()
+    test_deduplicate_after_plain_run()
+    test_failed_file_drops_output()
+    test_scripts_share_converter()
+    print("所有测试通过")
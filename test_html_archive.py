@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试原始HTML归档和离线回放
+先从本地HTTP服务爬取并归档，关闭服务后回放，验证生成的文件与在线爬取完全一致
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+
+from benchmark_first_post import build_sample_thread
+from enhance_scraped_files import SEPARATOR, enhance_scraped_files
+from html_archive import ArchivingSession, HtmlArchive, ReplaySession, create_session, parse_as_of
+from http_client import PooledSession
+from smogon_scraper import SmogonScraper
+from url_translator import URLTranslator
+
+THREAD_COUNT = 5
+
+def thread_page(index: int) -> bytes:
+    return build_sample_thread(replies=3).replace('Garchomp &amp; Friends', f'Thread {index}').encode('utf-8')
+
+def archive_page() -> bytes:
+    links = ''.join(f'<a data-tp-primary="on" href="/threads/thread.{index}/">Thread {index}</a>'
+                    for index in range(THREAD_COUNT))
+    return f'<html><body>{links}</body></html>'.encode('utf-8')
+
+class ForumHandler(BaseHTTPRequestHandler):
+    """模拟论坛：/forums/archive/ 为存档列表，/threads/thread.N/ 为帖子页面"""
+
+    def do_GET(self):
+        if self.path.startswith('/forums/archive/'):
+            body = archive_page()
+        elif self.path.startswith('/threads/thread.'):
+            body = thread_page(int(self.path.split('.')[1].rstrip('/')))
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def read_dir(path: str) -> dict:
+    contents = {}
+    for filename in sorted(os.listdir(path)):
+        with open(os.path.join(path, filename), 'r', encoding='utf-8') as f:
+            contents[filename] = f.read()
+    return contents
+
+def test_store_and_lookup():
+    """测试内容去重和按时间查找快照"""
+    with tempfile.TemporaryDirectory() as archive_dir:
+        archive = HtmlArchive(archive_dir)
+        url = "https://www.smogon.com/forums/threads/a.1/"
+        first = archive.store(url, b"<html>v1</html>", {'Content-Type': 'text/html', 'Server': 'x'},
+                              fetched_at=100.0)
+        archive.store(url, b"<html>v2</html>", fetched_at=200.0)
+        # 同样的内容只保存一份
+        archive.store("https://www.smogon.com/forums/threads/b.2/", b"<html>v1</html>", fetched_at=150.0)
+
+        assert archive.get(url) == b"<html>v2</html>"
+        assert archive.get(url, as_of=150.0) == b"<html>v1</html>"
+        assert archive.get(url, as_of=50.0) is None
+        assert archive.lookup(url, as_of=100.0)['headers'] == {'Content-Type': 'text/html'}
+        assert archive.stats() == {'snapshots': 3, 'urls': 2, 'objects': 2}
+        assert archive.load(first) == b"<html>v1</html>"
+
+        session = ReplaySession(archive)
+        response = session.get(url, stream=True)
+        assert b''.join(response.iter_content(4)) == b"<html>v2</html>"
+        with pytest.raises(requests.ConnectionError):
+            session.get("https://www.smogon.com/forums/threads/missing.3/")
+        archive.close()
+
+def test_create_session():
+    """测试根据参数创建会话"""
+    assert type(create_session()) is PooledSession
+    with tempfile.TemporaryDirectory() as archive_dir:
+        assert isinstance(create_session(archive_dir), ArchivingSession)
+        assert isinstance(create_session(archive_dir, replay=True), ReplaySession)
+        with pytest.raises(ValueError):
+            create_session(None, replay=True)
+        with pytest.raises(FileNotFoundError):
+            create_session(os.path.join(archive_dir, 'missing'), replay=True)
+
+def test_parse_as_of():
+    """测试解析命令行的快照时间"""
+    assert parse_as_of("1700000000") == 1700000000.0
+    assert parse_as_of("2026-10-01T12:00:00") == datetime(2026, 10, 1, 12).timestamp()
+    assert parse_as_of("2026-10-01") == datetime(2026, 10, 1).timestamp()
+    with pytest.raises(ValueError):
+        parse_as_of("yesterday")
+
+def test_crawl_then_replay():
+    """测试在线爬取归档后，离线回放生成相同的文件"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ForumHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    archive_url = f"{base_url}/forums/archive/"
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive_dir = os.path.join(work_dir, 'archive')
+        live_dir = os.path.join(work_dir, 'live')
+        try:
+            scraper = SmogonScraper(base_url=base_url, requests_per_second=0, state_db=None,
+                                    archive_dir=archive_dir)
+            scraper.scrape_chinese_archive(archive_url, save_dir=live_dir)
+            streamed = SmogonScraper(base_url=base_url, requests_per_second=0, state_db=None,
+                                     archive_dir=os.path.join(work_dir, 'stream_archive'),
+                                     stream_first_post=True)
+            streamed.scrape_chinese_archive(archive_url, max_threads=1, save_dir=os.path.join(work_dir, 'stream'))
+            live_translation = URLTranslator(archive_dir=archive_dir).scrape_first_post(f"{base_url}/threads/thread.0/")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert len(read_dir(live_dir)) == THREAD_COUNT
+        archive = HtmlArchive(archive_dir)
+        assert archive.stats()['urls'] == THREAD_COUNT + 1
+        assert archive.get(archive_url) == archive_page()
+        assert archive.get(f"{base_url}/threads/thread.2/") == thread_page(2)
+        # 归档时不流式下载，保存的都是完整页面
+        assert not streamed.stream_first_post
+        stream_archive = HtmlArchive(os.path.join(work_dir, 'stream_archive'))
+        thread_urls = [url for url in stream_archive.urls() if '/threads/' in url]
+        assert len(thread_urls) == 1
+        assert stream_archive.get(thread_urls[0]) == thread_page(int(thread_urls[0].split('.')[-1].rstrip('/')))
+        snapshot = archive.lookup(f"{base_url}/threads/thread.0/")
+        assert snapshot['complete'] and archive.load(snapshot['digest']) == thread_page(0)
+
+        # 服务已关闭，回放只读取归档，两次回放结果相同
+        for run in range(2):
+            replay_dir = os.path.join(work_dir, f'replay_{run}')
+            replayer = SmogonScraper(base_url=base_url, state_db="unused.db", archive_dir=archive_dir, replay=True)
+            assert replayer.crawl_state is None
+            replayer.scrape_chinese_archive(archive_url, save_dir=replay_dir)
+            assert read_dir(replay_dir) == read_dir(live_dir)
+        assert not os.path.exists("unused.db")
+
+        translator = URLTranslator(archive_dir=archive_dir, replay=True)
+        assert translator.scrape_first_post(f"{base_url}/threads/thread.0/") == live_translation
+        # 早于所有快照的时间点没有可回放的页面
+        translator = URLTranslator(archive_dir=archive_dir, replay=True, as_of=snapshot['fetched_at'] - 3600)
+        assert translator.scrape_first_post(f"{base_url}/threads/thread.0/") is None
+
+        # 增强文件：在线失败的文件在回放时重新生成
+        enhance_dir = os.path.join(work_dir, 'enhance')
+        os.makedirs(enhance_dir)
+        with open(os.path.join(enhance_dir, 'thread_1.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"{base_url}/threads/thread.1/\n中文分析" + SEPARATOR + "旧内容")
+        enhance_scraped_files(enhance_dir, archive_dir=archive_dir, replay=True)
+        enhanced = read_dir(enhance_dir)['thread_1.txt']
+        assert enhanced.count(SEPARATOR) == 1
+        assert enhanced.startswith(f"{base_url}/threads/thread.1/\n中文分析")
+        assert 'Garchomp is a strong setup sweeper.' in enhanced
+
+def test_replay_many_threads_quickly():
+    """测试回放大量归档帖子的耗时"""
+    base_url = "https://forum.test"
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive = HtmlArchive(os.path.join(work_dir, 'archive'))
+        thread_count = 300
+        links = ''.join(f'<a data-tp-primary="on" href="/threads/t.{index}/">T</a>' for index in range(thread_count))
+        archive.store(f"{base_url}/forums/archive/", f'<html><body>{links}</body></html>'.encode('utf-8'))
+        for index in range(thread_count):
+            archive.store(f"{base_url}/threads/t.{index}/", thread_page(index))
+
+        start = time.perf_counter()
+        replayer = SmogonScraper(base_url=base_url, max_workers=8, archive_dir=archive.root, replay=True)
+        replayer.scrape_chinese_archive(f"{base_url}/forums/archive/", save_dir=os.path.join(work_dir, 'out'))
+        elapsed = time.perf_counter() - start
+        print(f"回放 {thread_count} 个帖子耗时 {elapsed:.2f}秒")
+
+        assert len(os.listdir(os.path.join(work_dir, 'out'))) == thread_count
+        assert elapsed < 30
+
+if __name__ == "__main__":
+    test_store_and_lookup()
+    test_create_session()
+    test_parse_as_of()
+    test_crawl_then_replay()
+    test_replay_many_threads_quickly()
+    print("所有测试通过")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共享HTTP客户端
+验证连接复用、自动重试、响应大小限制和请求统计
+"""
+
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from http_client import PooledSession, ResponseTooLarge, get_shared_session
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1长连接服务，记录每个请求来自哪个客户端连接"""
+    protocol_version = 'HTTP/1.1'
+    client_ports = []
+    flaky_failures = 0
+
+    def do_GET(self):
+        KeepAliveHandler.client_ports.append(self.client_address[1])
+        if self.path == '/flaky' and KeepAliveHandler.flaky_failures < 2:
+            KeepAliveHandler.flaky_failures += 1
+            self.reply(503, b'busy')
+        elif self.path == '/big':
+            self.reply(200, b'x' * 5000)
+        elif self.path == '/big-undeclared':
+            # 不声明长度，读到连接关闭为止
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(b'y' * 5000)
+            self.close_connection = True
+        else:
+            self.reply(200, f'page {self.path}'.encode('utf-8'))
+
+    def reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    KeepAliveHandler.client_ports = []
+    KeepAliveHandler.flaky_failures = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_connection_reuse():
+    """测试连续请求复用同一个连接"""
+    server, base_url = start_server()
+    try:
+        check_connection_reuse(base_url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def check_connection_reuse(base_url: str):
+    session = PooledSession()
+    for index in range(20):
+        assert session.get(f"{base_url}/threads/{index}").text == f"page /threads/{index}"
+
+    assert len(KeepAliveHandler.client_ports) == 20
+    assert len(set(KeepAliveHandler.client_ports)) == 1
+    assert session.connections_opened() == 1
+
+    summary = session.metrics.summary()
+    assert summary['requests'] == 20
+    assert summary['errors'] == 0
+    assert summary['bytes_downloaded'] == sum(len(f"page /threads/{index}") for index in range(20))
+    assert summary['p95_ms'] >= summary['p50_ms']
+    print(session.metrics_summary())
+
+def test_retry_and_size_limit():
+    """测试可重试状态码自动重试，以及超过大小限制时中止"""
+    server, base_url = start_server()
+    try:
+        check_retry_and_size_limit(base_url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def check_retry_and_size_limit(base_url: str):
+    session = PooledSession(backoff_factor=0, max_response_bytes=1000)
+    response = session.get(f"{base_url}/flaky")
+    assert response.status_code == 200
+    assert KeepAliveHandler.flaky_failures == 2
+
+    no_retry = PooledSession(max_retries=0)
+    KeepAliveHandler.flaky_failures = 0
+    assert no_retry.get(f"{base_url}/flaky").status_code == 503
+
+    for path in ('/big', '/big-undeclared'):
+        with pytest.raises(ResponseTooLarge):
+            session.get(base_url + path)
+    assert session.metrics.summary()['errors'] == 2
+
+    # 流式请求只检查声明的长度，内容由调用方读取
+    with pytest.raises(ResponseTooLarge):
+        session.get(f"{base_url}/big", stream=True)
+    streamed = session.get(f"{base_url}/big-undeclared", stream=True)
+    assert len(b''.join(streamed.iter_content(1024))) == 5000
+
+    # 限制放宽后正常读取，连接池仍然可用
+    assert len(PooledSession(max_response_bytes=None).get(f"{base_url}/big").content) == 5000
+
+def test_shared_session():
+    """测试共享会话只创建一次"""
+    assert get_shared_session() is get_shared_session()
+    assert isinstance(get_shared_session(), PooledSession)
+
+if __name__ == "__main__":
+    test_connection_reuse()
+    test_retry_and_size_limit()
+    test_shared_session()
+    print("所有测试通过")
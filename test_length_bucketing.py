@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试按长度分桶的批次采样器
+验证每个样本在一个epoch内恰好出现一次、token预算模式不超预算，以及分桶后填充效率高于随机组批
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from length_bucketing import LengthBucketBatchSampler, padding_efficiency, random_batching_efficiency
+
+def make_lengths(count=200, seed=0):
+    """模拟SET单行和长段策略评论混合的长度分布"""
+    rng = np.random.default_rng(seed)
+    short = rng.integers(3, 12, size=count // 2)
+    long = rng.integers(150, 400, size=count - count // 2)
+    lengths = np.concatenate([short, long])
+    rng.shuffle(lengths)
+    return lengths
+
+def test_fixed_batch_size():
+    """测试固定批大小模式"""
+    lengths = make_lengths()
+    sampler = LengthBucketBatchSampler(lengths, batch_size=8, bucket_size_multiplier=10)
+    batches = list(sampler)
+
+    flat = sorted(index for batch in batches for index in batch)
+    assert flat == list(range(len(lengths)))
+    assert all(len(batch) <= 8 for batch in batches)
+    assert len(batches) == 25
+
+    stats = sampler.epoch_stats[-1]
+    baseline = random_batching_efficiency(lengths, batch_size=8)
+    print(f"分桶填充效率: {stats['efficiency']:.1%}，随机组批: {baseline['efficiency']:.1%}")
+    assert stats['efficiency'] > baseline['efficiency']
+    assert stats['efficiency'] > 0.8
+
+def test_token_budget():
+    """测试token预算模式"""
+    lengths = make_lengths()
+    sampler = LengthBucketBatchSampler(lengths, max_tokens=1024)
+    batches = list(sampler)
+
+    flat = sorted(index for batch in batches for index in batch)
+    assert flat == list(range(len(lengths)))
+    for batch in batches:
+        assert max(lengths[i] for i in batch) * len(batch) <= 1024
+
+    # 短样本可以组成更大的批次
+    assert max(len(batch) for batch in batches) > 8
+
+def test_epochs_reshuffle():
+    """测试每个epoch重新打乱且结果可复现"""
+    lengths = make_lengths()
+    sampler = LengthBucketBatchSampler(lengths, batch_size=8, seed=1)
+    assert len(sampler) == 25
+    first_epoch = list(sampler)
+    second_epoch = list(sampler)
+    assert first_epoch != second_epoch
+    assert [stats['epoch'] for stats in sampler.epoch_stats] == [0, 1]
+
+    again = LengthBucketBatchSampler(lengths, batch_size=8, seed=1)
+    assert list(again) == first_epoch
+
+def test_padding_efficiency_with_targets():
+    """测试同时统计源和目标的填充"""
+    stats = padding_efficiency([[0, 1]], [2, 4], [3, 3])
+    assert stats['real_tokens'] == 12
+    assert stats['padded_tokens'] == 14
+
+if __name__ == "__main__":
+    test_fixed_batch_size()
+    test_token_budget()
+    test_epochs_reshuffle()
+    test_padding_efficiency_with_targets()
+    print("所有测试通过")
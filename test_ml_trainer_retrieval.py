@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试TranslationMLTrainer的批量检索
+验证分块稀疏矩阵乘法 + argpartition 的结果与逐条计算余弦相似度一致
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from ml_trainer import TranslationMLTrainer
+
+ENGLISH_WORDS = ["garchomp", "heatran", "clefable", "stealth", "rock", "swords", "dance", "earthquake",
+                 "scale", "shot", "moon", "blast", "lava", "plume", "magic", "guard", "sweeper",
+                 "wall", "pivot", "setup", "special", "physical", "attacker", "coverage"]
+CHINESE_WORDS = ["烈咬陆鲨", "席多蓝恩", "皮可西", "隐形岩", "剑舞", "地震", "月亮之力", "喷烟", "魔法防守"]
+
+def build_trainer(pair_count=2000, seed=0):
+    """用随机生成的翻译对训练模型"""
+    rng = random.Random(seed)
+    pairs = [
+        {
+            'english': ' '.join(rng.choice(ENGLISH_WORDS) for _ in range(rng.randint(3, 12))),
+            'chinese': ''.join(rng.choice(CHINESE_WORDS) for _ in range(rng.randint(2, 6)))
+        }
+        for _ in range(pair_count)
+    ]
+
+    work_dir = tempfile.mkdtemp()
+    data_file = os.path.join(work_dir, 'pairs.json')
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'translation_pairs': pairs}, f, ensure_ascii=False)
+
+    trainer = TranslationMLTrainer(data_file, retrieval_backend="exact")
+    assert trainer.load_data()
+    assert trainer.prepare_training_data()
+    assert trainer.train_vectorizers()
+    return trainer
+
+def test_batch_matches_pairwise():
+    """测试批量检索与逐条余弦相似度结果一致"""
+    trainer = build_trainer()
+    # 强制分成多个块
+    trainer.SIMILARITY_BLOCK_SIZE = trainer.english_vectors.shape[0] * 7
+
+    queries = trainer.test_english[:50] + ["garchomp stealth rock", "unknown words", ""]
+    query_vectors = trainer.english_vectorizer.transform(queries)
+    indices, scores = trainer.retrieve_top_k(query_vectors, top_k=5)
+    assert indices.shape == (len(queries), 5)
+
+    for row, query_vector in enumerate(query_vectors):
+        expected = cosine_similarity(query_vector, trainer.english_vectors).flatten()
+        expected_top_scores = np.sort(expected)[::-1][:5]
+        assert np.allclose(scores[row], expected_top_scores)
+        assert np.allclose(expected[indices[row]], scores[row])
+
+    results = trainer.translate_batch(["garchomp stealth rock", "heatran lava plume"], top_k=3)
+    assert len(results) == 2
+    assert all(len(result) == 3 for result in results)
+    assert results[0] == trainer.translate_text("garchomp stealth rock", top_k=3)
+
+def test_evaluate_speed():
+    """测试评估数千个测试样本的速度"""
+    trainer = build_trainer(pair_count=15000, seed=1)
+    start = time.perf_counter()
+    results = trainer.evaluate_model()
+    elapsed = time.perf_counter() - start
+    print(f"评估 {results['test_samples']} 个测试样本耗时: {elapsed:.2f}秒")
+    assert results['test_samples'] == 3000
+    assert elapsed < 30
+
+if __name__ == "__main__":
+    test_batch_matches_pairwise()
+    test_evaluate_speed()
+    print("所有测试通过")
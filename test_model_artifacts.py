@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试可内存映射的模型格式
+验证保存后重新加载的模型与原模型检索结果一致，且向量和训练文本以内存映射方式加载
+"""
+
+import sys
+import os
+import pickle
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from ml_trainer import TranslationMLTrainer
+from model_artifacts import StringTable, save_strings, load_strings
+from test_ml_trainer_retrieval import build_trainer
+
+def is_memory_mapped(array) -> bool:
+    """沿着base链检查数组是否由内存映射文件支持（没有被复制）"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+def test_save_and_load_roundtrip():
+    """测试保存后加载的模型检索结果不变"""
+    trainer = build_trainer(pair_count=3000)
+    queries = trainer.test_english[:20] + ["garchomp stealth rock"]
+    expected = trainer.translate_batch(queries, top_k=3)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = os.path.join(work_dir, 'translation_model')
+        assert trainer.save_model(model_path)
+
+        start = time.perf_counter()
+        loaded = TranslationMLTrainer(retrieval_backend="exact")
+        assert loaded.load_model(model_path)
+        print(f"加载耗时: {(time.perf_counter() - start) * 1000:.1f}毫秒")
+
+        assert is_memory_mapped(loaded.english_vectors.data)
+        assert is_memory_mapped(loaded.english_vectors.indices)
+        assert isinstance(loaded.train_chinese, StringTable)
+        assert list(loaded.train_chinese) == list(trainer.train_chinese)
+        assert loaded.stats['training_pairs'] == trainer.stats['training_pairs']
+
+        actual = loaded.translate_batch(queries, top_k=3)
+        for actual_row, expected_row in zip(actual, expected):
+            assert [text for text, _ in actual_row] == [text for text, _ in expected_row]
+            assert np.allclose([score for _, score in actual_row], [score for _, score in expected_row])
+
+        # 加载后的向量化器产生相同的向量
+        original = trainer.english_vectorizer.transform(queries)
+        reloaded = loaded.english_vectorizer.transform(queries)
+        assert abs(original - reloaded).max() < 1e-12
+
+def test_load_legacy_pickle():
+    """测试兼容旧版pickle模型文件"""
+    trainer = build_trainer(pair_count=200)
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = os.path.join(work_dir, 'translation_model.pkl')
+        with open(model_path, 'wb') as f:
+            pickle.dump({
+                'english_vectorizer': trainer.english_vectorizer,
+                'chinese_vectorizer': trainer.chinese_vectorizer,
+                'english_vectors': trainer.english_vectors,
+                'chinese_vectors': trainer.chinese_vectors,
+                'train_english': trainer.train_english,
+                'train_chinese': trainer.train_chinese,
+                'stats': trainer.stats
+            }, f)
+
+        loaded = TranslationMLTrainer(retrieval_backend="exact")
+        assert loaded.load_model(model_path)
+        assert loaded.translate_text("garchomp stealth rock") == trainer.translate_text("garchomp stealth rock")
+
+def test_string_table():
+    """测试字符串表"""
+    texts = ["Garchomp", "", "烈咬陆鲨", "Stealth Rock 隐形岩"]
+    with tempfile.TemporaryDirectory() as work_dir:
+        save_strings(work_dir, 'texts', texts)
+        table = load_strings(work_dir, 'texts')
+        assert len(table) == 4
+        assert list(table) == texts
+        assert table[-1] == texts[-1]
+        assert table[np.int64(2)] == "烈咬陆鲨"
+        assert table[1:3] == texts[1:3]
+
+        save_strings(work_dir, 'empty', [])
+        assert list(load_strings(work_dir, 'empty')) == []
+
+if __name__ == "__main__":
+    test_save_and_load_roundtrip()
+    test_load_legacy_pickle()
+    test_string_table()
+    print("所有测试通过")
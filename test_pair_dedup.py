@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试翻译对去重
+验证完全重复、近似重复的识别，不相关的翻译对不会被合并，以及语料库、格式转换和训练器的去重
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from corpus_store import load_pairs
+from format_converter import DataFormatConverter
+from ml_trainer import TranslationMLTrainer
+from pair_dedup import MinHasher, NearDuplicateIndex, deduplicate_pairs, english_shingles, find_duplicates
+
+BASE = {
+    'english': "Garchomp is a decent setup sweeper that can use the combination of Swords Dance and Scale Shot "
+               "to break through common checks such as Skarmory and Corviknight.",
+    'chinese': "烈咬陆鲨是一个不错的强化清场手，可以用剑舞和鳞射的组合突破盔甲鸟和钢铠鸦等常见的联防。"
+}
+
+def random_pairs(count: int, seed: int = 0):
+    """互不相关的翻译对"""
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+             for _ in range(3000)]
+    return [{'english': ' '.join(rng.choice(words) for _ in range(rng.randint(8, 30))),
+             'chinese': ''.join(chr(0x4e00 + rng.randrange(3000)) for _ in range(rng.randint(10, 40)))}
+            for _ in range(count)]
+
+def test_exact_and_near_duplicates():
+    """测试完全重复（只差空白、大小写、标点）和近似重复"""
+    pairs = [
+        BASE,
+        {'english': BASE['english'].upper() + '  ', 'chinese': BASE['chinese'].replace('，', ' ')},
+        {'english': BASE['english'].replace('decent', 'good'), 'chinese': BASE['chinese']},
+        {'english': "Heatran sets up Stealth Rock.", 'chinese': "席多蓝恩布置隐形岩。"},
+        # 英文相同、中文完全不同的翻译对不是重复
+        {'english': BASE['english'], 'chinese': "完全不同的另一种翻译，讲的是盔甲鸟如何撒钉和吹风。"}
+    ]
+    report = find_duplicates(pairs)
+    assert report.kept == [0, 3, 4]
+    assert report.clusters == {0: [1, 2]}
+    assert (report.exact_duplicates, report.near_duplicates) == (1, 1)
+
+    kept, report = deduplicate_pairs(pairs, near=False)
+    assert len(kept) == 4 and report.near_duplicates == 0
+
+    summary = report.to_dict(pairs)
+    assert summary['clusters'][0]['representative']['index'] == 0
+
+def test_signature_estimates_jaccard():
+    """测试MinHash签名估计的相似度接近真实的Jaccard相似度"""
+    hasher = MinHasher(num_perm=256)
+    first = english_shingles(BASE['english'])
+    second = english_shingles(BASE['english'][:100])
+    jaccard = len(set(first.tolist()) & set(second.tolist())) / len(set(first.tolist()) | set(second.tolist()))
+    estimate = (hasher.signature(first) == hasher.signature(second)).mean()
+    assert abs(estimate - jaccard) < 0.1
+
+def test_incremental_index():
+    """测试增量索引返回重复的代表"""
+    index = NearDuplicateIndex()
+    assert index.add('a', BASE['english'], BASE['chinese']) is None
+    duplicate = index.add('b', BASE['english'] + " Indeed.", BASE['chinese'])
+    assert duplicate.representative == 'a' and not duplicate.exact
+    assert index.add('c', BASE['english'] + " Indeed.", BASE['chinese']).representative == 'a'
+
+def test_scales_linearly():
+    """测试互不相关的翻译对不会被合并，且耗时与数量近似线性"""
+    pairs = random_pairs(6000)
+    start = time.perf_counter()
+    assert len(find_duplicates(pairs[:2000]).kept) == 2000
+    small = time.perf_counter() - start
+    start = time.perf_counter()
+    report = find_duplicates(pairs + [dict(pair) for pair in pairs[:100]])
+    large = time.perf_counter() - start
+    assert len(report.kept) == 6000 and report.exact_duplicates == 100
+    assert large < small * 3.1 * 2
+
+def test_loaders_deduplicate():
+    """测试语料库、格式转换和训练器的去重"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        pairs_dir = os.path.join(work_dir, 'pairs')
+        os.makedirs(pairs_dir)
+        item = {'source': BASE['english'], 'target': BASE['chinese'], 'source_lang': 'english',
+                'target_lang': 'chinese'}
+        for filename in ('pair_001_Garchomp.json', 'pair_001_Garchomp.txt.json'):
+            with open(os.path.join(pairs_dir, filename), 'w', encoding='utf-8') as f:
+                json.dump([item, {'source': 'Hello there friend.', 'target': '你好朋友。'}] if 'txt' in filename
+                          else [item], f, ensure_ascii=False)
+
+        assert len(load_pairs(pairs_dir)) == 3
+        assert [pair['origin_file'] for pair in load_pairs(pairs_dir, deduplicate=True)] == [
+            'pair_001_Garchomp.json', 'pair_001_Garchomp.txt.json'
+        ]
+        assert len(load_pairs(pairs_dir, deduplicate=True, limit=1)) == 1
+
+        converter = DataFormatConverter(pairs_dir, os.path.join(work_dir, 'formatted'), deduplicate=True)
+        assert converter.convert_directory()
+        assert converter.duplicate_count == 1
+        with open(os.path.join(work_dir, 'formatted', 'pair_001_Garchomp.txt.json'), 'r', encoding='utf-8') as f:
+            assert [entry['source'] for entry in json.load(f)] == ['Hello there friend.']
+
+        data_file = os.path.join(work_dir, 'pairs.json')
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump({'translation_pairs': [BASE, dict(BASE), {'english': 'Hi', 'chinese': '嗨'}]}, f)
+        trainer = TranslationMLTrainer(data_file, deduplicate=True)
+        assert trainer.load_data()
+        assert trainer.stats['total_pairs'] == 2 and trainer.stats['duplicate_pairs'] == 1
+
+if __name__ == "__main__":
+    test_exact_and_near_duplicates()
+    test_signature_estimates_jaccard()
+    test_incremental_index()
+    test_scales_linearly()
+    test_loaders_deduplicate()
+    print("所有测试通过")
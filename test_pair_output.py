@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试翻译对照的流式输出
+验证JSONL分片轮换和manifest、崩溃后接着写、JSON/CSV/TXT转换，以及爬虫边提取边写入
+"""
+
+import sys
+import os
+import csv
+import json
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pair_output import (MANIFEST_NAME, ShardedJsonlWriter, convert_jsonl, count_jsonl_pairs, iter_jsonl_pairs,
+                         write_json)
+from smogon_scraper import SmogonScraper
+from test_html_archive import THREAD_COUNT, ForumHandler
+
+PAIRS = [
+    {'english': f'Garchomp sets up Swords Dance {index}.', 'chinese': f'烈咬陆鲨使用剑舞 {index}。',
+     'source': 'test', 'type': 'test_pair'}
+    for index in range(20)
+]
+
+def test_shard_rotation():
+    """测试分片超过大小上限时轮换并维护manifest"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        with ShardedJsonlWriter(work_dir, max_shard_bytes=300) as writer:
+            writer.write_many(PAIRS)
+
+        with open(os.path.join(work_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        assert len(manifest['shards']) > 1
+        assert manifest['total_count'] == 20
+        assert manifest['shards'][0]['file'] == 'pairs-00000.jsonl'
+        assert all(shard['bytes'] <= 300 for shard in manifest['shards'])
+        assert list(iter_jsonl_pairs(work_dir)) == PAIRS
+        assert count_jsonl_pairs(work_dir) == 20
+
+def test_resume_after_crash():
+    """测试最后一行只写了一半时，重新打开会截掉这一行并接着写"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        writer = ShardedJsonlWriter(work_dir)
+        writer.write_many(PAIRS[:5])
+        # 模拟崩溃：写了一半，也没有更新manifest
+        writer._file.write(b'{"english": "Half')
+        writer._file.flush()
+        assert count_jsonl_pairs(work_dir) == 5
+        assert len(list(iter_jsonl_pairs(work_dir))) == 5
+
+        with ShardedJsonlWriter(work_dir) as resumed:
+            assert resumed.total_count == 5
+            resumed.write_many(PAIRS[5:])
+        writer._file.close()
+        assert list(iter_jsonl_pairs(work_dir)) == PAIRS
+
+def test_convert_formats():
+    """测试把分片转换为JSON/CSV/TXT，JSON与原来json.dump的输出一致"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        pairs_dir = os.path.join(work_dir, 'pairs')
+        with ShardedJsonlWriter(pairs_dir, max_shard_bytes=500) as writer:
+            writer.write_many(PAIRS)
+
+        json_file = os.path.join(work_dir, 'out')
+        assert convert_jsonl(pairs_dir, json_file, 'json') == 20
+        with open(json_file + '.json', 'r', encoding='utf-8') as f:
+            text = f.read()
+        data = json.loads(text)
+        assert data['translation_pairs'] == PAIRS
+        assert data['metadata']['total_count'] == 20
+        assert data['statistics']['type_distribution'] == {'test_pair': 20}
+        assert text == json.dumps(data, ensure_ascii=False, indent=2)
+
+        assert convert_jsonl(pairs_dir, os.path.join(work_dir, 'out'), 'csv') == 20
+        with open(os.path.join(work_dir, 'out.csv'), 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        assert len(rows) == 21 and rows[1][0] == PAIRS[0]['english']
+
+        assert convert_jsonl(pairs_dir, os.path.join(work_dir, 'out'), 'txt') == 20
+        with open(os.path.join(work_dir, 'out.txt'), 'r', encoding='utf-8') as f:
+            text = f.read()
+        assert "总数量: 20" in text and "对照 20:" in text
+
+        # 没有翻译对时也是合法的JSON
+        write_json([], os.path.join(work_dir, 'empty.json'))
+        with open(os.path.join(work_dir, 'empty.json'), 'r', encoding='utf-8') as f:
+            assert json.load(f)['translation_pairs'] == []
+
+def test_scraper_writes_pairs():
+    """测试爬虫提取出翻译对就写入分片，不在内存中保留时也能保存和统计"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        pairs_dir = os.path.join(work_dir, 'pairs')
+        scraper = SmogonScraper(state_db=None, pairs_dir=pairs_dir, keep_pairs_in_memory=False)
+        lines = ["Garchomp is a strong wallbreaker.", "烈咬陆鲨是强力的破盾手。"]
+        scraper._extract_direct_pairs(lines, "test")
+        assert scraper.translation_pairs == []
+        assert scraper.pair_count == 1
+        assert count_jsonl_pairs(pairs_dir) == 1
+        assert scraper._get_statistics()['source_distribution'] == {'test': 1}
+
+        output = os.path.join(work_dir, 'saved')
+        scraper.save_translations(output, 'json')
+        with open(output + '.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['translation_pairs'][0]['english'] == lines[0]
+        assert data['metadata']['scraper_version'] == '1.0'
+        scraper.close_pairs()
+
+        # 目录中已有分片时默认拒绝使用，append接着写，overwrite重新写
+        with pytest.raises(FileExistsError):
+            SmogonScraper(state_db=None, pairs_dir=pairs_dir)
+        scraper = SmogonScraper(state_db=None, pairs_dir=pairs_dir, keep_pairs_in_memory=False,
+                                existing_pairs='append')
+        scraper._extract_direct_pairs(lines, "test")
+        assert scraper.pair_count == 2
+        scraper.close_pairs()
+        scraper = SmogonScraper(state_db=None, pairs_dir=pairs_dir, keep_pairs_in_memory=False,
+                                existing_pairs='overwrite')
+        assert scraper.pair_count == 0
+        scraper._extract_direct_pairs(lines, "test")
+        assert scraper.pair_count == count_jsonl_pairs(pairs_dir) == 1
+        scraper.close_pairs()
+        with pytest.raises(ValueError):
+            ShardedJsonlWriter(pairs_dir, existing='skip')
+
+        # 没有设置pairs_dir时行为不变
+        scraper = SmogonScraper(state_db=None)
+        scraper._extract_direct_pairs(lines, "test")
+        assert scraper.pair_count == len(scraper.translation_pairs) == 1
+
+def test_crawl_writes_pairs():
+    """测试爬取存档时从保存的帖子中提取翻译对并写入分片"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ForumHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        pairs_dir = os.path.join(work_dir, 'pairs')
+        try:
+            scraper = SmogonScraper(base_url=base_url, max_workers=4, requests_per_second=0, state_db=None,
+                                    pairs_dir=pairs_dir, keep_pairs_in_memory=False)
+            scraper.scrape_chinese_archive(f"{base_url}/forums/archive/", save_dir=os.path.join(work_dir, 'threads'))
+            scraper.close_pairs()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # 每个模拟帖子的主帖有一组英文-中文对照
+        pairs = list(iter_jsonl_pairs(pairs_dir))
+        assert scraper.pair_count == count_jsonl_pairs(pairs_dir) == len(pairs) >= THREAD_COUNT
+        assert {pair['source'] for pair in pairs} == {f'Thread {index}' for index in range(THREAD_COUNT)}
+        with open(os.path.join(pairs_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            assert json.load(f)['total_count'] == len(pairs)
+
+if __name__ == "__main__":
+    test_shard_rotation()
+    test_resume_after_crash()
+    test_convert_formats()
+    test_scraper_writes_pairs()
+    test_crawl_writes_pairs()
+    print("所有测试通过")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试并行提取翻译对
+验证多进程提取的翻译对和统计信息与单进程完全一致，并记录每个文件的耗时
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ml_translation_extractor import MLTranslationExtractor
+
+SEPARATOR = "=" * 80 + "\nORIGINAL THREAD FIRST POST\n" + "=" * 80
+
+def make_thread_file(index: int) -> str:
+    """生成一个包含OVERVIEW、SET COMMENTS和STRATEGY COMMENTS的帖子文件"""
+    chinese = f"""[OVERVIEW]
+宝可梦{index}号是一只强大的清场手。
+[SET]
+name: Swords Dance
+[SET COMMENTS]
+招式说明
+剑舞可以提升攻击{index}。
+[SET CREDITS]
+[STRATEGY COMMENTS]
+Other Options
+可以携带隐形岩{index}。
+Checks and Counters
+水系宝可梦{index}可以克制它。
+[SET CREDITS]"""
+    english = f"""[OVERVIEW]
+Pokemon number {index} is a strong sweeper.
+[SET]
+name: Swords Dance
+[SET COMMENTS]
+Swords Dance boosts attack {index}.
+[SET CREDITS]
+[STRATEGY COMMENTS]
+Other Options
+It can run Stealth Rock {index}.
+Checks and Counters
+Water types {index} check it.
+[SET CREDITS]"""
+    return f"{chinese}\n{SEPARATOR}\n{english}\n"
+
+def run_extraction(scraped_dir: str, workers: int) -> MLTranslationExtractor:
+    extractor = MLTranslationExtractor(scraped_dir)
+    extractor.extract_all_files(workers=workers)
+    return extractor
+
+def test_parallel_matches_serial():
+    """测试多进程与单进程结果一致"""
+    with tempfile.TemporaryDirectory() as scraped_dir:
+        for index in range(24):
+            with open(os.path.join(scraped_dir, f"thread_{index:02d}.txt"), 'w', encoding='utf-8') as f:
+                f.write(make_thread_file(index))
+        # 没有分割线的文件会被跳过
+        with open(os.path.join(scraped_dir, "broken.txt"), 'w', encoding='utf-8') as f:
+            f.write("no separator here")
+
+        serial = run_extraction(scraped_dir, workers=1)
+        parallel = run_extraction(scraped_dir, workers=4)
+
+        assert serial.translation_pairs == parallel.translation_pairs
+        assert serial.stats == parallel.stats
+        assert serial.stats['processed_files'] == 25
+        assert serial.stats['overview_pairs'] == 24
+        assert serial.stats['set_comments_pairs'] == 24
+        assert serial.stats['total_pairs'] == 48
+
+        # 结果按文件名顺序合并
+        assert [pair.source_file for pair in parallel.translation_pairs][:2] == ["thread_00.txt"] * 2
+        assert parallel.workers == 4
+        assert set(parallel.file_timings) == set(os.listdir(scraped_dir))
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    print("所有测试通过")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试进程内分阶段流水线
+验证生成器阶段串联、检查点续跑、阶段耗时统计，以及从归档回放运行完整的帖子处理流水线
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from html_archive import HtmlArchive
+from pipeline_runner import Stage, StagedPipeline, ThreadPipeline
+from smogon_scraper import SmogonScraper
+from test_parallel_extraction import make_thread_file
+
+BASE_URL = "https://forum.test"
+
+def test_staged_pipeline_and_resume():
+    """测试阶段串联、耗时统计和检查点续跑"""
+    calls = {'double': 0, 'slow': 0}
+
+    def double(items):
+        for item in items:
+            calls['double'] += 1
+            yield {'value': item['value'] * 2}
+
+    def slow(items):
+        for item in items:
+            calls['slow'] += 1
+            time.sleep(0.01)
+            if item['value'] % 4 == 0:
+                yield {'value': item['value'] + 1}
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        pipeline = StagedPipeline([Stage('double', double), Stage('slow', slow)], checkpoint_dir)
+        inputs = [{'value': value} for value in range(10)]
+        results = pipeline.run(inputs)
+        assert results == [{'value': value * 2 + 1} for value in range(0, 10, 2)]
+        assert pipeline.stats['double'].items_out == 10
+        assert pipeline.stats['slow'].items_out == 5
+        # 慢阶段的耗时只计入它自己
+        assert pipeline.stats['slow'].seconds >= 0.09
+        assert pipeline.stats['double'].seconds < pipeline.stats['slow'].seconds
+
+        with open(os.path.join(checkpoint_dir, '01_double.jsonl'), 'r', encoding='utf-8') as f:
+            assert len(f.readlines()) == 10
+
+        # 输入相同时从最后完成的检查点继续，不再执行任何阶段
+        assert pipeline.run(inputs, resume=True) == results
+        assert calls == {'double': 10, 'slow': 10}
+        assert pipeline.stats['slow'].resumed
+
+        # 只有第一个阶段完成时，从它的检查点继续执行第二个阶段
+        os.remove(os.path.join(checkpoint_dir, '02_slow.jsonl'))
+        assert pipeline.run(inputs, resume=True) == results
+        assert calls == {'double': 10, 'slow': 20}
+
+        # 输入变化时重新运行
+        assert pipeline.run(inputs[:2], resume=True) == [{'value': 1}]
+        assert calls['double'] == 12
+
+def thread_html(title: str, text: str) -> bytes:
+    body = '<br>'.join(text.split('\n'))
+    return (f'<html><body><h1 class="p-title-value">{title}</h1>'
+            f'<div class="bbWrapper">{body}</div><div class="bbWrapper">reply</div></body></html>').encode('utf-8')
+
+def build_archive(archive_dir: str, count: int) -> list:
+    """归档count个中文帖子（开头为英文原帖链接）和对应的英文原帖，以及一个开头不是链接的帖子"""
+    archive = HtmlArchive(archive_dir)
+    urls = []
+    for index in range(count):
+        chinese, english = make_thread_file(index).split("\n" + "=" * 80 + "\nORIGINAL THREAD FIRST POST\n" + "=" * 80 + "\n")
+        english_url = f"{BASE_URL}/threads/en.{index}/"
+        chinese_url = f"{BASE_URL}/threads/cn.{index}/"
+        archive.store(english_url, thread_html(f"EN {index}", english))
+        archive.store(chinese_url, thread_html(f"CN {index}", f"{english_url}\n{chinese}"))
+        urls.append(chinese_url)
+
+    no_link_url = f"{BASE_URL}/threads/no-link.99/"
+    archive.store(no_link_url, thread_html("No link", "没有链接的帖子"))
+    urls.append(no_link_url)
+    # 归档中不存在的链接
+    urls.append(f"{BASE_URL}/threads/missing.100/")
+    return urls
+
+def test_thread_pipeline_from_archive():
+    """测试从归档回放运行 爬取 -> 筛选 -> 增强 -> 提取 -> 转换 -> 拆分"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        archive_dir = os.path.join(work_dir, 'archive')
+        urls = build_archive(archive_dir, 3)
+        output_dir = os.path.join(work_dir, 'individual_pairs')
+
+        scraper = SmogonScraper(base_url=BASE_URL, archive_dir=archive_dir, replay=True)
+        pipeline = ThreadPipeline(scraper, save_dir=os.path.join(work_dir, 'threads'), output_dir=output_dir,
+                                  checkpoint_dir=os.path.join(work_dir, 'checkpoints'))
+        results = pipeline.run(urls)
+
+        stats = pipeline.pipeline.stats
+        assert stats['scrape'].items_out == 4
+        assert stats['filter'].items_out == 3
+        assert stats['enhance'].items_out == 3
+        assert stats['extract'].items_out == 6
+        assert len(results) == 6
+        assert sorted(os.listdir(os.path.join(work_dir, 'threads'))) == ['CN 0.txt', 'CN 1.txt', 'CN 2.txt']
+
+        files = sorted(os.listdir(output_dir))
+        assert files[0] == 'pair_001_CN_0.json'
+        with open(os.path.join(output_dir, files[0]), 'r', encoding='utf-8') as f:
+            item = json.load(f)[0]
+        assert item['source'] == 'Swords Dance boosts attack 0.'
+        assert item['source_lang'] == 'english'
+        assert item['target_lang'] == 'chinese'
+        assert '剑舞' in item['target']
+        assert item['metadata_section_type'] == 'SET_COMMENTS'
+
+        # 第二批翻译对编号接在已有文件之后
+        second = ThreadPipeline(scraper, save_dir=None, output_dir=output_dir, checkpoint_dir=None)
+        assert [result['id'] for result in second.run(urls[:1])] == [7, 8]
+
+        # 删除中间的文件后编号仍接在最大编号之后，不覆盖已有文件
+        os.remove(os.path.join(output_dir, files[0]))
+        assert [result['id'] for result in second.run(urls[:1])] == [9, 10]
+        assert len(os.listdir(output_dir)) == 9
+
+if __name__ == "__main__":
+    test_staged_pipeline_and_resume()
+    test_thread_pipeline_from_archive()
+    print("所有测试通过")
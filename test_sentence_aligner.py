@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试基于长度的句子对齐
+验证句子切分、1-1 / 2-1 / 1-2 对齐、带状动态规划的可达性，以及individual_pairs的句子级拆分
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sentence_aligner import align_lengths, align_sentences, split_pair_item, split_pairs_directory, split_sentences
+from smogon_scraper import SmogonScraper
+
+ENGLISH = ("Garchomp is a strong wallbreaker that can set up Swords Dance on passive foes. "
+           "Earthquake hits Heatran. "
+           "Scale Shot breaks through Multiscale and boosts its Speed, letting it outspeed threats like Dragonite after one boost. "
+           "Fire Fang hits Ferrothorn.")
+CHINESE = ("烈咬陆鲨是强力的破盾手，可以在被动的对手面前使用剑舞。"
+           "地震打击席多蓝恩。"
+           "鳞射可以打破多重鳞片。同时提升速度，强化一次后能超速快龙等威胁。"
+           "火焰牙打击坚果哑铃。")
+
+def test_split_sentences():
+    """测试英文和中文句子切分"""
+    assert split_sentences("It works. Mega Charizard Y is fast! (It is.)\nNext line", 'english') == [
+        "It works.", "Mega Charizard Y is fast!", "(It is.)", "Next line"
+    ]
+    assert split_sentences("第一句。第二句！“引用。”第三句", 'chinese') == ["第一句。", "第二句！", "“引用。”", "第三句"]
+
+def test_align_with_merge():
+    """测试1-1对齐和中文两句合并为一句"""
+    english = split_sentences(ENGLISH, 'english')
+    chinese = split_sentences(CHINESE, 'chinese')
+    assert (len(english), len(chinese)) == (4, 5)
+
+    pairs = align_sentences(english, chinese)
+    assert [(pair.english_indices, pair.chinese_indices) for pair in pairs] == [
+        ((0,), (0,)), ((1,), (1,)), ((2,), (2, 3)), ((3,), (4,))
+    ]
+    assert pairs[2].chinese == "鳞射可以打破多重鳞片。同时提升速度，强化一次后能超速快龙等威胁。"
+
+    # 交换两边时得到2-1合并
+    reverse = align_lengths([len(s) for s in chinese], [len(s) for s in english])
+    assert [bead[:2] for bead in reverse][2] == ((2, 3), (2,))
+
+def test_band_reaches_end():
+    """测试句子数差别很大和很长的输入都能覆盖全部句子"""
+    beads = align_lengths([30], [10] * 50)
+    assert sum(len(bead[1]) for bead in beads) == 50
+    assert sum(len(bead[0]) for bead in beads) == 1
+
+    lengths = [20 + (index * 7) % 40 for index in range(3000)]
+    beads = align_lengths(lengths, [length // 3 for length in lengths])
+    assert len(beads) == 3000
+    assert all(bead[0] == bead[1] for bead in beads)
+
+def test_split_pairs_directory():
+    """测试把individual_pairs中的翻译对拆分为句子级翻译对"""
+    item = {'source': ENGLISH, 'target': CHINESE, 'source_lang': 'english', 'target_lang': 'chinese',
+            'metadata_id': 3}
+    results = split_pair_item(item)
+    assert len(results) == 4
+    assert results[1]['source'] == "Earthquake hits Heatran."
+    assert results[1]['target'] == "地震打击席多蓝恩。"
+    assert results[1]['metadata_id'] == 3
+    assert results[1]['metadata_sentence_index'] == 1
+
+    # 中译英方向的翻译对保持方向
+    reverse = split_pair_item({'source': CHINESE, 'target': ENGLISH, 'source_lang': 'chinese', 'target_lang': 'english'})
+    assert reverse[1]['source'] == "地震打击席多蓝恩。"
+
+    # 只有一句时原样返回
+    single = {'source': 'Hello.', 'target': '你好。'}
+    assert split_pair_item(single) == [single]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'pairs')
+        output_dir = os.path.join(work_dir, 'sentences')
+        os.makedirs(input_dir)
+        with open(os.path.join(input_dir, 'pair_001.json'), 'w', encoding='utf-8') as f:
+            json.dump([item, single], f, ensure_ascii=False)
+
+        stats = split_pairs_directory(input_dir, output_dir)
+        assert stats == {'files': 1, 'input_pairs': 2, 'output_pairs': 5}
+        with open(os.path.join(output_dir, 'pair_001.json'), 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 5
+
+def test_scraper_smart_pairing():
+    """测试SmogonScraper在行数不同时按长度对齐"""
+    english = split_sentences(ENGLISH, 'english')
+    chinese = split_sentences(CHINESE, 'chinese')
+    scraper = SmogonScraper(state_db=None)
+    scraper._pair_set_contents(english, chinese, "test")
+    assert [pair['type'] for pair in scraper.translation_pairs] == ['set_smart_pair'] * 4
+    assert scraper.translation_pairs[1]['chinese'] == "地震打击席多蓝恩。"
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_align_with_merge()
+    test_band_reaches_end()
+    test_split_pairs_directory()
+    test_scraper_smart_pairing()
+    print("所有测试通过")
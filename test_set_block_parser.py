@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试单遍SET块解析
+验证块边界、结构化字段、章节查找，以及与原实现提取的配置行一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_set_parser import run_benchmark
+from set_block_parser import find_section, parse_marker, parse_set_blocks
+
+def test_block_boundaries():
+    """测试说明在空行、下一个[SET]和其他章节标记处结束"""
+    lines = [
+        "[OVERVIEW]",
+        "Overview text",
+        "[SET]",
+        "Garchomp @ Life Orb",
+        "[SET COMMENTS] Inline comment",
+        "Comment line",
+        "",
+        "Other content",
+        "[SET]",
+        "Pokemon: Dragapult",
+        "[SET COMMENTS]",
+        "Dragapult comment",
+        "[SET]",
+        "[SET COMMENTS]",
+        "Block without set lines",
+        "[SET]",
+        "宝可梦：烈咬陆鲨",
+        "[SET COMMENTS]",
+        "说明",
+        "[SET CREDITS]",
+        "Written by: someone",
+        "[SET]",
+        "Pokemon: Tyranitar",
+        "[SET COMMENTS]",
+        "Last comment line",
+    ]
+    records = parse_set_blocks(lines)
+    assert [record.set_lines for record in records] == [
+        ["Garchomp @ Life Orb"], ["Pokemon: Dragapult"], ["宝可梦：烈咬陆鲨"], ["Pokemon: Tyranitar"]
+    ]
+    assert records[0].comments == ["Inline comment", "Comment line"]
+    assert (records[0].start_line, records[0].end_line) == (2, 6)
+    assert records[1].comments == ["Dragapult comment"]
+    # 说明不会吞掉[SET CREDITS]之后的内容
+    assert records[2].comments == ["说明"]
+    # 最后一行也属于说明
+    assert records[3].comments == ["Last comment line"]
+    assert records[3].end_line == len(lines)
+
+def test_structured_fields():
+    """测试Showdown格式、字段格式和中文"||"格式的字段解析"""
+    showdown = parse_set_blocks([
+        "[SET]", "Garchomp @ Life Orb", "Ability: Rough Skin", "Tera Type: Steel",
+        "EVs: 252 Atk / 4 SpD / 252 Spe", "Jolly Nature", "- Swords Dance", "- Earthquake",
+    ])[0]
+    assert showdown.key_info() == {
+        'pokemon': 'Garchomp', 'ability': 'Rough Skin', 'item': 'Life Orb',
+        'moves': ['Swords Dance', 'Earthquake'], 'nature': 'Jolly', 'evs': '252 Atk / 4 SpD / 252 Spe'
+    }
+    assert showdown.tera_type == 'Steel'
+
+    chinese = parse_set_blocks([
+        "[SET]", "名称：剑舞 || 道具：生命宝珠 || 特性：粗糙皮肤 || 性格：爽朗", "招式1：剑舞 / 地震", "- 鳞射",
+    ])[0]
+    assert chinese.name == '剑舞'
+    assert chinese.item == '生命宝珠'
+    assert chinese.ability == '粗糙皮肤'
+    assert chinese.nature == '爽朗'
+    assert chinese.moves == ['剑舞', '地震', '鳞射']
+
+def test_find_section():
+    """测试章节查找"""
+    assert parse_marker("  [ set  comments ] text") == ('SET COMMENTS', 'text')
+    assert parse_marker("not a marker") is None
+
+    text = "[OVERVIEW]\nOverview\n[SET COMMENTS]\nFirst\n[CHECKS AND COUNTERS]\nChecks\n[SET CREDITS]\nCredits"
+    assert find_section(text, 'OVERVIEW') == 'Overview'
+    assert find_section(text, '[SET COMMENTS]') == 'First'
+    assert find_section(text, 'SET COMMENTS', ('SET CREDITS',)) == 'First\n[CHECKS AND COUNTERS]\nChecks'
+    assert find_section(text, 'SET CREDITS') == 'Credits'
+    assert find_section(text, 'MISSING') is None
+
+def test_matches_legacy_extraction():
+    """测试与原实现提取的配置行一致"""
+    result = run_benchmark(sets=20, repeat=1)
+    assert result['same_set_content']
+    assert result['blocks'] == 40
+
+if __name__ == "__main__":
+    test_block_boundaries()
+    test_structured_fields()
+    test_find_section()
+    test_matches_legacy_extraction()
+    print("所有测试通过")
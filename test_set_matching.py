@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试SET配对引擎
+验证宝可梦识别、按宝可梦分块、最优指派（优于贪心配对）以及匈牙利算法的纯Python实现
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pokemon_lexicon import POKEMON_NAMES, base_species
+from set_block_parser import SetRecord
+from set_pairing import _hungarian, extract_features, find_species, max_weight_assignment, pair_sets
+from smogon_scraper import SmogonScraper
+
+def make_record(*lines: str) -> SetRecord:
+    return SetRecord(start_line=0, set_lines=list(lines))
+
+def test_species_features():
+    """测试宝可梦识别和特征提取"""
+    assert find_species("Landorus-T @ Leftovers") == 'landorus'
+    assert find_species("超级烈咬陆鲨") == 'garchomp'
+    assert find_species("Calm Mind (Latias) (F) @ Latiasite") == 'latias'
+    assert find_species("Unknown @ Leftovers") == ''
+    # 形态归到基础形态
+    assert find_species("Rotom-W @ Leftovers") == find_species("清洗洛托姆 @ 剩饭") == 'rotom'
+    assert find_species("Mega Scizor") == find_species("超级巨钳螳螂") == 'scizor'
+    assert find_species("Galarian Slowking") == 'slowking'
+    assert find_species("Ho-Oh @ Heavy-Duty Boots") == 'ho-oh'
+
+    features = extract_features(make_record("宝可梦：土地云-灵兽", "努力值：252 HP / 4 攻击", "- 地震", "- 隐形岩"))
+    assert features.species == 'landorus'
+    assert features.move_count == 2
+    assert features.numbers == frozenset({'252', '4'})
+
+def test_species_blocking():
+    """测试不同宝可梦的SET即使招式和努力值相同也不会配对"""
+    english = [make_record("Garchomp @ Life Orb", "EVs: 252 Atk / 4 SpD / 252 Spe", "- Earthquake", "- Scale Shot")]
+    chinese = [
+        make_record("宝可梦：多龙巴鲁托", "努力值：252 攻击 / 4 特防 / 252 速度", "- 地震", "- 鳞射"),
+        make_record("宝可梦：烈咬陆鲨", "努力值：252 攻击 / 4 特防 / 252 速度", "- 地震", "- 鳞射"),
+    ]
+    assert [(en, cn) for en, cn, _ in pair_sets(english, chinese)] == [(0, 1)]
+
+def test_lexicon_coverage():
+    """测试词典中的每个宝可梦（包括形态）英文和中文都能识别为同一个基础形态"""
+    assert len(set(POKEMON_NAMES.values())) == len(POKEMON_NAMES)
+    for en_name, cn_name in POKEMON_NAMES.items():
+        assert find_species(f"{en_name} @ Leftovers") == find_species(f"{cn_name} @ 剩饭") == base_species(en_name).lower()
+
+def test_optimal_assignment_beats_greedy():
+    """测试贪心配对会漏掉的情况：第一个英文SET抢走了第二个英文SET唯一能配对的中文SET"""
+    english = [
+        make_record("Garchomp @ Life Orb", "EVs: 252 HP / 100 Atk / 200 Spe", "- A", "- B", "- C", "- D"),
+        make_record("Garchomp @ Leftovers", "EVs: 4 Def", "- A"),
+    ]
+    chinese = [
+        make_record("宝可梦：烈咬陆鲨", "努力值：252 HP / 100 攻击 / 200 速度 / 4 特防", "- 甲", "- 乙", "- 丙", "- 丁"),
+        make_record("宝可梦：烈咬陆鲨", "努力值：252 / 100 / 200 / 300 / 400", "- 甲", "- 乙", "- 丙", "- 丁"),
+    ]
+    pairs = pair_sets(english, chinese)
+    assert [(en, cn) for en, cn, _ in pairs] == [(0, 1), (1, 0)]
+    assert all(score > 0.5 for _, _, score in pairs)
+
+def test_hungarian_matches_brute_force():
+    """测试纯Python匈牙利算法与穷举结果一致"""
+    from itertools import permutations
+
+    rng = random.Random(7)
+    for rows, cols in [(3, 3), (3, 5), (5, 3), (4, 4)]:
+        scores = [[rng.random() for _ in range(cols)] for _ in range(rows)]
+        if rows <= cols:
+            pairs = _hungarian([[-score for score in row] for row in scores])
+        else:
+            transposed = [[-scores[row][col] for row in range(rows)] for col in range(cols)]
+            pairs = [(row, col) for col, row in _hungarian(transposed)]
+        best = max(
+            sum(scores[row][col] for row, col in zip(range(rows), perm)) if rows <= cols
+            else sum(scores[row][col] for col, row in zip(range(cols), perm))
+            for perm in permutations(range(max(rows, cols)), min(rows, cols))
+        )
+        assert abs(sum(scores[row][col] for row, col in pairs) - best) < 1e-9
+        assert abs(sum(scores[row][col] for row, col in max_weight_assignment(scores)) - best) < 1e-9
+
+def test_many_sets():
+    """测试大量SET时按宝可梦分块配对全部正确"""
+    species = list(POKEMON_NAMES.items())
+    english, chinese = [], []
+    for index in range(300):
+        en_name, cn_name = species[index % len(species)]
+        evs = f"{index} HP / {index + 1} Atk"
+        english.append(make_record(f"{en_name} @ Leftovers", f"EVs: {evs}", "- A", "- B"))
+        chinese.append(make_record(f"宝可梦：{cn_name}", f"努力值：{evs}", "- 甲", "- 乙"))
+    random.Random(3).shuffle(chinese)
+
+    pairs = pair_sets(english, chinese)
+    assert len(pairs) == 300
+    for en_index, cn_index, _ in pairs:
+        assert chinese[cn_index].evs == english[en_index].evs
+
+def test_scraper_pairing():
+    """测试SmogonScraper使用新的配对引擎"""
+    lines = [
+        "[SET]", "Garchomp @ Life Orb", "EVs: 252 Atk / 4 SpD / 252 Spe", "- Earthquake", "- Scale Shot",
+        "[SET COMMENTS]", "Garchomp sweeps.",
+        "[SET]", "烈咬陆鲨 @ 生命宝珠", "努力值：252 攻击 / 4 特防 / 252 速度", "- 地震", "- 鳞射",
+        "[SET COMMENTS]", "烈咬陆鲨可以清场。",
+    ]
+    scraper = SmogonScraper(state_db=None)
+    scraper._extract_set_pairs(lines, "test")
+    assert len(scraper.translation_pairs) == 1
+    pair = scraper.translation_pairs[0]
+    assert pair['type'] == 'set_matched_pair'
+    assert 'Garchomp sweeps.' in pair['english']
+    assert '烈咬陆鲨可以清场。' in pair['chinese']
+
+if __name__ == "__main__":
+    test_species_features()
+    test_species_blocking()
+    test_lexicon_coverage()
+    test_optimal_assignment_beats_greedy()
+    test_hungarian_matches_brute_force()
+    test_many_sets()
+    test_scraper_pairing()
+    print("所有测试通过")
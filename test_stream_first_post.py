@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式下载主帖
+本地HTTP服务提供包含大量回复的帖子页面，验证读到主帖结束就停止下载，且提取结果与完整下载一致
+"""
+
+import sys
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from benchmark_first_post import build_sample_thread, full_parse
+from first_post_extractor import FirstPostStreamParser, extract_first_post, read_first_post
+from smogon_scraper import SmogonScraper
+from url_translator import URLTranslator
+
+LARGE_PAGE = build_sample_thread(replies=3000).encode('utf-8')
+
+class LargeThreadHandler(BaseHTTPRequestHandler):
+    """返回大页面，/chunked 使用分块传输（没有Content-Length）"""
+    bytes_sent = []
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        chunked = self.path.startswith('/chunked')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(LARGE_PAGE)))
+        self.end_headers()
+
+        sent = 0
+        try:
+            for start in range(0, len(LARGE_PAGE), 8192):
+                piece = LARGE_PAGE[start:start + 8192]
+                if chunked:
+                    self.wfile.write(f"{len(piece):x}\r\n".encode('ascii') + piece + b"\r\n")
+                else:
+                    self.wfile.write(piece)
+                sent += len(piece)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        LargeThreadHandler.bytes_sent.append(sent)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LargeThreadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_stream_parser_any_chunking():
+    """测试任意分段方式输入的结果都与完整解析一致"""
+    html = build_sample_thread(replies=20).encode('utf-8')
+    expected = full_parse(html)
+    for chunk_size in (1, 7, 64, 4096):
+        parser = FirstPostStreamParser()
+        for start in range(0, len(html), chunk_size):
+            if parser.feed(html[start:start + chunk_size]):
+                break
+        assert parser.complete
+        page = parser.result()
+        assert (page.title, page.text()) == expected
+        assert parser.end < len(html) // 2
+
+    # 没有主帖的页面读到结尾也能得到结果
+    parser = FirstPostStreamParser()
+    assert not parser.feed(b'<h1 class="p-title-value">No post</h1>')
+    assert parser.result().title == "No post"
+    assert parser.result().post is None
+
+def test_stream_stops_early():
+    """测试主帖结束后断开连接，并报告读取字节数"""
+    server, base_url = start_server()
+    try:
+        expected = extract_first_post(LARGE_PAGE)
+        for path in ('/threads/garchomp.1/', '/chunked/garchomp.1/'):
+            response = requests.get(base_url + path, stream=True, timeout=10)
+            page, stats = read_first_post(response)
+            print(f"{path}: {stats.summary()}")
+
+            assert page.title == expected.title
+            assert page.text() == expected.text()
+            assert stats.stopped_early
+            assert 0 < stats.bytes_read < len(LARGE_PAGE) // 10
+            if path.startswith('/chunked'):
+                assert stats.content_length is None
+            else:
+                assert stats.content_length == len(LARGE_PAGE)
+                assert '节省' in stats.summary()
+    finally:
+        server.shutdown()
+
+def test_scraper_and_translator_streaming():
+    """测试爬虫和URL翻译器的流式模式"""
+    server, base_url = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as save_dir:
+            scraper = SmogonScraper(base_url=base_url, requests_per_second=0, state_db=None,
+                                    stream_first_post=True)
+            scraper._scrape_thread_to_file(f"{base_url}/threads/garchomp.1/", save_dir)
+            files = os.listdir(save_dir)
+            assert files == ['Garchomp & Friends.txt']
+            with open(os.path.join(save_dir, files[0]), 'r', encoding='utf-8') as f:
+                assert '[SET COMMENTS]' in f.read()
+            assert scraper.stream_totals['pages'] == 1
+            assert scraper.stream_totals['bytes_read'] < len(LARGE_PAGE) // 10
+
+        result = URLTranslator().scrape_first_post(f"{base_url}/threads/garchomp.1/")
+        assert result['title'] == 'Garchomp & Friends'
+        assert 'Garchomp is a strong setup sweeper.' in result['content']
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_stream_parser_any_chunking()
+    test_stream_stops_early()
+    test_scraper_and_translator_streaming()
+    print("所有测试通过")
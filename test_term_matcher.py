@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试术语匹配器
+验证单次扫描替换与逐词 re.sub 的单词边界语义一致，并且最长匹配优先
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from term_matcher import TermMatcher, get_term_matcher
+
+def test_longest_match_first():
+    """测试最长匹配优先"""
+    matcher = TermMatcher({
+        'Giratina': '骑拉帝纳',
+        'Giratina-O': '骑拉帝纳-起源',
+        'Shadow': '影子',
+        'Shadow Ball': '影子球'
+    })
+
+    result = matcher.replace("Giratina-O uses Shadow Ball, Giratina uses Shadow Sneak")
+    print(f"替换结果: {result}")
+    assert result == "骑拉帝纳-起源 uses 影子球, 骑拉帝纳 uses 影子 Sneak"
+
+def test_word_boundary():
+    """测试单词边界与原正则一致"""
+    terms = {'Hex': '祸不单行', 'team': '队伍', 'STAB': '本系加成'}
+    matcher = TermMatcher(terms, ignore_case=True)
+    text = "Hex hits hexagon teams; the TEAM relies on stab and STABs."
+
+    # 逐词替换的旧实现（术语互不重叠时结果应完全一致）
+    expected = text
+    for en_term, cn_term in terms.items():
+        expected = re.sub(r'\b' + re.escape(en_term) + r'\b', cn_term, expected, flags=re.IGNORECASE)
+
+    result = matcher.replace(text)
+    print(f"替换结果: {result}")
+    assert result == expected
+
+def test_without_word_boundary():
+    """测试不要求单词边界的短语替换"""
+    matcher = TermMatcher({'sweep': '清场'}, ignore_case=True, word_boundary=False)
+    assert matcher.replace("Sweeping and sweeps") == "清场ing and 清场s"
+
+def test_ascii_boundary():
+    """测试只按ASCII单词字符判断边界：英文术语要求完整单词，中文术语可以与汉字相连"""
+    matcher = TermMatcher({'ev': 'ev', '宝可梦': '宝可梦'}, ignore_case=True, ascii_boundary=True)
+    assert [term for _, _, term in matcher.iter_matches("every EV 这只宝可梦")] == ['ev', '宝可梦']
+    assert list(TermMatcher({'宝可梦': '宝可梦'}).iter_matches("这只宝可梦")) == []
+
+def test_case_fold_variants():
+    """测试忽略大小写时 ſ、开尔文符号等lower()不能还原的变体不会出错"""
+    matcher = TermMatcher({'Kings': 'K', 'Kick': '踢'}, ignore_case=True)
+    assert matcher.replace('kingſ') == 'K'
+    assert matcher.replace('\u212aick off') == '踢 off'
+    assert [term for _, _, term in matcher.iter_matches('kingſ')] == ['Kings']
+
+def test_iter_matches():
+    """测试匹配遍历返回原始术语"""
+    matcher = TermMatcher({'Stealth Rock': '隐形岩', 'Defog': '清雾'}, ignore_case=True)
+    matches = list(matcher.iter_matches("stealth rock and DEFOG"))
+    assert matches == [(0, 12, 'Stealth Rock'), (17, 22, 'Defog')]
+
+def test_matcher_cache():
+    """测试相同词典复用已编译的匹配器"""
+    terms = {'Garchomp': '烈咬陆鲨'}
+    first = get_term_matcher(terms, ignore_case=True)
+    second = get_term_matcher(dict(terms), ignore_case=True)
+    assert first is second
+
+    terms['Heatran'] = '席多蓝恩'
+    third = get_term_matcher(terms, ignore_case=True)
+    assert third is not first
+    assert third.replace("Heatran") == "席多蓝恩"
+
+def test_empty_dictionary():
+    """测试空词典"""
+    matcher = TermMatcher({})
+    assert len(matcher) == 0
+    assert matcher.replace("Garchomp") == "Garchomp"
+
+if __name__ == "__main__":
+    test_longest_match_first()
+    test_word_boundary()
+    test_without_word_boundary()
+    test_ascii_boundary()
+    test_case_fold_variants()
+    test_iter_matches()
+    test_matcher_cache()
+    test_empty_dictionary()
+    print("所有测试通过")
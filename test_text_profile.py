@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试文本字符画像
+验证各类字符计数、批量画像、语言判断，以及与原来的正则写法结果一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_text_profile import SAMPLE_LINES, legacy_classify, profile_classify
+from format_converter import DataFormatConverter
+from smogon_scraper import SmogonScraper
+from text_profile import detect_language, is_chinese_text, is_english_text, profile_text, profile_texts
+
+def test_profile_counts():
+    """测试各类字符计数"""
+    profile = profile_text(" Héllo，世界 12。かな 한글\t😀 ")
+    assert profile.length == 21
+    assert profile.stripped_length == 19
+    assert profile.latin == 4
+    assert profile.other_alpha == 1
+    assert profile.cjk == 2
+    assert profile.kana == 2
+    assert profile.hangul == 2
+    assert profile.digits == 2
+    assert profile.punctuation == 2
+    assert profile.spaces == 4
+    assert profile.whitespace == 1
+    assert profile.non_space == 17
+    assert profile.alpha == 11
+
+    empty = profile_text(None)
+    assert empty.length == 0
+    assert not empty.is_english() and not empty.is_chinese()
+
+def test_batch_matches_single():
+    """测试批量画像与逐条画像一致（包括含分隔符的文本）"""
+    texts = SAMPLE_LINES + ["", "  ", "a\x00b"]
+    assert profile_texts(texts) == [profile_text(text) for text in texts]
+    assert profile_texts(texts[:-1]) == [profile_text(text) for text in texts[:-1]]
+    assert profile_texts([]) == []
+
+def test_language_detection():
+    """测试语言判断"""
+    assert detect_language("烈咬陆鲨是强力的破盾手") == "chinese"
+    assert detect_language("こんにちは") == "japanese"
+    assert detect_language("안녕하세요") == "korean"
+    assert detect_language("Hello world") == "english"
+    assert detect_language("   ") == "unknown"
+    assert profile_text("").language(empty="english") == "english"
+
+    assert is_english_text("Garchomp @ Life Orb")
+    assert not is_english_text("252 / 4")
+    assert is_chinese_text("道具：生命宝珠")
+    assert not is_chinese_text("Life Orb")
+
+    # 只看字母：数字和标点不影响拉丁字母的比例
+    assert profile_text("EVs: 252 Atk / 4 SpD / 252 Spe").is_mostly_latin()
+    assert not profile_text("252 / 4").is_mostly_latin()
+    assert not profile_text("Garchomp 烈咬陆鲨").is_mostly_latin()
+    assert profile_text("Garchomp 烈咬陆鲨").is_mostly_latin(min_ratio=0.5)
+
+def test_matches_legacy_regex():
+    """测试与原来的正则写法判断结果一致"""
+    lines = SAMPLE_LINES + ["Hi", "abc 1", "中", "Latias (F) @ Latiasite", "混合 mixed 文本 text"]
+    assert profile_classify(lines) == legacy_classify(lines)
+
+def test_call_sites():
+    """测试各处语言判断使用字符画像"""
+    scraper = SmogonScraper(state_db=None)
+    assert scraper._is_english_text("Garchomp is a strong wallbreaker.")
+    assert scraper._is_chinese_text("烈咬陆鲨是强力的破盾手。")
+
+    lines = ["Garchomp is a strong wallbreaker.", "烈咬陆鲨是强力的破盾手。", "Other line here", "12"]
+    scraper._extract_direct_pairs(lines, "test")
+    assert [(pair['english'], pair['chinese']) for pair in scraper.translation_pairs] == [(lines[0], lines[1])]
+
+    converter = DataFormatConverter()
+    assert converter.detect_language("中文文本") == "chinese"
+    assert converter.detect_language("") == "unknown"
+
+if __name__ == "__main__":
+    test_profile_counts()
+    test_batch_matches_single()
+    test_language_detection()
+    test_matches_legacy_regex()
+    test_call_sites()
+    print("所有测试通过")
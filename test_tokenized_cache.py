@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试预分词缓存
+验证样本不再填充到max_length、缓存命中时使用内存映射、分词参数和翻译方向变化时缓存失效，以及写入失败时清理临时目录
+"""
+
+import sys
+import os
+import tempfile
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from tokenized_cache import load_or_tokenize, compute_cache_key
+
+class FakeTokenizer:
+    """按空格分词的简易分词器，记录调用次数"""
+    name_or_path = "fake-whitespace"
+    vocab_size = 1000
+    pad_token_id = 0
+
+    def __init__(self):
+        self.calls = 0
+        self.target_mode = False
+
+    def __call__(self, texts, max_length=None, truncation=False):
+        self.calls += 1
+        offset = 500 if self.target_mode else 0
+        input_ids = []
+        for text in texts:
+            ids = [offset + len(word) for word in text.split()] + [1]
+            if truncation and max_length:
+                ids = ids[:max_length]
+            input_ids.append(ids)
+        return {"input_ids": input_ids}
+
+    @contextmanager
+    def as_target_tokenizer(self):
+        self.target_mode = True
+        try:
+            yield
+        finally:
+            self.target_mode = False
+
+SOURCES = ["Garchomp", "Garchomp is a strong setup sweeper", "Heatran"]
+TARGETS = ["烈咬陆鲨", "烈咬陆鲨 是 强力 强化 清场手", "席多蓝恩"]
+
+def test_unpadded_and_cached():
+    """测试不填充的分词结果和磁盘缓存"""
+    tokenizer = FakeTokenizer()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tokenized = load_or_tokenize(tokenizer, SOURCES, TARGETS, max_length=512, cache_dir=cache_dir)
+        assert len(tokenized) == 3
+        assert tokenized.source(0) == [8, 1]
+        assert tokenized.source(1) == [8, 2, 1, 6, 5, 7, 1]
+        assert tokenized.target(2) == [504, 1]
+        assert tokenized.source_lengths().tolist() == [2, 7, 2]
+        calls = tokenizer.calls
+
+        # 第二次加载直接读取内存映射缓存，不再分词
+        cached = load_or_tokenize(tokenizer, SOURCES, TARGETS, max_length=512, cache_dir=cache_dir)
+        assert tokenizer.calls == calls
+        assert isinstance(cached.source_ids, np.memmap)
+        assert [cached.source(i) for i in range(3)] == [tokenized.source(i) for i in range(3)]
+        assert [cached.target(i) for i in range(3)] == [tokenized.target(i) for i in range(3)]
+
+        # 截断长度变化时重新分词
+        truncated = load_or_tokenize(tokenizer, SOURCES, TARGETS, max_length=3, cache_dir=cache_dir)
+        assert tokenizer.calls > calls
+        assert truncated.source(1) == [8, 2, 1]
+        assert len(os.listdir(cache_dir)) == 2
+
+def test_cache_key():
+    """测试缓存键对数据内容和分词器敏感"""
+    tokenizer = FakeTokenizer()
+    key = compute_cache_key(tokenizer, 512, SOURCES, TARGETS)
+    assert key == compute_cache_key(tokenizer, 512, list(SOURCES), list(TARGETS))
+    assert key != compute_cache_key(tokenizer, 512, SOURCES, TARGETS[:2] + ["火钢"])
+    assert key != compute_cache_key(tokenizer, 256, SOURCES, TARGETS)
+
+    other = FakeTokenizer()
+    other.name_or_path = "fake-other"
+    assert key != compute_cache_key(other, 512, SOURCES, TARGETS)
+
+    # 翻译方向不同（NLLB的语言标记不同）时缓存键不同
+    forward, backward = FakeTokenizer(), FakeTokenizer()
+    forward.src_lang, forward.tgt_lang = "eng_Latn", "zho_Hans"
+    backward.src_lang, backward.tgt_lang = "zho_Hans", "eng_Latn"
+    assert len({key, compute_cache_key(forward, 512, SOURCES, TARGETS),
+                compute_cache_key(backward, 512, SOURCES, TARGETS)}) == 3
+
+def test_failed_write_cleans_up():
+    """测试缓存已被其他进程写好、无法重命名时不留下临时目录"""
+    tokenizer = FakeTokenizer()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, compute_cache_key(tokenizer, 512, SOURCES, TARGETS))
+        os.makedirs(cache_path)
+        with open(os.path.join(cache_path, 'partial'), 'w') as f:
+            f.write('x')
+        tokenized = load_or_tokenize(tokenizer, SOURCES, TARGETS, max_length=512, cache_dir=cache_dir)
+        assert tokenized.source(0) == [8, 1]
+        assert os.listdir(cache_dir) == [os.path.basename(cache_path)]
+
+def test_in_memory_without_cache_dir():
+    """测试不指定缓存目录时只在内存中分词"""
+    tokenized = load_or_tokenize(FakeTokenizer(), SOURCES, TARGETS, max_length=512, cache_dir=None)
+    assert not isinstance(tokenized.source_ids, np.memmap)
+    assert tokenized.target(0) == [504, 1]
+
+if __name__ == "__main__":
+    test_unpadded_and_cached()
+    test_cache_key()
+    test_failed_write_cleans_up()
+    test_in_memory_without_cache_dir()
+    print("所有测试通过")
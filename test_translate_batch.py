@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量翻译
+用假的分词器和模型（把输入原样作为输出）验证translate_batch按长度分批、结果按输入顺序返回，
+评估时批量翻译失败改为逐个翻译，以及URL翻译器按行批量翻译时保留空行
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+
+from enhanced_transformers_module import EnhancedTransformersModule
+from url_translator import URLTranslator
+
+PAD_ID = 0
+
+class FakeBatch(dict):
+    def to(self, device):
+        return self
+
+class FakeTokenizer:
+    """每个字符一个token（码位），填充为0"""
+    pad_token_id = PAD_ID
+    eos_token_id = 1
+
+    def __call__(self, texts, max_length=None, truncation=False):
+        return {"input_ids": [[ord(char) for char in text][:max_length] for text in texts]}
+
+    def pad(self, features, padding=True, return_tensors="pt"):
+        ids = features["input_ids"]
+        width = max(len(item) for item in ids)
+        return FakeBatch(input_ids=torch.tensor([item + [PAD_ID] * (width - len(item)) for item in ids]))
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [''.join(chr(token) for token in row.tolist() if token != PAD_ID) for row in outputs]
+
+class EchoModel:
+    """把输入原样作为“翻译”，并记录每批的形状"""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def eval(self):
+        return self
+
+    def generate(self, input_ids, **kwargs):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        return input_ids
+
+def make_module(batch_size=2):
+    module = EnhancedTransformersModule.__new__(EnhancedTransformersModule)
+    module.config = {}
+    module.model_config = SimpleNamespace(max_length=64, recommended_batch_size=batch_size)
+    module.device = torch.device('cpu')
+    module.tokenizer = FakeTokenizer()
+    module.model = EchoModel()
+    module.term_dictionaries = {'pokemon_names': {}}
+    module.learning_stats = {'best_scores': {}, 'evaluation_history': []}
+    return module
+
+TEXTS = ["A fairly long sentence about Garchomp.", "Hi", "Medium text", "x", "Another long line of text here", "abc"]
+
+def test_results_in_input_order():
+    """测试按长度排序分批后结果仍按输入顺序返回"""
+    module = make_module(batch_size=2)
+    assert module.translate_batch(TEXTS) == TEXTS
+    assert module.translate_batch([]) == []
+
+    # 每批只填充到本批最长的输入，且批次按长度从短到长
+    widths = [shape[1] for shape in module.model.batch_shapes]
+    assert widths == sorted(widths)
+    assert widths[0] == 2 and widths[-1] == len(TEXTS[0])
+    assert [shape[0] for shape in module.model.batch_shapes] == [2, 2, 2]
+
+    assert module.translate_text("  Garchomp   uses  Earthquake ") == "Garchomp uses Earthquake"
+
+def test_evaluate_falls_back_to_single_translation():
+    """测试批量翻译失败时逐个翻译，出错的样本单独跳过"""
+    module = make_module()
+    module.translate_batch = lambda texts, **kwargs: [text for text in texts] if len(texts) == 1 else 1 / 0
+    module.translate_text = lambda text: 1 / 0 if text == "broken" else module.translate_batch([text])[0]
+    examples = [SimpleNamespace(source_text=text, target_text=text, domain="general")
+                for text in ("Garchomp outspeeds.", "broken", "Use Stealth Rock.")]
+
+    results = module.comprehensive_evaluate(examples)
+    assert results['total_samples'] == 3
+    assert results['general_sample_count'] == 2
+    assert abs(results['corpus_bleu'] - 100.0) < 1e-6
+
+def test_url_translator_keeps_blank_lines():
+    """测试URL翻译器只把非空行交给模型"""
+    seen = []
+
+    class Recorder:
+        def translate_batch(self, lines):
+            seen.extend(lines)
+            return [line.upper() for line in lines]
+
+    translator = URLTranslator(model_translator=Recorder())
+    assert translator.translate_with_model("first\n\n  \nsecond") == "FIRST\n\n  \nSECOND"
+    assert seen == ["first", "second"]
+
+if __name__ == "__main__":
+    test_results_in_input_order()
+    test_evaluate_falls_back_to_single_translation()
+    test_url_translator_keeps_blank_lines()
+    print("所有测试通过")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试翻译记忆索引
+验证倒排索引检索结果与逐个计算Jaccard的结果一致，并且新增样本后立即可以检索到
+"""
+
+import sys
+import os
+import random
+import re
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from translation_memory import TranslationMemoryIndex
+from translator import PersonalizedTranslator
+
+WORDS = ["garchomp", "heatran", "clefable", "stealth", "rock", "swords", "dance", "earthquake",
+         "scale", "shot", "moon", "blast", "lava", "plume", "magic", "guard", "the", "is", "a", "with"]
+
+def brute_force(texts, query, k, min_score):
+    """原来的逐个比较实现"""
+    query_words = set(re.findall(r'\b\w+\b', query.lower()))
+    scored = []
+    for doc_id, text in enumerate(texts):
+        words = set(re.findall(r'\b\w+\b', text.lower()))
+        total = len(query_words | words)
+        if total and query_words:
+            score = len(query_words & words) / total
+            if score > min_score:
+                scored.append((-score, doc_id))
+    scored.sort()
+    return [(doc_id, -score) for score, doc_id in scored[:k]]
+
+def random_sentence(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 10)))
+
+def test_matches_brute_force():
+    """测试检索结果与暴力计算一致"""
+    rng = random.Random(0)
+    texts = [random_sentence(rng) for _ in range(500)]
+    index = TranslationMemoryIndex()
+    index.add_many(texts)
+
+    for _ in range(200):
+        query = random_sentence(rng)
+        for k, min_score in [(1, 0.3), (5, 0.0), (3, 0.6)]:
+            expected = brute_force(texts, query, k, min_score)
+            actual = index.search(query, k=k, min_score=min_score)
+            assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected], query
+            assert all(abs(a[1] - e[1]) < 1e-12 for a, e in zip(actual, expected))
+
+    assert index.search("", k=1) == []
+    assert index.search("unknown words only", k=1) == []
+
+def test_translator_incremental_updates():
+    """测试add_translation_sample后立即可检索"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        translator = PersonalizedTranslator(os.path.join(work_dir, 'translation_data.json'))
+        assert translator._find_similar_translation("Garchomp uses Swords Dance") is None
+
+        translator.add_translation_sample("Garchomp uses Swords Dance", "烈咬陆鲨使用剑舞")
+        translator.add_translation_sample("Heatran uses Lava Plume", "席多蓝恩使用喷烟")
+        assert translator._find_similar_translation("Garchomp uses Swords Dance first") == "烈咬陆鲨使用剑舞"
+        assert translator._find_similar_translation("Heatran uses Lava Plume") == "席多蓝恩使用喷烟"
+
+        # 保存后重新加载，索引随数据一起重建
+        translator.save_data()
+        reloaded = PersonalizedTranslator(os.path.join(work_dir, 'translation_data.json'))
+        assert len(reloaded.memory_index) == 2
+        assert reloaded._find_similar_translation("Heatran uses Lava Plume") == "席多蓝恩使用喷烟"
+
+def test_large_memory_lookup_speed():
+    """测试10万个样本时的检索速度"""
+    rng = random.Random(1)
+    vocabulary = [f"term{i}" for i in range(20000)] + WORDS
+    index = TranslationMemoryIndex()
+    for _ in range(100000):
+        index.add(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(5, 15))))
+
+    queries = [' '.join(rng.choice(vocabulary) for _ in range(8)) for _ in range(100)]
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k=1, min_score=0.3)
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"10万样本平均检索耗时: {elapsed * 1000:.2f}毫秒")
+    assert elapsed < 0.05
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_translator_incremental_updates()
+    test_large_memory_lookup_speed()
+    print("所有测试通过")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本字符画像
+单次扫描统计文本中的拉丁字母、汉字、假名、谚文、数字、标点和空白字符数量，供各处的语言判断共用，
+取代每次判断都对同一文本多次调用re.findall、text.replace(' ', '')的写法。
+扫描用str.translate把每个字符映射为类别码（C实现），再用str.count计数
+"""
+
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable, List
+
+# 类别码
+LATIN = 'L'        # ASCII字母
+CJK = 'C'          # 汉字 一-鿿
+KANA = 'K'         # 平假名、片假名 ぀-ヿ
+HANGUL = 'H'       # 谚文音节 가-힯
+OTHER_ALPHA = 'A'  # 其他字母（带重音的拉丁字母、西里尔字母等）
+DIGIT = 'D'
+PUNCTUATION = 'P'  # Unicode标点以及ASCII符号
+SPACE = ' '        # 空格（与 text.replace(' ', '') 的语义一致）
+WHITESPACE = 'W'   # 其他空白字符
+OTHER = 'O'
+
+# 批量画像时连接文本用的分隔符，映射为自身
+_BATCH_SEPARATOR = '\x00'
+
+def _build_table() -> str:
+    """基本多文种平面每个字符对应的类别码；平面外的字符不在表中，translate时保持原样，不计入任何类别"""
+    codes = []
+    for code_point in range(0x10000):
+        char = chr(code_point)
+        if char == _BATCH_SEPARATOR:
+            codes.append(_BATCH_SEPARATOR)
+        elif char == ' ':
+            codes.append(SPACE)
+        elif ('a' <= char <= 'z') or ('A' <= char <= 'Z'):
+            codes.append(LATIN)
+        elif 0x4e00 <= code_point <= 0x9fff:
+            codes.append(CJK)
+        elif 0x3040 <= code_point <= 0x30ff:
+            codes.append(KANA)
+        elif 0xac00 <= code_point <= 0xd7af:
+            codes.append(HANGUL)
+        elif char.isdecimal():
+            codes.append(DIGIT)
+        elif char.isalpha():
+            codes.append(OTHER_ALPHA)
+        elif char.isspace():
+            codes.append(WHITESPACE)
+        elif unicodedata.category(char).startswith('P') or (code_point < 0x80 and char.isprintable()):
+            codes.append(PUNCTUATION)
+        else:
+            codes.append(OTHER)
+    return ''.join(codes)
+
+_CATEGORY_TABLE = _build_table()
+
+@dataclass(frozen=True)
+class TextProfile:
+    """文本中各类字符的数量"""
+    length: int
+    stripped_length: int  # len(text.strip())
+    latin: int
+    cjk: int
+    kana: int
+    hangul: int
+    other_alpha: int
+    digits: int
+    punctuation: int
+    spaces: int
+    whitespace: int       # 空格以外的空白字符
+
+    @property
+    def non_space(self) -> int:
+        """去掉空格后的长度"""
+        return self.length - self.spaces
+
+    @property
+    def alpha(self) -> int:
+        """所有字母（包括汉字、假名、谚文）"""
+        return self.latin + self.cjk + self.kana + self.hangul + self.other_alpha
+
+    def is_english(self, min_length: int = 5, min_letters: int = 3, min_ratio: float = 0.6) -> bool:
+        """是否主要为英文：ASCII字母占去掉空格后长度的比例超过min_ratio"""
+        if self.length < min_length or self.latin < min_letters or self.non_space == 0:
+            return False
+        return self.latin / self.non_space > min_ratio
+
+    def is_mostly_latin(self, min_ratio: float = 0.7) -> bool:
+        """ASCII字母占全部字母（包括汉字、假名、谚文）的比例是否超过min_ratio，不看数字、标点和空白"""
+        return self.alpha > 0 and self.latin / self.alpha > min_ratio
+
+    def is_chinese(self, min_length: int = 2, min_ratio: float = 0.3) -> bool:
+        """是否主要为中文：汉字占去掉空格后长度的比例超过min_ratio"""
+        if self.length < min_length or self.non_space == 0:
+            return False
+        return self.cjk / self.non_space > min_ratio
+
+    def language(self, empty: str = "unknown", min_ratio: float = 0.3) -> str:
+        """按汉字、假名、谚文的比例判断语言，都不超过min_ratio时为英文"""
+        if self.stripped_length == 0:
+            return empty
+        if self.cjk / self.stripped_length > min_ratio:
+            return "chinese"
+        if self.kana / self.stripped_length > min_ratio:
+            return "japanese"
+        if self.hangul / self.stripped_length > min_ratio:
+            return "korean"
+        return "english"
+
+def _profile_codes(codes: str, stripped_length: int) -> TextProfile:
+    return TextProfile(
+        length=len(codes),
+        stripped_length=stripped_length,
+        latin=codes.count(LATIN),
+        cjk=codes.count(CJK),
+        kana=codes.count(KANA),
+        hangul=codes.count(HANGUL),
+        other_alpha=codes.count(OTHER_ALPHA),
+        digits=codes.count(DIGIT),
+        punctuation=codes.count(PUNCTUATION),
+        spaces=codes.count(SPACE),
+        whitespace=codes.count(WHITESPACE),
+    )
+
+def profile_text(text: str) -> TextProfile:
+    """统计一段文本的字符画像"""
+    text = text or ''
+    return _profile_codes(text.translate(_CATEGORY_TABLE), len(text.strip()))
+
+def profile_texts(texts: Iterable[str]) -> List[TextProfile]:
+    """批量统计字符画像：所有文本连接后只调用一次translate"""
+    texts = [text or '' for text in texts]
+    if not texts:
+        return []
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [profile_text(text) for text in texts]
+    codes = _BATCH_SEPARATOR.join(texts).translate(_CATEGORY_TABLE).split(_BATCH_SEPARATOR)
+    return [_profile_codes(code, len(text.strip())) for code, text in zip(codes, texts)]
+
+def is_english_text(text: str) -> bool:
+    """判断文本是否主要为英文"""
+    return profile_text(text).is_english()
+
+def is_chinese_text(text: str) -> bool:
+    """判断文本是否主要为中文"""
+    return profile_text(text).is_chinese()
+
+def detect_language(text: str, empty: str = "unknown") -> str:
+    """判断文本语言（chinese / japanese / korean / english），空文本返回empty"""
+    return profile_text(text).language(empty)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预分词数据缓存
+把整个数据集的源文本和目标文本一次性分词（不填充），以扁平的NumPy数组加偏移量的形式保存到磁盘，
+加载时使用内存映射；缓存键由分词器名称、语言设置、最大长度和数据内容哈希决定
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 缓存格式版本，格式变化时递增使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+
+class TokenizedPairs:
+    """内存映射的预分词翻译对：第i个样本的ids为 ids[offsets[i]:offsets[i+1]]"""
+
+    def __init__(self, source_ids: np.ndarray, source_offsets: np.ndarray,
+                 target_ids: np.ndarray, target_offsets: np.ndarray):
+        self.source_ids = source_ids
+        self.source_offsets = source_offsets
+        self.target_ids = target_ids
+        self.target_offsets = target_offsets
+
+    def __len__(self):
+        return len(self.source_offsets) - 1
+
+    def source(self, idx: int) -> List[int]:
+        return self.source_ids[self.source_offsets[idx]:self.source_offsets[idx + 1]].tolist()
+
+    def target(self, idx: int) -> List[int]:
+        return self.target_ids[self.target_offsets[idx]:self.target_offsets[idx + 1]].tolist()
+
+    def source_lengths(self) -> np.ndarray:
+        """每个样本的源序列长度"""
+        return np.diff(self.source_offsets)
+
+    def target_lengths(self) -> np.ndarray:
+        """每个样本的目标序列长度"""
+        return np.diff(self.target_offsets)
+
+def compute_cache_key(tokenizer, max_length: int, sources: List[str], targets: List[str]) -> str:
+    """根据分词器名称、语言设置、最大长度和数据内容计算缓存键
+
+    NLLB、mBART等分词器按src_lang/tgt_lang加入语言标记，翻译方向不同时分词结果也不同
+    """
+    digest = hashlib.sha256()
+    header = {
+        'format': CACHE_FORMAT_VERSION,
+        'tokenizer': getattr(tokenizer, 'name_or_path', type(tokenizer).__name__),
+        'tokenizer_class': type(tokenizer).__name__,
+        'vocab_size': getattr(tokenizer, 'vocab_size', None),
+        'src_lang': getattr(tokenizer, 'src_lang', None),
+        'tgt_lang': getattr(tokenizer, 'tgt_lang', None),
+        'max_length': max_length
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+    for source, target in zip(sources, targets):
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(target.encode('utf-8'))
+        digest.update(b'\x01')
+    return digest.hexdigest()[:32]
+
+def _flatten(sequences: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """把变长序列拼接为扁平数组和偏移量"""
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    if sequences:
+        offsets[1:] = np.cumsum([len(seq) for seq in sequences])
+    flat = np.fromiter((token for seq in sequences for token in seq), dtype=np.int32, count=int(offsets[-1]))
+    return flat, offsets
+
+def tokenize_pairs(tokenizer, sources: List[str], targets: List[str], max_length: int,
+                   batch_size: int = 1000) -> TokenizedPairs:
+    """一次性批量分词（不填充）"""
+    source_sequences = []
+    target_sequences = []
+
+    for start in range(0, len(sources), batch_size):
+        source_batch = sources[start:start + batch_size]
+        target_batch = targets[start:start + batch_size]
+
+        source_sequences.extend(tokenizer(source_batch, max_length=max_length, truncation=True)["input_ids"])
+        with tokenizer.as_target_tokenizer():
+            target_sequences.extend(tokenizer(target_batch, max_length=max_length, truncation=True)["input_ids"])
+
+    source_ids, source_offsets = _flatten(source_sequences)
+    target_ids, target_offsets = _flatten(target_sequences)
+    return TokenizedPairs(source_ids, source_offsets, target_ids, target_offsets)
+
+_ARRAY_NAMES = ('source_ids', 'source_offsets', 'target_ids', 'target_offsets')
+
+def _load_cached(cache_path: str) -> Optional[TokenizedPairs]:
+    """内存映射读取完整的缓存，缺少任一数组时返回None"""
+    paths = [os.path.join(cache_path, f"{name}.npy") for name in _ARRAY_NAMES]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return TokenizedPairs(*[np.load(path, mmap_mode='r') for path in paths])
+
+def load_or_tokenize(tokenizer, sources: List[str], targets: List[str], max_length: int,
+                     cache_dir: Optional[str] = ".tokenized_cache") -> TokenizedPairs:
+    """从磁盘缓存加载预分词结果，缓存不存在时分词并写入缓存
+
+    Args:
+        cache_dir: 缓存目录，为None时只在内存中分词一次
+    """
+    if not cache_dir:
+        return tokenize_pairs(tokenizer, sources, targets, max_length)
+
+    cache_key = compute_cache_key(tokenizer, max_length, sources, targets)
+    cache_path = os.path.join(cache_dir, cache_key)
+    cached = _load_cached(cache_path)
+    if cached is not None:
+        return cached
+
+    tokenized = tokenize_pairs(tokenizer, sources, targets, max_length)
+
+    # 先写入临时目录再重命名，避免中断时留下不完整的缓存
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+        for name in _ARRAY_NAMES:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(tokenized, name))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # 其他进程已经写好了同一份缓存，或者缓存目录不可写
+        pass
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    cached = _load_cached(cache_path)
+    return cached if cached is not None else tokenized
@@ -16,6 +16,9 @@ from typing import Dict, List, Any, Tuple, Optional
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 
+from corpus_store import open_corpus
+from domain_classifier import DomainClassifier, domains_from_keywords
+
 try:
     from transformers import (
         AutoTokenizer, AutoModelForSeq2SeqLM,
@@ -32,6 +35,12 @@ except ImportError:
     print("警告：Transformers库未安装，请运行: pip install transformers torch")
     TRANSFORMERS_AVAILABLE = False
 
+# 命中关键词较多的领域；strategy排在前面，命中数相同时归为strategy
+_DOMAIN_CLASSIFIER = DomainClassifier(domains_from_keywords({
+    'strategy': ['strategy', 'team', 'synergy', 'counter', 'check', 'threat'],
+    'pokemon': ['pokemon', 'move', 'ability', 'type', 'stat', 'hp', 'attack', 'defense']
+}))
+
 @dataclass
 class TranslationExample:
     """翻译样本数据结构"""
@@ -167,35 +176,29 @@ class TransformersLearningModule:
         
         print(f"正在从 {pairs_directory} 加载翻译对...")
         
-        for filename in os.listdir(pairs_directory):
-            if filename.endswith('.json'):
-                filepath = os.path.join(pairs_directory, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        
-                    if 'english' in data and 'chinese' in data:
-                        # 创建翻译样本
-                        example = TranslationExample(
-                            source_text=data['english'],
-                            target_text=data['chinese'],
-                            domain=self._classify_domain(data['english']),
-                            difficulty=self._assess_difficulty(data['english']),
-                            quality_score=self._assess_quality(data['english'], data['chinese'])
-                        )
-                        
-                        # 随机分配到训练集或验证集 (80:20)
-                        if np.random.random() < 0.8:
-                            self.training_examples.append(example)
-                        else:
-                            self.validation_examples.append(example)
-                        
-                        # 提取专业术语
-                        self._extract_terms(data['english'], data['chinese'])
-                        
-                except Exception as e:
-                    print(f"加载文件 {filename} 失败: {e}")
-                    continue
+        with open_corpus(pairs_directory) as corpus:
+            pairs = list(corpus.iter_pairs(deduplicate=True))
+        
+        # 整个语料库一次扫描完成领域分类
+        domains = _DOMAIN_CLASSIFIER.classify_batch([data['english'] for data in pairs])
+        for data, domain in zip(pairs, domains):
+            # 创建翻译样本
+            example = TranslationExample(
+                source_text=data['english'],
+                target_text=data['chinese'],
+                domain=domain,
+                difficulty=self._assess_difficulty(data['english']),
+                quality_score=self._assess_quality(data['english'], data['chinese'])
+            )
+            
+            # 随机分配到训练集或验证集 (80:20)
+            if np.random.random() < 0.8:
+                self.training_examples.append(example)
+            else:
+                self.validation_examples.append(example)
+            
+            # 提取专业术语
+            self._extract_terms(data['english'], data['chinese'])
         
         self.learning_stats["total_examples"] = len(self.training_examples) + len(self.validation_examples)
         self.learning_stats["training_examples"] = len(self.training_examples)
@@ -207,20 +210,7 @@ class TransformersLearningModule:
     
     def _classify_domain(self, text: str) -> str:
         """分类文本领域"""
-        pokemon_keywords = ['pokemon', 'move', 'ability', 'type', 'stat', 'hp', 'attack', 'defense']
-        strategy_keywords = ['strategy', 'team', 'synergy', 'counter', 'check', 'threat']
-        
-        text_lower = text.lower()
-        
-        pokemon_count = sum(1 for keyword in pokemon_keywords if keyword in text_lower)
-        strategy_count = sum(1 for keyword in strategy_keywords if keyword in text_lower)
-        
-        if pokemon_count > strategy_count:
-            return "pokemon"
-        elif strategy_count > 0:
-            return "strategy"
-        else:
-            return "general"
+        return _DOMAIN_CLASSIFIER.classify(text)
     
     def _assess_difficulty(self, text: str) -> float:
         """评估文本难度"""
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译记忆检索索引
+每个翻译样本只分词一次，建立 词 -> 样本ID 的倒排索引；查询时用前缀过滤只访问最稀有的几个词的倒排表，
+再对候选样本精确计算Jaccard相似度，结果与逐个比较完全一致，但不需要扫描全部样本
+"""
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Tuple
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """把文本转换为小写词集合"""
+    return frozenset(WORD_PATTERN.findall(text.lower()))
+
+class TranslationMemoryIndex:
+    """基于倒排索引的翻译记忆相似检索"""
+
+    def __init__(self):
+        self.documents: List[FrozenSet[str]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, text: str) -> int:
+        """加入一个样本，返回样本ID（即加入顺序）"""
+        doc_id = len(self.documents)
+        words = tokenize(text)
+        self.documents.append(words)
+        for word in words:
+            self.postings[word].append(doc_id)
+        return doc_id
+
+    def add_many(self, texts: List[str]):
+        for text in texts:
+            self.add(text)
+
+    def clear(self):
+        self.documents = []
+        self.postings = defaultdict(list)
+
+    def search(self, text: str, k: int = 1, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """返回Jaccard相似度严格大于min_score的前k个样本 [(样本ID, 相似度)]，相同分数时ID小的在前"""
+        query = tokenize(text)
+        if not query or k <= 0:
+            return []
+
+        query_size = len(query)
+        # 相似度 > min_score 要求重叠词数至少为 floor(min_score * |q|) + 1
+        required_overlap = int(math.floor(min_score * query_size)) + 1
+        if required_overlap > query_size:
+            return []
+
+        # 前缀过滤：满足条件的样本一定包含最稀有的 |q| - required_overlap + 1 个词中的至少一个，
+        # 索引中没有的词出现频率为0，排在最前面但不会产生候选
+        known_words = sorted((word for word in query if word in self.postings),
+                             key=lambda word: len(self.postings[word]))
+        prefix_length = len(known_words) - required_overlap + 1
+        candidates = set()
+        for word in known_words[:prefix_length]:
+            candidates.update(self.postings[word])
+
+        # 长度过滤：Jaccard <= min(|q|,|d|) / max(|q|,|d|)
+        results = []
+        for doc_id in candidates:
+            document = self.documents[doc_id]
+            if min(query_size, len(document)) / max(query_size, len(document)) <= min_score:
+                continue
+            overlap = len(query & document)
+            score = overlap / (query_size + len(document) - overlap)
+            if score > min_score:
+                results.append((score, doc_id))
+
+        best = heapq.nsmallest(k, results, key=lambda item: (-item[0], item[1]))
+        return [(doc_id, score) for score, doc_id in best]
@@ -13,6 +13,9 @@ from collections import defaultdict, Counter
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 
+from corpus_store import open_corpus
+from term_matcher import get_term_matcher
+
 class TranslationPairMimic:
     def __init__(self, pairs_directory: str = "individual_pairs"):
         self.pairs_directory = pairs_directory
@@ -36,16 +39,8 @@ class TranslationPairMimic:
             print(f"目录 {self.pairs_directory} 不存在")
             return
         
-        for filename in os.listdir(self.pairs_directory):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.pairs_directory, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if 'english' in data and 'chinese' in data:
-                            self.translation_pairs.append(data)
-                except Exception as e:
-                    print(f"加载文件 {filename} 时出错: {e}")
+        with open_corpus(self.pairs_directory) as corpus:
+            self.translation_pairs.extend(corpus.iter_pairs(deduplicate=True))
         
         print(f"成功加载 {len(self.translation_pairs)} 个翻译对")
     
@@ -242,31 +237,17 @@ class TranslationPairMimic:
     
     def translate_text(self, english_text: str) -> str:
         """基于学习的模式翻译文本"""
-        chinese_text = english_text
-        
-        # 应用宝可梦名称翻译
-        for en_name, cn_name in self.patterns['pokemon_names'].items():
-            chinese_text = re.sub(r'\b' + re.escape(en_name) + r'\b', cn_name, chinese_text)
-        
-        # 应用招式名称翻译
-        for en_move, cn_move in self.patterns['move_names'].items():
-            chinese_text = re.sub(r'\b' + re.escape(en_move) + r'\b', cn_move, chinese_text)
+        # 宝可梦、招式、特性、道具、属性名称（区分大小写，单词边界）
+        name_terms = {}
+        for category in ['pokemon_names', 'move_names', 'ability_names', 'item_names', 'type_names']:
+            for en_term, cn_term in self.patterns[category].items():
+                name_terms.setdefault(en_term, cn_term)
         
-        # 应用特性名称翻译
-        for en_ability, cn_ability in self.patterns['ability_names'].items():
-            chinese_text = re.sub(r'\b' + re.escape(en_ability) + r'\b', cn_ability, chinese_text)
+        chinese_text = get_term_matcher(name_terms).replace(english_text)
         
-        # 应用道具名称翻译
-        for en_item, cn_item in self.patterns['item_names'].items():
-            chinese_text = re.sub(r'\b' + re.escape(en_item) + r'\b', cn_item, chinese_text)
-        
-        # 应用属性名称翻译
-        for en_type, cn_type in self.patterns['type_names'].items():
-            chinese_text = re.sub(r'\b' + re.escape(en_type) + r'\b', cn_type, chinese_text)
-        
-        # 应用常用短语翻译
-        for en_phrase, cn_phrase in self.patterns['common_phrases'].items():
-            chinese_text = re.sub(re.escape(en_phrase), cn_phrase, chinese_text, flags=re.IGNORECASE)
+        # 应用常用短语翻译（忽略大小写，不要求单词边界）
+        phrase_matcher = get_term_matcher(dict(self.patterns['common_phrases']), ignore_case=True, word_boundary=False)
+        chinese_text = phrase_matcher.replace(chinese_text)
         
         return chinese_text
     
@@ -275,6 +256,9 @@ class TranslationPairMimic:
         if base_pair is None:
             base_pair = random.choice(self.translation_pairs)
         
+        # 语料库中的id是行号，原文件中的id在metadata中
+        base_pair_id = base_pair.get('metadata', {}).get('id', base_pair.get('id', 'unknown'))
+        
         # 创建新的翻译对
         new_pair = {
             'id': f'mimic_{len(self.translation_pairs) + 1}',
@@ -284,7 +268,7 @@ class TranslationPairMimic:
             'source_file': f"mimic_generated_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
             'confidence': 0.8,
             'generation_method': 'pattern_based_mimic',
-            'base_pair_id': base_pair.get('id', 'unknown')
+            'base_pair_id': base_pair_id
         }
         
         return new_pair
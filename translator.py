@@ -13,10 +13,13 @@ from collections import defaultdict
 import argparse
 import time
 
+from text_profile import profile_text, profile_texts
+from translation_memory import TranslationMemoryIndex
+
 # 可选依赖，如果没有安装则使用预设样本
 try:
-    import requests
     from bs4 import BeautifulSoup
+    from http_client import get_shared_session
     NETWORK_AVAILABLE = True
 except ImportError:
     NETWORK_AVAILABLE = False
@@ -192,6 +195,7 @@ class PersonalizedTranslator:
                 'long_sentence_split': True
             }
         }
+        self.memory_index = TranslationMemoryIndex()
         self.load_data()
     
     def load_data(self):
@@ -201,6 +205,8 @@ class PersonalizedTranslator:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.translation_pairs = data.get('translation_pairs', [])
+                    self.memory_index.clear()
+                    self._sync_memory_index()
                     loaded_patterns = data.get('style_patterns', self.style_patterns)
                     
                     # 将list转换回set
@@ -239,6 +245,8 @@ class PersonalizedTranslator:
             'chinese': chinese_text.strip()
         })
         
+        self._sync_memory_index()
+        
         # 分析翻译风格
         self._analyze_style(english_text, chinese_text)
         print(f"已添加翻译样本，当前共有 {len(self.translation_pairs)} 个样本")
@@ -290,7 +298,7 @@ class PersonalizedTranslator:
         }
         
         # 获取论坛页面
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_shared_session().get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -321,7 +329,7 @@ class PersonalizedTranslator:
             return
             
         try:
-            response = requests.get(post_url, headers=headers, timeout=10)
+            response = get_shared_session().get(post_url, headers=headers, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -335,15 +343,17 @@ class PersonalizedTranslator:
             text_content = post_content.get_text(separator='\n', strip=True)
             
             # 尝试识别英文和中文对照的模式
-            lines = text_content.split('\n')
+            lines = [line.strip() for line in text_content.split('\n')]
+            # 每行只统计一次字符画像
+            profiles = profile_texts(lines)
             
             for i in range(len(lines) - 1):
-                current_line = lines[i].strip()
-                next_line = lines[i + 1].strip()
+                current_line = lines[i]
+                next_line = lines[i + 1]
                 
                 # 检查是否为英文-中文对照
-                if (self._is_english_text(current_line) and 
-                    self._is_chinese_text(next_line) and 
+                if (profiles[i].is_mostly_latin() and 
+                    next_line and profiles[i + 1].is_chinese(min_length=1) and 
                     len(current_line) > 10 and len(next_line) > 5):
                     
                     self.add_translation_sample(current_line, next_line)
@@ -353,25 +363,11 @@ class PersonalizedTranslator:
     
     def _is_english_text(self, text: str) -> bool:
         """判断文本是否主要为英文"""
-        if not text:
-            return False
-        
-        # 计算英文字符比例
-        english_chars = sum(1 for c in text if c.isascii() and c.isalpha())
-        total_chars = sum(1 for c in text if c.isalpha())
-        
-        return total_chars > 0 and english_chars / total_chars > 0.7
+        return bool(text) and profile_text(text).is_mostly_latin()
     
     def _is_chinese_text(self, text: str) -> bool:
         """判断文本是否主要为中文"""
-        if not text:
-            return False
-        
-        # 计算中文字符比例
-        chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
-        total_chars = len(text.replace(' ', ''))
-        
-        return total_chars > 0 and chinese_chars / total_chars > 0.3
+        return bool(text) and profile_text(text).is_chinese(min_length=1)
     
     def _load_preset_smogon_samples(self):
         """加载预设的Smogon翻译样本"""
@@ -522,27 +518,21 @@ class PersonalizedTranslator:
         
         return result
     
+    def _sync_memory_index(self):
+        """让翻译记忆索引与translation_pairs保持一致，只对新增的样本分词"""
+        if len(self.memory_index) > len(self.translation_pairs):
+            # translation_pairs被整体替换过，重建索引
+            self.memory_index.clear()
+        for pair in self.translation_pairs[len(self.memory_index):]:
+            self.memory_index.add(pair['english'])
+    
     def _find_similar_translation(self, english_text: str) -> str:
-        """查找相似的翻译样本"""
-        english_words = set(re.findall(r'\b\w+\b', english_text.lower()))
-        
-        best_match = None
-        best_score = 0
-        
-        for pair in self.translation_pairs:
-            sample_words = set(re.findall(r'\b\w+\b', pair['english'].lower()))
-            
-            # 计算词汇重叠度
-            overlap = len(english_words & sample_words)
-            total = len(english_words | sample_words)
-            
-            if total > 0:
-                score = overlap / total
-                if score > best_score and score > 0.3:  # 至少30%相似度
-                    best_score = score
-                    best_match = pair['chinese']
-        
-        return best_match
+        """查找相似的翻译样本（词汇Jaccard相似度至少30%）"""
+        self._sync_memory_index()
+        matches = self.memory_index.search(english_text, k=1, min_score=0.3)
+        if not matches:
+            return None
+        return self.translation_pairs[matches[0][0]]['chinese']
     
     def show_learning_progress(self):
         """显示学习进度"""
@@ -4,26 +4,31 @@ URL翻译器
 根据输入的Smogon论坛URL，爬取first post内容并使用学习结果进行中文翻译
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
 from datetime import datetime
 from typing import Dict, List, Any
 import os
 
+from first_post_extractor import extract_first_post, read_first_post
+from html_archive import ArchivingSession, create_session, parse_as_of
+from pokemon_lexicon import POKEMON_NAMES
+from term_matcher import get_term_matcher
+
 class URLTranslator:
-    def __init__(self):
+    def __init__(self, model_translator=None, archive_dir: str = None, replay: bool = False, as_of: float = None):
+        """
+        Args:
+            model_translator: 可选的神经翻译模块（如EnhancedTransformersModule），
+                提供时按行批量调用其translate_batch，否则使用规则翻译
+            archive_dir: 原始HTML归档目录（None表示不归档）
+            replay: 从archive_dir回放页面，不访问网络
+            as_of: 回放时只使用该时间（Unix时间戳）之前的快照，None表示使用最新的快照
+        """
+        self.model_translator = model_translator
+        
         # 初始化HTTP会话
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        self.session = create_session(archive_dir, replay, as_of)
         
         # 加载学习到的翻译知识
         self.load_learned_knowledge()
@@ -32,28 +37,7 @@ class URLTranslator:
         """加载学习到的翻译知识"""
         # 精确的术语词典
         self.term_dictionary = {
-            'pokemon_names': {
-                'Garchomp': '烈咬陆鲨',
-                'Giratina-O': '骑拉帝纳-起源',
-                'Giratina': '骑拉帝纳',
-                'Landorus-T': '土地云-灵兽',
-                'Landorus': '土地云',
-                'Clefable': '皮可西',
-                'Heatran': '席多蓝恩',
-                'Scizor': '巨钳螳螂',
-                'Kartana': '纸御剑',
-                'Zapdos': '闪电鸟',
-                'Ho-Oh': '凤王',
-                'Arceus': '阿尔宙斯',
-                'Kyogre': '盖欧卡',
-                'Koraidon': '故勒顿',
-                'Miraidon': '密勒顿',
-                'Necrozma-DM': '奈克洛兹玛-黄昏之鬃',
-                'Ting-Lu': '古鼎鹿',
-                'Gliscor': '天蝎王',
-                'Chien-Pao': '古剑豹',
-                'Clodsire': '土王'
-            },
+            'pokemon_names': dict(POKEMON_NAMES),
             'move_names': {
                 'Shadow Ball': '影子球',
                 'Dragon Dance': '龙之舞',
@@ -232,30 +216,35 @@ class URLTranslator:
             }
         }
         
-    def scrape_first_post(self, url: str) -> Dict[str, str]:
-        """爬取指定URL的first post内容"""
+    def scrape_first_post(self, url: str, stream: bool = True) -> Dict[str, str]:
+        """爬取指定URL的first post内容
+        
+        stream为True时边下载边扫描，读到第一个帖子结束就断开连接，不下载后面的回复；
+        归档原始HTML时总是下载完整页面，回放才能重现完整的运行
+        """
+        stream = stream and not isinstance(self.session, ArchivingSession)
         try:
             print(f"正在爬取URL: {url}")
             
             # 发送请求
-            response = self.session.get(url, timeout=15)
+            response = self.session.get(url, timeout=15, stream=stream)
+            if not response.ok:
+                response.close()
             response.raise_for_status()
             
-            # 解析HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 获取帖子标题
-            title_elem = soup.find('h1', class_='p-title-value')
-            title = title_elem.get_text(strip=True) if title_elem else "未知标题"
-            
-            # 查找第一个帖子内容
-            first_post = soup.find('div', class_='bbWrapper')
+            # 只解析标题和第一个帖子内容
+            if stream:
+                page, stream_stats = read_first_post(response)
+                print(stream_stats.summary())
+            else:
+                page = extract_first_post(response.content)
+            title = page.title or "未知标题"
             
-            if not first_post:
+            if page.post is None:
                 raise Exception("未找到帖子内容")
             
             # 提取纯文本内容
-            text_content = first_post.get_text(separator='\n', strip=True)
+            text_content = page.text()
             
             # 清理文本格式
             lines = text_content.split('\n')
@@ -284,16 +273,12 @@ class URLTranslator:
         """翻译英文文本为中文"""
         result = text
         
-        # 1. 应用术语翻译（按长度降序排序以避免部分匹配）
+        # 1. 应用术语翻译（单次扫描，最长匹配优先以避免部分匹配）
         all_terms = {}
         for category in self.term_dictionary.values():
             all_terms.update(category)
         
-        sorted_terms = sorted(all_terms.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for en_term, cn_term in sorted_terms:
-            pattern = r'\b' + re.escape(en_term) + r'\b'
-            result = re.sub(pattern, cn_term, result, flags=re.IGNORECASE)
+        result = get_term_matcher(all_terms, ignore_case=True).replace(result)
         
         # 2. 应用语法结构转换
         for category, patterns in self.grammar_structures.items():
@@ -305,14 +290,19 @@ class URLTranslator:
         for category in self.general_vocabulary.values():
             all_vocab.update(category)
         
-        sorted_vocab = sorted(all_vocab.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for en_word, cn_word in sorted_vocab:
-            pattern = r'\b' + re.escape(en_word) + r'\b'
-            result = re.sub(pattern, cn_word, result, flags=re.IGNORECASE)
+        result = get_term_matcher(all_vocab, ignore_case=True).replace(result)
         
         return result
     
+    def translate_with_model(self, text: str) -> str:
+        """使用神经翻译模块按行批量翻译，空行原样保留"""
+        lines = text.split('\n')
+        positions = [i for i, line in enumerate(lines) if line.strip()]
+        translations = self.model_translator.translate_batch([lines[i] for i in positions])
+        for i, translation in zip(positions, translations):
+            lines[i] = translation
+        return '\n'.join(lines)
+    
     def analyze_translation_quality(self, english: str, chinese: str) -> Dict[str, float]:
         """分析翻译质量"""
         # 计算中文字符比例
@@ -354,7 +344,10 @@ class URLTranslator:
         
         # 翻译内容
         print("\n正在翻译内容...")
-        translated_content = self.translate_text(scraped_data['content'])
+        if self.model_translator is not None:
+            translated_content = self.translate_with_model(scraped_data['content'])
+        else:
+            translated_content = self.translate_text(scraped_data['content'])
         
         # 分析质量
         quality = self.analyze_translation_quality(scraped_data['content'], translated_content)
@@ -430,12 +423,34 @@ class URLTranslator:
 
 def main():
     """主函数"""
-    translator = URLTranslator()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Smogon帖子URL翻译器')
+    parser.add_argument('url', nargs='?', help='帖子URL（不指定时进入交互模式）')
+    parser.add_argument('--archive-dir', type=str, default='html_archive', help='原始HTML归档目录')
+    parser.add_argument('--no-archive', action='store_true', help='不保存原始HTML')
+    parser.add_argument('--replay', action='store_true', help='从归档读取页面，不访问网络')
+    parser.add_argument('--as-of', type=parse_as_of, default=None,
+                        help='回放时只使用该时间之前的快照（Unix时间戳或ISO日期时间，如2026-10-01T12:00:00）')
+    parser.add_argument('--model', type=str, default=None,
+                        help='使用神经翻译模型（transformers_config.json中的模型键，如mt5_small），不指定时使用规则翻译')
+    parser.add_argument('--config', type=str, default='transformers_config.json', help='神经翻译模型的配置文件')
+    args = parser.parse_args()
+    if args.as_of is not None and not args.replay:
+        parser.error('--as-of只能与--replay一起使用')
+    
+    model_translator = None
+    if args.model:
+        from enhanced_transformers_module import EnhancedTransformersModule
+        print(f"正在加载翻译模型: {args.model}")
+        model_translator = EnhancedTransformersModule(config_path=args.config, model_key=args.model)
+    
+    translator = URLTranslator(model_translator=model_translator,
+                               archive_dir=None if args.no_archive and not args.replay else args.archive_dir,
+                               replay=args.replay, as_of=args.as_of)
     
-    # 检查命令行参数
-    import sys
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
+    if args.url:
+        url = args.url
         print(f"处理URL: {url}")
         result = translator.process_url(url)
         if result: